@@ -0,0 +1,188 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""Asynchronous (non-blocking) checkpointing."""
+
+import copy
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Type
+
+import torch
+
+
+def _fsync_dir(dir_path: str) -> None:
+    # Directories can not be opened (and synced) on Windows
+    if os.name == "nt":
+        return
+
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_save(obj: Any, path: str) -> None:
+    """Saves an object with `torch.save`, so that `path` holds either the previous
+    or the new file, even if the process is interrupted.
+
+    The object is written to a temporary file, which is synced to disk and renamed to `path`.
+
+    Args:
+        obj: Object to be saved.
+        path: Path to the output file.
+
+    """
+
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "wb") as f:
+        torch.save(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def atomic_copy(src_path: str, dst_path: str) -> None:
+    """Copies a file, so that `dst_path` holds either the previous or the new file.
+
+    Args:
+        src_path: Path to the source file.
+        dst_path: Path to the destination file.
+
+    """
+
+    tmp_path = dst_path + ".tmp"
+
+    shutil.copy(src_path, tmp_path)
+    with open(tmp_path, "rb+") as f:
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, dst_path)
+    _fsync_dir(os.path.dirname(os.path.abspath(dst_path)))
+
+
+class AsyncCheckpointer:
+    """Saves checkpoints in a background thread.
+
+    When a checkpoint is saved, its tensors are copied (snapshotted) into CPU buffers,
+    which are pinned if CUDA is available and reused across saves, and the remaining
+    objects are deep-copied. Serialization, syncing to disk and (atomic) renaming
+    are performed in the background, so training can continue while the checkpoint is written.
+
+    Callers should `wait` for the in-flight checkpoints before exiting, or use the checkpointer
+    as a context manager, which waits for them when the context is exited.
+
+    """
+
+    def __init__(self, max_in_flight: Optional[int] = 1) -> None:
+        """Initialize the checkpointer.
+
+        Args:
+            max_in_flight: Maximum number of checkpoints being written at the same time.
+                Saving another checkpoint waits for the oldest one to finish.
+
+        """
+
+        assert max_in_flight > 0, "`max_in_flight` should be greater than 0."
+
+        self.max_in_flight = max_in_flight
+
+        # Each in-flight save has its own set of buffers, which are reused once it finishes
+        self._buffers = [{} for _ in range(max_in_flight)]
+        self._futures: List[Optional[Future]] = [None] * max_in_flight
+        self._n_saves = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="async_checkpoint")
+
+    def _snapshot(self, obj: Any, buffers: Dict[str, torch.Tensor], key: str) -> Any:
+        """Copies an object, placing its tensors in CPU buffers.
+
+        Args:
+            obj: Object to be copied.
+            buffers: Buffers of the current save, indexed by the key of their tensor.
+            key: Key (path) of the object, which identifies its buffer across saves.
+
+        Returns:
+            Copied object.
+
+        """
+
+        if isinstance(obj, torch.Tensor):
+            buffer = buffers.get(key)
+            if buffer is None or buffer.shape != obj.shape or buffer.dtype != obj.dtype:
+                buffer = torch.empty(obj.shape, dtype=obj.dtype, pin_memory=torch.cuda.is_available())
+                buffers[key] = buffer
+
+            return buffer.copy_(obj.detach(), non_blocking=True)
+
+        if isinstance(obj, dict):
+            snapshot = copy.copy(obj)
+            for k, v in obj.items():
+                snapshot[k] = self._snapshot(v, buffers, f"{key}/{k}")
+
+            return snapshot
+
+        if isinstance(obj, (list, tuple)) and not hasattr(obj, "_fields"):
+            return type(obj)(self._snapshot(v, buffers, f"{key}/{i}") for i, v in enumerate(obj))
+
+        return copy.deepcopy(obj)
+
+    def save(self, obj: Any, path: str, copy_paths: Optional[List[str]] = None) -> Future:
+        """Snapshots an object and saves it in the background.
+
+        Args:
+            obj: Object (usually a dictionary of state dictionaries) to be saved.
+            path: Path to the output file.
+            copy_paths: Paths where the output file should be copied to after it is saved.
+
+        Returns:
+            Future that is resolved when the checkpoint has been written.
+
+        """
+
+        slot = self._n_saves % self.max_in_flight
+        self._n_saves += 1
+
+        # Buffers of this slot can only be reused once its previous save has finished
+        if self._futures[slot] is not None:
+            self._futures[slot].result()
+
+        snapshot = self._snapshot(obj, self._buffers[slot], "")
+
+        # Waits for the (non-blocking) device-to-host copies
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+
+        self._futures[slot] = self._executor.submit(self._write, snapshot, path, copy_paths or [])
+
+        return self._futures[slot]
+
+    def _write(self, snapshot: Any, path: str, copy_paths: List[str]) -> None:
+        atomic_save(snapshot, path)
+
+        for copy_path in copy_paths:
+            atomic_copy(path, copy_path)
+
+    def wait(self) -> None:
+        """Waits for all in-flight checkpoints to be written, raising their errors (if any)."""
+
+        for future in self._futures:
+            if future is not None:
+                future.result()
+
+    def __enter__(self) -> "AsyncCheckpointer":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.wait()
@@ -8,6 +8,7 @@ import os
 
 import torch
 
+from .async_checkpoint import AsyncCheckpointer, atomic_save
 from .config import Config
 from . import utils
 
@@ -20,6 +21,9 @@ class CheckPoint(UserDict):
     by setting key, value pairs after new(). As any dictionary key is set,
     checkpoint becomes dirty. On commit(), dictionary is saved and emptied.
     Invariant: checkpoint remains dirty until commit() is called.
+
+    If `async` is set in the checkpoint config, commit() snapshots the dictionary
+    and saves it in the background; wait() blocks until pending saves are done.
     """
     def __init__(self, conf_checkpoint:Config, load_existing:bool) -> None:
         super().__init__()
@@ -27,15 +31,18 @@ class CheckPoint(UserDict):
         # region config vars
         self.filepath = utils.full_path(conf_checkpoint['filename'])
         self.freq = conf_checkpoint['freq']
+        async_save = conf_checkpoint.get_val('async', False)
         # endregion
 
         self._callbacks = []
+        self._checkpointer = AsyncCheckpointer() if async_save else None
 
         if load_existing:
             self.load_existing()
 
     def load_existing(self)->bool:
         assert self.is_empty()
+        self.wait()
         if self.filepath and os.path.exists(self.filepath):
             d = torch.load(self.filepath, map_location=torch.device('cpu'))
             self.clear()
@@ -58,9 +65,16 @@ class CheckPoint(UserDict):
 
     def commit(self)->None:
         assert self.filepath and not self.is_empty()
-        torch.save(self.data, self.filepath)
+        if self._checkpointer is not None:
+            self._checkpointer.save(self.data, self.filepath)
+        else:
+            atomic_save(self.data, self.filepath)
         # clean up after commit so we don't hold up references
 
+    def wait(self)->None:
+        if self._checkpointer is not None:
+            self._checkpointer.wait()
+
     def is_empty(self)->bool:
         return len(self) == 0
 
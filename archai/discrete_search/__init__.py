@@ -1,6 +1,7 @@
 from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.dataset import DatasetProvider
 from archai.discrete_search.api.objective import Objective, AsyncObjective
+from archai.discrete_search.api.objective_cache import ObjectiveCache
 from archai.discrete_search.api.search_space import (
     DiscreteSearchSpace, EvolutionarySearchSpace, 
     BayesOptSearchSpace, RLSearchSpace
@@ -79,7 +79,7 @@ class MoBananasSearch(Searcher):
         return evaluate_models(archs, cheap_objectives, self.dataset_provider)
 
     def get_surrogate_iter_dataset(self, all_pop: List[ArchaiModel]):
-        encoded_archs = np.vstack([self.search_space.encode(m) for m in all_pop])
+        encoded_archs = self.search_space.encode_many(all_pop)
         target = np.array([
             self.search_state.all_evaluation_results[obj] 
             for obj in self.expensive_objectives
@@ -89,17 +89,12 @@ class MoBananasSearch(Searcher):
     
     def mutate_parents(self, parents: List[ArchaiModel],
                        mutations_per_parent: int = 1) -> List[ArchaiModel]:
-        mutated_models = [
-            self.search_space.mutate(p)
-            for p in parents
-            for _ in range(mutations_per_parent)
-        ]
-
-        # Removes duplicates
-        mutated_models = [
-            m for m in mutated_models 
-            if m.archid not in self.evaluated_archids
-        ]
+        # Duplicates are rejected by the search space
+        mutated_models = self.search_space.mutate_many(
+            [p for p in parents for _ in range(mutations_per_parent)],
+            exclude=self.evaluated_archids
+        )
+        mutated_models = [m for m in mutated_models if m is not None]
 
         if not mutated_models:
             raise ValueError(
@@ -111,7 +106,7 @@ class MoBananasSearch(Searcher):
 
     def predict_expensive_objectives(self, archs: List[ArchaiModel]) -> Dict[str, MeanVar]:
         ''' Predicts expensive objectives for `archs` using surrogate model ''' 
-        encoded_archs = np.vstack([self.search_space.encode(m) for m in archs])
+        encoded_archs = self.search_space.encode_many(archs)
         pred_results = self.surrogate_model.predict(encoded_archs)
         
         return {
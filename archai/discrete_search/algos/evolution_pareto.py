@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import math
 from overrides.overrides import overrides
 from pathlib import Path
 import random
@@ -14,7 +15,7 @@ from archai.discrete_search import (
 )
 
 from archai.discrete_search.api.search_space import EvolutionarySearchSpace
-from archai.discrete_search.utils.evaluation import evaluate_models
+from archai.discrete_search.utils.evaluation import StreamingEvaluator
 
 
 class EvolutionParetoSearch(Searcher):
@@ -26,7 +27,8 @@ class EvolutionParetoSearch(Searcher):
                  num_random_mix: int = 5, max_unseen_population: int = 100,
                  mutations_per_parent: int = 1, num_crossovers: int = 5, 
                  obj_valid_ranges: Optional[List[Tuple[float, float]]] = None,
-                 crowd_sorting: Optional[Dict[str, Union[bool, float]]] = None, seed: int = 1):
+                 crowd_sorting: Optional[Dict[str, Union[bool, float]]] = None,
+                 min_ready_fraction: float = 1.0, seed: int = 1):
         
         assert isinstance(search_space, EvolutionarySearchSpace), \
             f'{str(search_space.__class__)} is not compatible with {str(self.__class__)}'
@@ -49,6 +51,11 @@ class EvolutionParetoSearch(Searcher):
         self.obj_valid_ranges = obj_valid_ranges
         self.crowd_sorting = crowd_sorting
 
+        # Fraction of the models submitted in an iteration that must be evaluated before
+        # proceeding. Models still pending on async objectives are carried over and added
+        # to the search state of the iteration they finish in
+        self.min_ready_fraction = min_ready_fraction
+
         # Utils
         self.search_state = SearchResults(search_space, objectives)
         self.seed = seed
@@ -61,6 +68,7 @@ class EvolutionParetoSearch(Searcher):
         assert self.num_iters > 0
         assert self.num_random_mix > 0
         assert self.max_unseen_population > 0
+        assert 0 < self.min_ready_fraction <= 1.0
 
     def filter_population(self, population: List[ArchaiModel]):
         ''' Filter the population based on the objectives constraints '''
@@ -81,6 +89,9 @@ class EvolutionParetoSearch(Searcher):
         mutations = {}
         oversample_factor = 1
 
+        # Evaluated architectures and candidates are rejected by the search space before being built
+        seen_archids = set(self.evaluated_architectures)
+
         if self.crowd_sorting:
             oversample_factor = (
                 self.crowd_sorting['oversampling_factor'] if self.crowd_sorting['mutation']
@@ -100,15 +111,17 @@ class EvolutionParetoSearch(Searcher):
                 continue
 
             while len(candidates) < (mutations_per_parent * oversample_factor) and nb_tries < patience:
-                mutated_model = self.search_space.mutate(p)
-                mutated_model.metadata['parent'] = p.archid
-
-                mutated_models = [mutated_model] if not isinstance(mutated_model, list) else mutated_model
+                mutated_models = self.search_space.mutate_many(
+                    [p] * (mutations_per_parent * oversample_factor - len(candidates)),
+                    exclude=seen_archids
+                )
 
                 for nbr in mutated_models:
-                    if nbr.archid not in self.evaluated_architectures:
+                    if nbr is not None:
+                        nbr.metadata['parent'] = p.archid
                         nbr.metadata['generation'] = self.iter_num
                         candidates[nbr.archid] = nbr
+                        seen_archids.add(nbr.archid)
                 nb_tries += 1
             
             # TODO: Figure out a way to use crowd sorting here
@@ -135,15 +148,14 @@ class EvolutionParetoSearch(Searcher):
 
         if len(parents) >= 2:
             pairs = [random.sample(parents, 2) for _ in range(num_crossovers)]
-            for p1, p2 in pairs:
-                child = self.search_space.crossover([p1, p2])
+            crossovers = self.search_space.crossover_many(pairs, exclude=self.evaluated_architectures)
 
-                if child:
-                    if child.archid not in children_hashes and child.archid not in self.evaluated_architectures:
-                        child.metadata['generation'] = self.iter_num
-                        child.metadata['parents'] = f'{p1.archid},{p2.archid}'
-                        children.append(child)
-                        children_hashes.add(child.archid)
+            for (p1, p2), child in zip(pairs, crossovers):
+                if child and child.archid not in children_hashes:
+                    child.metadata['generation'] = self.iter_num
+                    child.metadata['parents'] = f'{p1.archid},{p2.archid}'
+                    children.append(child)
+                    children_hashes.add(child.archid)
 
         return children
 
@@ -179,6 +191,7 @@ class EvolutionParetoSearch(Searcher):
             unseen_pop = self.sample_random_models(self.init_num_models)
 
         self.all_pop = unseen_pop
+        evaluator = StreamingEvaluator(self.objectives)
 
         for i in range(self.num_iters):
             self.iter_num = i + 1
@@ -192,20 +205,32 @@ class EvolutionParetoSearch(Searcher):
                 f' {len(unseen_pop)} models'
             )
 
-            results = evaluate_models(unseen_pop, self.objectives, self.dataset_provider)
+            tickets = evaluator.submit(unseen_pop, self.dataset_provider)
+
+            # Records submitted archs to avoid computing the same architecture twice
+            self.evaluated_architectures.update([m.archid for m in unseen_pop])
+
+            # Waits for all pending models (including previous iterations) in the last iteration
+            min_models, tickets = (
+                (None, None) if i == self.num_iters - 1
+                else (math.ceil(self.min_ready_fraction * len(tickets)), tickets)
+            )
+            evaluated_pop, results, _ = evaluator.fetch(min_models, tickets=tickets)
+
+            self.logger.info(
+                f'iter {i}: {len(evaluated_pop)} models evaluated, {evaluator.num_pending} still pending'
+            )
+
             self.search_state.add_iteration_results(
-                unseen_pop, results,
+                evaluated_pop, results,
 
                 # Mutation and crossover info
                 extra_model_data={
-                    'parent': [p.metadata.get('parent', None) for p in unseen_pop],
-                    'parents': [p.metadata.get('parents', None) for p in unseen_pop],
+                    'parent': [p.metadata.get('parent', None) for p in evaluated_pop],
+                    'parents': [p.metadata.get('parents', None) for p in evaluated_pop],
                 }
             )
 
-            # Records evaluated archs to avoid computing the same architecture twice
-            self.evaluated_architectures.update([m.archid for m in unseen_pop])
-
             # update the pareto frontier
             self.logger.info(f'iter {i}: updating the pareto')
             pareto = self.search_state.get_pareto_frontier()['models']
@@ -0,0 +1,307 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from overrides import overrides
+
+from archai.common.utils import create_logger
+from archai.discrete_search import (
+    ArchaiModel, AsyncObjective, DatasetProvider, Objective,
+    SearchResults, Searcher
+)
+from archai.discrete_search.api.search_space import EvolutionarySearchSpace
+from archai.discrete_search.utils.evaluation import StreamingEvaluator
+from archai.discrete_search.utils.multi_objective import get_pareto_frontier
+
+
+class SteadyStateEvolutionSearch(Searcher):
+    def __init__(self, search_space: EvolutionarySearchSpace,
+                 objectives: Dict[str, Union[Objective, AsyncObjective]],
+                 dataset_provider: DatasetProvider,
+                 output_dir: str, num_evals: int = 1000,
+                 max_in_flight: int = 8, init_num_models: int = 10,
+                 initial_population_paths: Optional[List[str]] = None,
+                 crossover_prob: float = 0.2, random_sample_prob: float = 0.05,
+                 obj_valid_ranges: Optional[List[Tuple[float, float]]] = None,
+                 generation_size: Optional[int] = None, save_every: Optional[int] = None,
+                 patience: int = 20, seed: int = 1):
+        """Asynchronous (steady-state) evolutionary multi-objective search.
+
+        Unlike `EvolutionParetoSearch`, which evaluates whole generations, this algorithm keeps
+        `max_in_flight` evaluations running at all times. Whenever evaluations finish, their results
+        are used as parents and the same number of children are generated (by mutating or
+        crossing over members of the current frontier) and submitted.
+
+        Finished evaluations are added to the search results in groups of `generation_size`
+        models, which are recorded as search iterations. This bounds the number of iterations
+        (and the Pareto frontiers kept for each of them) instead of recording one per evaluation.
+
+        Evaluations are considered in flight while any of their `AsyncObjective` jobs is pending,
+        so `max_in_flight` should usually match the number of workers of the asynchronous objectives.
+        Synchronous objectives are computed when models are submitted.
+
+        Args:
+            search_space (EvolutionarySearchSpace): Search space.
+            objectives (Dict[str, Union[Objective, AsyncObjective]]): Dictionary mapping
+                an objective identifier to an objective object.
+            dataset_provider (DatasetProvider): Dataset provider.
+            output_dir (str): Output directory.
+            num_evals (int, optional): Total number of evaluations. Defaults to 1000.
+            max_in_flight (int, optional): Number of concurrent evaluations. Defaults to 8.
+            init_num_models (int, optional): Number of random models of the initial population,
+                if `initial_population_paths` is not provided. Defaults to 10.
+            initial_population_paths (Optional[List[str]], optional): Paths of the architectures
+                of the initial population. Defaults to None.
+            crossover_prob (float, optional): Probability of generating a child by crossover
+                instead of mutation. Defaults to 0.2.
+            random_sample_prob (float, optional): Probability of sampling a random model
+                instead of a child, to mitigate local minima. Defaults to 0.05.
+            obj_valid_ranges (Optional[List[Tuple[float, float]]], optional): Valid range of each
+                objective. Models outside of these ranges are not used as parents. Defaults to None.
+            generation_size (Optional[int], optional): Number of finished evaluations recorded as
+                a single search iteration. If `None`, uses `max_in_flight`. Defaults to None.
+            save_every (Optional[int], optional): Number of finished evaluations between saving
+                the search state, which is saved when search iterations are recorded.
+                If `None`, uses `max_in_flight`. Defaults to None.
+            patience (int, optional): Maximum number of tries to generate a child that was not
+                evaluated before, after which a random model is sampled. Defaults to 20.
+            seed (int, optional): Random seed. Defaults to 1.
+        """
+
+        assert isinstance(search_space, EvolutionarySearchSpace), \
+            f'{str(search_space.__class__)} is not compatible with {str(self.__class__)}'
+
+        self.search_space = search_space
+        self.objectives = objectives
+        self.dataset_provider = dataset_provider
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True, parents=True)
+
+        # Algorithm settings
+        self.num_evals = num_evals
+        self.max_in_flight = max_in_flight
+        self.init_num_models = init_num_models
+        self.initial_population_paths = initial_population_paths
+        self.crossover_prob = crossover_prob
+        self.random_sample_prob = random_sample_prob
+        self.obj_valid_ranges = obj_valid_ranges
+        self.generation_size = generation_size or max_in_flight
+        self.save_every = save_every or max_in_flight
+        self.patience = patience
+
+        # Utils
+        self.search_state = SearchResults(search_space, objectives)
+
+        # Finished evaluations that were not recorded in `search_state` yet
+        self.unrecorded_pop = []
+        self.unrecorded_results = {obj_name: [] for obj_name in objectives}
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.evaluated_architectures = set()
+        self.num_submitted = 0
+        self.num_evaluated = 0
+        self.logger = create_logger(str(self.output_dir / 'log.log'), enable_stdout=True)
+
+        assert self.num_evals > 0
+        assert self.max_in_flight > 0
+        assert self.generation_size > 0
+        assert 0 <= self.crossover_prob <= 1 and 0 <= self.random_sample_prob <= 1
+
+    def get_pareto_frontier(self) -> Dict:
+        """Gets the Pareto frontier of all finished evaluations, including the unrecorded ones."""
+
+        if self.search_state.iteration_num > 0:
+            pareto = self.search_state.get_pareto_frontier()
+        else:
+            pareto = {'models': [], 'evaluation_results': {obj_name: np.array([]) for obj_name in self.objectives}}
+
+        if not self.unrecorded_pop:
+            return pareto
+
+        return get_pareto_frontier(
+            pareto['models'] + self.unrecorded_pop,
+            {
+                obj_name: np.concatenate([
+                    pareto['evaluation_results'][obj_name],
+                    np.array(self.unrecorded_results[obj_name], dtype=np.float64)
+                ])
+                for obj_name in self.objectives
+            },
+            self.objectives
+        )
+
+    def get_parents(self) -> List[ArchaiModel]:
+        """Gets the members of the current Pareto frontier within `obj_valid_ranges`."""
+
+        pareto = self.get_pareto_frontier()
+
+        if not self.obj_valid_ranges:
+            return pareto['models']
+
+        return [
+            model for model_idx, model in enumerate(pareto['models'])
+            if all(
+                min_value <= pareto['evaluation_results'][obj_name][model_idx] <= max_value
+                for obj_name, (min_value, max_value) in zip(self.objectives, self.obj_valid_ranges)
+            )
+        ]
+
+    def sample_random_model(self) -> ArchaiModel:
+        model = self.search_space.random_sample()
+        model.metadata['generation'] = self.num_submitted
+
+        return model
+
+    def generate_child(self, parents: List[ArchaiModel]) -> ArchaiModel:
+        """Generates a model that was not evaluated before by mutating or crossing over `parents`.
+
+        Args:
+            parents (List[ArchaiModel]): Candidate parents.
+
+        Returns:
+            ArchaiModel: Child model, or a random model if `parents` is empty or
+                no new child was found within `patience` tries.
+        """
+
+        if not parents or self.rng.random() < self.random_sample_prob:
+            return self.sample_random_model()
+
+        for _ in range(self.patience):
+            # Children of evaluated architectures are rejected by the search space
+            if len(parents) >= 2 and self.rng.random() < self.crossover_prob:
+                p1, p2 = self.rng.sample(parents, 2)
+                child = self.search_space.crossover_many([[p1, p2]], exclude=self.evaluated_architectures)[0]
+                parents_info = {'parents': f'{p1.archid},{p2.archid}'}
+            else:
+                parent = self.rng.choice(parents)
+                child = self.search_space.mutate_many([parent], exclude=self.evaluated_architectures)[0]
+                parents_info = {'parent': parent.archid}
+
+            if child is not None:
+                child.metadata.update(parents_info)
+                child.metadata['generation'] = self.num_submitted
+
+                return child
+
+        return self.sample_random_model()
+
+    def submit(self, evaluator: StreamingEvaluator, models: List[ArchaiModel]) -> None:
+        # Records submitted archs to avoid evaluating the same architecture twice
+        self.evaluated_architectures.update(m.archid for m in models)
+        self.num_submitted += len(models)
+
+        evaluator.submit(models, self.dataset_provider)
+
+    def record_generation(self) -> None:
+        """Adds the unrecorded evaluations to the search results as a search iteration."""
+
+        if not self.unrecorded_pop:
+            return
+
+        evaluated_pop = self.unrecorded_pop
+        self.search_state.add_iteration_results(
+            evaluated_pop,
+            {obj_name: np.array(results) for obj_name, results in self.unrecorded_results.items()},
+            extra_model_data={
+                'parent': [p.metadata.get('parent', None) for p in evaluated_pop],
+                'parents': [p.metadata.get('parents', None) for p in evaluated_pop],
+            }
+        )
+
+        self.unrecorded_pop = []
+        self.unrecorded_results = {obj_name: [] for obj_name in self.objectives}
+
+    def save_search_state(self) -> None:
+        self.search_state.save_search_state(
+            str(self.output_dir / f'search_state_{self.search_state.num_models}.csv')
+        )
+
+        self.search_state.save_pareto_frontier_models(
+            str(self.output_dir / f'pareto_models_{self.search_state.num_models}')
+        )
+
+        self.search_state.save_all_2d_pareto_evolution_plots(str(self.output_dir))
+
+    @overrides
+    def search(self) -> SearchResults:
+        if self.initial_population_paths:
+            self.logger.info(
+                f'Loading initial population from {len(self.initial_population_paths)} architectures'
+            )
+            init_pop = [self.search_space.load_arch(path) for path in self.initial_population_paths]
+        else:
+            self.logger.info(f'Using {self.init_num_models} random architectures as the initial population')
+            init_pop = [self.sample_random_model() for _ in range(self.init_num_models)]
+
+        init_pop = init_pop[:self.num_evals]
+        evaluator = StreamingEvaluator(self.objectives)
+
+        # Models of the initial population that do not fit in the evaluation slots
+        # are submitted as soon as slots become available
+        self.submit(evaluator, init_pop[:self.max_in_flight])
+        queued_pop = init_pop[self.max_in_flight:]
+        last_save = 0
+
+        while self.num_evaluated < self.num_evals:
+            evaluated_pop, results, _ = evaluator.fetch(1)
+
+            # Finished evaluations are used as parents right away, but only recorded
+            # in the search results once a whole generation has finished
+            self.unrecorded_pop.extend(evaluated_pop)
+            for obj_name, obj_results in results.items():
+                self.unrecorded_results[obj_name].extend(obj_results)
+
+            self.num_evaluated += len(evaluated_pop)
+
+            if len(self.unrecorded_pop) >= self.generation_size or self.num_evaluated >= self.num_evals:
+                self.record_generation()
+
+                self.logger.info(
+                    f'{self.num_evaluated}/{self.num_evals} models evaluated, {evaluator.num_pending} in flight, '
+                    f'{len(self.search_state.pareto_archive[-1][0])} Pareto-frontier members'
+                )
+
+                num_models = self.search_state.num_models
+                if num_models - last_save >= self.save_every or num_models >= self.num_evals:
+                    self.save_search_state()
+                    last_save = num_models
+
+            # Refills the evaluation slots
+            num_new_models = min(
+                self.max_in_flight - evaluator.num_pending,
+                self.num_evals - self.num_submitted
+            )
+
+            new_models, queued_pop = queued_pop[:num_new_models], queued_pop[num_new_models:]
+            parents = self.get_parents() if len(new_models) < num_new_models else []
+
+            new_archids = {m.archid for m in new_models}
+
+            for _ in range(self.patience * num_new_models):
+                if len(new_models) >= num_new_models:
+                    break
+
+                # Random samples may also be duplicates
+                child = self.generate_child(parents)
+
+                if child.archid not in self.evaluated_architectures and child.archid not in new_archids:
+                    new_models.append(child)
+                    new_archids.add(child.archid)
+
+            if new_models:
+                self.submit(evaluator, new_models)
+            elif evaluator.num_pending == 0:
+                self.logger.info('Search ended. Could not find new architectures to evaluate.')
+
+                if self.unrecorded_pop:
+                    self.record_generation()
+                    self.save_search_state()
+
+                break
+
+        return self.search_state
@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import math
 import random
 from overrides import overrides
 from typing import List, Union, Dict
@@ -14,7 +15,7 @@ from archai.discrete_search import (
 )
 
 from archai.discrete_search.utils import get_non_dominated_sorting
-from archai.discrete_search.utils.evaluation import evaluate_models
+from archai.discrete_search.utils.evaluation import StreamingEvaluator
 
 
 class SucessiveHalvingSearch(Searcher):
@@ -25,6 +26,7 @@ class SucessiveHalvingSearch(Searcher):
                  init_num_models: int = 10,
                  init_budget: float = 1.0,
                  budget_multiplier: float = 2.0,
+                 min_ready_fraction: float = 1.0,
                  seed: int = 1):
 
         assert isinstance(search_space, DiscreteSearchSpace)
@@ -39,6 +41,12 @@ class SucessiveHalvingSearch(Searcher):
         self.init_budget = init_budget
         self.budget_multiplier = budget_multiplier
 
+        # Fraction of the models of each round that must be evaluated before choosing
+        # the models promoted to the next round. Models that finish later are still
+        # recorded in the search state (with their original budget), but are not promoted
+        self.min_ready_fraction = min_ready_fraction
+        assert 0 < self.min_ready_fraction <= 1.0
+
         self.output_dir.mkdir(exist_ok=True)
 
         # Utils
@@ -56,6 +64,7 @@ class SucessiveHalvingSearch(Searcher):
         current_budget = self.init_budget
         population = [self.search_space.random_sample() for _ in range(self.init_num_models)]
         selected_models = population
+        evaluator = StreamingEvaluator(self.objectives)
 
         for i in range(self.num_iters):
             if len(selected_models) <= 1:
@@ -70,18 +79,27 @@ class SucessiveHalvingSearch(Searcher):
             )
 
             self.logger.info(f'Evaluating {len(selected_models)} models with budget {current_budget}..')
-            results = evaluate_models(selected_models, self.objectives, self.dataset_provider, budgets={
+            tickets = evaluator.submit(selected_models, self.dataset_provider, budgets={
                 obj_name: current_budget
                 for obj_name in self.objectives
             })
 
-            # Logs results and saves iteration models
-            self.search_state.add_iteration_results(
-                selected_models, results,
-                extra_model_data={
-                    'budget': [current_budget] * len(selected_models)
-                }
+            # Waits for all pending models (including previous iterations) in the last iteration
+            min_models, tickets = (
+                (None, None) if i == self.num_iters - 1
+                else (math.ceil(self.min_ready_fraction * len(tickets)), tickets)
             )
+            evaluated_models, results, budgets = evaluator.fetch(min_models, tickets=tickets)
+
+            # Logs results (including late models from previous rounds) and saves iteration models
+            self._add_iteration_results(evaluated_models, results, budgets)
+
+            # Only models from this round are considered for promotion
+            round_ids = {id(model) for model in selected_models}
+            round_mask = [id(model) in round_ids for model in evaluated_models]
+
+            selected_models = [model for model, m in zip(evaluated_models, round_mask) if m]
+            results = {obj_name: obj_results[round_mask] for obj_name, obj_results in results.items()}
 
             models_dir = self.output_dir / f'models_iter_{self.iter_num}'
             models_dir.mkdir(exist_ok=True)
@@ -106,6 +124,18 @@ class SucessiveHalvingSearch(Searcher):
             # Update parameters for next iteration
             self.iter_num += 1
             current_budget = current_budget * self.budget_multiplier
-        
+
+        # Records models that are still being evaluated
+        if evaluator.num_pending > 0:
+            self._add_iteration_results(*evaluator.fetch())
+
         return self.search_state
 
+    def _add_iteration_results(self, models, results, budgets) -> None:
+        self.search_state.add_iteration_results(
+            models, results,
+            extra_model_data={
+                'budget': budgets[next(iter(self.objectives))]
+            }
+        )
+
@@ -1,31 +1,80 @@
-
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 
 class ArchaiModel():
     """Wraps a model object with an architecture id and optionally a metadata dictionary.
 
         Args:
             arch (Any): Model object (e.g torch.nn.Module)
-            
+
             archid (str): **Architecture** string identifier of `arch` object. Will be used to deduplicate
-                models of the same architecture, so architecture hashes are prefered. `archid` should only 
+                models of the same architecture, so architecture hashes are prefered. `archid` should only
                 identify neural network architectures and not model weight information.
-            
+
             metadata (Optional[Dict], optional): Optional model metadata dictionary. Defaults to None.
+
+            build_fn (Optional[Callable[[ArchaiModel], Any]], optional): Optional function that builds
+                the model object from the `ArchaiModel` (e.g from its architecture config in `metadata`).
+                If provided, the model is lazy: `arch` can be `None` and is built on its first access,
+                and can be released with `ArchaiModel.release`. Defaults to None.
         """
 
-    def __init__(self, arch: Any, archid: str, metadata: Optional[Dict] = None):
-        self.arch = arch
+    def __init__(self, arch: Any, archid: str, metadata: Optional[Dict] = None,
+                 build_fn: Optional[Callable[['ArchaiModel'], Any]] = None):
+        self._arch = arch
         self.archid = archid
         self.metadata = metadata or dict()
+        self.build_fn = build_fn
+
+    @property
+    def arch(self) -> Any:
+        """Model object. Lazy models are built on first access."""
+
+        if self._arch is None and self.build_fn is not None:
+            self._arch = self.build_fn(self)
+
+        return self._arch
+
+    @arch.setter
+    def arch(self, arch: Any) -> None:
+        self._arch = arch
+
+    @property
+    def is_lazy(self) -> bool:
+        """Whether the model object can be built (and released) on demand."""
+
+        return self.build_fn is not None
+
+    @property
+    def is_materialized(self) -> bool:
+        """Whether the model object is currently built."""
+
+        return self._arch is not None
+
+    def release(self) -> None:
+        """Releases the model object of a lazy model, which is built again on its next access.
+        Does nothing for models that are not lazy.
+        """
+
+        if self.is_lazy:
+            self._arch = None
+
+    def __setstate__(self, state: Dict) -> None:
+        # Supports models pickled before lazy models were introduced
+        if 'arch' in state:
+            state['_arch'] = state.pop('arch')
+
+        state.setdefault('build_fn', None)
+        self.__dict__.update(state)
 
     def __repr__(self):
+        arch = self._arch if self.is_materialized else '<not materialized>'
+
         return (
             f'ArchaiModel(\n\tarchid={self.archid}, \n\t'
-            f'metadata={self.metadata}, \n\tarch={self.arch}\n)'
+            f'metadata={self.metadata}, \n\tarch={arch}\n)'
         )
 
     def __str__(self):
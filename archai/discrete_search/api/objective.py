@@ -3,7 +3,7 @@
 
 import copy
 from abc import abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from overrides import EnforceOverrides
 
 from archai.discrete_search.api.archai_model import ArchaiModel
@@ -63,9 +63,14 @@ class Objective(EnforceOverrides):
                          budget: Optional[float] = None):
                 return len(list(model.arch.modules()))
 
+    Objectives that keep using the evaluated models after `evaluate` returns (e.g train their weights
+    in place across evaluations) should set `requires_model_after_eval = True`, so search results do not
+    release the model objects of lazy models.
+
     For a list of bultin metrics, please check `archai.discrete_search.objectives`.
     """
     higher_is_better: bool = False
+    requires_model_after_eval: bool = False
 
     @abstractmethod
     def evaluate(self, arch: ArchaiModel, dataset: DatasetProvider,
@@ -104,6 +109,11 @@ class AsyncObjective(EnforceOverrides):
     triplet. `AsyncObjective.fetch_all` is a blocking call that waits and gathers the results from previously
     sent evaluation jobs and cleans the job queue.
 
+    Results can also be streamed as jobs complete with `AsyncObjective.fetch_ready` or
+    `AsyncObjective.as_completed`, which return `(job index, result)` pairs, where the job index is the position
+    of the job in the queue. The job queue is cleaned once all jobs have been fetched. Subclasses should override
+    `AsyncObjective.fetch_ready` to support streaming, otherwise it waits for all jobs using `fetch_all`.
+
     .. highlight:: python
     .. code-block:: python
         :caption: Task Accuracy
@@ -123,10 +133,21 @@ class AsyncObjective(EnforceOverrides):
         my_obj.send(model_4, dataset_provider, budget=None)
         assert len(my_obj.fetch_all()) == 1
 
+        # Streams results as soon as jobs complete
+        my_obj.send(model_5, dataset_provider, budget=None)
+        my_obj.send(model_6, dataset_provider, budget=None)
+
+        for job_idx, result in my_obj.as_completed():
+            print(f'Job {job_idx} finished with {result}')
+
+    As in `archai.discrete_search.Objective`, objectives that keep using the evaluated models after their
+    results are fetched should set `requires_model_after_eval = True`.
+
     For a list of bultin objectives, please check `archai.discrete_search.objectives`.
     """
 
     higher_is_better: bool = False
+    requires_model_after_eval: bool = False
 
     @abstractmethod
     def send(self, arch: ArchaiModel, dataset: DatasetProvider,
@@ -149,3 +170,35 @@ class AsyncObjective(EnforceOverrides):
         """Fetch all the results from active jobs sent using the `.send` method and resets job queue. The
         results are expected to respect the original scheduling order.
         """
+
+    def fetch_ready(self, timeout: Optional[float] = None) -> List[Tuple[int, Optional[float]]]:
+        """Fetches the results from jobs that have finished and were not fetched yet. The job queue is reset
+        once all jobs have been fetched.
+
+        The default implementation waits for all jobs using `fetch_all`.
+
+        Args:
+            timeout (Optional[float], optional): Maximum number of seconds to wait for at least one job
+                to finish. If `None`, waits until at least one job finishes. Defaults to None.
+
+        Returns:
+            List[Tuple[int, Optional[float]]]: List of (job index, result) pairs. Empty if
+                no job finished within `timeout` seconds or if there are no pending jobs.
+        """
+
+        return list(enumerate(self.fetch_all()))
+
+    def as_completed(self) -> Iterator[Tuple[int, Optional[float]]]:
+        """Iterates over the results from active jobs as they finish.
+
+        Yields:
+            Tuple[int, Optional[float]]: (job index, result) pairs.
+        """
+
+        while True:
+            ready = self.fetch_ready(timeout=None)
+
+            if not ready:
+                return
+
+            yield from ready
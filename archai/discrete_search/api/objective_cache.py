@@ -0,0 +1,67 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from abc import abstractmethod
+from typing import Iterable, List, Optional, Tuple
+
+from overrides import EnforceOverrides
+
+
+class ObjectiveCache(EnforceOverrides):
+    """Abstract base class for objective evaluation caches used by `SearchObjectives`.
+
+    Cache entries map a string key, a stable fingerprint of the (objective, architecture, dataset, budget)
+    evaluation, to the evaluation result. Subclasses are expected to implement `ObjectiveCache.get` and
+    `ObjectiveCache.set`, and may override `ObjectiveCache.get_many` and `ObjectiveCache.set_many`
+    to batch lookups and writes.
+
+    Caches that outlive the search process (`persistent = True`) only store evaluations whose objective
+    and dataset can be fingerprinted from their configuration, since object identifiers are not stable
+    across processes.
+
+    For a list of bultin caches, please check `archai.discrete_search.utils.objective_cache`.
+    """
+
+    persistent: bool = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[float]:
+        """Gets a cached evaluation result.
+
+        Args:
+            key (str): Evaluation fingerprint.
+
+        Returns:
+            Optional[float]: Cached result or `None` if `key` is not cached (or expired).
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: float) -> None:
+        """Caches an evaluation result.
+
+        Args:
+            key (str): Evaluation fingerprint.
+            value (float): Evaluation result.
+        """
+
+    def get_many(self, keys: Iterable[str]) -> List[Optional[float]]:
+        """Gets a list of cached evaluation results.
+
+        Args:
+            keys (Iterable[str]): Evaluation fingerprints.
+
+        Returns:
+            List[Optional[float]]: Cached results, `None` for keys that are not cached.
+        """
+
+        return [self.get(key) for key in keys]
+
+    def set_many(self, items: Iterable[Tuple[str, float]]) -> None:
+        """Caches a list of evaluation results.
+
+        Args:
+            items (Iterable[Tuple[str, float]]): (key, value) pairs.
+        """
+
+        for key, value in items:
+            self.set(key, value)
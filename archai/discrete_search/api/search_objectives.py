@@ -5,14 +5,33 @@ from typing import Union, Optional, Tuple, List, Dict, Callable
 
 from archai.discrete_search.api.archai_model import ArchaiModel
 from archai.discrete_search.api.objective import Objective, AsyncObjective
+from archai.discrete_search.api.objective_cache import ObjectiveCache
 from archai.discrete_search.api.dataset import DatasetProvider
+from archai.discrete_search.utils.objective_cache import InMemoryObjectiveCache, get_fingerprint
+from archai.discrete_search.utils.parallel import evaluate_objective
+
+import warnings
 
 import numpy as np
 from tqdm import tqdm
 
 
 class SearchObjectives():
-    def __init__(self, cache_objective_evaluation: bool = True, progress_bar: bool = True) -> None:
+    def __init__(self, cache_objective_evaluation: bool = True, progress_bar: bool = True,
+                 cache: Optional[ObjectiveCache] = None, executor: str = 'thread',
+                 chunk_size: int = 1) -> None:
+        """Manages the cheap, expensive and proxy objectives of a search.
+
+        Args:
+            cache_objective_evaluation (bool, optional): Whether to cache objective evaluations. Defaults to True.
+            progress_bar (bool, optional): Whether to show progress bars. Defaults to True.
+            cache (Optional[ObjectiveCache], optional): Cache backend, e.g a persistent
+                `archai.discrete_search.utils.objective_cache.SQLiteObjectiveCache` shared by multiple
+                search workers. If `None`, uses an in-memory cache. Defaults to None.
+            executor (str, optional): Local pool type used by synchronous objectives with `num_workers > 1`,
+                either `thread` or `process`. Defaults to 'thread'.
+            chunk_size (int, optional): Number of models sent to a local worker at once. Defaults to 1.
+        """
         self.cheap_objs = {}
         self.exp_objs = {}
         self.proxy_objs = {}
@@ -20,12 +39,21 @@ class SearchObjectives():
         self.progress_bar = progress_bar
         self.cache_objective_evaluation = cache_objective_evaluation
         
-        # Cache key: (obj_name, is_proxy, archid, dataset obj, budget)
-        self.cache: Dict[Tuple[str, bool, str, DatasetProvider, Optional[float]], Optional[float]] = {}
+        # Cache key: fingerprint of (objective config, archid, dataset config, budget)
+        self.cache = cache if cache is not None else InMemoryObjectiveCache()
+
+        # Objects fingerprinted by `id()`, which are kept alive so their identifiers are not reused
+        self._id_fingerprinted_objs = {}
+        self._uncacheable_objs = set()
+
+        # Local parallel execution of synchronous objectives
+        self.executor = executor
+        self.chunk_size = chunk_size
 
     def add_cheap_objective(self, objective_name: str, objective: Union[Objective, AsyncObjective],
                             higher_is_better: bool,
-                            constraint: Optional[Tuple[float, float]] = None) -> None:
+                            constraint: Optional[Tuple[float, float]] = None,
+                            num_workers: int = 1, pin_cpus: bool = False) -> None:
         assert isinstance(objective, (AsyncObjective, Objective))
         assert objective_name not in dict(self.cheap_objs, **self.exp_objs),\
             f'There is already an objective named {objective_name}.'
@@ -34,14 +62,17 @@ class SearchObjectives():
             'objective': objective,
             'higher_is_better': higher_is_better,
             'constraint': constraint or [-float('-inf'), float('+inf')],
-            'proxy': False
+            'proxy': False,
+            'num_workers': num_workers,
+            'pin_cpus': pin_cpus
         }
     
     def add_expensive_objective(self, objective_name: str,
                                 objective: Union[Objective, AsyncObjective],
                                 higher_is_better: bool,
                                 constraint: Optional[Tuple[float, float]] = None,
-                                proxy_constraint: Optional[Tuple[Union[Objective, AsyncObjective], float, float]] = None) -> None:
+                                proxy_constraint: Optional[Tuple[Union[Objective, AsyncObjective], float, float]] = None,
+                                num_workers: int = 1, pin_cpus: bool = False) -> None:
         assert isinstance(objective, (AsyncObjective, Objective))
         assert objective_name not in dict(self.cheap_objs, **self.exp_objs),\
             f'There is already an objective named {objective_name}.'
@@ -50,7 +81,9 @@ class SearchObjectives():
             'objective': objective,
             'higher_is_better': higher_is_better,
             'constraint': constraint or [-float('-inf'), float('+inf')],
-            'proxy': False
+            'proxy': False,
+            'num_workers': num_workers,
+            'pin_cpus': pin_cpus
         }
 
         if proxy_constraint:
@@ -60,7 +93,9 @@ class SearchObjectives():
                 'objective': proxy_objective,
                 'higher_is_better': higher_is_better,
                 'constraint': p_constraint,
-                'proxy': True
+                'proxy': True,
+                'num_workers': num_workers,
+                'pin_cpus': pin_cpus
             }
 
     def _filter_objs(self, objs: Dict[str, Dict], field_name: str, query_fn: Callable) -> Dict[str, Dict]:
@@ -70,6 +105,41 @@ class SearchObjectives():
             if query_fn(obj_dict[field_name])
         }
 
+    def _get_fingerprint(self, obj) -> Optional[str]:
+        try:
+            return get_fingerprint(obj)
+        except ValueError as e:
+            # Identifiers are only valid in the current process, so they cannot key persistent caches
+            if self.cache.persistent:
+                if id(obj) not in self._uncacheable_objs:
+                    self._uncacheable_objs.add(id(obj))
+                    self._id_fingerprinted_objs[id(obj)] = obj
+                    warnings.warn(f'{e} Its evaluations will not be cached.')
+
+                return None
+
+            self._id_fingerprinted_objs[id(obj)] = obj
+            return get_fingerprint(obj, allow_ids=True)
+
+    def _get_cache_keys(self, obj_name: str,
+                        objective: Union[Objective, AsyncObjective],
+                        models: List[ArchaiModel],
+                        dataset_providers: List[DatasetProvider],
+                        budgets: List[Optional[float]]) -> List[Optional[str]]:
+        # Fingerprints of objectives and datasets are computed once per object
+        obj_fingerprint = self._get_fingerprint(objective)
+        data_fingerprints = {}
+
+        for data in dataset_providers:
+            if id(data) not in data_fingerprints:
+                data_fingerprints[id(data)] = self._get_fingerprint(data)
+
+        return [
+            get_fingerprint(obj_name, obj_fingerprint, model.archid, data_fingerprints[id(data)], budget)
+            if obj_fingerprint is not None and data_fingerprints[id(data)] is not None else None
+            for model, data, budget in zip(models, dataset_providers, budgets)
+        ]
+
     def _eval_objs(self,
                    objs: Dict[str, Dict],
                    models: List[ArchaiModel], 
@@ -91,18 +161,23 @@ class SearchObjectives():
         sync_objs = self._filter_objs(objs, 'objective', lambda x: isinstance(x, Objective))
         async_objs = self._filter_objs(objs, 'objective', lambda x: isinstance(x, AsyncObjective))
 
-        assert all(len(dataset_providers) == len(models) == b for b in budgets.values())
+        assert all(len(dataset_providers) == len(models) == len(b) for b in budgets.values())
 
         # Initializes evaluation results with cached results
-        eval_results = {
-            obj_name: [
-                self.cache.get(
-                    (obj_name, obj_d['proxy'], model.archid, data, budget)
+        cache_keys, eval_results = {}, {}
+
+        for obj_name, obj_d in objs.items():
+            if self.cache_objective_evaluation:
+                cache_keys[obj_name] = self._get_cache_keys(
+                    obj_name, obj_d['objective'], models, dataset_providers, budgets[obj_name]
                 )
-                for model, data, budget in zip(models, dataset_providers, budgets[obj_name])
-            ]
-            for obj_name, obj_d in objs.items()
-        }
+
+                # Evaluations without a stable key are not looked up
+                keys = [key for key in cache_keys[obj_name] if key is not None]
+                cached_results = dict(zip(keys, self.cache.get_many(keys)))
+                eval_results[obj_name] = [cached_results.get(key) for key in cache_keys[obj_name]]
+            else:
+                eval_results[obj_name] = [None] * len(models)
 
         # Saves model indices that are not in the cache and need to be evaluated
         eval_indices = {
@@ -122,17 +197,22 @@ class SearchObjectives():
                     models[i], dataset_providers[i], budgets[obj_name][i]
                 )
 
-        # Calculates synchronous objectives in order
+        # Calculates synchronous objectives in order, optionally using a local pool of workers
         for obj_name, obj_d in sync_objs.items():
-            pbar = (
-                tqdm(eval_indices[obj_name], desc=f'Calculating "{obj_name}"...')
-                if progress_bar else eval_indices[obj_name]
+            indices = eval_indices[obj_name]
+
+            results = evaluate_objective(
+                obj_d['objective'],
+                [models[i] for i in indices],
+                [dataset_providers[i] for i in indices],
+                [budgets[obj_name][i] for i in indices],
+                num_workers=obj_d['num_workers'], executor=self.executor,
+                chunk_size=self.chunk_size, pin_cpus=obj_d['pin_cpus'],
+                progress_bar=progress_bar, desc=f'Calculating "{obj_name}"...'
             )
 
-            for i in pbar:
-                eval_results[obj_name][i] = obj_d['objective'].evaluate(
-                    models[i], dataset_providers[i], budgets[obj_name][i]
-                )
+            for i, result in zip(indices, results):
+                eval_results[obj_name][i] = result
 
         # Gets results from async objectives
         pbar = (
@@ -152,20 +232,17 @@ class SearchObjectives():
         
         # Updates cache
         if self.cache_objective_evaluation:
-            for obj_name, obj_d in objs.items():
-                for i in eval_indices[obj_name]:
-                    cache_tuple = (
-                        obj_name, obj_d['proxy'],
-                        models[i].archid, dataset_providers[i],
-                        budgets[obj_name][i]
-                    )
-
-                    self.cache[cache_tuple] = eval_results[obj_name][i]
+            for obj_name in objs:
+                self.cache.set_many([
+                    (cache_keys[obj_name][i], eval_results[obj_name][i])
+                    for i in eval_indices[obj_name]
+                    if eval_results[obj_name][i] is not None and cache_keys[obj_name][i] is not None
+                ])
 
         assert len(set(len(r) for r in eval_results.values())) == 1
 
         return {
-            obj_name: np.ndarray(obj_results, dtype=np.float64)
+            obj_name: np.array(obj_results, dtype=np.float64)
             for obj_name, obj_results in eval_results.items()
         }
 
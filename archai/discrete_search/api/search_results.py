@@ -1,5 +1,6 @@
-import copy
 import re
+import sys
+import weakref
 from pathlib import Path
 from time import time
 from typing import Any, Dict, List, Optional, Tuple, Union
@@ -9,29 +10,127 @@ import numpy as np
 import pandas as pd
 
 from archai.discrete_search import AsyncObjective, Objective, ArchaiModel, DiscreteSearchSpace
-from archai.discrete_search.utils.multi_objective import _find_pareto_frontier_points, get_pareto_frontier
+from archai.discrete_search.utils.multi_objective import _find_pareto_frontier_points
 
 
 class SearchResults():
     def __init__(self, search_space: DiscreteSearchSpace,
-                 objectives: Dict[str, Union[Objective, AsyncObjective]]):
+                 objectives: Dict[str, Union[Objective, AsyncObjective]],
+                 initial_capacity: int = 1024,
+                 release_models: Optional[bool] = None):
+        """Stores the results of a search.
+
+        Args:
+            search_space (DiscreteSearchSpace): Search space.
+            objectives (Dict[str, Union[Objective, AsyncObjective]]): Dictionary mapping
+                an objective identifier to an objective object.
+            initial_capacity (int, optional): Initial number of preallocated models. Defaults to 1024.
+            release_models (Optional[bool], optional): Whether evaluated lazy models should release
+                their model objects. If `None`, models are released unless an objective sets
+                `requires_model_after_eval`. Defaults to None.
+        """
+
         self.search_space = search_space
         self.objectives = objectives
         self.iteration_num = 0
+        self.num_models = 0
         
         self.init_time = time()
-        self.search_walltimes = []
-        self.results = []
+
+        # Columnar storage. Numerical columns are preallocated arrays that grow geometrically,
+        # archids are interned and extra model data is stored as one list per column
+        self._capacity = max(1, initial_capacity)
+        self._evaluation_results = {
+            obj_name: np.empty(self._capacity, dtype=np.float64) for obj_name in self.objectives
+        }
+        self._iteration_nums = np.empty(self._capacity, dtype=np.int32)
+        self._search_walltimes = np.empty(self._capacity, dtype=np.float64)
+        self.archids = []
+        self.extra_model_data = {}
+
+        # Only Pareto-frontier members of each iteration are strongly referenced, the remaining
+        # models are kept as weak references so their weights can be released by the searcher
+        self._model_refs = []
+        self._frontier_models = {}
+
+        # Incremental Pareto archive. `iteration_offsets[it]` is the global index of the first
+        # model of iteration `it`, `iteration_frontiers[it]` holds the Pareto-frontier of iteration `it`
+        # alone, and `pareto_archive[it]` holds the Pareto-frontier of iterations `0` to `it`.
+        # Frontiers are stored as (global indices, objective points) tuples
+        self.iteration_offsets = [0]
+        self.iteration_frontiers = []
+        self.pareto_archive = []
+
+        # Objectives that use models after evaluation (e.g `ProgressiveTraining` trains their weights
+        # in place), so their models cannot be rebuilt from their configs
+        if release_models is None:
+            release_models = not any(
+                getattr(obj, 'requires_model_after_eval', False) for obj in objectives.values()
+            )
+
+        self.release_models = release_models
 
     @property
-    def all_evaluation_results(self):
+    def all_evaluation_results(self) -> Dict[str, np.ndarray]:
+        """Read-only views of the evaluation results of all models."""
+
         return {
-            obj_name: np.array([
-                r 
-                for iter_results in self.results
-                for r in iter_results[obj_name]
-            ], dtype=np.float32) for obj_name in self.objectives
+            obj_name: self._read_only_view(obj_results)
+            for obj_name, obj_results in self._evaluation_results.items()
+        }
+
+    @property
+    def iteration_nums(self) -> np.ndarray:
+        """Read-only view of the search iteration of all models."""
+
+        return self._read_only_view(self._iteration_nums)
+
+    @property
+    def search_walltimes(self) -> np.ndarray:
+        """Read-only view of the search duration (hours) when each model was added."""
+
+        return self._read_only_view(self._search_walltimes)
+
+    def _read_only_view(self, column: np.ndarray) -> np.ndarray:
+        view = column[:self.num_models]
+        view.flags.writeable = False
+
+        return view
+
+    def _grow(self, num_models: int) -> None:
+        if num_models <= self._capacity:
+            return
+
+        while self._capacity < num_models:
+            self._capacity *= 2
+
+        def _resize(column: np.ndarray) -> np.ndarray:
+            new_column = np.empty(self._capacity, dtype=column.dtype)
+            new_column[:self.num_models] = column[:self.num_models]
+
+            return new_column
+
+        self._evaluation_results = {
+            obj_name: _resize(obj_results) for obj_name, obj_results in self._evaluation_results.items()
         }
+        self._iteration_nums = _resize(self._iteration_nums)
+        self._search_walltimes = _resize(self._search_walltimes)
+
+    def get_model(self, idx: int) -> Optional[ArchaiModel]:
+        """Gets a stored model by its global index.
+
+        Args:
+            idx (int): Global model index.
+
+        Returns:
+            Optional[ArchaiModel]: Stored model or `None` if the model is not
+                a Pareto-frontier member and was already released.
+        """
+
+        if idx in self._frontier_models:
+            return self._frontier_models[idx]
+
+        return self._model_refs[idx]()
 
     def add_iteration_results(self, models: List[ArchaiModel],
                               evaluation_results: Dict[str, np.ndarray],
@@ -48,24 +147,78 @@ class SearchResults():
         assert len(self.objectives) == len(evaluation_results)
         assert all(len(r) == len(models) for r in evaluation_results.values())
 
-        extra_model_data = copy.deepcopy(extra_model_data) or dict()
+        extra_model_data = extra_model_data or dict()
         
         if extra_model_data:
             assert all(len(v) == len(models) for v in extra_model_data.values())
-        
-        evaluation_results = copy.deepcopy(evaluation_results)
-        evaluation_results.update(extra_model_data)
 
-        self.results.append({
-            'archid': [m.archid for m in models],
-            'models': [m for m in models], # To avoid creating a reference to `models` variable
-            **evaluation_results
-        })
+        start, end = self.num_models, self.num_models + len(models)
+        self._grow(end)
+
+        for obj_name in self.objectives:
+            self._evaluation_results[obj_name][start:end] = evaluation_results[obj_name]
+        
+        self._iteration_nums[start:end] = self.iteration_num
 
         # Adds current search duration in hours
-        self.search_walltimes += [(time() - self.init_time) / 3600] * len(models)
+        self._search_walltimes[start:end] = (time() - self.init_time) / 3600
+
+        self.archids.extend(sys.intern(m.archid) for m in models)
+        self._model_refs.extend(weakref.ref(m) for m in models)
+
+        # Columns missing from previous (or current) iterations are filled with `None`
+        for column_name in extra_model_data.keys() - self.extra_model_data.keys():
+            self.extra_model_data[column_name] = [None] * start
+
+        for column_name, column in self.extra_model_data.items():
+            column.extend(extra_model_data.get(column_name, [None] * len(models)))
+
+        self.num_models = end
+        self._update_pareto_archive(models)
         self.iteration_num += 1
 
+        # Evaluated lazy models are stored without their model objects
+        if self.release_models:
+            for m in models:
+                m.release()
+
+    def _get_objective_points(self, start: int, end: int) -> np.ndarray:
+        # Inverts maximization objectives and converts results to an
+        # array of shape (end - start, len(objectives))
+        return np.vstack([
+            (-self._evaluation_results[obj_name][start:end] if obj.higher_is_better
+             else self._evaluation_results[obj_name][start:end])
+            for obj_name, obj in self.objectives.items()
+        ]).T
+
+    def _merge_frontiers(self, frontiers: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        # Points dominated inside a frontier are also dominated in their union, so the merged
+        # frontier only depends on the members of `frontiers` (given in iteration order)
+        indices = np.concatenate([idx for idx, _ in frontiers])
+        points = np.concatenate([pts for _, pts in frontiers], axis=0)
+
+        pareto_points = np.array(_find_pareto_frontier_points(points), dtype=np.int64)
+        return indices[pareto_points], points[pareto_points]
+
+    def _update_pareto_archive(self, models: List[ArchaiModel]) -> None:
+        offset = self.iteration_offsets[-1]
+        self.iteration_offsets.append(offset + len(models))
+
+        # Only the new models and the current frontier are checked
+        iteration_frontier = self._merge_frontiers([
+            (np.arange(offset, offset + len(models)), self._get_objective_points(offset, offset + len(models)))
+        ])
+        self.iteration_frontiers.append(iteration_frontier)
+
+        self.pareto_archive.append(
+            self._merge_frontiers(self.pareto_archive[-1:] + [iteration_frontier])
+        )
+
+        # Frontier members of any iteration window are kept alive
+        self._frontier_models.update({
+            idx: models[idx - offset] for idx in iteration_frontier[0].tolist()
+        })
+
     def get_pareto_frontier(self, start_iteration: int = 0, end_iteration: Optional[int] = None) -> Dict:
         """Gets the pareto-frontier using the search results from iterations `start_iteration` to `end_iteration`.
         If `end_iteration=None`, uses the last iteration. 
@@ -81,30 +234,20 @@ class SearchResults():
         """        
         end_iteration = end_iteration or self.iteration_num
 
-        all_models = [
-            model 
-            for it in range(start_iteration, end_iteration)
-            for model in self.results[it]['models']
-        ]
-        
-        all_results = {
-            obj_name: np.concatenate([
-                self.results[it][obj_name]
-                for it in range(start_iteration, end_iteration)
-            ], axis=0)
-            for obj_name in self.objectives.keys()
-        }
-
-        all_iteration_nums = np.array([
-            it 
-            for it in range(start_iteration, end_iteration)
-            for _ in range(len(self.results[it]['models']))
-        ])
-
-        pareto_frontier = get_pareto_frontier(all_models, all_results, self.objectives)
-        pareto_frontier.update({'iteration_nums': all_iteration_nums[pareto_frontier['indices']]})
+        if start_iteration == 0:
+            global_indices, _ = self.pareto_archive[end_iteration - 1]
+        else:
+            global_indices, _ = self._merge_frontiers(self.iteration_frontiers[start_iteration:end_iteration])
 
-        return pareto_frontier
+        return {
+            'models': [self._frontier_models[idx] for idx in global_indices.tolist()],
+            'evaluation_results': {
+                obj_name: obj_results[global_indices]
+                for obj_name, obj_results in self._evaluation_results.items()
+            },
+            'indices': global_indices - self.iteration_offsets[start_iteration],
+            'iteration_nums': self._iteration_nums[global_indices]
+        }
 
     def get_search_state_df(self) -> pd.DataFrame:
         """Gets the search state pd.DataFrame
@@ -112,18 +255,18 @@ class SearchResults():
         Returns:
             pd.DataFrame: search state DataFrame.
         """        
-        state_df = pd.concat([
-            pd.DataFrame(it_results).assign(iteration_num=it)
-            for it, it_results in enumerate(self.results)
-        ], axis=0).reset_index(drop=True)
-        state_df['Search walltime (hours)'] = self.search_walltimes
-
-        pareto_frontier = self.get_pareto_frontier()
+        state_df = pd.DataFrame({
+            'archid': self.archids,
+            **self.all_evaluation_results,
+            **self.extra_model_data,
+            'iteration_num': self.iteration_nums,
+            'Search walltime (hours)': self.search_walltimes
+        })
 
         state_df['is_pareto'] = False
-        state_df.loc[pareto_frontier['indices'], 'is_pareto'] = True
+        state_df.loc[self.get_pareto_frontier()['indices'], 'is_pareto'] = True
 
-        return state_df.drop(['models'], axis=1)
+        return state_df
 
     def save_search_state(self, file: Union[str, Path]) -> None:
         state_df = self.get_search_state_df()
@@ -160,11 +303,16 @@ class SearchResults():
         colors = plt.cm.plasma(np.linspace(0, 1, self.iteration_num + 1))
         sm = plt.cm.ScalarMappable(cmap=plt.cm.plasma, norm=plt.Normalize(vmin=0, vmax=self.iteration_num + 1))
 
+        # Pareto-frontier is updated incrementally with the models of each iteration
+        points = status_df[['x', 'y']].values
+        iteration_nums = status_df['iteration_num'].values
+        pareto_indices = np.array([], dtype=np.int64)
+
         for s in status_range:
-            generation_df = status_df.query(f'iteration_num <= {s}').copy()
-            
-            points = generation_df[['x', 'y']].values
-            pareto_df = generation_df.iloc[_find_pareto_frontier_points(points)].copy()
+            candidates = np.concatenate([pareto_indices, np.flatnonzero(iteration_nums == s)])
+            pareto_indices = candidates[_find_pareto_frontier_points(points[candidates])]
+
+            pareto_df = status_df.iloc[pareto_indices].copy()
             pareto_df = pareto_df.sort_values('x')
 
             ax.step(
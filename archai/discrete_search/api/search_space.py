@@ -2,7 +2,7 @@
 # Licensed under the MIT license.
 
 from abc import abstractmethod
-from typing import List, Union
+from typing import Container, List, Optional, Union
 from overrides.enforce import EnforceOverrides
 
 import torch
@@ -10,6 +10,27 @@ import numpy as np
 from archai.discrete_search.api.archai_model import ArchaiModel
 
 
+def _flatten_models(models: List[Union[ArchaiModel, List[ArchaiModel], None]]) -> List[Optional[ArchaiModel]]:
+    # `mutate` implementations may return a list of models
+    return [m for model in models for m in (model if isinstance(model, list) else [model])]
+
+
+def _reject_duplicates(models: List[Optional[ArchaiModel]],
+                       exclude: Optional[Container[str]] = None) -> List[Optional[ArchaiModel]]:
+    exclude = exclude or set()
+    archids = set()
+    results = []
+
+    for model in models:
+        if model is None or model.archid in exclude or model.archid in archids:
+            results.append(None)
+        else:
+            results.append(model)
+            archids.add(model.archid)
+
+    return results
+
+
 class DiscreteSearchSpace(EnforceOverrides):
     """Abstract base class for Discrete Search Spaces. Search spaces
     represent all considered architectures of a given task.
@@ -95,6 +116,45 @@ class EvolutionarySearchSpace(DiscreteSearchSpace, EnforceOverrides):
             ArchaiModel: Resulting model
         """        
 
+    def mutate_many(self, arch_list: List[ArchaiModel],
+                    exclude: Optional[Container[str]] = None) -> List[Optional[ArchaiModel]]:
+        """Mutates each architecture of `arch_list`, rejecting mutations that are duplicated
+        or that have an architecture id in `exclude` (e.g architectures already evaluated).
+
+        Subclasses may override this method to reject candidates before building their models.
+
+        Args:
+            arch_list (List[ArchaiModel]): Base models.
+            exclude (Optional[Container[str]], optional): Architecture ids to be rejected.
+                Defaults to None.
+
+        Returns:
+            List[Optional[ArchaiModel]]: Mutated model of each base model in `arch_list`,
+                or `None` if the mutation was rejected. If `mutate` returns a list of models,
+                all of them are included (in order).
+        """
+
+        return _reject_duplicates(_flatten_models([self.mutate(arch) for arch in arch_list]), exclude)
+
+    def crossover_many(self, arch_lists: List[List[ArchaiModel]],
+                       exclude: Optional[Container[str]] = None) -> List[Optional[ArchaiModel]]:
+        """Combines each list of architectures of `arch_lists`, rejecting children that are
+        duplicated or that have an architecture id in `exclude`.
+
+        Subclasses may override this method to reject candidates before building their models.
+
+        Args:
+            arch_lists (List[List[ArchaiModel]]): Lists of architectures.
+            exclude (Optional[Container[str]], optional): Architecture ids to be rejected.
+                Defaults to None.
+
+        Returns:
+            List[Optional[ArchaiModel]]: Resulting model of each list in `arch_lists`,
+                or `None` if the child was rejected.
+        """
+
+        return _reject_duplicates([self.crossover(arch_list) for arch_list in arch_lists], exclude)
+
 
 class BayesOptSearchSpace(DiscreteSearchSpace, EnforceOverrides):
     """Abstract base class for discrete search spaces compatible with Bayesian Optimization algorithms.
@@ -112,6 +172,19 @@ class BayesOptSearchSpace(DiscreteSearchSpace, EnforceOverrides):
             np.ndarray: Fixed-length vector representation of `arch`
         """
 
+    def encode_many(self, arch_list: List[ArchaiModel]) -> np.ndarray:
+        """Encodes a list of architectures into a 2D array. Subclasses may override
+        this method with a vectorized implementation.
+
+        Args:
+            arch_list (List[ArchaiModel]): Models from the search space
+
+        Returns:
+            np.ndarray: Array of shape `(len(arch_list), num_features)`
+        """
+
+        return np.vstack([self.encode(arch) for arch in arch_list])
+
 
 class RLSearchSpace(DiscreteSearchSpace, EnforceOverrides):
     ''' Base class for Discrete Search Spaces compatible with Reinforcement Learning search algorithms. '''
@@ -36,6 +36,7 @@ class AvgOnnxLatency(Objective):
             for input_shape in input_shapes
         ])
 
+        self.input_shape = input_shape
         self.input_dtype = input_dtype
         self.rand_range = rand_range
         self.num_trials = num_trials
@@ -1,5 +1,6 @@
-from typing import Callable, List, Dict, Optional, Union
+from typing import Callable, List, Dict, Optional, Tuple, Union
 import tempfile
+from time import time
 
 import ray
 from overrides import overrides
@@ -8,6 +9,7 @@ from archai.discrete_search import (
     ArchaiModel, DiscreteSearchSpace,
     DatasetProvider, Objective, AsyncObjective
 )
+from archai.discrete_search.objectives.ray import wait_ready_refs
 
 
 def ray_wrap_training_fn(training_fn):
@@ -19,6 +21,9 @@ def ray_wrap_training_fn(training_fn):
 
 
 class ProgressiveTraining(Objective):
+    # Model weights are trained in place across evaluations
+    requires_model_after_eval: bool = True
+
     def __init__(self, search_space: DiscreteSearchSpace, 
                  training_fn: Callable, higher_is_better: bool = False):
         self.search_space = search_space
@@ -42,12 +47,16 @@ class ProgressiveTraining(Objective):
 
 
 class RayProgressiveTraining(AsyncObjective):
+    # Model weights are trained in place across evaluations
+    requires_model_after_eval: bool = True
+
     def __init__(self, search_space: DiscreteSearchSpace, 
                  training_fn: Callable, higher_is_better: bool = False,
                  timeout: Optional[float] = None, force_stop: bool = False, 
                  **ray_kwargs):
 
         self.search_space = search_space
+        self.training_fn = training_fn
         
         if ray_kwargs:
             self.compute_fn = ray.remote(**ray_kwargs)(ray_wrap_training_fn(training_fn))
@@ -64,6 +73,10 @@ class RayProgressiveTraining(AsyncObjective):
 
         # Ray training job object refs
         self.results_ref = []
+        self.send_times = []
+
+        # Metric results already fetched by `fetch_ready`, indexed by job
+        self.fetched_results = {}
         
         # Training state buffer (e.g optimizer state) for each architecture id
         self.training_states = {}
@@ -78,22 +91,73 @@ class RayProgressiveTraining(AsyncObjective):
         self.results_ref.append(self.compute_fn.remote(
             nas_model, dataset, budget, current_tr_state
         ))
+        self.send_times.append(time())
+
+    def _sync_job_results(self, job_id: int, job_results: Optional[Tuple]) -> Optional[float]:
+        if not job_results:
+            return None
+
+        trained_model, job_metric, training_state = job_results
+        
+        # Syncs model weights
+        with tempfile.NamedTemporaryFile() as tmp:
+            self.search_space.save_model_weights(trained_model, tmp.name)
+            self.search_space.load_model_weights(self.models[job_id], tmp.name)
+        
+        # Syncs training state
+        self.training_states[trained_model.archid] = training_state
+
+        return job_metric
+
+    @overrides
+    def fetch_ready(self, timeout: Optional[float] = None) -> List[Tuple[int, Optional[float]]]:
+        ref2idx = {ref: i for i, ref in enumerate(self.results_ref)}
+        pending_refs = [ref for ref, i in ref2idx.items() if i not in self.fetched_results]
+
+        if not pending_refs:
+            return []
+
+        ready_refs, expired_refs = wait_ready_refs(
+            pending_refs, [self.send_times[ref2idx[ref]] for ref in pending_refs],
+            timeout=timeout, job_timeout=self.timeout, force_stop=self.force_stop
+        )
+
+        # Canceled jobs are returned as None
+        ready_results = sorted(
+            [
+                (ref2idx[ref], self._sync_job_results(ref2idx[ref], job_results))
+                for ref, job_results in zip(ready_refs, ray.get(ready_refs))
+            ] +
+            [(ref2idx[ref], None) for ref in expired_refs]
+        )
+        self.fetched_results.update(ready_results)
+
+        # Resets model and job buffers once all jobs were fetched
+        if len(self.fetched_results) == len(self.results_ref):
+            self.models, self.results_ref, self.send_times, self.fetched_results = [], [], [], {}
+
+        return ready_results
 
     @overrides
     def fetch_all(self) -> List[Union[float, None]]:
         results = [None] * len(self.results_ref)
 
+        # Maps each pending object from the object_refs list to its index
+        ref2idx = {
+            ref: i for i, ref in enumerate(self.results_ref)
+            if i not in self.fetched_results
+        }
+        pending_refs = list(ref2idx.keys())
+
         # Fetchs training job results
         if not self.timeout:
-            results = ray.get(self.results_ref, timeout=self.timeout)
-        else:
-            # Maps each object from the object_refs list to its index
-            ref2idx = {ref: i for i, ref in enumerate(self.results_ref)}
-            
+            for ref, job_results in zip(pending_refs, ray.get(pending_refs)):
+                results[ref2idx[ref]] = job_results
+        elif pending_refs:
             # Gets all results available within `self.timeout` seconds.
             complete_objs, incomplete_objs = ray.wait(
-                self.results_ref, timeout=self.timeout,
-                num_returns=len(self.results_ref)
+                pending_refs, timeout=self.timeout,
+                num_returns=len(pending_refs)
             )
             partial_results = ray.get(complete_objs)
             
@@ -107,22 +171,15 @@ class RayProgressiveTraining(AsyncObjective):
         metric_results = []
 
         for job_id, job_results in enumerate(results):
-            if job_results:
-                trained_model, job_metric, training_state = job_results
-                
-                # Syncs model weights
-                with tempfile.NamedTemporaryFile() as tmp:
-                    self.search_space.save_model_weights(trained_model, tmp.name)
-                    self.search_space.load_model_weights(self.models[job_id], tmp.name)
-                
-                # Syncs training state
-                self.training_states[trained_model.archid] = training_state
-
-                metric_results.append(job_metric)
+            if job_id in self.fetched_results:
+                metric_results.append(self.fetched_results[job_id])
+            else:
+                metric_results.append(self._sync_job_results(job_id, job_results))
 
         # Resets model and job buffers
         self.models = []
         self.results_ref = []
+        self.send_times = []
+        self.fetched_results = {}
 
         return metric_results
-
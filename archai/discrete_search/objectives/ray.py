@@ -1,4 +1,5 @@
-from typing import List, Optional, Union
+from time import time
+from typing import List, Optional, Tuple, Union
 
 import ray
 from overrides import overrides
@@ -14,6 +15,49 @@ def _wrap_metric_calculate(class_method):
     return calculate
 
 
+def wait_ready_refs(refs: List[ray.ObjectRef], send_times: List[float], timeout: Optional[float] = None,
+                    job_timeout: Optional[float] = None,
+                    force_stop: bool = False) -> Tuple[List[ray.ObjectRef], List[ray.ObjectRef]]:
+    """Waits for at least one job to finish or to exceed its time limit.
+
+    Args:
+        refs (List[ray.ObjectRef]): Object refs of pending jobs.
+        send_times (List[float]): Time each job was sent.
+        timeout (Optional[float], optional): Maximum number of seconds to wait. If `None`, waits until
+            at least one job finishes or exceeds its time limit. Defaults to None.
+        job_timeout (Optional[float], optional): Time limit of each job, counted from when it was sent.
+            Jobs exceeding it are canceled. Defaults to None.
+        force_stop (bool, optional): Whether canceled jobs should be force-killed. Defaults to False.
+
+    Returns:
+        Tuple[List[ray.ObjectRef], List[ray.ObjectRef]]: Finished and canceled object refs.
+    """
+
+    if job_timeout:
+        time_left = max(0.0, min(send_times) + job_timeout - time())
+        timeout = time_left if timeout is None else min(timeout, time_left)
+
+    # Waits for at least one job and then gets every other job that is already complete
+    ready_refs, _ = ray.wait(refs, num_returns=1, timeout=timeout)
+
+    if ready_refs:
+        ready_refs, _ = ray.wait(refs, num_returns=len(refs), timeout=0)
+
+    if not job_timeout:
+        return ready_refs, []
+
+    ready_refs_set, now = set(ready_refs), time()
+    expired_refs = [
+        ref for ref, send_time in zip(refs, send_times)
+        if ref not in ready_refs_set and now - send_time >= job_timeout
+    ]
+
+    for ref in expired_refs:
+        ray.cancel(ref, force=force_stop)
+
+    return ready_refs, expired_refs
+
+
 class RayParallelObjective(AsyncObjective):
     def __init__(self, obj: Objective, timeout: Optional[float] = None, force_stop: bool = False, 
                  **ray_kwargs):
@@ -23,13 +67,15 @@ class RayParallelObjective(AsyncObjective):
 
         Args:
             obj (Objective): A `Objective` object
-            timeout (Optional[float], optional): Timeout for `receive_all`. Jobs not finished after the time limit
-                are canceled and returned as None. Defaults to None.
+            timeout (Optional[float], optional): Timeout for `fetch_all`. Jobs not finished after the time limit
+                are canceled and returned as None. When streaming results with `fetch_ready`, the time limit
+                is counted from when each job was sent. Defaults to None.
             force_stop (bool, optional): If incomplete tasks (within `timeout` seconds) should be force-killed. If 
                 set to `False`, Ray will just send a `KeyboardInterrupt` signal to the process.
             **ray_kwargs: Key-value arguments for ray.remote(), e.g: num_gpus, num_cpus, max_task_retries.
         """        
         assert isinstance(obj, Objective)
+        self.obj = obj
 
         # Wraps metric.calculate as a standalone function. This only works with stateless metrics
         if ray_kwargs:
@@ -41,26 +87,62 @@ class RayParallelObjective(AsyncObjective):
         self.timeout = timeout
         self.force_stop = force_stop
         self.object_refs = []
+        self.send_times = []
+
+        # Results already fetched by `fetch_ready`, indexed by job
+        self.fetched_results = {}
 
     @overrides
     def send(self, nas_model: ArchaiModel, dataset: DatasetProvider,
              budget: Optional[float] = None) -> None:
         self.object_refs.append(self.compute_fn.remote(nas_model, dataset, budget))
+        self.send_times.append(time())
+
+    @overrides
+    def fetch_ready(self, timeout: Optional[float] = None) -> List[Tuple[int, Optional[float]]]:
+        ref2idx = {ref: i for i, ref in enumerate(self.object_refs)}
+        pending_refs = [ref for ref, i in ref2idx.items() if i not in self.fetched_results]
+
+        if not pending_refs:
+            return []
+
+        ready_refs, expired_refs = wait_ready_refs(
+            pending_refs, [self.send_times[ref2idx[ref]] for ref in pending_refs],
+            timeout=timeout, job_timeout=self.timeout, force_stop=self.force_stop
+        )
+
+        # Canceled jobs are returned as None
+        ready_results = sorted(
+            [(ref2idx[ref], result) for ref, result in zip(ready_refs, ray.get(ready_refs))] +
+            [(ref2idx[ref], None) for ref in expired_refs]
+        )
+        self.fetched_results.update(ready_results)
+
+        # Resets metric state once all jobs were fetched
+        if len(self.fetched_results) == len(self.object_refs):
+            self.object_refs, self.send_times, self.fetched_results = [], [], {}
+
+        return ready_results
 
     @overrides
     def fetch_all(self) -> List[Union[float, None]]:
-        results = [None] * len(self.object_refs)
+        results = [self.fetched_results.get(i) for i in range(len(self.object_refs))]
+
+        # Maps each pending object from the object_refs list to its index
+        ref2idx = {
+            ref: i for i, ref in enumerate(self.object_refs)
+            if i not in self.fetched_results
+        }
+        pending_refs = list(ref2idx.keys())
 
         if not self.timeout:
-            results = ray.get(self.object_refs, timeout=self.timeout)
-        else:
-            # Maps each object from the object_refs list to its index
-            ref2idx = {ref: i for i, ref in enumerate(self.object_refs)}
-            
+            for ref, result in zip(pending_refs, ray.get(pending_refs)):
+                results[ref2idx[ref]] = result
+        elif pending_refs:
             # Gets all results available within `self.timeout` seconds.
             complete_objs, incomplete_objs = ray.wait(
-                self.object_refs, timeout=self.timeout,
-                num_returns=len(self.object_refs)
+                pending_refs, timeout=self.timeout,
+                num_returns=len(pending_refs)
             )
             partial_results = ray.get(complete_objs)
             
@@ -74,5 +156,7 @@ class RayParallelObjective(AsyncObjective):
 
         # Resets metric state
         self.object_refs = []
+        self.send_times = []
+        self.fetched_results = {}
 
         return results
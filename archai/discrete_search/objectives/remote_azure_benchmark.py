@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import platform
 import time
@@ -53,8 +54,10 @@ class RemoteAzureBenchmarkObjective(AsyncObjective):
         # TODO: Make this class more general / less pipeline-specific
 
         input_shapes = [input_shape] if isinstance(input_shape, tuple) else input_shape        
+        self.input_shape = input_shape
         self.sample_input = tuple([torch.rand(*input_shape) for input_shape in input_shapes])
         self.blob_container_name = blob_container_name
+        self.connection_string_sha256 = hashlib.sha256(connection_string.encode('utf-8')).hexdigest()
         self.blob_service_client = BlobServiceClient.from_connection_string(connection_string)
 
         self.table_name = table_name
@@ -76,6 +79,18 @@ class RemoteAzureBenchmarkObjective(AsyncObjective):
         # Architecture list
         self.archids = []
 
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        # The connection string holds the storage account credentials, so it is hashed
+        return {
+            'connection_string_sha256': self.connection_string_sha256,
+            'input_shape': self.input_shape,
+            'blob_container_name': self.blob_container_name,
+            'table_name': self.table_name,
+            'metric_key': self.metric_key,
+            'partition_key': self.partition_key,
+            'onnx_export_kwargs': self.onnx_export_kwargs
+        }
+
     @property
     def table_client(self):
         return self.table_service_client.create_table_if_not_exists(
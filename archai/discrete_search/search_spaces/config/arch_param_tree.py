@@ -5,6 +5,8 @@ import operator
 from copy import deepcopy
 from random import Random
 
+import numpy as np
+
 from archai.discrete_search.search_spaces.config import utils
 from archai.discrete_search.search_spaces.config.discrete_choice import DiscreteChoice
 from archai.discrete_search.search_spaces.config.arch_config import ArchConfig, build_arch_config
@@ -15,6 +17,10 @@ class ArchParamTree(object):
         self.config_tree = deepcopy(config_tree)
         self.params, self.constants = self._init_tree(config_tree)
 
+        # Flat table of (path, choice) pairs of the deduplicated architecture
+        # parameters, compiled on demand by `_get_choice_table`
+        self._choice_table = None
+
     @property
     def num_archs(self):
         """Total number of architectures"""
@@ -114,6 +120,46 @@ class ArchParamTree(object):
         param_dict = self.to_dict(flatten=True, deduplicate_params=True, remove_constants=True)
         return list(param_dict.keys())
 
+    def _get_choice_table(self) -> List[Tuple[Tuple[str, ...], DiscreteChoice]]:
+        if self._choice_table is None:
+            table, dedup_param_ids = [], set()
+
+            # Follows the same order of `to_dict(flatten=True, deduplicate_params=True)`
+            def _compile(tree: ArchParamTree, prefix: Tuple[str, ...]) -> None:
+                for param_name, param in tree.params.items():
+                    if isinstance(param, ArchParamTree):
+                        _compile(param, prefix + (str(param_name),))
+                    elif id(param) not in dedup_param_ids:
+                        table.append((prefix + (str(param_name),), param))
+                        dedup_param_ids.add(id(param))
+
+            _compile(self, ())
+            self._choice_table = table
+
+        return self._choice_table
+
+    def _get_config_values(self, config: ArchConfig) -> List[Tuple[Any, bool]]:
+        values = []
+
+        for path, _ in self._get_choice_table():
+            node, config_node = config._config_dict, config
+
+            for key in path[:-1]:
+                node, config_node = node[key], config_node.nodes[key]
+
+            values.append((node[path[-1]], path[-1] in config_node._used_params))
+
+        return values
+
+    @staticmethod
+    def _get_choice_index(choice: DiscreteChoice, value: Any) -> int:
+        for idx, c in enumerate(choice.choices):
+            # Tuples are loaded as lists from json files
+            if c == value or (isinstance(c, tuple) and list(c) == value):
+                return idx
+
+        raise ValueError(f'{value} is not a valid choice of {choice}.')
+
     def encode_config(self, config: ArchConfig, track_unused_params: bool = True) -> List[float]:
         """Encodes an `ArchConfig` object into a fixed-length vector of features.
         This method should be used after the model object is created.
@@ -128,20 +174,125 @@ class ArchParamTree(object):
         Returns:
             List[float]
         """
-        deduped_features = list(self.to_dict(
-            flatten=True, deduplicate_params=True, remove_constants=True
-        ).keys())
+        return [
+            value if (used or not track_unused_params) else float('NaN')
+            for value, used in self._get_config_values(config)
+        ]
 
-        flat_config = utils.flatten_dict(config._config_dict)
-        flat_used_params = utils.flatten_dict(config.get_used_params())
-        
-        # Build feature array
-        features = OrderedDict([(k, v) for k, v in flat_config.items() if k in deduped_features])
-        
-        # Replaces unused params with NaNs if necessary
-        if track_unused_params:
-            for feature_name, _ in features.items():
-                if not flat_used_params[feature_name]:
-                    features[feature_name] = float('NaN')
-        
-        return list(features.values())
+    def encode_many(self, configs: List[ArchConfig], track_unused_params: bool = True,
+                    one_hot: bool = False) -> np.ndarray:
+        """Encodes a list of `ArchConfig` objects into a 2D array of features.
+
+        If `one_hot=False`, each architecture parameter is represented by its value (as in
+        `ArchParamTree.encode_config`) if all of its choices are numeric, or by the index of
+        the selected choice otherwise. Unlike `encode_config`, which keeps raw values to identify
+        architectures, these features are numeric, so `ConfigSearchSpace.encode` also uses them.
+
+        Args:
+            configs (List[ArchConfig]): Architecture configurations.
+            track_unused_params (bool, optional): If `track_unused_params=True`, parameters not
+                used during model creation are represented as `float("NaN")` (or as zeros, if
+                `one_hot=True`). Defaults to True.
+            one_hot (bool, optional): Whether architecture parameters should be one-hot
+                encoded. Defaults to False.
+
+        Returns:
+            np.ndarray: Array of shape `(len(configs), num_features)`.
+        """
+        table = self._get_choice_table()
+        choice_idx = np.empty((len(configs), len(table)), dtype=np.int64)
+
+        # Maps hashable values to choice indices
+        value_maps = []
+        for _, choice in table:
+            try:
+                value_maps.append({c: i for i, c in reversed(list(enumerate(choice.choices)))})
+            except TypeError:
+                value_maps.append(None)
+
+        for config_idx, config in enumerate(configs):
+            for param_idx, (value, used) in enumerate(self._get_config_values(config)):
+                if track_unused_params and not used:
+                    choice_idx[config_idx, param_idx] = -1
+                    continue
+
+                value_map = value_maps[param_idx]
+
+                try:
+                    idx = value_map[value] if value_map is not None else None
+                except (KeyError, TypeError):
+                    idx = None
+
+                if idx is None:
+                    idx = self._get_choice_index(table[param_idx][1], value)
+
+                choice_idx[config_idx, param_idx] = idx
+
+        unused = choice_idx < 0
+
+        if one_hot:
+            offsets = np.cumsum([0] + [len(choice) for _, choice in table])
+            features = np.zeros((len(configs), offsets[-1]), dtype=np.float64)
+
+            rows, cols = np.nonzero(~unused)
+            features[rows, offsets[cols] + choice_idx[rows, cols]] = 1.0
+
+            return features
+
+        features = np.empty((len(configs), len(table)), dtype=np.float64)
+
+        for param_idx, (_, choice) in enumerate(table):
+            if all(isinstance(c, (int, float, np.number)) for c in choice.choices):
+                choice_values = np.array(choice.choices, dtype=np.float64)
+            else:
+                choice_values = np.arange(len(choice), dtype=np.float64)
+
+            features[:, param_idx] = choice_values[np.maximum(choice_idx[:, param_idx], 0)]
+
+        features[unused] = np.nan
+        return features
+
+    def decode_many(self, features: np.ndarray, one_hot: bool = False) -> List[ArchConfig]:
+        """Decodes a 2D array of features created by `ArchParamTree.encode_many` into
+        a list of `ArchConfig` objects. Unused parameters are set to their first choice.
+
+        Args:
+            features (np.ndarray): Array of shape `(num_configs, num_features)`.
+            one_hot (bool, optional): Whether `features` is one-hot encoded. Defaults to False.
+
+        Returns:
+            List[ArchConfig]: Architecture configurations.
+        """
+        table = self._get_choice_table()
+        features = np.atleast_2d(features)
+        choice_idx = np.zeros((features.shape[0], len(table)), dtype=np.int64)
+
+        if one_hot:
+            offsets = np.cumsum([0] + [len(choice) for _, choice in table])
+
+            for param_idx in range(len(table)):
+                choice_idx[:, param_idx] = np.argmax(
+                    features[:, offsets[param_idx]:offsets[param_idx + 1]], axis=1
+                )
+        else:
+            for param_idx, (_, choice) in enumerate(table):
+                column = features[:, param_idx]
+                used = ~np.isnan(column)
+
+                if all(isinstance(c, (int, float, np.number)) for c in choice.choices):
+                    choice_values = np.array(choice.choices, dtype=np.float64)
+                    distances = np.abs(column[used, None] - choice_values[None, :])
+                    choice_idx[used, param_idx] = np.argmin(distances, axis=1)
+                else:
+                    choice_idx[used, param_idx] = column[used].astype(np.int64)
+
+        choices_dict = self.to_dict()
+        param_idxs = {id(choice): param_idx for param_idx, (_, choice) in enumerate(table)}
+
+        return [
+            build_arch_config(utils.replace_ptree_choices(
+                choices_dict,
+                lambda choice, row=row: choice.choices[row[param_idxs[id(choice)]]]
+            ))
+            for row in choice_idx.tolist()
+        ]
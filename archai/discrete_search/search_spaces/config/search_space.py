@@ -1,6 +1,10 @@
+import hashlib
+from collections import OrderedDict
+from functools import partial
+
 from overrides import overrides
 from random import Random
-from typing import List, Type, Callable, Any
+from typing import Any, Callable, Container, Dict, List, Optional, Type
 
 import numpy as np
 import torch
@@ -25,6 +29,22 @@ def retry_on_exception(func: Callable[[], Any], num_retries: int) -> Any:
     raise exceptions[0]
 
 
+class ConfigModelBuilder():
+    def __init__(self, model_cls: Type[torch.nn.Module], model_kwargs: Dict[str, Any]):
+        """Builds the model object of a lazy `ArchaiModel` from its architecture config.
+
+        Args:
+            model_cls (Type[torch.nn.Module]): Model class.
+            model_kwargs (Dict[str, Any]): Additional arguments passed to `model_cls`.
+        """
+
+        self.model_cls = model_cls
+        self.model_kwargs = model_kwargs
+
+    def __call__(self, model: ArchaiModel) -> torch.nn.Module:
+        return self.model_cls(model.metadata['config'], **self.model_kwargs)
+
+
 class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
     def __init__(self,
                  model_cls: Type[torch.nn.Module],
@@ -34,6 +54,8 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
                  track_unused_params: bool = True,
                  unused_param_value: int = 0, 
                  model_creation_attempts: int = 1,
+                 lazy_models: bool = False,
+                 max_archid_index_size: int = 100_000,
                  **model_kwargs):
         self.model_cls = model_cls
         self.arch_param_tree = arch_param_tree
@@ -43,28 +65,168 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         self.model_kwargs = model_kwargs
         self.model_creation_attempts = model_creation_attempts
 
+        # Lazy models only build `model_cls` when `ArchaiModel.arch` is accessed
+        # and can be released after evaluation (see `ArchaiModel.release`)
+        self.lazy_models = lazy_models
+        self.model_builder = ConfigModelBuilder(model_cls, model_kwargs)
+
         self.rng = Random(seed)
 
+        # Maps hashed configs to their architecture ids, used to reject duplicated candidates
+        # before building their models. Least recently used configs are evicted first
+        self.max_archid_index_size = max_archid_index_size
+        self.archid_index: 'OrderedDict[int, str]' = OrderedDict()
+
     def get_archid(self, arch_config: ArchConfig) -> str:
         e = self.arch_param_tree.encode_config(
             arch_config, track_unused_params=self.track_unused_params
         )
         return str(tuple(e))
-    
+
+    def _get_config_key(self, arch_config: ArchConfig) -> int:
+        # 64-bit hash of the config encoding (including unused parameters)
+        e = self.arch_param_tree.encode_config(arch_config, track_unused_params=False)
+        return int.from_bytes(hashlib.blake2b(str(tuple(e)).encode(), digest_size=8).digest(), 'little')
+
+    def get_config_archid(self, arch_config: ArchConfig) -> Optional[str]:
+        """Gets the architecture id of `arch_config` without building its model.
+
+        If `track_unused_params=True`, the architecture id depends on which parameters are used
+        during model creation, so it is only available for configs that were already built
+        (and are still in the `max_archid_index_size` most recently used configs). In that case,
+        `mutate_many` and `crossover_many` only reject exact repeats of built configs before
+        building their models, while other duplicates are rejected after being built.
+
+        Args:
+            arch_config (ArchConfig): Architecture config.
+
+        Returns:
+            Optional[str]: Architecture id or `None` if it cannot be determined before building the model.
+        """
+
+        if not self.track_unused_params:
+            return self.get_archid(arch_config)
+
+        key = self._get_config_key(arch_config)
+        archid = self.archid_index.get(key)
+
+        if archid is not None:
+            self.archid_index.move_to_end(key)
+
+        return archid
+
+    def build_model(self, arch_config: ArchConfig) -> ArchaiModel:
+        """Builds a model from an architecture config. If `lazy_models=True`, the model object
+        is only built when `ArchaiModel.arch` is accessed (and errors from `model_cls` are deferred),
+        unless it is needed to compute the architecture id (`track_unused_params=True`).
+
+        Args:
+            arch_config (ArchConfig): Architecture config.
+
+        Returns:
+            ArchaiModel: Model.
+        """
+
+        # Architecture ids that track unused parameters require building the model,
+        # which is then kept by lazy models until they are released
+        model = None
+
+        if not self.lazy_models or self.track_unused_params:
+            model = self.model_cls(arch_config, **self.model_kwargs)
+
+        archid = self.get_archid(arch_config)
+
+        if self.track_unused_params:
+            key = self._get_config_key(arch_config)
+            self.archid_index[key] = archid
+            self.archid_index.move_to_end(key)
+
+            if len(self.archid_index) > self.max_archid_index_size:
+                self.archid_index.popitem(last=False)
+
+        return ArchaiModel(
+            arch=model,
+            archid=archid,
+            metadata={'config': arch_config},
+            build_fn=self.model_builder if self.lazy_models else None
+        )
+
+    def _build_unseen_models(self, config_fns: List[Callable[[], ArchConfig]],
+                             exclude: Optional[Container[str]] = None) -> List[Optional[ArchaiModel]]:
+        exclude = exclude or set()
+        archids = set()
+        models = []
+
+        def _build_unseen_model(config_fn: Callable[[], ArchConfig]) -> Optional[ArchaiModel]:
+            config = config_fn()
+
+            # Rejects known configs before building their models
+            archid = self.get_config_archid(config)
+
+            if archid is not None and (archid in exclude or archid in archids):
+                return None
+
+            return self.build_model(config)
+
+        for config_fn in config_fns:
+            # Each attempt generates a new config, as in `mutate` and `crossover`
+            model = retry_on_exception(lambda: _build_unseen_model(config_fn), self.model_creation_attempts)
+
+            if model is None or model.archid in exclude or model.archid in archids:
+                models.append(None)
+            else:
+                models.append(model)
+                archids.add(model.archid)
+
+        return models
+
+    def _mutate_config(self, arch_config: ArchConfig) -> ArchConfig:
+        # Mutates parameter with probability `self.mutation_prob`
+        mutated_dict = utils.replace_ptree_pair_choices(
+            self.arch_param_tree.to_dict(),
+            arch_config.to_dict(),
+            lambda d_choice, current_choice: (
+                self.rng.choice(d_choice.choices)
+                if self.rng.random() < self.mutation_prob
+                else current_choice
+            )
+        )
+
+        return build_arch_config(mutated_dict)
+
+    def _crossover_config(self, config_list: List[ArchConfig]) -> ArchConfig:
+        # Selects two configs from `config_list` to perform crossover
+        config_1, config_2 = self.rng.choices(config_list, k=2)
+
+        # Starting with arch param tree dict, randomly replaces DiscreteChoice objects
+        # with params from config_1 with probability 0.5
+        choices_dict = self.arch_param_tree.to_dict()
+        cross_dict = utils.replace_ptree_pair_choices(
+            choices_dict,
+            config_1.to_dict(),
+            lambda d_choice, m1_value: (
+                m1_value
+                if self.rng.random() < 0.5
+                else d_choice
+            )
+        )
+
+        # Replaces all remaining DiscreteChoice objects with params from config_2
+        cross_dict = utils.replace_ptree_pair_choices(
+            cross_dict,
+            config_2.to_dict(),
+            lambda d_choice, m2_value: m2_value
+        )
+
+        return build_arch_config(cross_dict)
+
     @overrides
     def save_arch(self, model: ArchaiModel, path: str) -> None:
         model.metadata['config'].to_json(path)
     
     @overrides
     def load_arch(self, path: str) -> ArchaiModel:
-        config = ArchConfig.from_json(path)
-        model = self.model_cls(config, **self.model_kwargs)
-        
-        return ArchaiModel(
-            arch=model,
-            archid=self.get_archid(config),
-            metadata={'config': config}
-        )
+        return self.build_model(ArchConfig.from_json(path))
     
     @overrides
     def save_model_weights(self, model: ArchaiModel, path: str) -> None:
@@ -76,90 +238,50 @@ class ConfigSearchSpace(EvolutionarySearchSpace, BayesOptSearchSpace):
         
     @overrides
     def random_sample(self) -> ArchaiModel:
-        def _sample():
-            config = self.arch_param_tree.sample_config(self.rng)
-            model = self.model_cls(config, **self.model_kwargs)
-            return model, config
-
-        model, config = retry_on_exception(_sample, self.model_creation_attempts)
-
-        return ArchaiModel(
-            arch=model,
-            archid=self.get_archid(config),
-            metadata={'config': config}
+        return retry_on_exception(
+            lambda: self.build_model(self.arch_param_tree.sample_config(self.rng)),
+            self.model_creation_attempts
         )
 
     @overrides
     def mutate(self, model: ArchaiModel) -> ArchaiModel:
-        choices_dict = self.arch_param_tree.to_dict()
-
-        def _mutate():
-            # Mutates parameter with probability `self.mutation_prob`
-            mutated_dict = utils.replace_ptree_pair_choices(
-                choices_dict, 
-                model.metadata['config'].to_dict(),
-                lambda d_choice, current_choice: (
-                    self.rng.choice(d_choice.choices)
-                    if self.rng.random() < self.mutation_prob
-                    else current_choice
-                )
-            )
-
-            mutated_config = build_arch_config(mutated_dict)
-            mutated_model = self.model_cls(mutated_config, **self.model_kwargs)
-
-            return mutated_model, mutated_config
-        
-        mutated_model, mutated_config = retry_on_exception(_mutate, self.model_creation_attempts)
-        
-        return ArchaiModel(
-            arch=mutated_model,
-            archid=self.get_archid(mutated_config),
-            metadata={'config': mutated_config}
+        return retry_on_exception(
+            lambda: self.build_model(self._mutate_config(model.metadata['config'])),
+            self.model_creation_attempts
         )
 
     @overrides
     def crossover(self, model_list: List[ArchaiModel]) -> ArchaiModel:
-        def _crossover():
-            # Selects two models from `model_list` to perform crossover
-            model_1, model_2 = self.rng.choices(model_list, k=2)
-
-            # Starting with arch param tree dict, randomly replaces DiscreteChoice objects
-            # with params from model_1 with probability 0.5
-            choices_dict = self.arch_param_tree.to_dict()
-            cross_dict = utils.replace_ptree_pair_choices(
-                choices_dict,
-                model_1.metadata['config'].to_dict(),
-                lambda d_choice, m1_value: (
-                    m1_value
-                    if self.rng.random() < 0.5
-                    else d_choice
-                )
-            )
-
-            # Replaces all remaining DiscreteChoice objects with params from model_2
-            cross_dict = utils.replace_ptree_pair_choices(
-                cross_dict,
-                model_2.metadata['config'].to_dict(),
-                lambda d_choice, m2_value: m2_value
-            )
+        return retry_on_exception(
+            lambda: self.build_model(self._crossover_config([m.metadata['config'] for m in model_list])),
+            self.model_creation_attempts
+        )
 
-            cross_config = build_arch_config(cross_dict)
-            cross_model = self.model_cls(cross_config, **self.model_kwargs)
+    @overrides
+    def mutate_many(self, arch_list: List[ArchaiModel],
+                    exclude: Optional[Container[str]] = None) -> List[Optional[ArchaiModel]]:
+        # Mutations are generated as configs and only unseen configs are built
+        # (see `get_config_archid` for the limitation of `track_unused_params=True`)
+        config_fns = [partial(self._mutate_config, arch.metadata['config']) for arch in arch_list]
+        return self._build_unseen_models(config_fns, exclude)
 
-            return cross_model, cross_config
-        
-        cross_model, cross_config = retry_on_exception(_crossover, self.model_creation_attempts)
-        
-        return ArchaiModel(
-            arch=cross_model,
-            archid=self.get_archid(cross_config),
-            metadata={'config': cross_config}
-        )
+    @overrides
+    def crossover_many(self, arch_lists: List[List[ArchaiModel]],
+                       exclude: Optional[Container[str]] = None) -> List[Optional[ArchaiModel]]:
+        config_fns = [
+            partial(self._crossover_config, [arch.metadata['config'] for arch in arch_list])
+            for arch_list in arch_lists
+        ]
+        return self._build_unseen_models(config_fns, exclude)
 
     @overrides
     def encode(self, model: ArchaiModel) -> np.ndarray:
-        return np.array(self.arch_param_tree.encode_config(
-            model.metadata['config'], 
+        # Uses the same features of `encode_many` (non-numeric parameters are encoded by their choice index)
+        return self.encode_many([model])[0]
+
+    @overrides
+    def encode_many(self, arch_list: List[ArchaiModel]) -> np.ndarray:
+        return self.arch_param_tree.encode_many(
+            [arch.metadata['config'] for arch in arch_list],
             track_unused_params=self.track_unused_params
-        ))
+        )
@@ -1,4 +1,4 @@
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from tqdm import tqdm
@@ -7,17 +7,22 @@ from archai.discrete_search import (
     AsyncObjective, Objective, DatasetProvider,
     ArchaiModel
 )
+from archai.discrete_search.utils.parallel import evaluate_objective
 
 
 def evaluate_models(models: List[ArchaiModel],
                     objectives: Dict[str, Union[Objective, AsyncObjective]],  
                     dataset_providers: Union[DatasetProvider, List[DatasetProvider]],
-                    budgets: Union[Dict[str, float], Dict[str, List[float]], None] = None) -> Dict[str, np.ndarray]:
+                    budgets: Union[Dict[str, float], Dict[str, List[float]], None] = None,
+                    num_workers: Union[int, Dict[str, int]] = 1,
+                    executor: str = 'thread',
+                    chunk_size: int = 1,
+                    cpu_pinned_objectives: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
     """Evaluates all objective functions on a list of models and dataset(s).
     
     Objectives are evaluated in the following order:
         (1) Asynchronous objectives are dispatched by calling `.send`
-        (2) Synchronous objectives are computed using `.evaluate`
+        (2) Synchronous objectives are computed using `.evaluate`, optionally with a local pool of workers
         (3) Asynchronous objectives results are gathered by calling `.fetch_all`
 
     Args:
@@ -61,6 +66,17 @@ def evaluate_models(models: List[ArchaiModel],
                 ```
             3. Default budget for all objectives (`budgets=None`)
             Defaults to None.
+
+        num_workers (Union[int, Dict[str, int]], optional): Number of local workers used to evaluate
+            synchronous objectives, either for all objectives (int) or for each objective (Dict[str, int]).
+            Objectives not specified are evaluated sequentially. Defaults to 1.
+
+        executor (str, optional): Local pool type, either `thread` or `process`. Defaults to 'thread'.
+
+        chunk_size (int, optional): Number of models sent to a worker at once. Defaults to 1.
+
+        cpu_pinned_objectives (Optional[List[str]], optional): Synchronous objectives that should pin
+            each worker to an exclusive set of CPUs (e.g latency objectives). Defaults to None.
     
     Returns:
         Dict[str, np.array]: Evaluation results (`np.array` of size `len(models)`) for each metric passed
@@ -97,20 +113,21 @@ def evaluate_models(models: List[ArchaiModel],
             else:
                 obj.send(arch, dataset)
     
+    if not isinstance(num_workers, dict):
+        num_workers = {obj_name: num_workers for obj_name in objectives}
+
+    cpu_pinned_objectives = cpu_pinned_objectives or []
+
     # Calculates synchronous objectives in order
     for obj_name, obj in sync_objectives:
-        pbar = tqdm(inputs, desc=f'Calculating "{obj_name}"...')
-
-        if budgets:
-            objective_results[obj_name] = np.array([
-                obj.evaluate(arch, dataset, budget=budgets[obj_name][arch_idx]) 
-                for arch_idx, (arch, dataset) in pbar
-            ], dtype=np.float64)
-        else:
-            objective_results[obj_name] = np.array([
-                obj.evaluate(arch, dataset) 
-                for _, (arch, dataset) in pbar
-            ], dtype=np.float64)
+        objective_results[obj_name] = np.array(evaluate_objective(
+            obj, models, dataset_providers,
+            budgets[obj_name] if budgets else [None] * len(models),
+            num_workers=num_workers.get(obj_name, 1),
+            executor=executor, chunk_size=chunk_size,
+            pin_cpus=obj_name in cpu_pinned_objectives,
+            desc=f'Calculating "{obj_name}"...'
+        ), dtype=np.float64)
 
     # Gets results from async objectives
     pbar = tqdm(async_objectives, desc=f'Gathering results from async objectives...')
@@ -118,3 +135,199 @@ def evaluate_models(models: List[ArchaiModel],
         objective_results[obj_name] = np.array(obj.fetch_all(), dtype=np.float64)
 
     return objective_results
+
+
+class StreamingEvaluator():
+    def __init__(self, objectives: Dict[str, Union[Objective, AsyncObjective]],
+                 poll_interval: float = 1.0,
+                 num_workers: Union[int, Dict[str, int]] = 1,
+                 executor: str = 'thread',
+                 chunk_size: int = 1,
+                 cpu_pinned_objectives: Optional[List[str]] = None):
+        """Evaluates models on a set of objectives and returns them as soon as all of their
+        objectives are available, using `AsyncObjective.fetch_ready`.
+
+        Synchronous objectives are computed when models are submitted, while asynchronous objectives
+        keep running in the background, so a search algorithm can proceed with the models that
+        already finished while slower evaluations are still in flight. Time limits of asynchronous
+        objectives (e.g `RayParallelObjective.timeout`) are enforced by their `fetch_ready` method,
+        which cancels the jobs that exceed them and returns their results as None.
+
+        Args:
+            objectives (Dict[str, Union[Objective, AsyncObjective]]): Dictionary mapping
+                an objective identifier to an objective object.
+            poll_interval (float, optional): Maximum number of seconds spent waiting on a single
+                asynchronous objective before polling the others. Defaults to 1.0.
+            num_workers (Union[int, Dict[str, int]], optional): Number of local workers used to evaluate
+                synchronous objectives, either for all objectives (int) or for each objective (Dict[str, int]).
+                Objectives not specified are evaluated sequentially. Defaults to 1.
+            executor (str, optional): Local pool type, either `thread` or `process`. Defaults to 'thread'.
+            chunk_size (int, optional): Number of models sent to a worker at once. Defaults to 1.
+            cpu_pinned_objectives (Optional[List[str]], optional): Synchronous objectives that should pin
+                each worker to an exclusive set of CPUs (e.g latency objectives). Defaults to None.
+        """
+
+        assert all(isinstance(obj, (Objective, AsyncObjective)) for obj in objectives.values()),\
+            'All objectives must subclass `Objective` or `AsyncObjective`.'
+
+        self.objectives = objectives
+        self.poll_interval = poll_interval
+
+        if not isinstance(num_workers, dict):
+            num_workers = {obj_name: num_workers for obj_name in objectives}
+
+        self.num_workers = num_workers
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.cpu_pinned_objectives = cpu_pinned_objectives or []
+
+        self.sync_objectives = {n: o for n, o in objectives.items() if isinstance(o, Objective)}
+        self.async_objectives = {n: o for n, o in objectives.items() if isinstance(o, AsyncObjective)}
+
+        # Submitted models that still have pending objectives, indexed by submission ticket
+        self.pending = {}
+        self.num_submitted = 0
+
+        # Maps the job index of each async. objective to a submission ticket. Job indices
+        # are reset by the objective once all of its jobs were fetched
+        self.job_tickets = {obj_name: [] for obj_name in self.async_objectives}
+        self.num_pending_jobs = {obj_name: 0 for obj_name in self.async_objectives}
+
+    @property
+    def num_pending(self) -> int:
+        """Number of submitted models with pending objectives."""
+
+        return len(self.pending)
+
+    def submit(self, models: List[ArchaiModel],
+               dataset_providers: Union[DatasetProvider, List[DatasetProvider]],
+               budgets: Union[Dict[str, float], Dict[str, List[float]], None] = None) -> List[int]:
+        """Submits models for evaluation.
+
+        Args:
+            models (List[ArchaiModel]): List of architectures.
+            dataset_providers (Union[DatasetProvider, List[DatasetProvider]]): A single dataset provider
+                or list of dataset providers with the same length of `models`.
+            budgets (Union[Dict[str, float], Dict[str, List[float]], None], optional): Budget values
+                for each objective or objective-model combination. Defaults to None.
+
+        Returns:
+            List[int]: Submission ticket of each model.
+        """
+
+        if not isinstance(dataset_providers, list):
+            dataset_providers = [dataset_providers] * len(models)
+
+        budgets = {
+            obj_name: (budget if isinstance(budget, list) else [budget] * len(models))
+            for obj_name, budget in (budgets or {}).items()
+        }
+        budgets = {obj_name: budgets.get(obj_name, [None] * len(models)) for obj_name in self.objectives}
+
+        assert len(dataset_providers) == len(models)
+        assert all(len(b) == len(models) for b in budgets.values())
+
+        tickets = list(range(self.num_submitted, self.num_submitted + len(models)))
+        self.num_submitted += len(models)
+
+        for ticket, model_idx in zip(tickets, range(len(models))):
+            self.pending[ticket] = {
+                'model': models[model_idx],
+                'results': {},
+                'budgets': {obj_name: b[model_idx] for obj_name, b in budgets.items()}
+            }
+
+        # Dispatches jobs for all async objectives first
+        for obj_name, obj in self.async_objectives.items():
+            for ticket, model, dataset, budget in zip(tickets, models, dataset_providers, budgets[obj_name]):
+                obj.send(model, dataset, budget)
+
+                self.job_tickets[obj_name].append(ticket)
+                self.num_pending_jobs[obj_name] += 1
+
+        # Calculates synchronous objectives in order
+        for obj_name, obj in self.sync_objectives.items():
+            results = evaluate_objective(
+                obj, models, dataset_providers, budgets[obj_name],
+                num_workers=self.num_workers.get(obj_name, 1),
+                executor=self.executor, chunk_size=self.chunk_size,
+                pin_cpus=obj_name in self.cpu_pinned_objectives,
+                desc=f'Calculating "{obj_name}"...'
+            )
+
+            for ticket, result in zip(tickets, results):
+                self.pending[ticket]['results'][obj_name] = result
+
+        return tickets
+
+    def _fetch_ready(self, obj_name: str, timeout: Optional[float]) -> int:
+        ready = self.objectives[obj_name].fetch_ready(timeout=timeout)
+
+        for job_idx, result in ready:
+            self.pending[self.job_tickets[obj_name][job_idx]]['results'][obj_name] = result
+
+        self.num_pending_jobs[obj_name] -= len(ready)
+
+        if self.num_pending_jobs[obj_name] == 0:
+            self.job_tickets[obj_name] = []
+
+        return len(ready)
+
+    def fetch(self, min_models: Optional[int] = None,
+              tickets: Optional[List[int]] = None) -> Tuple[List[ArchaiModel], Dict[str, np.ndarray], Dict[str, List]]:
+        """Fetches models that have all of their objectives evaluated, waiting until at least
+        `min_models` of them are available.
+
+        Args:
+            min_models (Optional[int], optional): Minimum number of evaluated models. If `None`,
+                waits for all pending models. Defaults to None.
+            tickets (Optional[List[int]], optional): If provided, only models from `tickets` count
+                towards `min_models`. Other evaluated models are still returned. Defaults to None.
+
+        Returns:
+            Tuple[List[ArchaiModel], Dict[str, np.ndarray], Dict[str, List]]: Evaluated models
+                (in submission order), their evaluation results and budgets.
+        """
+
+        tickets = set(tickets) if tickets is not None else None
+
+        def _num_complete() -> int:
+            return sum(
+                1 for ticket, p in self.pending.items()
+                if len(p['results']) == len(self.objectives) and (tickets is None or ticket in tickets)
+            )
+
+        def _num_expected() -> int:
+            return len(self.pending) if tickets is None else len(tickets & self.pending.keys())
+
+        min_models = _num_expected() if min_models is None else min(min_models, _num_expected())
+
+        while _num_complete() < min_models:
+            # Non-blocking pass through all objectives before waiting on each of them
+            num_ready = sum(
+                self._fetch_ready(obj_name, timeout=0)
+                for obj_name, num_jobs in self.num_pending_jobs.items() if num_jobs > 0
+            )
+
+            if num_ready == 0:
+                for obj_name, num_jobs in self.num_pending_jobs.items():
+                    if num_jobs > 0 and self._fetch_ready(obj_name, timeout=self.poll_interval) > 0:
+                        break
+
+        complete_tickets = sorted(
+            ticket for ticket, p in self.pending.items()
+            if len(p['results']) == len(self.objectives)
+        )
+        complete = [self.pending.pop(ticket) for ticket in complete_tickets]
+
+        return (
+            [p['model'] for p in complete],
+            {
+                obj_name: np.array([p['results'][obj_name] for p in complete], dtype=np.float64)
+                for obj_name in self.objectives
+            },
+            {
+                obj_name: [p['budgets'][obj_name] for p in complete]
+                for obj_name in self.objectives
+            }
+        )
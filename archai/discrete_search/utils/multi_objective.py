@@ -1,10 +1,13 @@
+from bisect import bisect_right
 from typing import Dict, List, Union
 
 import numpy as np
-from tqdm import tqdm
 
 from archai.discrete_search import ArchaiModel, AsyncObjective, Objective
 
+# Maximum number of pairwise comparisons held in memory by a single broadcasted dominance check
+DOMINANCE_BLOCK_SIZE = 2 ** 22
+
 
 def get_pareto_frontier(models: List[ArchaiModel], 
                         evaluation_results: Dict[str, np.ndarray],
@@ -22,7 +25,7 @@ def get_pareto_frontier(models: List[ArchaiModel],
     results_array = np.vstack(list(inverted_results.values())).T
 
     pareto_points = np.array(
-        _find_pareto_frontier_points(results_array)
+        _find_pareto_frontier_points(results_array), dtype=np.int64
     )
 
     return {
@@ -50,9 +53,7 @@ def get_non_dominated_sorting(models: List[ArchaiModel],
     # Converts results to an array of shape (len(models), len(objectives))
     results_array = np.vstack(list(inverted_results.values())).T
 
-    frontiers = np.array(
-        _find_non_dominated_sorting(results_array)
-    )
+    frontiers = _find_non_dominated_sorting(results_array)
 
     return [{
         'models': [models[idx] for idx in frontier],
@@ -64,136 +65,244 @@ def get_non_dominated_sorting(models: List[ArchaiModel],
     } for frontier in frontiers]
 
 
-def _find_pareto_frontier_points(all_points: np.ndarray) -> List[int]:
+def _weak_dominance_matrix(reference: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Computes a (#reference, #points) boolean matrix where `[j, i]` tells
+    if `reference[j]` is lower or equal than `points[i]` on every dimension.
+
+    Args:
+        reference (np.ndarray): Reference points (#reference, #objectives).
+        points (np.ndarray): Points to be checked (#points, #objectives).
+
+    Returns:
+        np.ndarray: Weak dominance matrix.
+    """
+
+    # Reducing dimension-by-dimension is considerably faster than `np.all(..., axis=2)`,
+    # since the number of objectives is usually small
+    dominance = reference[:, None, 0] <= points[None, :, 0]
+
+    for dim in range(1, points.shape[1]):
+        dominance &= reference[:, None, dim] <= points[None, :, dim]
+
+    return dominance
+
+
+def _preceding_dominance_matrix(points: np.ndarray) -> np.ndarray:
+    """Computes a (#points, #points) boolean matrix where `[j, i]` tells
+    if `points[j]` precedes and weakly dominates `points[i]`.
+
+    Args:
+        points (np.ndarray): N-dimensional points.
+
+    Returns:
+        np.ndarray: Weak dominance matrix restricted to `j < i`.
+    """
+
+    n = points.shape[0]
+    return _weak_dominance_matrix(points, points) & np.triu(np.ones((n, n), dtype=bool), k=1)
+
+
+def _is_dominated_by(points: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Checks which rows of `points` are weakly dominated by at least one row of `reference`.
+
+    Comparisons are broadcasted in blocks of `reference` rows, so that memory usage
+    is bounded by `DOMINANCE_BLOCK_SIZE`.
+
+    Args:
+        points (np.ndarray): Points to be checked (#points, #objectives).
+        reference (np.ndarray): Reference points (#reference, #objectives).
+
+    Returns:
+        np.ndarray: Boolean mask of shape (#points,).
+    """
+
+    dominated = np.zeros(points.shape[0], dtype=bool)
+    if points.shape[0] == 0 or reference.shape[0] == 0:
+        return dominated
+
+    block_size = max(1, DOMINANCE_BLOCK_SIZE // points.shape[0])
+
+    for start in range(0, reference.shape[0], block_size):
+        dominated |= _weak_dominance_matrix(reference[start:start + block_size], points).any(axis=0)
+
+    return dominated
+
+
+def _find_pareto_frontier_points(all_points: np.ndarray, block_size: int = 512) -> List[int]:
     """Takes in a list of n-dimensional points, one per row, returns the list of row indices
         which are Pareto-frontier points.
         
-    Assumes that lower values on every dimension are better.
+    Assumes that lower values on every dimension are better. Duplicated points are only
+    considered once (first occurrence) and indices are returned in lexicographic order
+    of their points.
 
     Args:
         all_points: N-dimensional points.
+        block_size: Number of points checked at once when there are more than two dimensions.
 
     Returns:
         List of Pareto-frontier indexes.
     """
 
-    # For each point see if there exists  any other point which dominates it on all dimensions
-    # If that is true, then it is not a pareto point and vice-versa
-
     # Inputs should alwyas be a two-dimensional array
     assert len(all_points.shape) == 2
 
-    pareto_inds = []
+    # Gets the indices of unique points, lexicographically sorted. After sorting,
+    # a point can only be dominated by points that come before it
+    _, unique_indices = np.unique(all_points, axis=0, return_index=True)
+    points = all_points[unique_indices]
 
-    dim = all_points.shape[1]
+    if points.shape[0] == 0:
+        return []
 
-    # Gets the indices of unique points
-    _, unique_indices = np.unique(all_points, axis=0, return_index=True)
+    if points.shape[1] == 2:
+        return unique_indices[_find_2d_pareto_mask(points)].tolist()
 
-    for i in unique_indices:
-        this_point = all_points[i,:]
-        is_pareto = True
+    # Sweeps blocks of sorted points, checking them against the frontier found so far
+    # and against the preceding points of the same block
+    frontier = np.empty((0, points.shape[1]), dtype=points.dtype)
+    pareto_mask = np.zeros(points.shape[0], dtype=bool)
 
-        for j in unique_indices:
-            if j == i:
-                continue
+    for start in range(0, points.shape[0], block_size):
+        block = points[start:start + block_size]
+        block_mask = ~(_is_dominated_by(block, frontier) | _preceding_dominance_matrix(block).any(axis=0))
 
-            other_point = all_points[j,:]
-            diff = this_point - other_point
+        pareto_mask[start:start + block_size] = block_mask
+        frontier = np.concatenate([frontier, block[block_mask]], axis=0)
 
-            if sum(diff >= 0) == dim:
-                # Other point is smaller/larger on all dimensions
-                # so we have found at least one dominating point
-                is_pareto = False
-                break
-                
-        if is_pareto:
-            pareto_inds.append(i)
+    return unique_indices[pareto_mask].tolist()
 
-    return pareto_inds
 
+def _find_2d_pareto_mask(sorted_points: np.ndarray) -> np.ndarray:
+    """Sweep-line Pareto-frontier for unique, lexicographically sorted 2D points.
 
-def _find_non_dominated_sorting(all_points: np.ndarray) -> List[List[int]]:
+    Args:
+        sorted_points (np.ndarray): Unique 2D points sorted by (x, y).
+
+    Returns:
+        np.ndarray: Boolean mask of Pareto-frontier points.
+    """
+
+    y = sorted_points[:, 1]
+
+    # A point is non-dominated if its `y` is strictly lower than every preceding `y`
+    pareto_mask = np.ones(y.shape[0], dtype=bool)
+    pareto_mask[1:] = y[1:] < np.minimum.accumulate(y)[:-1]
+
+    return pareto_mask
+
+
+def _find_non_dominated_sorting(all_points: np.ndarray) -> List[np.ndarray]:
     """Finds non-dominated sorting frontiers from a matrix (#points, #objectives).
 
+    Points are lexicographically sorted, so that a point can only be weakly dominated by
+    points that come before it, and assigned to the first front that does not contain
+    any point that dominates it (ENS). Two-dimensional inputs use a binary search over
+    the minimum `y` of each front, while k-dimensional inputs are ranked in blocks
+    using broadcasted dominance checks.
+
     Args:
         all_points (np.ndarray): N-dimensional points.
 
     Returns:
-        List[List[int]]: List of frontier indices
+        List[np.ndarray]: List of frontier indices
     
     References:
-        Implementation adapted from:
-            https://github.com/anyoptimization/pymoo/blob/main/pymoo/util/nds/efficient_non_dominated_sort.py
-    
         Algorithm:
             X. Zhang, Y. Tian, R. Cheng, and Y. Jin,
             An efficient approach to nondominated sorting for evolutionary multiobjective optimization,
             IEEE Transactions on Evolutionary Computation, 2015, 19(2): 201-213.
     """
 
+    assert len(all_points.shape) == 2
+
     lex_sorting = np.lexsort(all_points.T[::-1])
-    all_points = all_points.copy()[lex_sorting]
+    sorted_points = all_points[lex_sorting]
 
-    fronts = []
+    if sorted_points.shape[0] == 0:
+        return []
 
-    for idx in range(all_points.shape[0]):
-        front_rank = _find_front_rank(all_points, idx, fronts)        
-        
-        if front_rank >= len(fronts):
-            fronts.append([])
+    if sorted_points.shape[1] == 1:
+        # Every point is weakly dominated by all of its predecessors
+        ranks = np.arange(sorted_points.shape[0])
+    elif sorted_points.shape[1] == 2:
+        ranks = _find_2d_front_ranks(sorted_points)
+    else:
+        ranks = _find_front_ranks(sorted_points)
 
-        fronts[front_rank].append(idx)
+    # Stable sorting keeps the lexicographic order inside each front
+    order = np.argsort(ranks, kind='stable')
+    boundaries = np.searchsorted(ranks[order], np.arange(1, ranks.max() + 1))
 
-    ret = []
-    for front in fronts:
-        ret.append(lex_sorting[front])
+    return [lex_sorting[front] for front in np.split(order, boundaries)]
 
-    return ret
 
+def _find_2d_front_ranks(sorted_points: np.ndarray) -> np.ndarray:
+    """Finds the front rank of lexicographically sorted 2D points.
 
-def _find_front_rank(all_points: np.ndarray, idx: int, fronts: List[List[int]]) -> int:
-    """Finds the front rank for all_points[idx] given `fronts`.
+    Args:
+        sorted_points (np.ndarray): 2D points sorted by (x, y).
+
+    Returns:
+        np.ndarray: Front rank of each point.
+    """
+
+    # `fronts_min_y[k]` is the minimum `y` of front `k`, which is non-decreasing in `k`.
+    # A point is dominated by a member of front `k` iff `fronts_min_y[k] <= y`
+    fronts_min_y = []
+    ranks = np.empty(sorted_points.shape[0], dtype=np.int64)
+
+    for idx, y in enumerate(sorted_points[:, 1].tolist()):
+        rank = bisect_right(fronts_min_y, y)
+
+        if rank == len(fronts_min_y):
+            fronts_min_y.append(y)
+        else:
+            fronts_min_y[rank] = y
+
+        ranks[idx] = rank
+
+    return ranks
+
+
+def _find_front_ranks(sorted_points: np.ndarray, block_size: int = 512) -> np.ndarray:
+    """Finds the front rank of lexicographically sorted k-dimensional points.
 
     Args:
-        all_points (np.ndarray): N-dimensional points.
-        idx (int): Point index.
-        fronts (List[List[int]]): Current NDS fronts
+        sorted_points (np.ndarray): N-dimensional points sorted lexicographically.
+        block_size (int, optional): Number of points ranked at once. Defaults to 512.
 
     Returns:
-        int: Front rank for `all_points[idx]`
-    
-    Reference:
-        Adapted from https://github.com/anyoptimization/pymoo/blob/main/pymoo/util/nds/efficient_non_dominated_sort.py
+        np.ndarray: Front rank of each point.
     """
-    
-    def dominates(x, y):
-        for i in range(len(x)):
-            if y[i] < x[i]:
-                return False
 
-        return True
+    fronts = []
+    ranks = np.empty(sorted_points.shape[0], dtype=np.int64)
+
+    for start in range(0, sorted_points.shape[0], block_size):
+        block = sorted_points[start:start + block_size]
+        intra_dominance = _preceding_dominance_matrix(block)
 
-    num_found_fronts = len(fronts)
-    rank = 0
-    current = all_points[idx]
+        pending = np.arange(block.shape[0])
+        rank = 0
 
-    while True:
-        if num_found_fronts == 0:
-            return 0
+        while pending.size > 0:
+            candidates = pending
 
-        fk_indices = fronts[rank]
-        solutions = all_points[fk_indices[::-1]]
-        non_dominated = True
+            if rank < len(fronts):
+                candidates = pending[~_is_dominated_by(block[pending], fronts[rank])]
 
-        for s in solutions:
-            if dominates(s, current):
-                non_dominated = False
-                break
+            # Candidates dominated by other candidates are also dominated by
+            # a non-dominated candidate (transitivity), which will join this front
+            members = candidates[~intra_dominance[np.ix_(candidates, candidates)].any(axis=0)]
+            ranks[start + members] = rank
 
-        if non_dominated:
-            return rank
-        else:
+            if rank < len(fronts):
+                fronts[rank] = np.concatenate([fronts[rank], block[members]], axis=0)
+            else:
+                fronts.append(block[members])
+
+            pending = np.setdiff1d(pending, members, assume_unique=True)
             rank += 1
-            if rank >= num_found_fronts:
-                return num_found_fronts
+
+    return ranks
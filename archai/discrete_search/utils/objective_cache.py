@@ -0,0 +1,303 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import enum
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from time import time
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from overrides import overrides
+
+from archai.discrete_search.api.objective_cache import ObjectiveCache
+
+
+def _describe(obj: Any, depth: int = 0, max_depth: int = 4, allow_ids: bool = False) -> Any:
+    """Builds a JSON-serializable description of `obj` that is stable across processes."""
+
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+
+    if isinstance(obj, float):
+        return repr(obj)
+
+    if isinstance(obj, (Path, enum.Enum)):
+        return str(obj)
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        items = [_describe(o, depth + 1, max_depth, allow_ids) for o in obj]
+        return sorted(items, key=json.dumps) if isinstance(obj, (set, frozenset)) else items
+
+    if isinstance(obj, dict):
+        return {str(k): _describe(v, depth + 1, max_depth, allow_ids) for k, v in sorted(obj.items(), key=lambda t: str(t[0]))}
+
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return {
+            'dtype': str(obj.dtype),
+            'shape': list(np.shape(obj)),
+            'sha256': hashlib.sha256(np.ascontiguousarray(obj).tobytes()).hexdigest()
+        }
+
+    if inspect.isclass(obj) or inspect.isfunction(obj) or inspect.ismethod(obj) or inspect.isbuiltin(obj):
+        return f'{getattr(obj, "__module__", "")}.{getattr(obj, "__qualname__", repr(obj))}'
+
+    class_path = f'{type(obj).__module__}.{type(obj).__qualname__}'
+
+    # Objects can supply an explicit description of their configuration
+    cache_fingerprint = getattr(obj, 'cache_fingerprint', None)
+    if callable(cache_fingerprint):
+        return {'class': class_path, 'config': _describe(cache_fingerprint(), 0, max_depth, allow_ids)}
+
+    if depth >= max_depth:
+        # Deeper configurations are hashed instead of truncated, so objects that only
+        # differ below `max_depth` still get different descriptions
+        try:
+            content = pickle.dumps(obj, protocol=4)
+        except Exception as e:
+            if not allow_ids:
+                raise ValueError(
+                    f'Could not pickle {class_path} (at depth {depth}) to build a stable fingerprint. '
+                    'Define a `cache_fingerprint()` method that describes its configuration.'
+                ) from e
+
+            return {'class': class_path, 'id': id(obj)}
+
+        return {'class': class_path, 'sha256': hashlib.sha256(content).hexdigest()}
+
+    # Objects are described by the attributes matching their constructor arguments,
+    # which usually hold their configuration (and not their mutable state)
+    try:
+        params = [
+            p.name for p in inspect.signature(type(obj).__init__).parameters.values()
+            if p.name != 'self' and p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+        ]
+    except (TypeError, ValueError):
+        params = []
+
+    attrs = getattr(obj, '__dict__', {})
+    missing_params = [p for p in params if p not in attrs]
+
+    if missing_params:
+        if not allow_ids:
+            raise ValueError(
+                f'Could not find attributes {missing_params} of {class_path} to build a stable fingerprint. '
+                'Store the constructor arguments as attributes or define a `cache_fingerprint()` method.'
+            )
+
+        return {'class': class_path, 'id': id(obj)}
+
+    return {
+        'class': class_path,
+        'config': {p: _describe(attrs[p], depth + 1, max_depth, allow_ids) for p in params}
+    }
+
+
+def get_fingerprint(*objs: Any, allow_ids: bool = False) -> str:
+    """Computes a stable fingerprint (SHA-256 hex digest) of `objs`.
+
+    Objects are described by their class and by the values of the attributes that match
+    their constructor arguments, so `get_fingerprint` produces the same value for
+    equally configured objects across processes and restarts. Objects can also define a
+    `cache_fingerprint()` method that returns a description of their configuration.
+
+    Args:
+        *objs: Objects to be fingerprinted.
+        allow_ids (bool, optional): Whether objects that cannot be described should be identified
+            by `id()`. Such fingerprints are only valid while the objects are alive in the current
+            process. Defaults to False.
+
+    Returns:
+        str: Fingerprint.
+
+    Raises:
+        ValueError: If an object cannot be described and `allow_ids` is `False`.
+    """
+
+    description = json.dumps([_describe(obj, allow_ids=allow_ids) for obj in objs], sort_keys=True)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+class InMemoryObjectiveCache(ObjectiveCache):
+    persistent: bool = False
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """In-memory objective cache with optional LRU and TTL eviction.
+
+        Args:
+            max_entries (Optional[int], optional): Maximum number of entries. Least recently used
+                entries are evicted first. Defaults to None (unbounded).
+            ttl (Optional[float], optional): Time-to-live of entries in seconds. Defaults to None.
+        """
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # Key: (value, creation time)
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    @overrides
+    def get(self, key: str) -> Optional[float]:
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            if self.ttl is not None and time() - entry[1] > self.ttl:
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    @overrides
+    def set(self, key: str, value: float) -> None:
+        with self.lock:
+            self.entries[key] = (value, time())
+            self.entries.move_to_end(key)
+
+            if self.max_entries is not None:
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class SQLiteObjectiveCache(ObjectiveCache):
+    persistent: bool = True
+
+    def __init__(self, path: Union[str, Path], max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None, timeout: float = 60.0,
+                 eviction_interval: int = 1000) -> None:
+        """Persistent objective cache stored in a local SQLite database.
+
+        The database uses write-ahead logging, so it can be shared by concurrent readers and writers
+        from multiple threads or search worker processes on the same machine. Connections are
+        opened lazily per thread and process.
+
+        Args:
+            path (Union[str, Path]): Path to the database file.
+            max_entries (Optional[int], optional): Maximum number of entries. Least recently used
+                entries are evicted first. Defaults to None (unbounded).
+            ttl (Optional[float], optional): Time-to-live of entries in seconds. Defaults to None.
+            timeout (float, optional): Seconds to wait for a locked database. Defaults to 60.0.
+            eviction_interval (int, optional): Number of writes between evictions. Defaults to 1000.
+        """
+
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.timeout = timeout
+        self.eviction_interval = eviction_interval
+
+        self._local = threading.local()
+        self._num_writes = 0
+
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value REAL, created_at REAL, last_access REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections cannot be shared between threads or forked processes
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.path), timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+
+            self._local.conn, self._local.pid = conn, os.getpid()
+
+        return conn
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_local']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @overrides
+    def get(self, key: str) -> Optional[float]:
+        return self.get_many([key])[0]
+
+    @overrides
+    def set(self, key: str, value: float) -> None:
+        self.set_many([(key, value)])
+
+    @overrides
+    def get_many(self, keys: Iterable[str]) -> List[Optional[float]]:
+        keys = list(keys)
+        now = time()
+        min_created_at = (now - self.ttl) if self.ttl is not None else float('-inf')
+        results = {}
+
+        with self._connection() as conn:
+            # Respects SQLite's maximum number of host parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+
+                rows = conn.execute(
+                    f'SELECT key, value FROM cache WHERE key IN ({placeholders}) AND created_at >= ?',
+                    (*batch, min_created_at)
+                ).fetchall()
+                results.update(rows)
+
+            if results and self.max_entries is not None:
+                conn.executemany(
+                    'UPDATE cache SET last_access = ? WHERE key = ?',
+                    [(now, key) for key in results]
+                )
+
+        return [results.get(key) for key in keys]
+
+    @overrides
+    def set_many(self, items: Iterable[Tuple[str, float]]) -> None:
+        now = time()
+        rows = [(key, float(value), now, now) for key, value in items if value is not None]
+
+        with self._connection() as conn:
+            conn.executemany('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', rows)
+
+        self._num_writes += len(rows)
+
+        if self._num_writes >= self.eviction_interval:
+            self.evict()
+
+    def evict(self) -> None:
+        """Removes expired entries and least recently used entries above `max_entries`."""
+
+        self._num_writes = 0
+
+        with self._connection() as conn:
+            if self.ttl is not None:
+                conn.execute('DELETE FROM cache WHERE created_at < ?', (time() - self.ttl,))
+
+            if self.max_entries is not None:
+                conn.execute(
+                    'DELETE FROM cache WHERE key IN ('
+                    'SELECT key FROM cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
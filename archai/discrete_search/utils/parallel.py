@@ -0,0 +1,127 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import multiprocessing
+import os
+import queue
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, List, Optional, Set, Tuple
+
+from tqdm import tqdm
+
+from archai.discrete_search.api.archai_model import ArchaiModel
+from archai.discrete_search.api.dataset import DatasetProvider
+from archai.discrete_search.api.objective import Objective
+
+
+def _evaluate_chunk(objective: Objective,
+                    chunk: List[Tuple[ArchaiModel, DatasetProvider, Optional[float]]]) -> List[float]:
+    return [objective.evaluate(arch, dataset, budget) for arch, dataset, budget in chunk]
+
+
+def _pin_worker(cpu_sets: Any) -> None:
+    # Each worker (thread or process) takes an exclusive set of CPUs. On Linux,
+    # `os.sched_setaffinity(0, ...)` only affects the calling thread
+    os.sched_setaffinity(0, cpu_sets.get())
+
+
+def get_cpu_sets(num_workers: int) -> List[Set[int]]:
+    """Splits the CPUs available to the current process into `num_workers` disjoint sets.
+
+    Args:
+        num_workers (int): Number of workers.
+
+    Returns:
+        List[Set[int]]: CPU sets. May contain less than `num_workers` sets
+            if there are not enough CPUs available.
+    """
+
+    cpus = sorted(os.sched_getaffinity(0))
+    cpus_per_worker = max(1, len(cpus) // num_workers)
+
+    return [
+        set(cpus[i * cpus_per_worker:(i + 1) * cpus_per_worker])
+        for i in range(min(num_workers, len(cpus)))
+    ]
+
+
+def evaluate_objective(objective: Objective,
+                       models: List[ArchaiModel],
+                       dataset_providers: List[DatasetProvider],
+                       budgets: List[Optional[float]],
+                       num_workers: int = 1,
+                       executor: str = 'thread',
+                       chunk_size: int = 1,
+                       pin_cpus: bool = False,
+                       progress_bar: bool = True,
+                       desc: Optional[str] = None) -> List[float]:
+    """Evaluates a synchronous objective on a list of models, optionally using a local pool of workers.
+
+    Results are returned in the same order of `models`, regardless of the order in which evaluations finish.
+
+    Args:
+        objective (Objective): Synchronous objective.
+        models (List[ArchaiModel]): List of architectures.
+        dataset_providers (List[DatasetProvider]): Dataset provider of each model.
+        budgets (List[Optional[float]]): Budget of each model.
+        num_workers (int, optional): Number of workers. If `1`, models are evaluated
+            sequentially in the current thread. Defaults to 1.
+        executor (str, optional): Pool type, either `thread` or `process`. Process pools require
+            `objective`, `models` and `dataset_providers` to be picklable. Defaults to 'thread'.
+        chunk_size (int, optional): Number of models sent to a worker at once. Defaults to 1.
+        pin_cpus (bool, optional): Whether each worker should be pinned to an exclusive set of CPUs,
+            e.g to prevent concurrent latency measurements from interfering. Only available on Linux.
+            Defaults to False.
+        progress_bar (bool, optional): Whether to show a progress bar. Defaults to True.
+        desc (Optional[str], optional): Progress bar description. Defaults to None.
+
+    Returns:
+        List[float]: Evaluation results.
+    """
+
+    assert executor in ['thread', 'process'], '`executor` must be either `thread` or `process`.'
+    assert len(models) == len(dataset_providers) == len(budgets)
+
+    inputs = list(zip(models, dataset_providers, budgets))
+    pbar = tqdm(total=len(inputs), desc=desc, disable=not progress_bar)
+
+    if num_workers <= 1 or len(inputs) <= 1:
+        results = []
+
+        for arch, dataset, budget in inputs:
+            results.append(objective.evaluate(arch, dataset, budget))
+            pbar.update(1)
+
+        pbar.close()
+        return results
+
+    pool_kwargs = {}
+
+    if pin_cpus:
+        if not hasattr(os, 'sched_setaffinity'):
+            warnings.warn('CPU pinning is not supported on this platform and will be ignored.')
+        else:
+            cpu_sets = get_cpu_sets(num_workers)
+            num_workers = len(cpu_sets)
+
+            cpu_queue = multiprocessing.get_context().Queue() if executor == 'process' else queue.Queue()
+            for cpu_set in cpu_sets:
+                cpu_queue.put(cpu_set)
+
+            pool_kwargs = {'initializer': _pin_worker, 'initargs': (cpu_queue,)}
+
+    pool_cls = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    chunks = [inputs[i:i + chunk_size] for i in range(0, len(inputs), chunk_size)]
+
+    with pool_cls(max_workers=num_workers, **pool_kwargs) as pool:
+        futures = [pool.submit(_evaluate_chunk, objective, chunk) for chunk in chunks]
+
+        for future, chunk in zip(futures, chunks):
+            future.add_done_callback(lambda _, n=len(chunk): pbar.update(n))
+
+        # Collects results in submission order to keep the order of `models`
+        results = [result for future in futures for result in future.result()]
+
+    pbar.close()
+    return results
@@ -19,6 +19,7 @@ from archai.nlp.datasets.hf.processors import (
     shuffle_dataset,
     tokenize_dataset,
 )
+from archai.nlp.datasets.hf.streaming import StreamingDataset
 from archai.nlp.datasets.hf.tokenizer_utils.pre_trained_tokenizer import (
     ArchaiPreTrainedTokenizerFast,
 )
@@ -57,6 +58,7 @@ def load_dataset(
     dataset_revision: Optional[List[str]] = None,
     dataset_disk: Optional[str] = "",
     dataset_stream: Optional[bool] = False,
+    dataset_shuffle_buffer_size: Optional[int] = 1000,
     dataset_refresh_cache: Optional[bool] = False,
     random_seed: Optional[int] = 42,
     n_samples: Optional[Union[int, List[int]]] = -1,
@@ -79,6 +81,7 @@ def load_dataset(
         dataset_revision: Version of the dataset to be loaded.
         dataset_disk: Folder where dataset should be stored/loaded (if supplied).
         dataset_stream: Whether the dataset should be streamed or not.
+        dataset_shuffle_buffer_size: Size of the buffer used to shuffle a streamed dataset.
         dataset_refresh_cache: Whether the cache should be refreshed or not.
         random_seed: Fixes the order of samples.
         n_samples: Subsamples into a fixed amount of samples.
@@ -111,7 +114,7 @@ def load_dataset(
 
     n_samples_list = map_to_list(n_samples, len(dataset.items()))
     for split, n_samples in zip(dataset.keys(), n_samples_list):
-        dataset[split] = shuffle_dataset(dataset[split], random_seed)
+        dataset[split] = shuffle_dataset(dataset[split], random_seed, buffer_size=dataset_shuffle_buffer_size)
         dataset[split] = resize_dataset(dataset[split], n_samples)
 
     return dataset
@@ -128,9 +131,13 @@ def encode_dataset(
     writer_batch_size: Optional[int] = 1000,
     num_proc: Optional[int] = None,
     format_column_name: Optional[Union[str, List[str]]] = None,
-) -> Union[DatasetDict, IterableDatasetDict]:
+) -> Union[DatasetDict, Dict[str, StreamingDataset]]:
     """Encode a dataset using a tokenizer.
 
+    Streamed datasets (`IterableDatasetDict`) are not encoded beforehand. Instead, each split
+    is wrapped in a `StreamingDataset`, which is sharded across ranks (if distributed training
+    is available) and encoded on-the-fly in batches of `batch_size` examples.
+
     Args:
         dataset: The dataset to be encoded.
         tokenizer: The tokenizer to use for encoding.
@@ -149,7 +156,7 @@ def encode_dataset(
             If `List[str]`, multiple columns will be available.
 
     Returns:
-        The encoded dataset.
+        The encoded dataset, or a dictionary of streaming datasets.
 
     """
 
@@ -165,21 +172,35 @@ def encode_dataset(
     fn_kwargs["tokenizer"] = tokenizer
     fn_kwargs["mapping_column_name"] = mapping_column_name
 
-    remove_columns = [v.column_names for _, v in dataset.items()]
-    assert all([c[0] for c in remove_columns])
+    if isinstance(dataset, IterableDatasetDict):
+        assert batched, "Streamed datasets only support batched mapping."
 
-    mapping_kwargs = {"batched": batched}
-    if isinstance(dataset, DatasetDict):
-        mapping_kwargs["remove_columns"] = remove_columns[0]
-        mapping_kwargs["batch_size"] = batch_size
-        mapping_kwargs["writer_batch_size"] = writer_batch_size
-        mapping_kwargs["num_proc"] = num_proc
+        if isinstance(format_column_name, str):
+            format_column_name = [format_column_name]
 
-    dataset = dataset.map(mapping_fn, fn_kwargs=fn_kwargs, **mapping_kwargs)
+        return {
+            split: StreamingDataset(
+                split_dataset,
+                mapping_fn,
+                mapping_fn_kwargs=fn_kwargs,
+                batch_size=batch_size,
+                column_names=format_column_name,
+            )
+            for split, split_dataset in dataset.items()
+        }
+
+    remove_columns = [v.column_names for _, v in dataset.items()]
+    assert all([c[0] for c in remove_columns])
 
-    if isinstance(dataset, DatasetDict):
-        dataset.set_format(type="torch", columns=format_column_name)
-    elif isinstance(dataset, IterableDatasetDict):
-        dataset = dataset.with_format(type="torch")
+    dataset = dataset.map(
+        mapping_fn,
+        fn_kwargs=fn_kwargs,
+        batched=batched,
+        remove_columns=remove_columns[0],
+        batch_size=batch_size,
+        writer_batch_size=writer_batch_size,
+        num_proc=num_proc,
+    )
+    dataset.set_format(type="torch", columns=format_column_name)
 
     return dataset
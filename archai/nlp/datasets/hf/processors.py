@@ -5,9 +5,11 @@
 
 import random
 import re
-from itertools import chain
-from typing import Any, Dict, List, Optional, Union
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
+import torch
 from datasets import concatenate_datasets as hf_concatenate_datasets
 from datasets import interleave_datasets as hf_interleave_datasets
 from datasets.arrow_dataset import Dataset
@@ -108,7 +110,7 @@ def merge_datasets(
     return dataset
 
 
-def resize_dataset(dataset: Dataset, n_samples: int) -> Dataset:
+def resize_dataset(dataset: Union[Dataset, IterableDataset], n_samples: int) -> Union[Dataset, IterableDataset]:
     """Resize a dataset to a specified number of samples.
 
     This function resizes a dataset to the specified number of samples, by
@@ -125,12 +127,17 @@ def resize_dataset(dataset: Dataset, n_samples: int) -> Dataset:
     """
 
     if n_samples > -1:
-        dataset = dataset.select(range(n_samples))
+        if isinstance(dataset, IterableDataset):
+            dataset = dataset.take(n_samples)
+        else:
+            dataset = dataset.select(range(n_samples))
 
     return dataset
 
 
-def shuffle_dataset(dataset: Union[Dataset, IterableDataset], seed: int) -> Union[Dataset, IterableDataset]:
+def shuffle_dataset(
+    dataset: Union[Dataset, IterableDataset], seed: int, buffer_size: Optional[int] = 1000
+) -> Union[Dataset, IterableDataset]:
     """Shuffle a dataset using a specified random seed.
 
     This function shuffles a dataset using the provided random seed. If
@@ -140,6 +147,7 @@ def shuffle_dataset(dataset: Union[Dataset, IterableDataset], seed: int) -> Unio
     Args:
         dataset: The input dataset to be shuffled.
         seed: The random seed to use for shuffling the dataset.
+        buffer_size: The size of the buffer used to shuffle streamed datasets.
 
     Returns:
         The shuffled dataset.
@@ -147,7 +155,10 @@ def shuffle_dataset(dataset: Union[Dataset, IterableDataset], seed: int) -> Unio
     """
 
     if seed > -1:
-        dataset = dataset.shuffle(seed)
+        if isinstance(dataset, IterableDataset):
+            dataset = dataset.shuffle(seed=seed, buffer_size=buffer_size)
+        else:
+            dataset = dataset.shuffle(seed)
 
     return dataset
 
@@ -204,20 +215,159 @@ def tokenize_contiguous_dataset(
         examples, mapping_column_name=mapping_column_name, tokenizer=tokenizer, truncate=False, padding=False
     )
 
-    concatenated_examples = {k: list(chain(*examples[k])) for k in examples.keys()}
+    result = {}
+    for k, t in examples.items():
+        concatenated_examples = np.fromiter((token for example in t for token in example), dtype=np.int64)
 
-    total_length = len(concatenated_examples[list(examples.keys())[0]])
-    if total_length >= model_max_length:
-        total_length = (total_length // model_max_length) * model_max_length
+        total_length = concatenated_examples.shape[0]
+        if total_length >= model_max_length:
+            total_length = (total_length // model_max_length) * model_max_length
 
-    result = {
-        k: [t[i : i + model_max_length] for i in range(0, total_length, model_max_length)]
-        for k, t in concatenated_examples.items()
-    }
+        result[k] = concatenated_examples[:total_length].reshape(-1, min(total_length, model_max_length) or 1)
 
     return result
 
 
+def pack_sequences(lengths: np.ndarray, max_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Bin-packs sequences into rows of `max_length` tokens.
+
+    Sequences are placed from the longest to the shortest, each one into the row
+    with the smallest remaining space that fits it (best-fit decreasing).
+
+    Args:
+        lengths: Length of each sequence (at most `max_length`).
+        max_length: Length of rows.
+
+    Returns:
+        Row and starting column of each sequence.
+
+    """
+
+    rows = np.zeros(len(lengths), dtype=np.int64)
+    cols = np.zeros(len(lengths), dtype=np.int64)
+
+    # Remaining space and identifier of rows that are not full, sorted by remaining space
+    available_rows = []
+    n_rows = 0
+
+    for idx in np.argsort(-lengths, kind="stable").tolist():
+        length = int(lengths[idx])
+
+        row_idx = bisect_left(available_rows, (length, -1))
+        if row_idx < len(available_rows):
+            remaining, row = available_rows.pop(row_idx)
+        else:
+            remaining, row = max_length, n_rows
+            n_rows += 1
+
+        rows[idx] = row
+        cols[idx] = max_length - remaining
+
+        if remaining > length:
+            insort(available_rows, (remaining - length, row))
+
+    return rows, cols
+
+
+def tokenize_packed_dataset(
+    examples: List[str],
+    tokenizer: Optional[Union[AutoTokenizer, ArchaiPreTrainedTokenizerFast]] = None,
+    mapping_column_name: Optional[Union[str, List[str]]] = "text",
+    model_max_length: Optional[int] = 1024,
+    **kwargs,
+) -> Dict[str, Any]:
+    """Tokenize a list of examples using a specified tokenizer and
+        pack them into fixed-length sequences (no truncation).
+
+    Examples longer than `model_max_length` are split into pieces, which are bin-packed
+    into rows so that as little padding as possible is used. Position identifiers restart
+    at every example, labels that would be predicted across examples (or from padding)
+    are ignored, and `segment_ids` identifies the examples of each row (`0` for padding),
+    e.g., to build block-diagonal attention masks with `get_packed_attention_mask`.
+
+    Args:
+        examples: A list of examples to be tokenized.
+        tokenizer: The tokenizer to use.
+        mapping_column_name: The columns in `examples` that should be tokenized.
+        model_max_length: Maximum length of sequences.
+
+    Returns:
+        Packed tokenized examples.
+
+    """
+
+    examples_mapping = tuple(examples[column_name] for column_name in mapping_column_name)
+    input_ids = tokenizer(*examples_mapping, truncation=False, padding=False, return_attention_mask=False)["input_ids"]
+
+    lengths = np.array([len(example) for example in input_ids], dtype=np.int64)
+    tokens = np.fromiter((token for example in input_ids for token in example), dtype=np.int64, count=lengths.sum())
+
+    # Splits examples into pieces of at most `model_max_length` tokens
+    n_pieces = np.maximum(1, (lengths + model_max_length - 1) // model_max_length)
+    piece_lengths = np.full(n_pieces.sum(), model_max_length, dtype=np.int64)
+    last_pieces = np.cumsum(n_pieces) - 1
+    piece_lengths[last_pieces] = lengths - (n_pieces - 1) * model_max_length
+
+    piece_lengths = piece_lengths[piece_lengths > 0]
+    piece_starts = np.cumsum(piece_lengths) - piece_lengths
+
+    rows, cols = pack_sequences(piece_lengths, model_max_length)
+    n_rows = rows.max() + 1 if len(rows) > 0 else 0
+
+    # Places every token with a single scatter
+    offsets = np.arange(len(tokens)) - np.repeat(piece_starts, piece_lengths)
+    dest = np.repeat(rows * model_max_length + cols, piece_lengths) + offsets
+
+    # Segments are numbered by their position in the row
+    order = np.lexsort((cols, rows))
+    segments = np.zeros(len(rows), dtype=np.int64)
+    segments[order] = np.arange(len(rows)) - np.searchsorted(rows[order], rows[order]) + 1
+
+    pad_token_id = getattr(tokenizer, "pad_token_id", None) or 0
+
+    packed_input_ids = np.full(n_rows * model_max_length, pad_token_id, dtype=np.int64)
+    packed_input_ids[dest] = tokens
+
+    position_ids = np.zeros(n_rows * model_max_length, dtype=np.int64)
+    position_ids[dest] = offsets
+
+    segment_ids = np.zeros(n_rows * model_max_length, dtype=np.int64)
+    segment_ids[dest] = np.repeat(segments, piece_lengths)
+
+    labels = np.where(segment_ids > 0, packed_input_ids, -100)
+    labels[dest[offsets == 0]] = -100
+
+    return {
+        "input_ids": packed_input_ids.reshape(n_rows, model_max_length),
+        "attention_mask": (segment_ids > 0).astype(np.int64).reshape(n_rows, model_max_length),
+        "position_ids": position_ids.reshape(n_rows, model_max_length),
+        "segment_ids": segment_ids.reshape(n_rows, model_max_length),
+        "labels": labels.reshape(n_rows, model_max_length),
+    }
+
+
+def get_packed_attention_mask(segment_ids: torch.LongTensor, causal: Optional[bool] = True) -> torch.BoolTensor:
+    """Get the block-diagonal attention mask of packed sequences.
+
+    Args:
+        segment_ids: Segment identifiers of packed sequences (`0` for padding).
+        causal: Whether tokens should only attend to previous tokens.
+
+    Returns:
+        Attention mask with shape `(batch_size, 1, seq_len, seq_len)`, where
+            `True` means that attention is allowed.
+
+    """
+
+    mask = (segment_ids[:, :, None] == segment_ids[:, None, :]) & (segment_ids[:, None, :] > 0)
+
+    if causal:
+        seq_len = segment_ids.size(-1)
+        mask &= torch.ones(seq_len, seq_len, dtype=torch.bool, device=segment_ids.device).tril()
+
+    return mask[:, None]
+
+
 def tokenize_nsp_dataset(
     examples: List[str],
     tokenizer: Optional[Union[AutoTokenizer, ArchaiPreTrainedTokenizerFast]] = None,
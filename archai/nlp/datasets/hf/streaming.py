@@ -0,0 +1,182 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""Streaming datasets that are tokenized on-the-fly."""
+
+from bisect import bisect_right
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Generator, List, Optional
+
+import torch
+from datasets.distributed import split_dataset_by_node
+from datasets.iterable_dataset import IterableDataset
+from torch.utils.data import IterableDataset as TorchIterableDataset
+
+# Maximum number of batch positions that are kept to resolve the position of consumed rows
+MAX_TRACKED_POSITIONS = 1024
+
+
+class StreamingDataset(TorchIterableDataset):
+    """A resumable iterable dataset that tokenizes a streamed dataset on-the-fly.
+
+    Examples are read from a Hugging Face `IterableDataset`, mapped in batches of `batch_size`
+    examples and yielded as tensors, so training can start without materializing
+    the encoded dataset. The position of the iteration is tracked by the number of
+    consumed examples, which allows resuming mid-epoch by only re-encoding the current batch.
+
+    Since the position is tracked by the iterating process, the dataset should not
+    be split across data loader workers (e.g., `dataloader_num_workers=0`). Besides, data
+    loaders prefetch rows before they are trained on, so the position of the iteration runs
+    ahead of training. `state_dict` therefore accepts the number of consumed rows, which
+    `HfTrainer` counts and saves with each checkpoint. Similarly, the dataset is already sharded
+    across ranks, so its data loader should not shard it again nor dispatch batches from a
+    single rank (`HfTrainer` builds such a data loader).
+
+    """
+
+    def __init__(
+        self,
+        dataset: IterableDataset,
+        mapping_fn: Callable[[Any], Dict[str, Any]],
+        mapping_fn_kwargs: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = 1000,
+        column_names: Optional[List[str]] = None,
+        rank: Optional[int] = None,
+        world_size: Optional[int] = None,
+    ) -> None:
+        """Initialize the dataset by sharding it across ranks, if distributed training is available.
+
+        Args:
+            dataset: Streamed dataset, which can be shuffled with a shuffle buffer.
+            mapping_fn: A function that maps batches of examples, e.g., `tokenize_dataset`.
+            mapping_fn_kwargs: Keyword arguments to pass to `mapping_fn`.
+            batch_size: The number of examples per batch when mapping.
+            column_names: The columns that should be yielded. If `None`, all columns are yielded.
+            rank: Rank of the current process. If `None`, it is retrieved from `torch.distributed`.
+            world_size: Number of processes. If `None`, it is retrieved from `torch.distributed`.
+
+        """
+
+        super().__init__()
+
+        is_distributed = torch.distributed.is_available() and torch.distributed.is_initialized()
+        if world_size is None:
+            world_size = torch.distributed.get_world_size() if is_distributed else 1
+        if rank is None:
+            rank = torch.distributed.get_rank() if is_distributed else 0
+        if not 0 <= rank < world_size:
+            raise ValueError(f"`rank` should be in [0, {world_size}), but got {rank}.")
+
+        if world_size > 1:
+            dataset = split_dataset_by_node(dataset, rank=rank, world_size=world_size)
+
+        self.dataset = dataset
+        self.mapping_fn = mapping_fn
+        self.mapping_fn_kwargs = mapping_fn_kwargs or {}
+        self.batch_size = batch_size
+        self.column_names = column_names
+
+        self.epoch = 0
+
+        # Position of the current batch (in examples) and number of rows yielded from it
+        self.n_examples = 0
+        self.n_batch_rows = 0
+
+        # Number of rows yielded since the first epoch and positions of the latest batches
+        self.n_rows = 0
+        self._positions = deque([(0, 0, 0)], maxlen=MAX_TRACKED_POSITIONS)
+
+    def _track_position(self) -> None:
+        # Positions are kept as `(n_rows, epoch, n_examples)` at the start of each batch
+        self._positions.append((self.n_rows - self.n_batch_rows, self.epoch, self.n_examples))
+
+    def set_epoch(self, epoch: int) -> None:
+        """Set the epoch, which changes the shuffling order and resets the position.
+
+        Args:
+            epoch: Epoch.
+
+        """
+
+        if epoch != self.epoch:
+            self.epoch = epoch
+            self.n_examples = 0
+            self.n_batch_rows = 0
+            self._track_position()
+
+    def state_dict(self, n_rows: Optional[int] = None) -> Dict[str, int]:
+        """Get the position of the iteration.
+
+        Args:
+            n_rows: Number of rows (since the first epoch) that have been consumed, e.g.,
+                trained on. If `None`, all rows yielded so far are considered consumed.
+
+        Returns:
+            Epoch and position of the iteration.
+
+        """
+
+        if n_rows is None:
+            n_rows = self.n_rows
+
+        idx = bisect_right([position[0] for position in self._positions], n_rows) - 1
+        if n_rows > self.n_rows or idx < 0:
+            raise ValueError(f"Position of row {n_rows} is not available (rows yielded: {self.n_rows}).")
+
+        batch_n_rows, epoch, n_examples = self._positions[idx]
+
+        return {"epoch": epoch, "n_examples": n_examples, "n_batch_rows": n_rows - batch_n_rows, "n_rows": n_rows}
+
+    def load_state_dict(self, state_dict: Dict[str, int]) -> None:
+        """Load the position of the iteration, which is resumed by the next iteration.
+
+        Args:
+            state_dict: Epoch and position of the iteration.
+
+        """
+
+        self.epoch = state_dict["epoch"]
+        self.n_examples = state_dict["n_examples"]
+        self.n_batch_rows = state_dict["n_batch_rows"]
+        self.n_rows = state_dict["n_rows"]
+
+        self._positions.clear()
+        self._track_position()
+
+    def __iter__(self) -> Generator[Dict[str, torch.Tensor], None, None]:
+        """Iterate over the encoded rows, starting from the current position.
+
+        Yields:
+            Encoded rows.
+
+        """
+
+        self.dataset.set_epoch(self.epoch)
+
+        # Examples before the current batch are skipped without being encoded
+        examples = iter(self.dataset.skip(self.n_examples) if self.n_examples > 0 else self.dataset)
+        n_skipped_rows = self.n_batch_rows
+
+        while True:
+            examples_batch = list(islice(examples, self.batch_size))
+            if not examples_batch:
+                break
+            self._track_position()
+
+            batch = {k: [example[k] for example in examples_batch] for k in examples_batch[0].keys()}
+            encoded_batch = self.mapping_fn(batch, **self.mapping_fn_kwargs)
+            if self.column_names is not None:
+                encoded_batch = {k: encoded_batch[k] for k in self.column_names}
+
+            n_rows = len(next(iter(encoded_batch.values())))
+            for i in range(n_skipped_rows, n_rows):
+                self.n_batch_rows = i + 1
+                self.n_rows += 1
+                yield {k: torch.as_tensor(v[i]) for k, v in encoded_batch.items()}
+
+            self.n_examples += len(examples_batch)
+            self.n_batch_rows = n_skipped_rows = 0
+
+        # Next iteration starts a new epoch
+        self.set_epoch(self.epoch + 1)
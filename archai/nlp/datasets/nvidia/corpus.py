@@ -8,12 +8,13 @@ import glob
 import os
 from typing import Optional, Tuple, Union
 
-import numpy as np
-import torch
-
 from archai.common import utils
 from archai.nlp import logging_utils
 from archai.nlp.datasets.nvidia import distributed_utils
+from archai.nlp.datasets.nvidia.corpus_utils import (
+    load_encoded_cache,
+    save_encoded_cache,
+)
 from archai.nlp.datasets.nvidia.lm_iterators import (
     LMMultiFileIterator,
     LMOrderedIterator,
@@ -222,8 +223,8 @@ class Corpus:
         self._create_train_vocab()
         self._encode_files()
 
-        train_size = f"{len(self.train)} files" if isinstance(self.train, list) else self.train.size(0)
-        logger.debug(f"Size: train = {train_size} | valid = {self.valid.size(0)} | test = {self.test.size(0)}")
+        train_size = f"{len(self.train)} files" if isinstance(self.train, list) else len(self.train)
+        logger.debug(f"Size: train = {train_size} | valid = {len(self.valid)} | test = {len(self.test)}")
 
     def load(self) -> bool:
         """Loads a pre-trained corpus.
@@ -250,13 +251,12 @@ class Corpus:
 
             self.vocab.load()
 
-            self.train = torch.from_numpy(np.load(self.train_cache_filepath))
-            self.valid = torch.from_numpy(np.load(self.valid_cache_filepath))
-            self.test = torch.from_numpy(np.load(self.test_cache_filepath))
+            # Encoded files are memory-mapped and iterators only read the parts they need
+            self.train = load_encoded_cache(self.train_cache_filepath)
+            self.valid = load_encoded_cache(self.valid_cache_filepath)
+            self.test = load_encoded_cache(self.test_cache_filepath)
 
-            logger.debug(
-                f"Size: train = {self.train.size(0)} | valid = {self.valid.size(0)} | test = {self.test.size(0)}"
-            )
+            logger.debug(f"Size: train = {len(self.train)} | valid = {len(self.valid)} | test = {len(self.test)}")
 
             return True
 
@@ -274,9 +274,9 @@ class Corpus:
 
         assert self.vocab is not None and self.vocab.is_trained()
 
-        np.save(self.train_cache_filepath, self.train.numpy())
-        np.save(self.valid_cache_filepath, self.valid.numpy())
-        np.save(self.test_cache_filepath, self.test.numpy())
+        save_encoded_cache(self.train_cache_filepath, self.train)
+        save_encoded_cache(self.valid_cache_filepath, self.valid)
+        save_encoded_cache(self.test_cache_filepath, self.test)
 
     def get_iterator(
         self,
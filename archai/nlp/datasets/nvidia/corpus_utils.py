@@ -5,7 +5,10 @@
 """
 
 import os
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import torch
 
 from archai.common import common, utils
 
@@ -74,3 +77,53 @@ def create_dirs(
         pretrained_path = os.path.join(os.path.dirname(output_dir), pretrained_path)
 
     return dataset_dir, output_dir, pretrained_path, cache_dir
+
+
+def get_compact_dtype(max_value: int) -> np.dtype:
+    """Gets the smallest unsigned integer data type able to represent token identifiers.
+
+    Args:
+        max_value: Maximum token identifier.
+
+    Returns:
+        (np.dtype): Data type.
+
+    """
+
+    for dtype in [np.uint16, np.uint32]:
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    return np.dtype(np.int64)
+
+
+def save_encoded_cache(file_path: str, input_ids: Union[torch.Tensor, np.ndarray]) -> None:
+    """Saves encoded tokens to a `.npy` file using a compact data type (uint16 or uint32),
+    so that it can be memory-mapped by `load_encoded_cache`.
+
+    Args:
+        file_path: Path to the cache file.
+        input_ids: Encoded tokens.
+
+    """
+
+    if isinstance(input_ids, torch.Tensor):
+        input_ids = input_ids.numpy()
+
+    max_value = int(input_ids.max()) if input_ids.size > 0 else 0
+    np.save(file_path, input_ids.astype(get_compact_dtype(max_value), copy=False))
+
+
+def load_encoded_cache(file_path: str) -> np.ndarray:
+    """Loads encoded tokens as a read-only memory map, so that only the
+    accessed parts of the file become resident in memory.
+
+    Args:
+        file_path: Path to the cache file.
+
+    Returns:
+        (np.ndarray): Memory-mapped encoded tokens.
+
+    """
+
+    return np.load(file_path, mmap_mode="r")
@@ -110,6 +110,39 @@ def all_reduce(tensor: Union[int, float, torch.Tensor], op: Optional[str] = "sum
     return tensor
 
 
+def all_reduce_tensor(tensor: torch.Tensor, op: Optional[str] = "sum") -> torch.Tensor:
+    """Reduces a tensor (in-place and on its own device) when using distributed mode.
+
+    Unlike `all_reduce`, it does not synchronize the host with the device, so several
+    values can be stacked into a tensor and reduced with a single collective.
+
+    Args:
+        tensor: Input tensor.
+        op: Type of reduction operator.
+
+    Returns:
+        (torch.Tensor): Reduced tensor.
+
+    """
+
+    if torch.distributed.is_available() and torch.distributed.is_initialized():
+        torch_ops = {
+            "sum": torch.distributed.ReduceOp.SUM,
+            "mean": torch.distributed.ReduceOp.SUM,
+            "min": torch.distributed.ReduceOp.MIN,
+            "max": torch.distributed.ReduceOp.MAX,
+            "product": torch.distributed.ReduceOp.PRODUCT,
+        }
+        if op not in torch_ops:
+            raise RuntimeError(f"Operator: {op} is not supported yet.")
+
+        torch.distributed.all_reduce(tensor, torch_ops[op])
+        if op == "mean":
+            tensor /= get_world_size()
+
+    return tensor
+
+
 @contextmanager
 def sync_workers() -> Generator[int, None, None]:
     """Yields the distributed rank and synchronizes all workers on exit.
@@ -5,7 +5,10 @@
 """Language Modeling-based iterators.
 """
 
-from typing import Generator, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Generator, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -13,13 +16,16 @@ import torch
 from archai.nlp.datasets.nvidia import distributed_utils
 from archai.nlp.datasets.nvidia.tokenizer_utils.vocab_base import VocabBase
 
+# Vocabulary used by the encoding worker processes
+_worker_vocab = None
+
 
 class LMOrderedIterator:
     """Implements an ordered-token iterator, e.g., there is no padding as tokens are contiguous."""
 
     def __init__(
         self,
-        input_ids: torch.LongTensor,
+        input_ids: Union[torch.LongTensor, np.ndarray],
         bsz: int,
         bptt: int,
         device: Optional[str] = "cpu",
@@ -29,6 +35,9 @@ class LMOrderedIterator:
     ) -> None:
         """Initializes by sharding inputs across GPUs, if distributed training is available.
 
+        Inputs are never copied: batches are gathered directly from `input_ids`, which can be
+        a memory-mapped array, so each rank only reads the rows of its own shard.
+
         Args:
             input_ids: Inputs.
             bsz: Batch size.
@@ -48,25 +57,40 @@ class LMOrderedIterator:
         self.warmup = warmup
         self.last_iter = None
 
-        # Divides cleanly the inputs into batches and trims the remaining elements
-        n_step = input_ids.size(0) // bsz
-        input_ids = input_ids[: n_step * bsz]
-        self.input_ids = input_ids.view(bsz, -1).contiguous().pin_memory()
+        if isinstance(input_ids, torch.Tensor):
+            input_ids = input_ids.numpy()
+
+        # Divides cleanly the inputs into batches (rows) and trims the remaining elements
+        n_step = input_ids.shape[0] // bsz
+        self.input_ids = input_ids[: n_step * bsz].reshape(bsz, -1)
 
-        # Creates warmup batches if memory is being used
+        # Warmup batches are prepended to each row (with the last tokens of the previous row)
+        # if memory is being used, which is handled when gathering batches
+        self.warmup_elems = 0
         if mem_len and warmup:
             self.warmup_batches = (mem_len + bptt - 1) // bptt
             self.warmup_elems = self.warmup_batches * bptt
 
-            warmup_ids = self.input_ids.roll((self.warmup_elems, 1), (1, 0))[:, : self.warmup_elems]
-            self.input_ids = torch.cat((warmup_ids, self.input_ids), dim=-1)
+        self.n_cols = self.warmup_elems + n_step
 
-        # Chunks the inputs for distributed training (if available)
+        # Chunks the rows for distributed training (if available)
         world_size = distributed_utils.get_world_size()
         rank = distributed_utils.get_rank()
-        self.input_ids = self.input_ids.chunk(world_size, dim=0)[rank]
 
-        self.n_batch = (self.input_ids.size(1) + self.bptt - 1) // self.bptt
+        rows_per_rank = (bsz + world_size - 1) // world_size
+        self.row_slice = slice(rank * rows_per_rank, min(bsz, (rank + 1) * rows_per_rank))
+
+        if self.row_slice.start >= self.row_slice.stop:
+            raise ValueError(
+                f"Batch size ({bsz}) does not have rows for rank {rank} (world size = {world_size}). "
+                "Use a batch size that is divisible by the world size."
+            )
+        self.rows = np.arange(self.row_slice.start, self.row_slice.stop)
+
+        # Shift of each row, set by `roll`
+        self.shifts = None
+
+        self.n_batch = (self.n_cols + self.bptt - 1) // self.bptt
 
     def roll(self, seed: int) -> None:
         """Rolls/shifts the data according to a random seed.
@@ -79,13 +103,42 @@ class LMOrderedIterator:
         rng = torch.Generator()
         rng.manual_seed(seed)
 
-        for i in range(self.input_ids.size(0)):
-            shift = torch.randint(0, self.input_ids.size(1), (1,), generator=rng)
+        shifts = torch.randint(0, self.n_cols, (len(self.rows),), generator=rng).numpy()
+        self.shifts = shifts if self.shifts is None else (self.shifts + shifts) % self.n_cols
+
+    def _get_tokens(self, start_idx: int, end_idx: int) -> torch.LongTensor:
+        """Gathers columns `start_idx` to `end_idx` of the shard rows.
+
+        Args:
+            start_idx: Starting column.
+            end_idx: Ending column (exclusive).
+
+        Returns:
+            (torch.LongTensor): Tokens placed on the iterator device.
+
+        """
+
+        if self.shifts is None and not self.warmup_elems:
+            tokens = self.input_ids[self.row_slice, start_idx:end_idx]
+        else:
+            cols = np.arange(start_idx, end_idx)[None, :]
+            rows = self.rows[:, None]
+
+            if self.shifts is not None:
+                cols = (cols + self.shifts[:, None]) % self.n_cols
 
-            row = self.input_ids[i, :]
-            row = torch.cat((row[shift:], row[:shift]))
+            # Warmup columns are taken from the end of the previous row
+            is_warmup = cols < self.warmup_elems
+            src_rows = np.where(is_warmup, (rows - 1) % self.bsz, rows)
+            src_cols = np.where(is_warmup, cols + self.input_ids.shape[1], cols) - self.warmup_elems
 
-            self.input_ids[i, :] = row
+            tokens = self.input_ids[src_rows, src_cols]
+
+        tokens = torch.from_numpy(np.array(tokens, dtype=np.int64))
+        if torch.cuda.is_available() and str(self.device) != "cpu":
+            tokens = tokens.pin_memory()
+
+        return tokens.to(self.device, non_blocking=True)
 
     def get_batch(self, i: int, bptt: Optional[int] = None) -> Tuple[torch.LongTensor, torch.LongTensor, int, bool]:
         """Gets a batch of `bptt` size.
@@ -103,13 +156,15 @@ class LMOrderedIterator:
         if bptt is None:
             bptt = self.bptt
 
-        seq_len = min(bptt, self.input_ids.size(1) - 1 - i)
+        seq_len = min(bptt, self.n_cols - 1 - i)
 
         start_idx = max(0, i - self.ext_len)
         end_idx = i + seq_len
 
-        input_ids = self.input_ids[:, start_idx:end_idx].to(self.device, non_blocking=True)
-        labels = self.input_ids[:, i + 1 : i + 1 + seq_len].to(self.device, non_blocking=True)
+        # Inputs and labels are gathered at once
+        tokens = self._get_tokens(start_idx, end_idx + 1)
+        input_ids = tokens[:, : end_idx - start_idx].contiguous()
+        labels = tokens[:, i + 1 - start_idx :].contiguous()
 
         warmup = True
         if self.mem_len and self.warmup:
@@ -131,10 +186,53 @@ class LMOrderedIterator:
         if start != 0:
             start += self.bptt
 
-        for i in range(start, self.input_ids.size(1) - 1, self.bptt):
+        for i in range(start, self.n_cols - 1, self.bptt):
             self.last_iter = i
             yield self.get_batch(i)
 
+    def get_varlen_schedule(
+        self,
+        start: Optional[int] = 0,
+        std: Optional[float] = 5.0,
+        min_len: Optional[int] = 5,
+        max_std: Optional[float] = 3.0,
+    ) -> np.ndarray:
+        """Gets a variable-length schedule, e.g., the starting column and sequence length of each batch.
+
+        Sequence lengths are sampled at once from a normal distribution centered at `bptt`
+        (or `bptt / 2` for 5% of the batches).
+
+        Args:
+            start: Starting point.
+            std: Standard deviation.
+            min_len: Minimum length.
+            max_std: Max standard deviation.
+
+        Returns:
+            (np.ndarray): Array with the starting column and sequence length of each batch.
+
+        """
+
+        n_tokens = self.n_cols - 1 - start
+        if n_tokens <= 0:
+            return np.zeros((0, 2), dtype=np.int64)
+
+        # Every sequence has at least `min_len` tokens, which bounds the number of batches
+        max_batches = (n_tokens + min_len - 1) // min_len + 1
+
+        bptt = np.where(np.random.random(max_batches) < 0.95, self.bptt, self.bptt / 2.0)
+        seq_len = np.random.normal(bptt, std).astype(np.int64)
+        seq_len = np.clip(seq_len, min_len, int(self.bptt + max_std * std))
+
+        end_idx = start + np.cumsum(seq_len)
+        start_idx = end_idx - seq_len
+
+        # Last batch is the first one that reaches the end of the inputs
+        n_batch = np.searchsorted(end_idx, self.n_cols - 2, side="left") + 1
+        end_idx = np.minimum(end_idx[:n_batch], self.n_cols - 1)
+
+        return np.stack((start_idx[:n_batch], end_idx - start_idx[:n_batch]), axis=1)
+
     def get_varlen_iter(
         self,
         start: Optional[int] = 0,
@@ -144,6 +242,9 @@ class LMOrderedIterator:
     ) -> Generator[Tuple, None, None]:
         """Gets a variable-length iterator.
 
+        Note that `last_iter` holds the starting point of the next batch, so it can
+        be used as `start` when resuming the iteration.
+
         Args:
             start: Starting point.
             std: Standard deviation.
@@ -155,19 +256,11 @@ class LMOrderedIterator:
 
         """
 
-        max_len = self.bptt + max_std * std
-        i = start
-
-        while True:
-            bptt = self.bptt if np.random.random() < 0.95 else self.bptt / 2.0
-            bptt = min(max_len, max(min_len, int(np.random.normal(bptt, std))))
+        schedule = self.get_varlen_schedule(start=start, std=std, min_len=min_len, max_std=max_std)
 
-            input_ids, labels, seq_len = self.get_batch(i, bptt)
-            i += seq_len
-
-            yield input_ids, labels, seq_len
-            if i >= self.input_ids.size(1) - 2:
-                break
+        for i, bptt in schedule.tolist():
+            self.last_iter = i + bptt
+            yield self.get_batch(i, bptt)
 
     def __iter__(self) -> Generator[Tuple, None, None]:
         """Defaults standard iteration to fixed-length batches.
@@ -180,6 +273,15 @@ class LMOrderedIterator:
         return self.get_fixlen_iter()
 
 
+def _init_encode_worker(vocab: VocabBase) -> None:
+    global _worker_vocab
+    _worker_vocab = vocab
+
+
+def _encode_file(path: str) -> np.ndarray:
+    return _worker_vocab.encode_file(path, verbose=False, num_workers=1)
+
+
 class LMMultiFileIterator:
     """Implements a multi-file non-ordered iterator, e.g., tokens are contiguous yet they come
     from different files.
@@ -197,10 +299,15 @@ class LMMultiFileIterator:
         ext_len: Optional[int] = 0,
         n_chunks: Optional[int] = 16,
         shuffle: Optional[bool] = False,
+        num_workers: Optional[int] = 1,
+        prefetch_files: Optional[int] = 2,
     ) -> None:
         """Initializes by adding support to multi-file inputs and sharding files
             across GPUs, if distributed training is available.
 
+        Files are encoded ahead of time by background worker processes, and batches are
+        sliced from the encoded files and copied to the device through pinned buffers.
+
         Args:
             paths: Paths to input files.
             vocab: Vocabulary/tokenizer.
@@ -211,6 +318,9 @@ class LMMultiFileIterator:
             ext_len: Length of extended context (for Transformer-XL).
             n_chunks: Number of chunks (to avoid out of memory).
             shuffle: Whether shuffling should be used.
+            num_workers: Number of worker processes that encode the files. If `0`,
+                files are encoded in the current process when needed.
+            prefetch_files: Number of files encoded ahead of time.
 
         """
 
@@ -221,6 +331,8 @@ class LMMultiFileIterator:
         self.ext_len = ext_len
         self.n_chunks = n_chunks
         self.shuffle = shuffle
+        self.num_workers = num_workers
+        self.prefetch_files = prefetch_files
         self.last_iter = None
 
         # For compatibility with LMOrderedIterator
@@ -234,6 +346,13 @@ class LMMultiFileIterator:
         paths_chunks = [paths[i : i + chunk_len] for i in range(0, len(paths), chunk_len)]
         self.paths = paths_chunks[rank]
 
+        # Double-buffered pinned tensors (and their copy events) of each kind of tensor
+        # (inputs and labels) used to transfer batches
+        self.use_pinned_buffers = torch.cuda.is_available() and str(device) != "cpu"
+        self._buffers = {}
+        self._copy_events = {}
+        self._buffer_idx = {}
+
     def roll(self, seed: Optional[int] = 0) -> None:
         """Backward compatibility for using same APIs."""
 
@@ -250,65 +369,120 @@ class LMMultiFileIterator:
 
         """
 
-        sequences = self.vocab.encode_file(path)
+        return self._prepare_sequences(self.vocab.encode_file(path))
+
+    def _prepare_sequences(self, sequences: np.ndarray) -> torch.LongTensor:
         if self.shuffle:
             np.random.shuffle(sequences)
 
-        return sequences
+        # Encoded files use a compact data type
+        return torch.from_numpy(sequences.astype(np.int64, copy=False))
 
-    def stream_iterator(self, iterator: Iterator) -> Generator[Tuple, None, None]:
-        """Creates a streaming-based iterator.
+    def _iter_sequences(self) -> Generator[torch.LongTensor, None, None]:
+        """Iterates over the encoded files, which are prefetched by worker processes.
+
+        Yields:
+            (Generator[torch.LongTensor, None, None]): Encoded files.
+
+        """
+
+        if not self.num_workers:
+            for path in self.paths:
+                yield self.get_sequences(path)
+            return
+
+        executor = ProcessPoolExecutor(
+            max_workers=self.num_workers, initializer=_init_encode_worker, initargs=(self.vocab,)
+        )
+
+        futures = deque()
+
+        try:
+            paths = iter(self.paths)
+
+            while True:
+                # Keeps `prefetch_files` files being encoded in the background
+                for path in islice(paths, max(1, self.prefetch_files) - len(futures)):
+                    futures.append(executor.submit(_encode_file, path))
+
+                if not futures:
+                    return
+
+                yield self._prepare_sequences(futures.popleft().result())
+        finally:
+            # Pending files are canceled by hand, since `cancel_futures` requires Python 3.9+
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _to_device(self, tensor: torch.LongTensor, name: str) -> torch.LongTensor:
+        """Copies a tensor to the iterator device, using alternating pinned buffers
+        so that the next batch can be prepared while the current one is transferred.
 
         Args:
-            iterator: Iterator with chunks of sequences.
+            tensor: Tensor in host memory.
+            name: Kind of tensor (e.g., `input_ids` or `labels`), which has its own pair of buffers.
 
-        Yields:
-            (Generator[Tuple, None, None]): Stream-based batch.
+        Returns:
+            (torch.LongTensor): Tensor placed on the iterator device.
 
         """
 
-        input_ids = torch.LongTensor(self.bsz, self.bptt)
-        labels = torch.LongTensor(self.bsz, self.bptt)
+        if not self.use_pinned_buffers:
+            return tensor.contiguous().to(self.device)
+
+        buffers = self._buffers.setdefault(name, [None, None])
+        copy_events = self._copy_events.setdefault(name, [None, None])
+
+        idx = self._buffer_idx.get(name, 0)
+        self._buffer_idx[name] = 1 - idx
+
+        buffer = buffers[idx]
+        if buffer is None or buffer.shape != tensor.shape:
+            buffer = buffers[idx] = torch.empty(tensor.shape, dtype=tensor.dtype).pin_memory()
 
-        n_retain = 0
+        # Waits until the previous copy from this buffer has finished
+        if copy_events[idx] is not None:
+            copy_events[idx].synchronize()
 
-        while True:
-            # input_ids: [bsz x n_retain+bptt]
-            # labels: [bsz x bptt]
-            input_ids[:, n_retain:].fill_(-1)
-            labels.fill_(-1)
+        buffer.copy_(tensor)
+        device_tensor = buffer.to(self.device, non_blocking=True)
 
-            valid_batch = True
-            for i in range(self.bsz):
-                n_filled = 0
-                try:
-                    while n_filled < self.bptt:
-                        stream = torch.LongTensor([next(iterator) for _ in range(self.bptt + 1)])
+        copy_events[idx] = torch.cuda.Event()
+        copy_events[idx].record()
 
-                        # Number of new tokens to be filled in
-                        n_tokens = min(len(stream) - 1, self.bptt - n_filled)
+        return device_tensor
 
-                        # First n_tokens are retained from last batch
-                        input_ids[i, n_retain + n_filled : n_retain + n_filled + n_tokens] = stream[:n_tokens]
-                        labels[i, n_filled : n_filled + n_tokens] = stream[1 : n_tokens + 1]
+    def stream_iterator(self, sequences: torch.LongTensor) -> Generator[Tuple, None, None]:
+        """Creates a streaming-based iterator.
+
+        Each row of a batch holds `bptt` input tokens and their labels, taken from
+        consecutive spans of `bptt + 1` tokens of `sequences`.
+
+        Args:
+            sequences: Chunk of encoded sequences.
+
+        Yields:
+            (Generator[Tuple, None, None]): Stream-based batch.
+
+        """
 
-                        n_filled += n_tokens
-                except StopIteration:
-                    valid_batch = False
-                    break
+        n_batch = sequences.size(0) // (self.bsz * (self.bptt + 1))
+        spans = sequences[: n_batch * self.bsz * (self.bptt + 1)].view(n_batch, self.bsz, self.bptt + 1)
 
-            if not valid_batch:
-                return
+        retained_ids = None
 
-            input_ids = input_ids.to(self.device)
-            labels = labels.to(self.device)
+        for i in range(n_batch):
+            input_ids = spans[i, :, :-1]
+            labels = spans[i, :, 1:]
 
-            yield input_ids, labels, self.bptt, True
+            # Prepends the last `ext_len` inputs from previous batch
+            if retained_ids is not None:
+                input_ids = torch.cat((retained_ids, input_ids), dim=1)
+            if self.ext_len > 0:
+                retained_ids = input_ids[:, -self.ext_len :]
 
-            n_retain = min(input_ids.size(1), self.ext_len)
-            if n_retain > 0:
-                input_ids[:, :n_retain] = input_ids[:, -n_retain:]
-            input_ids.resize_(input_ids.size(0), n_retain + self.bptt)
+            yield self._to_device(input_ids, "input_ids"), self._to_device(labels, "labels"), self.bptt, True
 
     def __iter__(self) -> Generator[Tuple, None, None]:
         """Defaults standard iteration to stream-based batches.
@@ -321,12 +495,10 @@ class LMMultiFileIterator:
         if self.shuffle:
             np.random.shuffle(self.paths)
 
-        for path in self.paths:
-            sequences = self.get_sequences(path)
+        for sequences in self._iter_sequences():
             sequences_chunks = torch.chunk(sequences, self.n_chunks, 0)
 
-            for i in range(self.n_chunks):
-                iterator = iter(sequences_chunks[i])
-                for idx, batch in enumerate(self.stream_iterator(iterator)):
+            for sequences_chunk in sequences_chunks:
+                for idx, batch in enumerate(self.stream_iterator(sequences_chunk)):
                     yield batch
                     self.last_iter = idx
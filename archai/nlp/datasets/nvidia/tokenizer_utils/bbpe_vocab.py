@@ -6,8 +6,8 @@
 
 import json
 import os
-from collections import OrderedDict
-from typing import Counter, List, Optional
+from collections import Counter, OrderedDict
+from typing import List, Optional
 
 from overrides import overrides
 from tokenizers import ByteLevelBPETokenizer
@@ -20,7 +20,10 @@ from archai.nlp.datasets.nvidia.tokenizer_utils.special_token_enum import (
     SpecialTokenEnum,
 )
 from archai.nlp.datasets.nvidia.tokenizer_utils.token_config import TokenConfig
-from archai.nlp.datasets.nvidia.tokenizer_utils.vocab_base import VocabBase
+from archai.nlp.datasets.nvidia.tokenizer_utils.vocab_base import (
+    VocabBase,
+    iter_sampled_lines,
+)
 
 logger = logging_utils.get_logger(__name__)
 
@@ -44,6 +47,9 @@ class BbpeVocab(VocabBase):
         sorted_vocab: Optional[bool] = True,
         encode_special_tokens: Optional[bool] = False,
         decode_special_tokens: Optional[bool] = False,
+        sample_stride: Optional[int] = 1,
+        sample_lines: Optional[int] = None,
+        num_workers: Optional[int] = None,
     ) -> None:
         """Defines the tokenization pipeline.
 
@@ -62,6 +68,10 @@ class BbpeVocab(VocabBase):
             sorted_vocab: Whether vocabulary should be sorted.
             encode_special_tokens: Whether special tokens should be encoded.
             decode_special_tokens: Whether special tokens should be decoded.
+            sample_stride: Interval between lines used for training (and counting frequencies).
+            sample_lines: Maximum number of lines used for training, which are uniformly
+                sampled and kept in memory.
+            num_workers: Number of worker processes used to count tokens' frequencies.
 
         """
 
@@ -83,6 +93,9 @@ class BbpeVocab(VocabBase):
         self.model_max_length = model_max_length
         self.encode_special_tokens = encode_special_tokens
         self.decode_special_tokens = decode_special_tokens
+        self.sample_stride = sample_stride
+        self.sample_lines = sample_lines
+        self.num_workers = num_workers
 
         self.bos_id = []
         self.eos_id = []
@@ -323,16 +336,15 @@ class BbpeVocab(VocabBase):
         tokens_counter = Counter()
         tokens_counter.update(list(range(len(self._tokenizer))))
 
-        for filepath in filepaths:
-            with open(filepath, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-            for i, l in enumerate(lines):
-                if ((i + 1) % 100000) == 0:
-                    logger.info(f"Counted tokens for line {i+1} ...")
+        # Frequencies are counted over the same sample of lines used for training
+        if self.sample_lines is not None:
+            lines = iter_sampled_lines(filepaths, stride=self.sample_stride, max_lines=self.sample_lines)
+            tokens_counter.update(self.count_lines(lines))
+            return tokens_counter
 
-                toks = self.encode_text(l)
-                tokens_counter.update(toks)
+        # Counters of file chunks are merged as soon as they are counted
+        for chunk_counter in self.iter_file_counts(filepaths, stride=self.sample_stride, num_workers=self.num_workers):
+            tokens_counter.update(chunk_counter)
 
         return tokens_counter
 
@@ -353,25 +365,17 @@ class BbpeVocab(VocabBase):
         special_tokens = self._config.get_special_tokens()
         min_frequency = self.min_frequency if self.min_frequency is not None else 2
 
-        # Pre-processes the file for training as well
-        def read_line_iter(func, file):
-            for line in file:
-                yield func(line)
-            return
-
-        open_files = [open(filepath, "r") for filepath in filepaths]
-        iter_files = iter([read_line_iter(self._preprocess_text, file) for file in open_files])
+        # Pre-processes the (sampled) lines for training as well
+        lines = iter_sampled_lines(filepaths, stride=self.sample_stride, max_lines=self.sample_lines)
+        iter_lines = (self._preprocess_text(line) for line in lines)
 
         # Spaces are added by ourselves
         tokenizer = ByteLevelBPETokenizer(dropout=dropout, add_prefix_space=False)
         tokenizer.train_from_iterator(
-            iter_files, vocab_size=self.vocab_size, min_frequency=min_frequency, special_tokens=special_tokens
+            iter_lines, vocab_size=self.vocab_size, min_frequency=min_frequency, special_tokens=special_tokens
         )
 
-        for file in open_files:
-            file.close()
-
-        if len(added_tokens):
+        if added_tokens:
             tokenizer.add_tokens(added_tokens)
 
         tokenizer.save(self._tokenizer_filepath, pretty=True)
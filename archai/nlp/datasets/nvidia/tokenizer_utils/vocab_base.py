@@ -4,20 +4,142 @@
 """Utilities for tokenization pipelines with huggingface/tokenizers.
 """
 
+import io
+import os
+import random
+import tempfile
 from abc import abstractmethod
-from collections import abc
-from typing import List, Optional
+from collections import Counter, abc
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 
-import torch
+import numpy as np
 from overrides import EnforceOverrides, overrides
 
 from archai.nlp import logging_utils
+from archai.nlp.datasets.nvidia.corpus_utils import get_compact_dtype
 from archai.nlp.datasets.nvidia.tokenizer_utils.special_token_enum import (
     SpecialTokenEnum,
 )
 
 logger = logging_utils.get_logger(__name__)
 
+# Vocabulary used by the encoding worker processes
+_worker_vocab = None
+
+# Minimum number of chunks that starts a pool of processes when the number of workers is not supplied,
+# as smaller files are encoded faster than the vocabulary is pickled into the workers
+MIN_POOL_CHUNKS = 4
+
+
+def _init_encode_worker(vocab: "VocabBase") -> None:
+    global _worker_vocab
+    _worker_vocab = vocab
+
+
+def _read_chunk_lines(path: str, start: int, end: int) -> io.StringIO:
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # Reads lines in the same way (universal newlines) as a file opened in text mode
+    return io.StringIO(data.decode("utf-8"), newline=None)
+
+
+def _encode_chunk(
+    path: str, start: int, end: int, output_path: str, dtype: np.dtype, vocab: Optional["VocabBase"] = None
+) -> int:
+    vocab = vocab if vocab is not None else _worker_vocab
+
+    encoded = []
+    for line in _read_chunk_lines(path, start, end):
+        encoded.extend(vocab.encode_text(line))
+
+    # Chunks are spilled to disk, so that only their lengths are returned to the caller
+    np.save(output_path, np.array(encoded, dtype=dtype))
+
+    return len(encoded)
+
+
+def _count_chunk(path: str, start: int, end: int, stride: int, vocab: Optional["VocabBase"] = None) -> Counter:
+    vocab = vocab if vocab is not None else _worker_vocab
+
+    return vocab.count_lines(islice(_read_chunk_lines(path, start, end), 0, None, stride))
+
+
+def get_file_chunks(path: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """Splits a file into byte ranges of approximately `chunk_size` bytes that
+    start and end at line boundaries.
+
+    Args:
+        path: Input file.
+        chunk_size: Approximate size of each chunk (in bytes).
+
+    Returns:
+        (List[Tuple[int, int]]): Starting and ending (exclusive) offsets of chunks.
+
+    """
+
+    file_size = os.path.getsize(path)
+    offsets = [0]
+
+    with open(path, "rb") as f:
+        while offsets[-1] < file_size:
+            f.seek(min(offsets[-1] + chunk_size, file_size))
+
+            # Moves to the beginning of the next line
+            f.readline()
+            offsets.append(min(f.tell(), file_size))
+
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def iter_sampled_lines(
+    paths: List[str], stride: Optional[int] = 1, max_lines: Optional[int] = None, seed: Optional[int] = 0
+) -> Iterator[str]:
+    """Iterates over a sample of the lines from a list of files.
+
+    Every `stride`-th line is sampled. If `max_lines` is supplied, a uniform sample
+    of at most `max_lines` of these lines is kept in memory (reservoir sampling)
+    and yielded in the order of the files.
+
+    Args:
+        paths: Input files.
+        stride: Interval between sampled lines.
+        max_lines: Maximum number of sampled lines.
+        seed: Random seed used by reservoir sampling.
+
+    Yields:
+        (str): Sampled lines.
+
+    """
+
+    def _iter_lines() -> Iterator[str]:
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                yield from f
+
+    lines = islice(_iter_lines(), 0, None, stride)
+
+    if max_lines is None:
+        yield from lines
+        return
+
+    rng = random.Random(seed)
+    reservoir = []
+
+    for idx, line in enumerate(lines):
+        if idx < max_lines:
+            reservoir.append((idx, line))
+        else:
+            replace_idx = rng.randint(0, idx)
+            if replace_idx < max_lines:
+                reservoir[replace_idx] = (idx, line)
+
+    for _, line in sorted(reservoir, key=lambda t: t[0]):
+        yield line
+
 
 class VocabBase(EnforceOverrides, abc.Sized):
     """Implements a base class for a customizable tokenization pipeline."""
@@ -158,38 +280,148 @@ class VocabBase(EnforceOverrides, abc.Sized):
 
         return [self.id_to_token(id) for id in ids]
 
-    def encode_file(self, path: str, verbose: Optional[bool] = True) -> torch.Tensor:
+    def encode_file(
+        self,
+        path: str,
+        verbose: Optional[bool] = True,
+        num_workers: Optional[int] = None,
+        chunk_size: Optional[int] = 32 * 1024**2,
+    ) -> np.ndarray:
         """Encodes text from an input file.
 
+        The file is split into chunks at line boundaries, which are encoded in parallel
+        by a pool of processes and spilled to temporary files. Once the number of tokens
+        is known, chunks are copied (in order) into a preallocated array that uses the
+        smallest data type able to represent the vocabulary (uint16 or uint32).
+
         Args:
             path: Input file.
             verbose: Whether should add verbosity to logger.
+            num_workers: Number of worker processes. If `None`, uses the number of available CPUs
+                when the file has at least `MIN_POOL_CHUNKS` chunks, or the current process otherwise.
+            chunk_size: Approximate size of each chunk (in bytes).
 
         Returns:
-            (torch.Tensor): Encoded tokens.
+            (np.ndarray): Encoded tokens.
 
         """
 
         logger.info(f"Encoding file: {path}")
 
-        encoded = []
-        tensor_encoded = torch.LongTensor()
+        dtype = get_compact_dtype(len(self) - 1)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            chunks = [
+                (path, start, end, os.path.join(tmp_dir, f"chunk_{idx}.npy"))
+                for idx, (start, end) in enumerate(get_file_chunks(path, chunk_size))
+            ]
+            chunk_lengths = list(self._map_chunks(_encode_chunk, chunks, num_workers, dtype, verbose=verbose))
+
+            encoded = np.empty(sum(chunk_lengths), dtype=dtype)
+            offset = 0
+
+            for (_, _, _, chunk_path), chunk_length in zip(chunks, chunk_lengths):
+                encoded[offset : offset + chunk_length] = np.load(chunk_path)
+                offset += chunk_length
+                os.remove(chunk_path)
+
+        return encoded
+
+    def count_lines(self, lines: Iterable[str]) -> Counter:
+        """Counts the frequency of tokens in lines of text.
+
+        Args:
+            lines: Lines of text.
+
+        Returns:
+            (Counter): Tokens' frequencies.
+
+        """
+
+        counter = Counter()
+        for line in lines:
+            counter.update(self.encode_text(line))
+
+        return counter
+
+    def iter_file_counts(
+        self,
+        paths: List[str],
+        stride: Optional[int] = 1,
+        num_workers: Optional[int] = None,
+        chunk_size: Optional[int] = 32 * 1024**2,
+    ) -> Iterator[Counter]:
+        """Counts the frequency of tokens from input files, in parallel.
+
+        Files are split into chunks at line boundaries, which are counted by a pool
+        of processes. Each chunk has its own counter, so that counters can be merged
+        (or spilled) by the caller without holding all of them in memory.
+
+        Args:
+            paths: Input files.
+            stride: Interval between counted lines of each chunk.
+            num_workers: Number of worker processes. If `None`, uses the number of available CPUs
+                when there are at least `MIN_POOL_CHUNKS` chunks, or the current process otherwise.
+            chunk_size: Approximate size of each chunk (in bytes).
+
+        Yields:
+            (Counter): Tokens' frequencies of each chunk.
+
+        """
+
+        chunks = [(path, start, end) for path in paths for start, end in get_file_chunks(path, chunk_size)]
+
+        yield from self._map_chunks(_count_chunk, chunks, num_workers, stride)
+
+    def _map_chunks(
+        self,
+        fn: Callable[..., Any],
+        chunks: List[Tuple],
+        num_workers: Optional[int],
+        *args,
+        verbose: Optional[bool] = True,
+    ) -> Iterator[Any]:
+        """Applies a function to chunks of files, using a pool of processes if there are enough chunks.
+
+        Args:
+            fn: Function that receives the path, starting and ending offsets of a chunk (and any other
+                per-chunk arguments), followed by `args` and the vocabulary (`vocab` keyword argument).
+            chunks: Path, starting and ending offsets (and any other per-chunk arguments) of each chunk.
+            num_workers: Number of worker processes. If `None`, uses the number of available CPUs
+                when there are at least `MIN_POOL_CHUNKS` chunks, or the current process otherwise.
+            verbose: Whether should log the progress as each chunk is completed.
+
+        Yields:
+            (Any): Outputs of the function, in the order of the chunks.
+
+        """
+
+        n_completed = 0
+
+        def _log_completed(*_) -> None:
+            nonlocal n_completed
+            n_completed += 1
+
+            if verbose and len(chunks) > 1:
+                logger.debug(f"Completed chunk: {n_completed}/{len(chunks)}")
 
-        with open(path, "r", encoding="utf-8") as f:
-            for idx, line in enumerate(f):
-                # Converts to tensor.Tensor every 500k lines,
-                # otherwise Python list uses a lot of RAM
-                if idx > 0 and idx % 500000 == 0:
-                    tensor_encoded = torch.cat((tensor_encoded, torch.LongTensor(encoded)))
-                    encoded = []
+        if num_workers is None:
+            num_workers = os.cpu_count() if len(chunks) >= MIN_POOL_CHUNKS else 1
+        num_workers = min(num_workers, len(chunks))
 
-                if verbose and idx > 0 and idx % 500000 == 0:
-                    logger.debug(f"Completed line: {format(idx)}")
+        if num_workers <= 1:
+            for chunk in chunks:
+                output = fn(*chunk, *args, vocab=self)
+                _log_completed()
+                yield output
+            return
 
-                tokens = self.encode_text(line)
-                encoded.extend(tokens)
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_encode_worker, initargs=(self,)) as executor:
+            futures = [executor.submit(fn, *chunk, *args) for chunk in chunks]
 
-        if len(encoded) > 0:
-            tensor_encoded = torch.cat((tensor_encoded, torch.LongTensor(encoded)))
+            # Progress is logged as chunks are completed, which might not follow their order
+            for future in futures:
+                future.add_done_callback(_log_completed)
 
-        return tensor_encoded
+            for future in futures:
+                yield future.result()
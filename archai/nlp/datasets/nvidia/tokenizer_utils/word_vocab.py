@@ -4,9 +4,14 @@
 """Word-based tokenizer.
 """
 
+import heapq
+import json
 import os
+import tempfile
 from collections import Counter, OrderedDict
-from typing import List, Optional
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from overrides import overrides
 
@@ -17,7 +22,10 @@ from archai.nlp.datasets.nvidia.tokenizer_utils.special_token_enum import (
     SpecialTokenEnum,
 )
 from archai.nlp.datasets.nvidia.tokenizer_utils.token_config import TokenConfig
-from archai.nlp.datasets.nvidia.tokenizer_utils.vocab_base import VocabBase
+from archai.nlp.datasets.nvidia.tokenizer_utils.vocab_base import (
+    VocabBase,
+    iter_sampled_lines,
+)
 
 logger = logging_utils.get_logger(__name__)
 
@@ -37,6 +45,10 @@ class WordVocab(VocabBase):
         delimiter: Optional[str] = None,
         encode_special_tokens: Optional[bool] = True,
         decode_special_tokens: Optional[bool] = True,
+        sample_stride: Optional[int] = 1,
+        sample_lines: Optional[int] = None,
+        num_workers: Optional[int] = None,
+        max_counter_size: Optional[int] = None,
     ):
         """Defines the tokenization pipeline.
 
@@ -52,10 +64,20 @@ class WordVocab(VocabBase):
             delimiter: Delimiter between tokens.
             encode_special_tokens: Whether special tokens should be encoded.
             decode_special_tokens: Whether special tokens should be decoded.
+            sample_stride: Interval between lines used for counting tokens.
+            sample_lines: Maximum number of lines used for counting tokens, which are
+                uniformly sampled and kept in memory.
+            num_workers: Number of worker processes used to count tokens.
+            max_counter_size: Maximum number of unique tokens kept in memory while counting.
+                Above this size, counts are spilled to (sorted) temporary files on disk,
+                which are merged after counting.
 
         """
 
         self.counter = Counter()
+        self._spill_filepaths = []
+        self._n_spilled_tokens = 0
+        self._n_unique_tokens = 0
 
         # No prefix space or line needed as we delimit on white space unlike in bbpe
         self._config = TokenConfig(
@@ -78,6 +100,10 @@ class WordVocab(VocabBase):
         self.delimiter = delimiter
         self.encode_special_tokens = encode_special_tokens
         self.decode_special_tokens = decode_special_tokens
+        self.sample_stride = sample_stride
+        self.sample_lines = sample_lines
+        self.num_workers = num_workers
+        self.max_counter_size = max_counter_size
 
     def _preprocess_text(self, text: str) -> str:
         """Pre-processes the text.
@@ -113,13 +139,113 @@ class WordVocab(VocabBase):
 
         assert os.path.exists(path), f"File does not exist: {path}"
 
-        with open(path, "r", encoding="utf-8") as f:
-            for idx, line in enumerate(f):
-                if verbose and idx > 0 and idx % 500000 == 0:
-                    logger.debug(f"Completed line: {idx}")
+        for counter in self.iter_file_counts([path], stride=self.sample_stride, num_workers=self.num_workers):
+            self._update_counter(counter)
+
+    def _update_counter(self, counter: Counter) -> None:
+        """Merges tokens' frequencies into the counter, which is spilled to disk
+        if it exceeds `max_counter_size` tokens.
+
+        Args:
+            counter: Tokens' frequencies.
+
+        """
+
+        self.counter.update(counter)
+
+        if self.max_counter_size is not None and len(self.counter) > self.max_counter_size:
+            self._spill_counter()
+
+    def _spill_counter(self) -> None:
+        """Writes the counter, sorted by token, to a temporary file and clears it.
+
+        Each token is written with the order of its first appearance, so that tied
+        frequencies are ordered as in the counter, e.g., `Counter.most_common`.
+
+        """
+
+        fd, spill_filepath = tempfile.mkstemp(prefix="word_vocab_", suffix=".jsonl")
+        self._spill_filepaths.append(spill_filepath)
+
+        orders = {sym: self._n_spilled_tokens + order for order, sym in enumerate(self.counter)}
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for sym, cnt in sorted(self.counter.items()):
+                f.write(json.dumps([sym, cnt, orders[sym]], ensure_ascii=False) + "\n")
+
+        self._n_spilled_tokens += len(self.counter)
+        self.counter.clear()
+
+    def _iter_spilled_counts(self) -> Iterator[Tuple[str, int, int]]:
+        """Merges the spilled counters, which are removed afterwards.
+
+        Yields:
+            (Tuple[str, int, int]): Tokens, their frequencies and the order of their first
+                appearance, sorted by token.
+
+        """
+
+        files = [open(spill_filepath, "r", encoding="utf-8") for spill_filepath in self._spill_filepaths]
+
+        try:
+            counts = heapq.merge(*[(tuple(json.loads(line)) for line in f) for f in files], key=itemgetter(0))
+            for sym, sym_counts in groupby(counts, key=itemgetter(0)):
+                sym_counts = list(sym_counts)
+                self._n_unique_tokens += 1
+
+                yield sym, sum(cnt for _, cnt, _ in sym_counts), min(order for _, _, order in sym_counts)
+        finally:
+            for f in files:
+                f.close()
+            for spill_filepath in self._spill_filepaths:
+                os.remove(spill_filepath)
+
+            self._spill_filepaths = []
+            self._n_spilled_tokens = 0
+
+    def _most_common(self, n: Optional[int] = None) -> Iterable[Tuple[str, int]]:
+        """Gets the most common tokens, including the ones that were spilled to disk.
+
+        Args:
+            n: Number of tokens. If `None`, gets all tokens.
+
+        Returns:
+            (Iterable[Tuple[str, int]]): Tokens and their frequencies, from the most common to the least common.
+
+        """
+
+        if not self._spill_filepaths:
+            self._n_unique_tokens = len(self.counter)
+            return self.counter.most_common(n)
+
+        self._spill_counter()
+        self._n_unique_tokens = 0
+
+        # Only the most common tokens are kept in memory, where ties are ordered by first appearance
+        counts = (t for t in self._iter_spilled_counts() if t[1] >= self.min_frequency)
+        if n is None:
+            counts = sorted(counts, key=lambda t: (-t[1], t[2]))
+        else:
+            counts = heapq.nsmallest(n, counts, key=lambda t: (-t[1], t[2]))
+
+        return [(sym, cnt) for sym, cnt, _ in counts]
+
+    @overrides
+    def count_lines(self, lines: Iterable[str]) -> Counter:
+        """Counts the frequency of tokens in lines of text.
+
+        Args:
+            lines: Lines of text.
+
+        Returns:
+            (Counter): Tokens' frequencies.
+
+        """
+
+        counter = Counter()
+        for line in lines:
+            counter.update(self._tokenize_text(line))
 
-                symbols = self._tokenize_text(line)
-                self.counter.update(symbols)
+        return counter
 
     def _tokenize_text(self, text: str) -> List[str]:
         """Tokenizes the text.
@@ -206,15 +332,19 @@ class WordVocab(VocabBase):
 
         self._clear()
 
-        for filepath in filepaths:
-            self._add_file(filepath)
+        if self.sample_lines is not None:
+            lines = iter_sampled_lines(filepaths, stride=self.sample_stride, max_lines=self.sample_lines)
+            self._update_counter(self.count_lines(lines))
+        else:
+            for filepath in filepaths:
+                self._add_file(filepath)
 
         # Adds specials tokens regardless of vocab_size
         for sym in self._config.get_special_tokens():
             self._add_special(sym)
 
         remaining_len = self.vocab_size - len(self) if self.vocab_size is not None else None
-        for sym, cnt in self.counter.most_common(remaining_len):
+        for sym, cnt in self._most_common(remaining_len):
             if cnt < self.min_frequency:
                 break
             self._add_symbol(sym)
@@ -223,7 +353,7 @@ class WordVocab(VocabBase):
             if rank == 0:
                 self._save()
 
-        logger.info(f"Final vocabulary size = {len(self)} | Unique tokens = {len(self.counter)}")
+        logger.info(f"Final vocabulary size = {len(self)} | Unique tokens = {self._n_unique_tokens}")
 
     @overrides
     def encode_text(self, text: str) -> List[int]:
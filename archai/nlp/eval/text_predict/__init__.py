@@ -4,7 +4,7 @@
 """Customizes a Text Predict evaluation tool based on text generation.
 """
 
-from archai.nlp.eval.text_predict.text_predict_eval import evaluate
+from archai.nlp.eval.text_predict.text_predict_eval import evaluate, evaluate_sharded
 from archai.nlp.eval.text_predict.text_predict_model import (
     TextPredictONNXModel,
     TextPredictTorchModel,
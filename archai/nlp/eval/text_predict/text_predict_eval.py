@@ -4,13 +4,18 @@
 """Text Predict-based evaluation.
 """
 
-from typing import Optional
+import os
+from typing import Callable, Optional
 
 import numpy as np
 
 from archai.nlp.eval.text_predict.text_predict_model import TextPredictModel
 from archai.nlp.eval.text_predict.text_predict_prediction import TextPredictionSequence
 from archai.nlp.eval.text_predict.text_predict_predictor import Predictor
+from archai.nlp.eval.text_predict.text_predict_sharded import (
+    predict_shards,
+    score_shards,
+)
 from archai.nlp.eval.text_predict.text_predict_tokenizer import TextPredictTokenizer
 
 
@@ -27,6 +32,8 @@ def evaluate(
     max_score: Optional[float] = 5.0,
     score_step: Optional[float] = 0.1,
     expected_match_rate: Optional[float] = 0.5,
+    batch_size: Optional[int] = 1,
+    beam_width: Optional[int] = 1,
 ) -> None:
     """Performs the Text Predict evaluation.
 
@@ -43,6 +50,8 @@ def evaluate(
         max_score: Maximum score.
         score_step: Step between minimum and maximum scores.
         expected_match_rate: Expected match rate.
+        batch_size: Number of positions that are predicted together.
+        beam_width: Number of continuations kept per position (`1` performs greedy decoding).
 
     """
 
@@ -51,6 +60,7 @@ def evaluate(
         tp_tokenizer,
         max_body_length=max_body_length,
         min_pred_length=min_pred_length,
+        beam_width=beam_width,
     )
 
     # Sequence is automatically loaded from file,
@@ -65,8 +75,73 @@ def evaluate(
 
     # Predicts and scores the sequence
     min_scores = np.arange(min_score, max_score, score_step).tolist()
-    predictor.predict(sequence)
+    predictor.predict(sequence, batch_size=batch_size)
     predictor.score(sequence, min_scores, expected_match_rate)
 
     # Outputs information about prediction and scoring pipelines
     sequence.save(output_dir)
+
+
+def evaluate_sharded(
+    tp_model_fn: Callable[[], TextPredictModel],
+    tp_tokenizer: TextPredictTokenizer,
+    data_file_path: str,
+    output_dir: Optional[str] = "",
+    num_workers: Optional[int] = 1,
+    shard_size: Optional[int] = 10000,
+    max_body_length: Optional[int] = 10000,
+    min_pred_length: Optional[int] = 6,
+    current_paragraph_only: Optional[bool] = False,
+    min_score: Optional[float] = 1.0,
+    max_score: Optional[float] = 5.0,
+    score_step: Optional[float] = 0.1,
+    expected_match_rate: Optional[float] = 0.5,
+    batch_size: Optional[int] = 1,
+    beam_width: Optional[int] = 1,
+) -> None:
+    """Performs the Text Predict evaluation with a pool of worker processes.
+
+    Positions are streamed from the data file in shards, each worker predicts
+    shards with its own model and the per-shard predictions are merged to be scored.
+
+    Args:
+        tp_model_fn: A picklable function that creates the Text Predict-based model of a worker.
+        tp_tokenizer: Text Predict-based tokenizer.
+        data_file_path: Path to the input data file.
+        output_dir: Output folder.
+        num_workers: Number of worker processes.
+        shard_size: Number of positions per shard.
+        max_body_length: Maximum length of the input text.
+        min_pred_length: Minimum length of the prediction.
+        current_paragraph_only: Only predicts information from current paragraph.
+        min_score: Minimum score.
+        max_score: Maximum score.
+        score_step: Step between minimum and maximum scores.
+        expected_match_rate: Expected match rate.
+        batch_size: Number of positions that are predicted together.
+        beam_width: Number of continuations kept per position (`1` performs greedy decoding).
+
+    """
+
+    shard_file_paths = predict_shards(
+        tp_model_fn,
+        tp_tokenizer,
+        data_file_path,
+        os.path.join(output_dir, "shards"),
+        num_workers=num_workers,
+        shard_size=shard_size,
+        batch_size=batch_size,
+        predictor_kwargs={
+            "max_body_length": max_body_length,
+            "min_pred_length": min_pred_length,
+            "beam_width": beam_width,
+        },
+        sequence_kwargs={
+            "min_score": min_score,
+            "current_paragraph_only": current_paragraph_only,
+            "min_pred_length": min_pred_length,
+        },
+    )
+
+    min_scores = np.arange(min_score, max_score, score_step).tolist()
+    score_shards(shard_file_paths, min_scores, expected_match_rate=expected_match_rate, output_dir=output_dir)
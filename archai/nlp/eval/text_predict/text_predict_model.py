@@ -6,6 +6,7 @@
 
 import functools
 import os
+from collections import defaultdict
 from typing import List, Optional, Tuple
 
 import numpy as np
@@ -13,7 +14,7 @@ import onnxruntime as ort
 import torch
 from transformers import AutoConfig
 
-from archai.nlp.eval.text_predict.text_predict_utils import LRUCache
+from archai.nlp.eval.text_predict.text_predict_utils import LRUCache, PrefixTreeCache
 
 
 class TextPredictModel:
@@ -35,6 +36,8 @@ class TextPredictModel:
         self.space_token_id = space_token_id
         self.max_seq_length = max_seq_length
 
+        self.next_token_probs_cache = LRUCache(maxsize=1024)
+
     @functools.lru_cache(maxsize=1024)
     def _create_fixed_length_tensor(self, inputs: Tuple[int, ...]) -> torch.Tensor:
         """Creates a PyTorch-ready tensor with fixed sequence length.
@@ -58,6 +61,58 @@ class TextPredictModel:
 
         return tensor
 
+    def get_token_log_probs(self, input_ids: Tuple[int, ...], batch_size: Optional[int] = 32) -> np.ndarray:
+        """Calculates the log-probabilities of each token given its preceding tokens.
+
+        The first token is conditioned on the space token. Tokens are scored with a sliding
+        window of `max_seq_length` tokens and a stride of half a window, so each token has
+        at least half a window of context, and the windows are forwarded in batches.
+
+        Args:
+            input_ids: Input tokens.
+            batch_size: Number of windows that are forwarded together.
+
+        Returns:
+            (np.ndarray): Log-probability of each token.
+
+        """
+
+        log_probs = np.zeros(len(input_ids), dtype=np.float64)
+        if len(input_ids) == 0:
+            return log_probs
+
+        sequence = (self.space_token_id,) + tuple(input_ids)
+        window_length = min(self.max_seq_length, len(sequence))
+        stride = max(window_length // 2, 1)
+
+        window_starts = [0]
+        while window_starts[-1] + window_length < len(sequence):
+            window_starts.append(min(window_starts[-1] + stride, len(sequence) - window_length))
+
+        sequence = torch.tensor(sequence, device=self.device)
+        windows = torch.stack([sequence[start : start + window_length] for start in window_starts])
+
+        # Window starting at `start` predicts tokens `start` to `start + window_length - 2`, but
+        # only scores the tokens after the ones that were scored by the previous window
+        scored_end = 0
+
+        with torch.no_grad():
+            for batch_start in range(0, len(window_starts), batch_size):
+                batch_windows = windows[batch_start : batch_start + batch_size]
+
+                logits = self.model(batch_windows).logits[:, :-1].float()
+                batch_log_probs = torch.log_softmax(logits, dim=-1)
+                batch_log_probs = batch_log_probs.gather(-1, batch_windows[:, 1:].unsqueeze(-1)).squeeze(-1)
+                batch_log_probs = batch_log_probs.cpu().numpy()
+
+                batch_window_starts = window_starts[batch_start : batch_start + batch_size]
+                for start, window_log_probs in zip(batch_window_starts, batch_log_probs):
+                    window_end = start + window_length - 1
+                    log_probs[scored_end:window_end] = window_log_probs[scored_end - start :]
+                    scored_end = window_end
+
+        return log_probs
+
     def get_loss(self, input_ids: Tuple[int, ...]) -> float:
         """Calculates the model's loss.
 
@@ -72,22 +127,69 @@ class TextPredictModel:
         if len(input_ids) == 0:
             return 0.0
 
-        with torch.no_grad():
-            n_labels, loss = 0, 0.0
-            for idx in range(0, len(input_ids) - 1, self.max_seq_length):
-                partial_input_ids = input_ids[idx : (idx + self.max_seq_length)]
-                partial_input_ids = self._create_fixed_length_tensor(partial_input_ids)
+        return float(-np.mean(self.get_token_log_probs(input_ids)))
 
-                labels = input_ids[idx + 1 : (idx + 1 + self.max_seq_length)]
-                labels = self._create_fixed_length_tensor(labels)
+    def _get_batch_next_token_probs(self, batch_input_ids: List[Tuple[int, ...]]) -> List[List[float]]:
+        """Core computation to calculate the probabilities of next token for a batch of inputs.
 
-                output = self.model(partial_input_ids, labels=labels)
-                loss += torch.sum(output.loss).item()
-                n_labels += len(labels)
+        Args:
+            batch_input_ids: Batch of input tokens.
 
-            return loss / n_labels
+        Returns:
+            (List[List[float]]): Next token's probabilities of each input.
+
+        """
+
+        # Inputs are padded to `max_seq_length`, except for empty inputs
+        groups = defaultdict(list)
+        for i, input_ids in enumerate(batch_input_ids):
+            input_ids = self._create_fixed_length_tensor(input_ids)
+            groups[input_ids.shape[-1]].append((i, input_ids))
+
+        next_token_probs = [None] * len(batch_input_ids)
+        for rows in groups.values():
+            input_ids = torch.cat([input_ids for _, input_ids in rows], dim=0)
+
+            with torch.no_grad():
+                output = self.model(input_ids)
+                probs = torch.softmax(output.logits[:, -1, :].float(), dim=-1).tolist()
+
+            for (i, _), row_probs in zip(rows, probs):
+                next_token_probs[i] = row_probs
+
+        return next_token_probs
+
+    def get_batch_next_token_probs(self, batch_input_ids: List[Tuple[int, ...]]) -> List[List[float]]:
+        """Calculates the probabilities of next token for a batch of inputs.
+
+        Inputs that are not cached are calculated with a single call to the model.
+
+        Args:
+            batch_input_ids: Batch of input tokens.
+
+        Returns:
+            (List[List[float]]): Next token's probabilities of each input.
+
+        """
+
+        batch_input_ids = [tuple(input_ids) for input_ids in batch_input_ids]
+
+        batch_probs = {
+            input_ids: self.next_token_probs_cache[input_ids]
+            for input_ids in batch_input_ids
+            if input_ids in self.next_token_probs_cache
+        }
+
+        uncached_input_ids = [input_ids for input_ids in dict.fromkeys(batch_input_ids) if input_ids not in batch_probs]
+        if len(uncached_input_ids) > 0:
+            uncached_probs = self._get_batch_next_token_probs(uncached_input_ids)
+
+            for input_ids, probs in zip(uncached_input_ids, uncached_probs):
+                self.next_token_probs_cache[input_ids] = probs
+                batch_probs[input_ids] = probs
+
+        return [batch_probs[input_ids] for input_ids in batch_input_ids]
 
-    @functools.lru_cache(maxsize=1024)
     def get_next_token_probs(self, input_ids: Tuple[int, ...]) -> List[float]:
         """Calculates the probabilities of next token.
 
@@ -99,13 +201,7 @@ class TextPredictModel:
 
         """
 
-        input_ids = self._create_fixed_length_tensor(input_ids)
-
-        with torch.no_grad():
-            output = self.model(input_ids)
-            next_token_probs = torch.exp(output.logits[-1][0]).tolist()
-
-        return next_token_probs
+        return self.get_batch_next_token_probs([input_ids])[0]
 
     @functools.lru_cache(maxsize=1024)
     def get_top_next_token_probs(self, input_ids: Tuple[int, ...]) -> Tuple[int, float]:
@@ -124,6 +220,48 @@ class TextPredictModel:
 
         return (idx, probs[idx])
 
+    def get_batch_top_next_token_probs(self, batch_input_ids: List[Tuple[int, ...]]) -> List[Tuple[int, float]]:
+        """Calculates the probability of top-1 next token for a batch of inputs.
+
+        Args:
+            batch_input_ids: Batch of input tokens.
+
+        Returns:
+            (List[Tuple[int, float]]): Top-1 next token's identifier and probability of each input.
+
+        """
+
+        return [top_probs[0] for top_probs in self.get_batch_top_k_next_token_probs(batch_input_ids, k=1)]
+
+    def get_batch_top_k_next_token_probs(
+        self, batch_input_ids: List[Tuple[int, ...]], k: Optional[int] = 1
+    ) -> List[List[Tuple[int, float]]]:
+        """Calculates the probabilities of top-k next tokens for a batch of inputs.
+
+        Args:
+            batch_input_ids: Batch of input tokens.
+            k: Number of next tokens per input.
+
+        Returns:
+            (List[List[Tuple[int, float]]]): Top-k next tokens' identifiers and probabilities of each
+                input, from the most to the least probable.
+
+        """
+
+        batch_top_k_probs = []
+        for probs in self.get_batch_next_token_probs(batch_input_ids):
+            probs = np.asarray(probs)
+
+            if k == 1:
+                top_idxs = [int(np.argmax(probs))]
+            else:
+                top_idxs = np.argpartition(-probs, min(k, len(probs)) - 1)[:k]
+                top_idxs = top_idxs[np.argsort(-probs[top_idxs], kind="stable")].tolist()
+
+            batch_top_k_probs.append([(idx, float(probs[idx])) for idx in top_idxs])
+
+        return batch_top_k_probs
+
 
 class TextPredictTorchModel(TextPredictModel):
     """Wraps a PyTorch model for Text Predict."""
@@ -162,6 +300,7 @@ class TextPredictONNXModel(TextPredictModel):
         onnx_model_path: str,
         space_token_id: int,
         max_seq_length: Optional[int] = 30,
+        past_cache_max_bytes: Optional[int] = 256 * 1024 * 1024,
     ) -> None:
         """Overrides initialization method.
 
@@ -169,6 +308,7 @@ class TextPredictONNXModel(TextPredictModel):
             onnx_model_path: Path to the ONNX model file.
             space_token_id: Space token identifier.
             max_seq_length: Maximum sequence length.
+            past_cache_max_bytes: Maximum size (in bytes) of the past key/values cache.
 
         """
 
@@ -186,124 +326,185 @@ class TextPredictONNXModel(TextPredictModel):
         self.session = ort.InferenceSession(onnx_model_path, self.sess_options, providers=["CPUExecutionProvider"])
 
         self.input_names = [i.name for i in self.session.get_inputs()]
-        self.batch_size = 1
 
-        self.past_cache = LRUCache(maxsize=1024)
-        self.min_past_cache_length = 8
+        self.past_cache = PrefixTreeCache(max_bytes=past_cache_max_bytes)
 
-    def _get_past_cache(
-        self,
-        input_ids: Tuple[int, ...],
-        min_cutoff: Optional[int] = 1,
-        max_cutoff: Optional[int] = 4,
-    ) -> Tuple[List[int], int]:
-        """Retrieves past key/values from cache.
+    def _get_past_shape(self, batch_size: int, past_sequence_length: int) -> List[int]:
+        """Gets the shape of the past key/values of a layer.
 
         Args:
-            input_ids: Input tokens.
-            min_cutoff: Minimum cutoff of the cache.
-            max_cutoff: Maximum cutoff of the cache.
+            batch_size: Batch size.
+            past_sequence_length: Length of the past key/values.
 
         Returns:
-            (Tuple[List[int], int]): Past key/values and their length.
+            (List[int]): Shape of the past key/values.
 
         """
 
-        if len(input_ids) - min_cutoff < self.min_past_cache_length:
-            return None, len(input_ids)
+        past_key_values = self.config.past_key_values if hasattr(self.config, "past_key_values") else 2
+        d_model = self.config.d_model if hasattr(self.config, "d_model") else self.config.hidden_size
+        d_head = self.config.d_head if hasattr(self.config, "d_head") else int(d_model / self.config.n_head)
 
-        for i in range(min_cutoff, max_cutoff + 1):
-            past_key = str(input_ids[: (-1 * i)])
-            if past_key in self.past_cache:
-                return (self.past_cache[past_key], len(input_ids[: (-1 * i)]))
+        return [past_key_values, batch_size, self.config.n_head, past_sequence_length, d_head]
 
-        return None, len(input_ids)
+    def _run_padded_batch(self, rows: List[Tuple[Tuple[int, ...], Optional[List[np.ndarray]], int]]) -> np.ndarray:
+        """Forwards inputs with different lengths and cached prefix lengths with a single session run.
 
-    def _update_past_cache(self, input_ids: Tuple[int, ...], past_ids: List[int]) -> None:
-        """Updates the past key/values cache.
+        Past key/values are left-padded up to the longest cached prefix and the remaining
+        tokens are left-padded up to the longest remainder, so that the last token of every
+        input is aligned. The attention mask hides the padding and the position identifiers
+        restart the positions of each input, while the padding is removed from the present
+        key/values before they are cached.
 
         Args:
-            input_ids: Input tokens.
-            past_ids: Past key/values.
+            rows: Inputs, with their past key/values and the length of their cached prefix.
+
+        Returns:
+            (np.ndarray): Next token's probabilities of each input.
 
         """
 
-        if len(input_ids) < self.min_past_cache_length:
-            return
+        batch_size = len(rows)
+        max_past_length = max(past_length for _, _, past_length in rows)
+        max_length = max(len(input_ids) - past_length for input_ids, _, past_length in rows)
 
-        self.past_cache[str(input_ids)] = past_ids
+        ort_inputs = {
+            "input_ids": np.full((batch_size, max_length), self.space_token_id, dtype=np.int64),
+            "attention_mask": np.zeros((batch_size, max_past_length + max_length), dtype=np.int64),
+            "position_ids": np.zeros((batch_size, max_length), dtype=np.int64),
+        }
+        for i in range(self.config.n_layer):
+            ort_inputs[f"past_{i}"] = np.zeros(self._get_past_shape(batch_size, max_past_length), dtype=np.float32)
 
-    @functools.lru_cache(maxsize=1024)
-    def get_next_token_probs(self, input_ids: Tuple[int, ...]) -> List[float]:
-        """Calculates the probabilities of next token.
+        for j, (input_ids, past, past_length) in enumerate(rows):
+            length = len(input_ids) - past_length
+
+            ort_inputs["input_ids"][j, max_length - length :] = input_ids[past_length:]
+            ort_inputs["position_ids"][j, max_length - length :] = np.arange(past_length, len(input_ids))
+            ort_inputs["attention_mask"][j, max_past_length - past_length : max_past_length] = 1
+            ort_inputs["attention_mask"][j, max_past_length + max_length - length :] = 1
+
+            if past_length > 0:
+                for i in range(self.config.n_layer):
+                    ort_inputs[f"past_{i}"][:, j, :, max_past_length - past_length :] = past[i][:, 0]
+
+        ort_outputs = self.session.run(None, ort_inputs)
+
+        # Present key/values cover the whole inputs (once unpadded), so they are cached under them
+        for j, (input_ids, _, past_length) in enumerate(rows):
+            length = len(input_ids) - past_length
+            self.past_cache.insert(
+                input_ids,
+                [
+                    np.concatenate(
+                        (
+                            present[:, j : j + 1, :, max_past_length - past_length : max_past_length],
+                            present[:, j : j + 1, :, max_past_length + max_length - length :],
+                        ),
+                        axis=-2,
+                    )
+                    for present in ort_outputs[1:]
+                ],
+            )
+
+        return ort_outputs[0]
+
+    def _get_batch_next_token_probs(self, batch_input_ids: List[Tuple[int, ...]]) -> List[List[float]]:
+        """Core computation to calculate the probabilities of next token for a batch of inputs.
+
+        Only the tokens after the longest cached prefix of each input are forwarded. If the model
+        was exported with an attention mask, all inputs are padded and forwarded together,
+        otherwise, only inputs with the same length and the same cached prefix length are.
 
         Args:
-            input_ids: Input tokens.
+            batch_input_ids: Batch of input tokens.
 
         Returns:
-            (List[float]): Next token's probabilities.
+            (List[List[float]]): Next token's probabilities of each input.
 
         """
 
-        if len(input_ids) == 0:
-            input_ids = (self.space_token_id,)
-        elif len(input_ids) > self.max_seq_length:
-            input_ids = input_ids[(-1 * self.max_seq_length) :]
+        rows = []
+        for input_ids in batch_input_ids:
+            if len(input_ids) == 0:
+                input_ids = (self.space_token_id,)
+            elif len(input_ids) > self.max_seq_length:
+                input_ids = input_ids[(-1 * self.max_seq_length) :]
+
+            past, past_length = self.past_cache.lookup(input_ids)
+            rows.append((input_ids, past, past_length))
+
+        if "attention_mask" in self.input_names:
+            return self._run_padded_batch(rows).tolist()
+
+        groups = defaultdict(list)
+        for i, (input_ids, _, past_length) in enumerate(rows):
+            groups[(past_length, len(input_ids))].append(i)
+
+        next_token_probs = [None] * len(batch_input_ids)
+        for group_idxs in groups.values():
+            probs = self._run_batch([rows[i] for i in group_idxs])
+
+            for i, row_probs in zip(group_idxs, probs):
+                next_token_probs[i] = row_probs.tolist()
+
+        return next_token_probs
+
+    def _run_batch(self, rows: List[Tuple[Tuple[int, ...], Optional[List[np.ndarray]], int]]) -> np.ndarray:
+        """Forwards inputs with the same length and cached prefix length with a single session run.
+
+        Args:
+            rows: Inputs, with their past key/values and the length of their cached prefix.
+
+        Returns:
+            (np.ndarray): Next token's probabilities of each input.
 
-        past_ids, past_length = self._get_past_cache(input_ids)
-        if past_ids is None:
-            past_sequence_length = 0
-        else:
-            input_ids = input_ids[past_length:]
-            past_sequence_length = past_length
+        """
+
+        past_length = rows[0][2]
 
         ort_inputs = {}
-        ort_inputs["input_ids"] = np.ascontiguousarray(np.array(input_ids).reshape(self.batch_size, len(input_ids)))
+        ort_inputs["input_ids"] = np.ascontiguousarray(
+            np.array([input_ids[past_length:] for input_ids, _, _ in rows], dtype=np.int64)
+        )
 
-        if past_ids is None:
-            past_key_values = self.config.past_key_values if hasattr(self.config, "past_key_values") else 2
-            d_head = (
-                self.config.d_head if hasattr(self.config, "d_head") else int(self.config.d_model / self.config.n_head)
-            )
-            past_shape = [
-                past_key_values,
-                self.batch_size,
-                self.config.n_head,
-                past_sequence_length,
-                d_head,
-            ]
-            for i in range(self.config.n_layer):
-                ort_inputs[f"past_{i}"] = np.zeros(past_shape, dtype=np.float32, order="C")
-        else:
-            for i in range(self.config.n_layer):
-                ort_inputs[f"past_{i}"] = np.ascontiguousarray(past_ids[i])
+        for i in range(self.config.n_layer):
+            if past_length == 0:
+                ort_inputs[f"past_{i}"] = np.zeros(self._get_past_shape(len(rows), 0), dtype=np.float32, order="C")
+            else:
+                ort_inputs[f"past_{i}"] = np.ascontiguousarray(np.concatenate([past[i] for _, past, _ in rows], axis=1))
 
         ort_outputs = self.session.run(None, ort_inputs)
-        past_ids = ort_outputs[1:]
-        probs = ort_outputs[0][0, :]
 
-        original_input_ids = input_ids
-        self._update_past_cache(original_input_ids, past_ids)
+        # Present key/values cover the whole inputs, so they are cached under them
+        for j, (input_ids, _, _) in enumerate(rows):
+            self.past_cache.insert(input_ids, [present[:, j : j + 1] for present in ort_outputs[1:]])
 
-        return probs.tolist()
+        return ort_outputs[0]
 
-    def get_loss(self, input_ids: Tuple[int, ...]) -> float:
-        """Calculates the model's loss.
+    def get_token_log_probs(self, input_ids: Tuple[int, ...], batch_size: Optional[int] = 32) -> np.ndarray:
+        """Calculates the log-probabilities of each token given its preceding tokens.
+
+        The first token is conditioned on the space token. Since the model only outputs the
+        next token's probabilities, the (truncated) prefixes of the tokens are forwarded in batches.
 
         Args:
-            input_ids: Inputs.
+            input_ids: Input tokens.
+            batch_size: Number of prefixes that are forwarded together.
 
         Returns:
-            (float): Loss.
+            (np.ndarray): Log-probability of each token.
 
         """
 
-        if len(input_ids) == 0:
-            return 0.0
+        input_ids = tuple(input_ids)
+        log_probs = np.zeros(len(input_ids), dtype=np.float64)
+
+        for batch_start in range(0, len(input_ids), batch_size):
+            batch_end = min(batch_start + batch_size, len(input_ids))
+            batch_input_ids = [(self.space_token_id,) + input_ids[:i] for i in range(batch_start, batch_end)]
 
-        loss = []
-        for i, token in enumerate(input_ids):
-            probs = self.get_next_token_probs((self.space_token_id,) + input_ids[:i])
-            loss.append(-np.log(probs[token]))
+            for i, probs in enumerate(self._get_batch_next_token_probs(batch_input_ids), start=batch_start):
+                log_probs[i] = np.log(probs[input_ids[i]])
 
-        return np.mean(loss)
+        return log_probs
@@ -11,12 +11,12 @@ import os
 import re
 from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
 
 import ftfy
 import numpy as np
 import pandas as pd
-from tqdm import tqdm
+from scipy.interpolate import interp1d
 
 from archai.nlp.eval.eval_utils import cached_property
 from archai.nlp.eval.text_predict.text_predict_model import TextPredictModel
@@ -56,7 +56,7 @@ class TextPredictPrediction:
         self.text = text
 
         self.probability = probability
-        self.score = score
+        self._score = score
 
         self.input_ids = input_ids
         self.token_ids = token_ids
@@ -144,6 +144,19 @@ class TextPredictPrediction:
 
         return len(self) * self.p_accept()
 
+    def score(self) -> float:
+        """Score of the prediction, which defaults to the expected number of accepted characters.
+
+        Returns:
+            (float): Prediction score.
+
+        """
+
+        if self._score is not None:
+            return self._score
+
+        return self.p_char_accept()
+
     def all_ids(self) -> Tuple[int, ...]:
         """Combines the `input_ids` and `token_ids` from the prediction.
 
@@ -366,6 +379,357 @@ class TextPredictionPosition:
         return json.dumps(output)
 
 
+def positions_to_data_frame(positions: Iterable[TextPredictionPosition]) -> pd.DataFrame:
+    """Converts the predictions of positions into a data frame, which is built column by column.
+
+    Text-based columns are gathered with a single pass over the positions, while the
+    numeric columns are calculated with vectorized operations.
+
+    Args:
+        positions: Text Predict-based positions.
+
+    Returns:
+        (pd.DataFrame): Predictions data frame.
+
+    """
+
+    line_ids, char_ids, texts, body_continued = [], [], [], []
+    probabilities, scores, matches, last_matched_chars, word_counts = [], [], [], [], []
+
+    for position in positions:
+        prediction = position.prediction
+
+        line_ids.append(position.line_id)
+        char_ids.append(position.char_id)
+
+        if prediction is None:
+            texts.append("")
+            body_continued.append(True)
+            probabilities.append(0.0)
+            scores.append(0.0)
+            matches.append(None)
+            last_matched_chars.append(0)
+            word_counts.append(0)
+            continue
+
+        text = str(prediction)
+        reference = position.body_continued[: len(text)]
+        prediction.has_matched = text == reference
+
+        texts.append(text)
+        body_continued.append(reference)
+        probabilities.append(prediction.probability)
+        scores.append(np.nan if prediction._score is None else prediction._score)
+        matches.append(prediction.has_matched)
+        last_matched_chars.append(len(os.path.commonprefix([text, reference])))
+        word_counts.append(prediction.word_count())
+
+    has_prediction = np.array([match is not None for match in matches], dtype=bool)
+    lengths = np.array([len(text) for text in texts], dtype=np.int64)
+    probabilities = np.array(probabilities, dtype=np.float64)
+    char_ids = np.array(char_ids, dtype=np.int64)
+    last_matched_chars = np.array(last_matched_chars, dtype=np.int64)
+
+    # Same calculations as `TextPredictPrediction`, but over all predictions at once
+    p_accept_given_match = np.maximum(TextPredictPrediction.a * lengths + TextPredictPrediction.b, 0.0)
+    p_accept = np.maximum(probabilities * p_accept_given_match, 0.0)
+    char_accepted = lengths * p_accept
+    scores = np.array(scores, dtype=np.float64)
+    scores = np.where(np.isnan(scores), char_accepted, scores)
+    length_types = np.select([lengths < 6, lengths < 11, lengths < 16], ["0:XS", "1:S", "2:M"], "3:L")
+
+    return pd.DataFrame(
+        OrderedDict(
+            [
+                ("Line", np.array(line_ids, dtype=np.int64)),
+                ("Char", char_ids),
+                ("Text", texts),
+                ("BodyContinued", body_continued),
+                ("Probability", probabilities),
+                ("Length", lengths),
+                ("Match", matches),
+                ("PAccept", p_accept),
+                ("Score", scores),
+                ("CharAccepted", char_accepted),
+                ("WordCount", np.array(word_counts, dtype=np.int64)),
+                ("Type", np.where(has_prediction, length_types, "").astype(object)),
+                ("LastMatchChar", last_matched_chars),
+                ("NextTrigger", char_ids + last_matched_chars + 1),
+                ("PAcceptGivenMatch", p_accept_given_match),
+            ]
+        )
+    )
+
+
+def _calculate_triggers(predictions_df: pd.DataFrame, min_scores: List[float]) -> np.ndarray:
+    """Calculates which predictions are triggered for each minimum score.
+
+    A prediction is a candidate if its score is higher than the minimum score. The first
+    candidate of each line is triggered, and the following ones are only triggered after the
+    characters matched by the previous triggered prediction.
+
+    Each candidate points to the next candidate that could be triggered after it, which is found
+    with a vectorized search over the (line, character) positions. The candidates of all minimum
+    scores form a single graph, where the triggered candidates are the paths from the first candidate
+    of each minimum score. Paths are gathered by pointer doubling, i.e., each iteration follows
+    twice as many pointers as the previous one. Thus, candidates should be sorted by line and,
+    within each line, by character.
+
+    Args:
+        predictions_df: Predictions data frame.
+        min_scores: Minimum scores.
+
+    Returns:
+        (np.ndarray): Triggers of each minimum score and prediction.
+
+    """
+
+    n_scores, n_predictions = len(min_scores), len(predictions_df.index)
+
+    # Triggered is an array that denotes if suggestion is regarded as 'triggered'
+    # -1: score was too low
+    #  0: score OK, but something is being shown and current suggestion could not be shown
+    #  1: suggestion shown
+    triggered = np.full((n_scores, n_predictions), -1)
+    if n_scores == 0 or n_predictions == 0:
+        return triggered
+
+    line_ids = predictions_df["Line"].values.astype(np.int64)
+    char_ids = predictions_df["Char"].values.astype(np.int64)
+    matched_char_ids = char_ids + predictions_df["LastMatchChar"].values.astype(np.int64)
+
+    # Candidates of the lowest minimum score include the candidates of all the others
+    is_candidate = predictions_df["Score"].values[None, :] >= np.asarray(min_scores, dtype=np.float64)[:, None]
+    candidate_idxs = np.flatnonzero(is_candidate.any(axis=0))
+
+    wrong_line_order = np.flatnonzero(np.diff(line_ids[candidate_idxs]) < 0)
+    if len(wrong_line_order) > 0:
+        i, j = candidate_idxs[wrong_line_order[0]], candidate_idxs[wrong_line_order[0] + 1]
+        msg = f"Incorrect order of lines in the file (current line = {line_ids[i]}, "
+        msg += f"processed line = {line_ids[j]}; current char = {matched_char_ids[i]}, "
+        msg += f"processed char = {char_ids[j]}"
+
+        raise ValueError(msg)
+
+    same_line = np.diff(line_ids[candidate_idxs]) == 0
+    if np.any(same_line & (np.diff(char_ids[candidate_idxs]) < 0)):
+        raise ValueError("Incorrect order of characters in the file.")
+
+    # Nodes are the candidates of every minimum score, grouped by minimum score and sorted by
+    # (minimum score, line, character), thus they can be encoded as a single key
+    score_ids, prediction_idxs = np.nonzero(is_candidate)
+    n_nodes = len(prediction_idxs)
+
+    n_chars = int(matched_char_ids[candidate_idxs].max()) + 2 if n_nodes > 0 else 1
+    n_keys = (int(line_ids[candidate_idxs].max()) + 1) * n_chars if n_nodes > 0 else 1
+    keys = score_ids * n_keys + line_ids[prediction_idxs] * n_chars + char_ids[prediction_idxs]
+    matched_keys = score_ids * n_keys + line_ids[prediction_idxs] * n_chars + matched_char_ids[prediction_idxs]
+
+    # Next node after each node, where `n_nodes` marks the end of the path (and points to itself)
+    n_score_nodes = np.bincount(score_ids, minlength=n_scores)
+    score_ends = np.cumsum(n_score_nodes)
+
+    next_nodes = np.searchsorted(keys, matched_keys, side="right")
+    next_nodes[next_nodes >= score_ends[score_ids]] = n_nodes
+    next_nodes = np.append(next_nodes, n_nodes)
+
+    # Paths start at the first node of each minimum score
+    is_triggered = np.zeros(n_nodes + 1, dtype=bool)
+    is_triggered[(score_ends - n_score_nodes)[n_score_nodes > 0]] = True
+
+    n_triggered = 0
+    while is_triggered.sum() > n_triggered:
+        n_triggered = is_triggered.sum()
+
+        is_triggered[next_nodes[is_triggered]] = True
+        next_nodes = next_nodes[next_nodes]
+
+        is_triggered[n_nodes] = False
+
+    triggered[score_ids, prediction_idxs] = is_triggered[:n_nodes]
+
+    return triggered
+
+
+def calculate_triggered_predictions(predictions_df: pd.DataFrame, min_score: float) -> pd.DataFrame:
+    """Calculates the triggered predictions.
+
+    Args:
+        predictions_df: Predictions data frame, where a column with the triggers is added.
+        min_score: Minimum score.
+
+    Returns:
+        (pd.DataFrame): Triggered predictions data frame.
+
+    """
+
+    triggered = _calculate_triggers(predictions_df, [min_score])[0]
+
+    triggered_df = predictions_df.iloc[np.flatnonzero(triggered == 1)].reset_index(drop=True)
+    if len(triggered_df.index) == 0:
+        triggered_df = pd.DataFrame()
+
+    triggered_column_name = f"Trigger: {min_score}"
+    predictions_df[triggered_column_name] = triggered
+
+    return triggered_df
+
+
+def summarize_triggered_predictions(
+    triggered_df: pd.DataFrame,
+    total_eval_points: int,
+    total_word_count: int,
+    perplexity: float,
+    min_score: Optional[float] = None,
+) -> OrderedDict:
+    """Summarizes the triggered predictions.
+
+    Args:
+        triggered_df: Triggered predictions.
+        total_eval_points: Number of positions.
+        total_word_count: Number of words.
+        perplexity: Perplexity of the positions.
+        min_score: Minimum score.
+
+    Returns:
+        (OrderedDict): Score-based meta-information.
+
+    """
+
+    summary = OrderedDict()
+    summary["Score"] = min_score
+    summary["TotalEvalPoints"] = total_eval_points
+    summary["TotalWordCount"] = total_word_count
+    summary["Perplexity"] = perplexity
+    summary["SuggestionsShown"] = len(triggered_df.index)
+    summary["SuggestionsMatched"] = int(np.sum(triggered_df["Match"])) if len(triggered_df.columns) else 0
+    summary["SuggestionsAccepted"] = (
+        int(np.sum(triggered_df["Match"] * triggered_df["PAcceptGivenMatch"])) if len(triggered_df.columns) else 0
+    )
+    summary["SuggestionRatePerWord"] = summary["SuggestionsShown"] / summary["TotalWordCount"]
+    summary["SuggestionRatePerChar"] = summary["SuggestionsShown"] / summary["TotalEvalPoints"]
+    summary["MatchRate"] = np.mean(triggered_df["Match"]) if len(triggered_df.columns) else 0
+    summary["AcceptRate"] = (
+        np.mean(triggered_df["Match"] * triggered_df["PAcceptGivenMatch"]) if len(triggered_df.columns) else 0
+    )
+    summary["CharMatched"] = (
+        int(np.sum(triggered_df["Match"] * triggered_df["Length"])) if len(triggered_df.columns) else 0
+    )
+    summary["CharAccepted"] = (
+        int(np.sum(triggered_df["Match"] * triggered_df["PAcceptGivenMatch"] * triggered_df["Length"]))
+        if len(triggered_df.columns)
+        else 0
+    )
+    summary["CharMatchRate"] = summary["CharMatched"] / summary["TotalEvalPoints"]
+    summary["CharAcceptRate"] = summary["CharAccepted"] / summary["TotalEvalPoints"]
+    summary["SuggestionsShownByType"] = (
+        triggered_df.groupby(["Type"]).size().to_dict() if len(triggered_df.columns) else None
+    )
+    summary["SuggestionsMatchedByType"] = (
+        triggered_df[triggered_df["Match"]].groupby(["Type"]).size().to_dict() if len(triggered_df.columns) else 0
+    )
+    summary["MatchRateByType"] = (
+        triggered_df.groupby(["Type"]).agg({"Match": "mean"}).to_dict()["Match"]
+        if len(triggered_df.columns)
+        else None
+    )
+    summary["SuggestionsShownByWordCount"] = (
+        triggered_df.groupby(["WordCount"]).size().to_dict() if len(triggered_df.columns) else None
+    )
+    summary["SuggestionsMatchedByWordCount"] = (
+        triggered_df[triggered_df["Match"]].groupby(["WordCount"]).size().to_dict()
+        if len(triggered_df.columns)
+        else None
+    )
+    summary["MatchRateByWordCount"] = (
+        triggered_df.groupby(["WordCount"]).agg({"Match": "mean"}).to_dict()["Match"]
+        if len(triggered_df.columns)
+        else None
+    )
+
+    return summary
+
+
+def sweep_triggered_predictions(
+    predictions_df: pd.DataFrame,
+    min_scores: List[float],
+    total_eval_points: int,
+    total_word_count: int,
+    perplexity: float,
+    expected_match_rate: Optional[float] = None,
+) -> Tuple[List[OrderedDict], pd.DataFrame]:
+    """Summarizes the triggered predictions over a set of minimum scores.
+
+    Triggers of all minimum scores are calculated at once, except for the one interpolated
+    from the expected match rate, which depends on the summaries of the others.
+
+    Args:
+        predictions_df: Predictions data frame.
+        min_scores: Minimum scores.
+        total_eval_points: Number of positions.
+        total_word_count: Number of words.
+        perplexity: Perplexity of the positions.
+        expected_match_rate: Expected match rate to find best score, which is
+            interpolated from the summaries and summarized as the last minimum score.
+
+    Returns:
+        (Tuple[List[OrderedDict], pd.DataFrame]): Summary of each minimum score and
+            triggered predictions of the last minimum score (with the triggers of every minimum score).
+
+    """
+
+    min_scores = sorted(min_scores)
+
+    def _summarize(min_scores: List[float], triggered: np.ndarray) -> None:
+        for min_score, score_triggered in zip(min_scores, triggered):
+            triggered_idxs = np.flatnonzero(score_triggered == 1)
+
+            triggered_df = predictions_df.iloc[triggered_idxs].reset_index(drop=True)
+            if len(triggered_df.index) == 0:
+                triggered_df = pd.DataFrame()
+
+            summary = summarize_triggered_predictions(
+                triggered_df, total_eval_points, total_word_count, perplexity, min_score=min_score
+            )
+            score_summary.append(summary)
+            triggers.append((min_score, score_triggered))
+
+    score_summary, triggers = [], []
+    _summarize(min_scores, _calculate_triggers(predictions_df, min_scores))
+
+    if expected_match_rate is not None and expected_match_rate >= 0 and expected_match_rate <= 1.0:
+        match_rate = [summ["MatchRate"] for summ in score_summary]
+        score = [summ["Score"] for summ in score_summary]
+
+        if len(match_rate) >= 2:
+            f = interp1d(
+                match_rate,
+                score,
+                bounds_error=False,
+                kind="linear",
+                fill_value="extrapolate",
+            )
+            min_score = float(f(expected_match_rate))
+
+            _summarize([min_score], _calculate_triggers(predictions_df, [min_score]))
+
+    if len(triggers) == 0:
+        return score_summary, None
+
+    # Triggered predictions of the last minimum score are saved with the triggers of every minimum score
+    triggers_df = pd.DataFrame(
+        OrderedDict((f"Trigger: {min_score}", score_triggered) for min_score, score_triggered in triggers),
+        index=predictions_df.index,
+    )
+    triggered_idxs = np.flatnonzero(triggers[-1][1] == 1)
+
+    triggered_df = pd.concat([predictions_df, triggers_df], axis=1).iloc[triggered_idxs].reset_index(drop=True)
+    if len(triggered_df.index) == 0:
+        triggered_df = pd.DataFrame()
+
+    return score_summary, triggered_df
+
+
 class TextPredictionSequence(OrderedDict):
     """Represents a sequence of positions inside the Text Prediction pipeline."""
 
@@ -424,6 +788,76 @@ class TextPredictionSequence(OrderedDict):
 
         raise NotImplementedError
 
+    @staticmethod
+    def iter_file(file_path: str, **kwargs) -> Generator[TextPredictionPosition, None, None]:
+        """Iterates over the positions of a file, without loading all of them at once.
+
+        Args:
+            file_path: Path to load the positions.
+
+        Returns:
+            (Generator[TextPredictionPosition, None, None]): Iterator over Text Predict-based positions.
+
+        """
+
+        file_type = os.path.splitext(file_path)[1]
+        if file_type == ".ljson":
+            return TextPredictionSequence.iter_ljson_file(file_path)
+        if file_type == ".txt":
+            return TextPredictionSequence.iter_text_file(file_path, **kwargs)
+
+        raise NotImplementedError
+
+    @staticmethod
+    def iter_ljson_file(file_path: str) -> Generator[TextPredictionPosition, None, None]:
+        """Iterates over the positions of a .ljson file.
+
+        Args:
+            file_path: Path to load the positions.
+
+        Yields:
+            (TextPredictionPosition): Text Predict-based position.
+
+        """
+
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                yield TextPredictionPosition.from_ljson(line)
+
+    @staticmethod
+    def iter_text_file(
+        file_path: str, new_document_regex: Optional[str] = "\\n\\n+"
+    ) -> Generator[TextPredictionPosition, None, None]:
+        """Iterates over the positions of a .txt file, where each character of a document is a position.
+
+        Args:
+            file_path: Path to load the positions.
+            new_document_regex: Regex to identify a new document.
+
+        Yields:
+            (TextPredictionPosition): Text Predict-based position.
+
+        """
+
+        with open(file_path, encoding="utf-8") as f:
+            text = f.read()
+
+        lines = re.split(new_document_regex, text, flags=re.DOTALL | re.MULTILINE)
+
+        for line_id, line in enumerate(lines):
+            line = line.strip()
+            line = ftfy.fix_text(line)
+
+            for char_id in range(len(line)):
+                yield TextPredictionPosition(
+                    line_id=line_id,
+                    char_id=char_id,
+                    body=line[:char_id],
+                    body_continued=line[char_id:],
+                    prediction=None,
+                    time=None,
+                )
+
     @classmethod
     def from_ljson_file(
         cls: TextPredictionSequence,
@@ -440,13 +874,8 @@ class TextPredictionSequence(OrderedDict):
 
         """
 
-        lines = []
-        with open(file_path, encoding="utf-8") as f:
-            lines = f.readlines()
-
         sequence = TextPredictionSequence(**kwargs)
-        for line in lines:
-            position = TextPredictionPosition.from_ljson(line)
+        for position in TextPredictionSequence.iter_ljson_file(file_path):
             sequence[position.unique_id] = position
 
         return sequence
@@ -469,26 +898,9 @@ class TextPredictionSequence(OrderedDict):
 
         """
 
-        with open(file_path, encoding="utf-8") as f:
-            text = f.read()
-
-        lines = re.split(new_document_regex, text, flags=re.DOTALL | re.MULTILINE)
         sequence = TextPredictionSequence(**kwargs)
-
-        for line_id, line in enumerate(lines):
-            line = line.strip()
-            line = ftfy.fix_text(line)
-
-            for char_id in range(len(line)):
-                position = TextPredictionPosition(
-                    line_id=line_id,
-                    char_id=char_id,
-                    body=line[:char_id],
-                    body_continued=line[char_id:],
-                    prediction=None,
-                    time=None,
-                )
-                sequence[position.unique_id] = position
+        for position in TextPredictionSequence.iter_text_file(file_path, new_document_regex=new_document_regex):
+            sequence[position.unique_id] = position
 
         return sequence
 
@@ -557,62 +969,7 @@ class TextPredictionSequence(OrderedDict):
 
         """
 
-        predictions = []
-        for pos in self.values():
-            prediction = pos.prediction
-
-            if prediction is not None:
-                body_continued = pos.body_continued[: len(prediction)]
-                prediction.has_matched = str(prediction) == body_continued
-
-                min_length = min(len(str(prediction)), len(body_continued))
-                last_matched_char = next(
-                    (i for i in range(min_length) if str(prediction)[i] != body_continued[i]),
-                    min_length,
-                )
-
-                length_type = prediction.length_type()
-                prediction_odict = prediction.to_odict()
-                p_accept_given_match = prediction.p_accept_given_match()
-            else:
-                body_continued, min_length, last_matched_char = True, 0, 0
-
-                prediction_odict = OrderedDict(
-                    [
-                        ("Text", ""),
-                        ("Probability", 0.0),
-                        ("Length", 0),
-                        ("EndWithCompleteWord", False),
-                        ("Match", None),
-                        ("PAccept", 0.0),
-                        ("Score", 0.0),
-                        ("CharAccepted", 0.0),
-                        ("WordCount", 0),
-                        ("Tokens", None),
-                    ]
-                )
-                length_type = ""
-                p_accept_given_match = 0.0
-
-            prediction_odict["Line"] = pos.line_id
-            prediction_odict["Char"] = pos.char_id
-            prediction_odict["BodyContinued"] = body_continued
-            prediction_odict["Type"] = length_type
-            prediction_odict["LastMatchChar"] = last_matched_char
-            prediction_odict["NextTrigger"] = pos.char_id + last_matched_char + 1
-            prediction_odict["PAcceptGivenMatch"] = p_accept_given_match
-
-            predictions.append(prediction_odict)
-
-        predictions_df = pd.DataFrame(predictions)
-        predictions_df_columns = ["Line", "Char", "Text", "BodyContinued"]
-        predictions_df_columns = (
-            predictions_df_columns
-            + predictions_df.columns.drop(predictions_df_columns + ["EndWithCompleteWord", "Tokens"]).tolist()
-        )
-        predictions_df = predictions_df[predictions_df_columns]
-
-        return predictions_df
+        return positions_to_data_frame(self.values())
 
     def calculate_triggered_predictions(
         self, min_score: float, predictions_df: Optional[pd.Series] = None
@@ -628,48 +985,37 @@ class TextPredictionSequence(OrderedDict):
 
         """
 
-        triggered_predictions = []
-
         if predictions_df is None:
             predictions_df = self.get_predictions()
 
-        # Keeps count where prediction has triggered
-        line_id = -1
-        char_id = -1
+        return calculate_triggered_predictions(predictions_df, min_score)
 
-        # Triggered is an array that denotes if suggestion is regarded as 'triggered'
-        # -1: score was too low
-        #  0: score OK, but something is being shown and current suggestion could not be shown
-        #  1: suggestion shown
-        triggered = np.full((len(predictions_df.index),), -1)
+    def calculate_loss(self, model: TextPredictModel, tokenizer: TextPredictTokenizer) -> Tuple[float, int]:
+        """Calculates the loss of sequence, summed over its tokens.
 
-        score_values = predictions_df["Score"].values
-        for i in tqdm(range(predictions_df.shape[0]), desc=f"Scoring with {min_score:.2f}"):
-            if score_values[i] < min_score:
-                continue
+        Args:
+            model: Text Predict-based model used to calculate the loss.
+            tokenizer: Text Predict-based tokenizer used to calculate the loss.
 
-            if predictions_df["Line"][i] < line_id:
-                msg = f"Incorrect order of lines in the file (current line = {line_id}, "
-                msg += f'processed line = {predictions_df["Line"][i]}; current char = {char_id}, '
-                msg += f'processed char = {predictions_df["Char"][i]}'
+        Returns:
+            (Tuple[float, int]): Summed loss and number of tokens.
 
-                raise ValueError(msg)
+        """
 
-            triggered[i] = 0
-            if predictions_df["Line"][i] > line_id or predictions_df["Char"][i] > char_id:
-                d = predictions_df.iloc[i].to_dict()
+        loss = 0.0
+        token_ids_length = 0
 
-                line_id = d["Line"]
-                char_id = d["Char"] + d["LastMatchChar"]
+        for unique_id in self._filter_keys_char_id(1):
+            text = self[unique_id].body + self[unique_id].body_continued
+            text = tokenizer.clean_text(text)
 
-                triggered_predictions.append(d)
-                triggered[i] = 1
+            token_ids = tokenizer.encode(text)
+            token_ids_length += len(token_ids)
 
-        triggered_df = pd.DataFrame(triggered_predictions)
-        triggered_column_name = f"Trigger: {min_score}"
-        predictions_df[triggered_column_name] = triggered
+            # Tokens of the whole document are scored at once
+            loss -= float(np.sum(model.get_token_log_probs(tuple(token_ids))))
 
-        return triggered_df
+        return loss, token_ids_length
 
     def calculate_perplexity(self, model: TextPredictModel, tokenizer: TextPredictTokenizer) -> float:
         """Calculates the perplexity of sequence.
@@ -683,18 +1029,7 @@ class TextPredictionSequence(OrderedDict):
 
         """
 
-        loss = 0.0
-        token_ids_length = 0
-
-        for unique_id in self._filter_keys_char_id(1):
-            text = self[unique_id].body + self[unique_id].body_continued
-            text = tokenizer.clean_text(text)
-
-            token_ids = tokenizer.encode(text)
-            token_ids_length += len(token_ids)
-
-            loss += len(token_ids) * model.get_loss(tuple(token_ids))
-
+        loss, token_ids_length = self.calculate_loss(model, tokenizer)
         perplexity = np.exp(loss / token_ids_length)
 
         return perplexity
@@ -723,55 +1058,6 @@ class TextPredictionSequence(OrderedDict):
         if self.perplexity is None:
             self.perplexity = self.calculate_perplexity(model, tokenizer)
 
-        summary = OrderedDict()
-        summary["Score"] = min_score
-        summary["TotalEvalPoints"] = len(self)
-        summary["TotalWordCount"] = self.word_count
-        summary["Perplexity"] = self.perplexity
-        summary["SuggestionsShown"] = len(triggered_df.index)
-        summary["SuggestionsMatched"] = int(np.sum(triggered_df["Match"])) if len(triggered_df.columns) else 0
-        summary["SuggestionsAccepted"] = (
-            int(np.sum(triggered_df["Match"] * triggered_df["PAcceptGivenMatch"])) if len(triggered_df.columns) else 0
-        )
-        summary["SuggestionRatePerWord"] = summary["SuggestionsShown"] / summary["TotalWordCount"]
-        summary["SuggestionRatePerChar"] = summary["SuggestionsShown"] / summary["TotalEvalPoints"]
-        summary["MatchRate"] = np.mean(triggered_df["Match"]) if len(triggered_df.columns) else 0
-        summary["AcceptRate"] = (
-            np.mean(triggered_df["Match"] * triggered_df["PAcceptGivenMatch"]) if len(triggered_df.columns) else 0
-        )
-        summary["CharMatched"] = (
-            int(np.sum(triggered_df["Match"] * triggered_df["Length"])) if len(triggered_df.columns) else 0
+        return summarize_triggered_predictions(
+            triggered_df, len(self), self.word_count, self.perplexity, min_score=min_score
         )
-        summary["CharAccepted"] = (
-            int(np.sum(triggered_df["Match"] * triggered_df["PAcceptGivenMatch"] * triggered_df["Length"]))
-            if len(triggered_df.columns)
-            else 0
-        )
-        summary["CharMatchRate"] = summary["CharMatched"] / summary["TotalEvalPoints"]
-        summary["CharAcceptRate"] = summary["CharAccepted"] / summary["TotalEvalPoints"]
-        summary["SuggestionsShownByType"] = (
-            triggered_df.groupby(["Type"]).size().to_dict() if len(triggered_df.columns) else None
-        )
-        summary["SuggestionsMatchedByType"] = (
-            triggered_df[triggered_df["Match"]].groupby(["Type"]).size().to_dict() if len(triggered_df.columns) else 0
-        )
-        summary["MatchRateByType"] = (
-            triggered_df.groupby(["Type"]).agg({"Match": "mean"}).to_dict()["Match"]
-            if len(triggered_df.columns)
-            else None
-        )
-        summary["SuggestionsShownByWordCount"] = (
-            triggered_df.groupby(["WordCount"]).size().to_dict() if len(triggered_df.columns) else None
-        )
-        summary["SuggestionsMatchedByWordCount"] = (
-            triggered_df[triggered_df["Match"]].groupby(["WordCount"]).size().to_dict()
-            if len(triggered_df.columns)
-            else None
-        )
-        summary["MatchRateByWordCount"] = (
-            triggered_df.groupby(["WordCount"]).agg({"Match": "mean"}).to_dict()["Match"]
-            if len(triggered_df.columns)
-            else None
-        )
-
-        return summary
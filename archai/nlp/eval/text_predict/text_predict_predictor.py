@@ -8,15 +8,17 @@ import copy
 import functools
 import re
 import time
-from typing import List, Optional, Tuple, Union
+from typing import Generator, List, Optional, Tuple, Union
 
-from scipy.interpolate import interp1d
+import numpy as np
 from tqdm import tqdm
 
 from archai.nlp.eval.text_predict.text_predict_model import TextPredictModel
 from archai.nlp.eval.text_predict.text_predict_prediction import (
+    TextPredictionPosition,
     TextPredictionSequence,
     TextPredictPrediction,
+    sweep_triggered_predictions,
 )
 from archai.nlp.eval.text_predict.text_predict_tokenizer import (
     SEPARATOR_TOKENS_SET,
@@ -63,6 +65,7 @@ class Predictor:
         tokenizer: TextPredictTokenizer,
         max_body_length: Optional[int] = 1000000,
         min_pred_length: Optional[int] = 6,
+        beam_width: Optional[int] = 1,
     ) -> None:
         """Overrides initialization method.
 
@@ -71,14 +74,19 @@ class Predictor:
             tokenizer: An instance of a Text Predict-based tokenizer.
             max_body_length: Maximum text to process (otherwise it will be truncated).
             min_pred_length: Minimum length (tokens) of prediction.
+            beam_width: Number of continuations kept per text at each forward pass
+                (`1` performs greedy decoding).
 
         """
 
+        assert beam_width >= 1, "`beam_width` should be a positive integer."
+
         self.model = model
         self.tokenizer = tokenizer
 
         self.max_body_length = max_body_length
         self.min_pred_length = min_pred_length
+        self.beam_width = beam_width
         self.bos_token_id = None
 
     def _truncate_text(self, text: str) -> str:
@@ -113,18 +121,34 @@ class Predictor:
         if len(input_ids) > 0 and self.tokenizer[input_ids[-1]][-1] in SEPARATOR_TOKENS_SET:
             return True
 
-        probs = self.model.get_probs(input_ids)
+        return self._check_complete_word_probs(self.model.get_next_token_probs(input_ids))
+
+    def _check_complete_word_probs(self, next_token_probs: List[float]) -> bool:
+        """Checks if the next token's probabilities complete a word according to threshold.
+
+        Args:
+            next_token_probs: Next token's probabilities of the predicted word.
+
+        Returns:
+            (bool): Whether word is complete or not.
+
+        """
+
         probs_sum = sum(
-            [prob for idx, prob in enumerate(probs) if idx in self.tokenizer.TOKENIZER_WORD_TOKEN_SEPARATOR]
+            [next_token_probs[idx] for idx in self.tokenizer.separator_tokens if idx < len(next_token_probs)]
         )
 
         return probs_sum > Predictor.COMPLETE_WORD_PROB_THRESHOLD
 
-    def _update_end_with_complete_word(self, prediction: TextPredictPrediction) -> bool:
+    def _update_end_with_complete_word(
+        self, prediction: TextPredictPrediction, next_token_probs: Optional[List[float]] = None
+    ) -> bool:
         """Updates whether prediction defines a complete word or not.
 
         Args:
             prediction: Prediction.
+            next_token_probs: Next token's probabilities of the prediction. If not supplied,
+                they are calculated (or retrieved from the cache) by the model.
 
         Returns:
             (bool): Whether prediction defines a complete word or not.
@@ -134,9 +158,13 @@ class Predictor:
         if prediction.input_ids is None or prediction.token_ids is None:
             raise ValueError(f"Unable to determine if `{prediction}` ends with a complete word.")
 
-        prediction.end_with_complete_word = self._check_end_with_complete_word(
-            tuple(prediction.input_ids + prediction.token_ids)
-        )
+        input_ids = tuple(prediction.input_ids + prediction.token_ids)
+        if next_token_probs is None or (
+            len(input_ids) > 0 and self.tokenizer[input_ids[-1]][-1] in SEPARATOR_TOKENS_SET
+        ):
+            prediction.end_with_complete_word = self._check_end_with_complete_word(input_ids)
+        else:
+            prediction.end_with_complete_word = self._check_complete_word_probs(next_token_probs)
 
         return prediction.end_with_complete_word
 
@@ -189,15 +217,12 @@ class Predictor:
         if filter_prefix_length == 0:
             filtered_tokens = [((idx,), prob, len(self.tokenizer[idx])) for idx, prob in enumerate(next_token_probs)]
         else:
-            filtered_tokens = self.tokenizer.filter_tokens(filter_prefix)
-            filtered_tokens = tuple((idx,) for idx in filtered_tokens)
+            filtered_ids = self.tokenizer.filter_tokens(filter_prefix)
+            filtered_probs = np.asarray(next_token_probs)[filtered_ids]
+            filtered_lengths = self.tokenizer.token_lengths[filtered_ids] - filter_prefix_length
             filtered_tokens = [
-                (
-                    tuple_idx,
-                    next_token_probs[tuple_idx[0]],
-                    len(self.tokenizer[tuple_idx[0]]) - filter_prefix_length,
-                )
-                for tuple_idx in filtered_tokens
+                ((idx,), prob, length)
+                for idx, prob, length in zip(filtered_ids.tolist(), filtered_probs.tolist(), filtered_lengths.tolist())
             ]
 
         filtered_tokens = tuple(sorted(filtered_tokens, key=lambda x: -x[1]))
@@ -308,14 +333,14 @@ class Predictor:
 
         return prediction
 
-    def _predict(self, text: str) -> TextPredictPrediction:
-        """Core computation to perform the prediction pipeline.
+    def _prepare_input_ids(self, text: str) -> Tuple[Tuple[int, ...], str]:
+        """Prepares the input identifiers (context) and prefix of a text.
 
         Args:
             text: Input text to be predicted.
 
         Returns:
-            (TextPredictPrediction): Instance of predicted text.
+            (Tuple[Tuple[int, ...], str]): Input identifiers and prefix.
 
         """
 
@@ -329,71 +354,193 @@ class Predictor:
         if self.bos_token_id is not None and is_full_length:
             input_ids = (self.bos_token_id,) + input_ids
 
-        prediction = self._find_initial_prediction(input_ids, prefix)
-        if prediction.probability == 0.0:
-            return TextPredictPrediction.empty()
+        return input_ids, prefix
 
-        if self._check_valid_prediction(prediction):
-            best_prediction = prediction
-        else:
-            best_prediction = TextPredictPrediction.empty()
+    def _predict_batch(self, texts: List[str]) -> List[TextPredictPrediction]:
+        """Core computation to perform the prediction pipeline over a batch of texts.
 
-        total_prob = prediction.probability
-        n_forward_pass = 0
-        while total_prob > self.MIN_PROB_CUTOFF and n_forward_pass < self.MAX_FORWARD_PASS:
-            n_forward_pass += 1
+        Each forward pass calculates the top-`beam_width` next tokens of all the continuations
+        (of every text) that have not been stopped with a single call to the model, and keeps
+        the `beam_width` most probable new continuations of each text.
 
-            next_token_id, next_prob = self.model.get_top_next_token_probs(tuple(prediction.all_ids()))
-            next_text = self.tokenizer.decode([next_token_id])
+        Args:
+            texts: Input texts to be predicted.
 
-            prediction = TextPredictPrediction.next_prediction(prediction, next_text, next_prob, next_token_id)
-            self._update_end_with_complete_word(prediction)
+        Returns:
+            (List[TextPredictPrediction]): Instances of predicted texts.
 
-            total_prob = prediction.probability
+        """
 
-            if (
-                len(prediction) >= self.min_pred_length
-                and prediction._check_valid_prediction()
-                and prediction.score() >= best_prediction.score()
-                and prediction.probability > self.MIN_PROB_CUTOFF
-            ):
-                best_prediction = prediction
+        batch_inputs = [self._prepare_input_ids(text) for text in texts]
 
-        if len(best_prediction) >= self.min_pred_length and best_prediction._check_valid_prediction():
-            return best_prediction
+        # Initial next token's probabilities are cached by the model, as well as the ones of the
+        # new predictions of each forward pass, so the cache should hold all of them
+        next_token_probs_cache = self.model.next_token_probs_cache
+        next_token_probs_cache.maxsize = max(next_token_probs_cache.maxsize, len(texts) * self.beam_width)
 
-        return TextPredictPrediction.empty()
+        self.model.get_batch_next_token_probs([input_ids for input_ids, _ in batch_inputs])
 
-    def predict(self, sequences: List[TextPredictionSequence], output_file: Optional[str] = None) -> None:
-        """Predicts a set of sequences.
+        predictions = [None] * len(texts)
+        best_predictions = [TextPredictPrediction.empty() for _ in texts]
+
+        for i, (input_ids, prefix) in enumerate(batch_inputs):
+            prediction = self._find_initial_prediction(input_ids, prefix)
+            if prediction.probability == 0.0:
+                continue
+
+            predictions[i] = prediction
+            if self._check_valid_prediction(prediction):
+                best_predictions[i] = prediction
+
+        # Continuations (beams) of each text, which start from the initial prediction
+        beams = [[prediction] if prediction is not None else [] for prediction in predictions]
+
+        for _ in range(self.MAX_FORWARD_PASS):
+            active_predictions = [
+                (i, prediction)
+                for i, beam in enumerate(beams)
+                for prediction in beam
+                if prediction.probability > self.MIN_PROB_CUTOFF
+            ]
+            if len(active_predictions) == 0:
+                break
+
+            next_tokens = self.model.get_batch_top_k_next_token_probs(
+                [tuple(prediction.all_ids()) for _, prediction in active_predictions], k=self.beam_width
+            )
+
+            candidates = [[] for _ in texts]
+            for (i, prediction), top_next_tokens in zip(active_predictions, next_tokens):
+                for next_token_id, next_prob in top_next_tokens:
+                    next_text = self.tokenizer.decode([next_token_id])
+                    candidates[i].append(
+                        TextPredictPrediction.next_prediction(prediction, next_text, next_prob, next_token_id)
+                    )
+
+            beams = [
+                sorted(text_candidates, key=lambda x: -x.probability)[: self.beam_width]
+                for text_candidates in candidates
+            ]
+
+            # Checking for complete words requires the next token's probabilities of the new predictions,
+            # which are also the inputs of the next forward pass
+            beams_probs = iter(
+                self.model.get_batch_next_token_probs(
+                    [tuple(prediction.all_ids()) for beam in beams for prediction in beam]
+                )
+            )
+
+            for i, beam in enumerate(beams):
+                for prediction in beam:
+                    self._update_end_with_complete_word(prediction, next_token_probs=next(beams_probs))
+
+                    if (
+                        len(prediction) >= self.min_pred_length
+                        and self._check_valid_prediction(prediction)
+                        and prediction.score() >= best_predictions[i].score()
+                        and prediction.probability > self.MIN_PROB_CUTOFF
+                    ):
+                        best_predictions[i] = prediction
+
+        return [
+            best_prediction
+            if len(best_prediction) >= self.min_pred_length and self._check_valid_prediction(best_prediction)
+            else TextPredictPrediction.empty()
+            for best_prediction in best_predictions
+        ]
+
+    def _predict(self, text: str) -> TextPredictPrediction:
+        """Core computation to perform the prediction pipeline.
+
+        Args:
+            text: Input text to be predicted.
+
+        Returns:
+            (TextPredictPrediction): Instance of predicted text.
+
+        """
+
+        return self._predict_batch([text])[0]
+
+    def iter_predict(
+        self,
+        sequences: List[TextPredictionSequence],
+        batch_size: Optional[int] = 1,
+        show_progress: Optional[bool] = True,
+    ) -> Generator[List[TextPredictionPosition], None, None]:
+        """Predicts a set of sequences in batches of positions.
 
         Args:
             sequences: Set of sequences to be predicted.
-            output_file: Path to the output file.
+            batch_size: Number of positions that are predicted together. When larger than 1,
+                the time of each position is the average time of its batch.
+            show_progress: Whether a progress bar should be displayed.
+
+        Yields:
+            (List[TextPredictionPosition]): Batch of positions, after they have been predicted.
 
         """
 
-        for i, pos in enumerate(tqdm(sequences.values(), desc="Predicting")):
-            start_time = time.time()
+        positions = list(sequences.values())
 
-            text = pos.body
-            if sequences.current_paragraph_only:
-                text = re.sub("^(.*\n)", "", text, flags=re.M)
-            if len(text) > sequences.max_body_length:
-                text = pos.body[(-1 * sequences.max_body_length) :]
-                text = text[text.find(" ") :]
+        with tqdm(total=len(positions), desc="Predicting", disable=not show_progress) as pbar:
+            for batch_start in range(0, len(positions), batch_size):
+                batch_positions = positions[batch_start : batch_start + batch_size]
+                start_time = time.time()
 
-            prediction = self._predict(text)
+                texts = []
+                for pos in batch_positions:
+                    text = pos.body
+                    if sequences.current_paragraph_only:
+                        text = re.sub("^(.*\n)", "", text, flags=re.M)
+                    if len(text) > sequences.max_body_length:
+                        text = pos.body[(-1 * sequences.max_body_length) :]
+                        text = text[text.find(" ") :]
+                    texts.append(text)
 
-            end_time = time.time()
-            pos.time = int(1000 * (end_time - start_time))
+                predictions = self._predict_batch(texts)
 
-            if len(prediction) >= sequences.min_pred_length and prediction.score() >= sequences.min_score:
-                pos.prediction = prediction
-            else:
-                pos.prediction = None
+                end_time = time.time()
+                pos_time = int(1000 * (end_time - start_time) / len(batch_positions))
+
+                for pos, prediction in zip(batch_positions, predictions):
+                    pos.time = pos_time
+
+                    if len(prediction) >= sequences.min_pred_length and prediction.score() >= sequences.min_score:
+                        pos.prediction = prediction
+                    else:
+                        pos.prediction = None
+
+                yield batch_positions
 
-            if output_file is not None and ((i + 1) % sequences.save_step == 0 or i == (len(sequences) - 1)):
+                pbar.update(len(batch_positions))
+
+    def predict(
+        self,
+        sequences: List[TextPredictionSequence],
+        output_file: Optional[str] = None,
+        batch_size: Optional[int] = 1,
+    ) -> None:
+        """Predicts a set of sequences.
+
+        Args:
+            sequences: Set of sequences to be predicted.
+            output_file: Path to the output file.
+            batch_size: Number of positions that are predicted together. When larger than 1,
+                the time of each position is the average time of its batch.
+
+        """
+
+        n_predicted = 0
+
+        for batch_positions in self.iter_predict(sequences, batch_size=batch_size):
+            batch_start = n_predicted
+            n_predicted += len(batch_positions)
+
+            # Saves whenever the batch crosses a multiple of `save_step` or ends the sequence
+            if output_file is not None and (
+                n_predicted // sequences.save_step > batch_start // sequences.save_step or n_predicted == len(sequences)
+            ):
                 sequences.save(output_file)
 
     def score(
@@ -413,37 +560,18 @@ class Predictor:
 
         if isinstance(min_scores, (float, int)):
             min_scores = [float(min_scores)]
-        min_scores.sort()
-
-        if expected_match_rate is not None and expected_match_rate >= 0 and expected_match_rate <= 1.0:
-            min_scores.append(None)
 
         predictions = sequences.get_predictions()
-        score_summary = []
-
-        for min_score in min_scores:
-            if min_score is None:
-                match_rate = [summ["MatchRate"] for summ in score_summary]
-                score = [summ["Score"] for summ in score_summary]
-
-                if len(match_rate) < 2:
-                    continue
-
-                f = interp1d(
-                    match_rate,
-                    score,
-                    bounds_error=False,
-                    kind="linear",
-                    fill_value="extrapolate",
-                )
-                min_score = float(f(expected_match_rate))
-
-            triggered_preds = sequences.calculate_triggered_predictions(min_score, predictions)
-            sequences.triggered_preds = triggered_preds
 
-            scored_preds = sequences.score_triggered_predictions(
-                triggered_preds, self.model, self.tokenizer, min_score=min_score
-            )
-            score_summary.append(scored_preds)
-
-        sequences.score_summary = score_summary
+        # Allows perplexity to be cached and avoids re-computation
+        if sequences.perplexity is None:
+            sequences.perplexity = sequences.calculate_perplexity(self.model, self.tokenizer)
+
+        sequences.score_summary, sequences.triggered_preds = sweep_triggered_predictions(
+            predictions,
+            min_scores,
+            len(sequences),
+            sequences.word_count,
+            sequences.perplexity,
+            expected_match_rate=expected_match_rate,
+        )
@@ -0,0 +1,275 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""Text Predict-based sharded (multi-process) prediction and scoring.
+"""
+
+import glob
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional
+
+import numpy as np
+from tqdm import tqdm
+
+from archai.nlp.eval.text_predict.text_predict_model import TextPredictModel
+from archai.nlp.eval.text_predict.text_predict_prediction import (
+    TextPredictionPosition,
+    TextPredictionSequence,
+    positions_to_data_frame,
+    sweep_triggered_predictions,
+)
+from archai.nlp.eval.text_predict.text_predict_predictor import Predictor
+from archai.nlp.eval.text_predict.text_predict_tokenizer import TextPredictTokenizer
+
+SHARDS_FILE = "shards.json"
+SHARD_PREDICTION_FILE = "preds_{:05d}.ljson"
+SHARD_STATS_FILE = "preds_{:05d}.json"
+
+# Predictor of the worker process, which owns its model (and session)
+_worker_predictor = None
+
+
+def _init_predict_worker(
+    model_fn: Callable[[], TextPredictModel],
+    tokenizer: TextPredictTokenizer,
+    predictor_kwargs: Dict[str, Any],
+) -> None:
+    global _worker_predictor
+    _worker_predictor = Predictor(model_fn(), tokenizer, **predictor_kwargs)
+
+
+def _predict_shard(
+    positions: List[TextPredictionPosition],
+    shard_file_path: str,
+    stats_file_path: str,
+    sequence_kwargs: Dict[str, Any],
+    batch_size: int,
+    predictor: Optional[Predictor] = None,
+) -> Dict[str, Any]:
+    """Predicts a shard of positions, appending each batch of predictions to the shard file.
+
+    Args:
+        positions: Positions of the shard.
+        shard_file_path: Path to the output predictions file.
+        stats_file_path: Path to the output statistics file, which is written once
+            the shard has been predicted.
+        sequence_kwargs: Keyword arguments of the sequence.
+        batch_size: Number of positions that are predicted together.
+        predictor: Predictor. If `None`, uses the predictor of the worker process.
+
+    Returns:
+        (Dict[str, Any]): Statistics of the shard.
+
+    """
+
+    predictor = predictor or _worker_predictor
+
+    sequence = TextPredictionSequence(**sequence_kwargs)
+    for position in positions:
+        sequence[position.unique_id] = position
+
+    with open(shard_file_path, "w", encoding="utf-8") as f:
+        for batch_positions in predictor.iter_predict(sequence, batch_size=batch_size, show_progress=False):
+            f.writelines([pos.to_ljson() + "\n" for pos in batch_positions])
+            f.flush()
+
+    loss, n_tokens = sequence.calculate_loss(predictor.model, predictor.tokenizer)
+    stats = {
+        "n_positions": len(sequence),
+        "word_count": sequence.word_count,
+        "loss": loss,
+        "n_tokens": n_tokens,
+    }
+
+    # Statistics are written last, so they mark the shard as complete
+    with open(stats_file_path, "w") as f:
+        json.dump(stats, f)
+
+    return stats
+
+
+def _iter_shards(
+    positions: Iterable[TextPredictionPosition], shard_size: int
+) -> Generator[List[TextPredictionPosition], None, None]:
+    positions = iter(positions)
+
+    while True:
+        shard = list(islice(positions, shard_size))
+        if not shard:
+            break
+
+        yield shard
+
+
+def predict_shards(
+    model_fn: Callable[[], TextPredictModel],
+    tokenizer: TextPredictTokenizer,
+    data_file_path: str,
+    output_dir: str,
+    num_workers: Optional[int] = 1,
+    shard_size: Optional[int] = 10000,
+    batch_size: Optional[int] = 1,
+    predictor_kwargs: Optional[Dict[str, Any]] = None,
+    sequence_kwargs: Optional[Dict[str, Any]] = None,
+) -> List[str]:
+    """Predicts the positions of a file in shards, which are dispatched to a pool of worker processes.
+
+    Positions are streamed from the file and split into shards of consecutive positions.
+    Each shard is predicted by a worker, which appends its predictions to a per-shard file.
+    Shards that have already been predicted (e.g., by an interrupted run), i.e., that have
+    both their predictions and statistics files, are skipped.
+
+    Args:
+        model_fn: A function that creates the model, which is called once by each worker.
+            It should be picklable (e.g., a module-level function or `functools.partial`).
+        tokenizer: Text Predict-based tokenizer.
+        data_file_path: Path to the input data file (.ljson or .txt).
+        output_dir: Output folder of the per-shard files.
+        num_workers: Number of worker processes. If 0, shards are predicted in the current process.
+        shard_size: Number of positions per shard.
+        batch_size: Number of positions that are predicted together.
+        predictor_kwargs: Keyword arguments of the predictor.
+        sequence_kwargs: Keyword arguments of the sequences.
+
+    Returns:
+        (List[str]): Paths to the per-shard predictions files.
+
+    """
+
+    predictor_kwargs = predictor_kwargs or {}
+    sequence_kwargs = sequence_kwargs or {}
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Shards of a previous run can only be reused if they were split in the same way
+    shards_config = {"data_file_path": os.path.abspath(data_file_path), "shard_size": shard_size}
+    shards_file_path = os.path.join(output_dir, SHARDS_FILE)
+    if os.path.exists(shards_file_path):
+        with open(shards_file_path, "r") as f:
+            if json.load(f) != shards_config:
+                for shard_file_path in glob.glob(os.path.join(output_dir, "preds_*")):
+                    os.remove(shard_file_path)
+
+    with open(shards_file_path, "w") as f:
+        json.dump(shards_config, f)
+
+    if num_workers > 0:
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_predict_worker,
+            initargs=(model_fn, tokenizer, predictor_kwargs),
+        )
+        predictor = None
+    else:
+        executor = None
+        predictor = Predictor(model_fn(), tokenizer, **predictor_kwargs)
+
+    # Bounds the number of shards (and their positions) held in memory
+    max_in_flight = 2 * max(num_workers, 1)
+    futures = deque()
+
+    shard_file_paths = []
+
+    try:
+        with tqdm(desc="Predicting shards") as pbar:
+            positions_iter = TextPredictionSequence.iter_file(data_file_path)
+
+            for shard_id, positions in enumerate(_iter_shards(positions_iter, shard_size)):
+                shard_file_path = os.path.join(output_dir, SHARD_PREDICTION_FILE.format(shard_id))
+                stats_file_path = os.path.join(output_dir, SHARD_STATS_FILE.format(shard_id))
+                shard_file_paths.append(shard_file_path)
+
+                if os.path.exists(shard_file_path) and os.path.exists(stats_file_path):
+                    pbar.update(1)
+                    continue
+
+                args = (positions, shard_file_path, stats_file_path, sequence_kwargs, batch_size)
+                if executor is None:
+                    _predict_shard(*args, predictor=predictor)
+                    pbar.update(1)
+                    continue
+
+                while len(futures) >= max_in_flight:
+                    futures.popleft().result()
+                    pbar.update(1)
+
+                futures.append(executor.submit(_predict_shard, *args))
+
+            while futures:
+                futures.popleft().result()
+                pbar.update(1)
+    finally:
+        if executor is not None:
+            # Pending shards are cancelled by hand, since `shutdown(cancel_futures=True)` requires Python 3.9
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+
+    return shard_file_paths
+
+
+def score_shards(
+    shard_file_paths: List[str],
+    min_scores: List[float],
+    expected_match_rate: Optional[float] = None,
+    output_dir: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Scores the predictions of shards, merging their triggered predictions and statistics.
+
+    Shard files are streamed in order, keeping only the meta-information about the
+    predictions (instead of the positions and their bodies) in memory.
+
+    Args:
+        shard_file_paths: Paths to the per-shard predictions files, in order.
+        min_scores: Minimum scores.
+        expected_match_rate: Expected match rate to find best score.
+        output_dir: Output folder of the scoring summary and triggered predictions.
+
+    Returns:
+        (List[Dict[str, Any]]): Summary of each minimum score.
+
+    """
+
+    n_positions, word_count, loss, n_tokens = 0, 0, 0.0, 0
+
+    for shard_file_path in shard_file_paths:
+        stats_file_path = os.path.splitext(shard_file_path)[0] + ".json"
+        with open(stats_file_path, "r") as f:
+            stats = json.load(f)
+
+        n_positions += stats["n_positions"]
+        word_count += stats["word_count"]
+        loss += stats["loss"]
+        n_tokens += stats["n_tokens"]
+
+    predictions_df = positions_to_data_frame(
+        position
+        for shard_file_path in tqdm(shard_file_paths, desc="Merging shards")
+        for position in TextPredictionSequence.iter_ljson_file(shard_file_path)
+    )
+
+    perplexity = float(np.exp(loss / n_tokens)) if n_tokens > 0 else None
+
+    score_summary, triggered_df = sweep_triggered_predictions(
+        predictions_df,
+        min_scores,
+        n_positions,
+        word_count,
+        perplexity,
+        expected_match_rate=expected_match_rate,
+    )
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+        with open(os.path.join(output_dir, "summary.json"), "w") as f:
+            f.write(json.dumps(score_summary, indent=1))
+
+        if triggered_df is not None:
+            triggered_df.to_csv(os.path.join(output_dir, "triggered_preds.csv"), index=False)
+
+    return score_summary
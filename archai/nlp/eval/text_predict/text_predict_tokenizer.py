@@ -4,17 +4,18 @@
 """Text Predict-based tokenizer.
 """
 
+import bisect
 import functools
 import re
-from typing import List, Optional, Set, Tuple, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
+import numpy as np
 from transformers.models.auto.tokenization_auto import AutoTokenizer
 
 from archai.nlp.datasets.hf.tokenizer_utils.pre_trained_tokenizer import (
     ArchaiPreTrainedTokenizerFast,
 )
 from archai.nlp.eval.eval_utils import cached_property
-from archai.nlp.eval.text_predict.text_predict_utils import LRUCache
 
 SEPARATOR_TOKENS = "Ġ \nĊ\t\.;:,'\"`<>\(\)\{\}\[\]\|\!@\#\$\%\^\&\*=\+\?/\\_\-~"
 SEPARATOR_TOKENS_SET = set(SEPARATOR_TOKENS)
@@ -24,7 +25,6 @@ class TextPredictTokenizer:
     """Wraps a tokenizer for Text Predict."""
 
     BOS_TEXT = "\n "
-    FILTER_TOKENS_CACHE_SIZE = 65536
     INVALID_TOKENS = {50256}
 
     REGEX_SPLIT = re.compile("^(.*)([" + SEPARATOR_TOKENS + "].*)$", re.MULTILINE | re.DOTALL)
@@ -40,7 +40,6 @@ class TextPredictTokenizer:
         """
 
         self.tokenizer = tokenizer
-        self.filter_tokens_cache = LRUCache(self.FILTER_TOKENS_CACHE_SIZE)
 
     def __iter__(self) -> int:
         """Provides an iterator over the tokenizer's vocabulary.
@@ -50,7 +49,7 @@ class TextPredictTokenizer:
 
         """
 
-        yield from self.tokenizer.vocab
+        yield from self.vocab
 
     def __len__(self) -> int:
         """Provides the length of vocabulary.
@@ -60,7 +59,7 @@ class TextPredictTokenizer:
 
         """
 
-        return len(self.tokenizer.vocab)
+        return len(self.vocab)
 
     def __getitem__(self, idx: int) -> str:
         """Retrieves a string-based token based on identifier.
@@ -86,6 +85,17 @@ class TextPredictTokenizer:
 
         return self.tokenizer.bos_token_id
 
+    @cached_property
+    def vocab(self) -> Dict[str, int]:
+        """Caches the tokenizer's vocabulary, which is rebuilt on every access by fast tokenizers.
+
+        Returns:
+            (Dict[str, int]): String-based tokens and their identifiers.
+
+        """
+
+        return self.tokenizer.vocab
+
     @cached_property
     def separator_tokens(self) -> Set:
         """Computes the available tokens separators.
@@ -137,60 +147,81 @@ class TextPredictTokenizer:
 
         return self.tokenizer.decode(tokens)
 
-    def _filter_tokens(self, filter_prefix: str) -> Tuple[int, ...]:
+    @cached_property
+    def prefix_index(self) -> Tuple[List[str], np.ndarray]:
+        """Computes the prefix index, i.e., the vocabulary sorted by string-based tokens.
+
+        Tokens that start with a prefix are contiguous in the index and can be found
+        with two binary searches.
+
+        Returns:
+            (Tuple[List[str], np.ndarray]): Sorted string-based tokens and their identifiers.
+
+        """
+
+        sorted_vocab = sorted(self.vocab.items())
+
+        sorted_tokens = [token for token, _ in sorted_vocab]
+        sorted_ids = np.array([idx for _, idx in sorted_vocab], dtype=np.int64)
+
+        return sorted_tokens, sorted_ids
+
+    @cached_property
+    def token_lengths(self) -> np.ndarray:
+        """Computes the length of the decoded tokens.
+
+        Returns:
+            (np.ndarray): Length of each decoded token, indexed by identifier.
+
+        """
+
+        return np.array([len(self[i]) for i in range(len(self))], dtype=np.int64)
+
+    def _filter_tokens(self, filter_prefix: str) -> np.ndarray:
         """Core computation to filter tokens according to the supplied prefix.
 
+        A token is kept if it starts with the prefix or if the prefix starts with it, which
+        costs a binary search over the prefix index and a vocabulary lookup per prefix character.
+
         Args:
             filter_prefix: Prefix to filter tokens.
 
         Returns:
-            (Tuple[int, ...]): Filtered tokens.
+            (np.ndarray): Filtered tokens.
 
         """
 
         if len(filter_prefix) > 0 and filter_prefix[0] == " ":
             filter_prefix = "Ġ" + filter_prefix[1:]
 
-        filtered_tokens = None
-        filter_prefix_len = len(filter_prefix)
+        sorted_tokens, sorted_ids = self.prefix_index
 
-        cached_filter_prefix = next(
-            (
-                filter_prefix[:i]
-                for i in reversed(range(1, len(filter_prefix) - 1))
-                if filter_prefix[:i] in self.filter_tokens_cache
-            ),
-            None,
-        )
+        # Tokens that start with the prefix, which are bounded by the prefix and
+        # the prefix followed by the largest possible character
+        start = bisect.bisect_left(sorted_tokens, filter_prefix)
+        end = bisect.bisect_left(sorted_tokens, filter_prefix + chr(0x10FFFF), lo=start)
+        filtered_tokens = sorted_ids[start:end]
 
-        if len(filter_prefix) > 0 and cached_filter_prefix is not None:
-            pre_filtered_tokens = self.filter_tokens_cache[cached_filter_prefix]
-            filtered_tokens = [
-                (idx, token)
-                for idx, token in pre_filtered_tokens
-                if token[: min(len(token), filter_prefix_len)] == filter_prefix[: min(len(token), filter_prefix_len)]
-            ]
-        else:
-            filtered_tokens = [
-                (idx, token)
-                for token, idx in self.tokenizer.vocab.items()
-                if token[: min(len(token), filter_prefix_len)] == filter_prefix[: min(len(token), filter_prefix_len)]
-            ]
+        # Tokens that are shorter than the prefix and are prefixes of it
+        vocab = self.vocab
+        shorter_tokens = [vocab[filter_prefix[:i]] for i in range(len(filter_prefix)) if filter_prefix[:i] in vocab]
+        if shorter_tokens:
+            filtered_tokens = np.concatenate((np.array(shorter_tokens, dtype=np.int64), filtered_tokens))
 
-        self.filter_tokens_cache[filter_prefix] = filtered_tokens
-        filtered_tokens = tuple(idx for idx, _ in filtered_tokens)
+        # Filtered tokens are cached and shared, thus they should not be modified
+        filtered_tokens.setflags(write=False)
 
         return filtered_tokens
 
     @functools.lru_cache(maxsize=32768)
-    def filter_tokens(self, filter_prefix: str) -> Tuple[int, ...]:
+    def filter_tokens(self, filter_prefix: str) -> np.ndarray:
         """Filters tokens according to the supplied prefix.
 
         Args:
             filter_prefix: Prefix to filter tokens.
 
         Returns:
-            (Tuple[int, ...]): Filtered tokens.
+            (np.ndarray): Identifiers of filtered tokens, which can be used to index the probabilities.
 
         """
 
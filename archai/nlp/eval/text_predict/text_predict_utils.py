@@ -4,8 +4,10 @@
 """Text Predict-based utilities, such as caching mechanism.
 """
 
-from collections import OrderedDict
-from typing import Any, Optional
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 
 class LRUCache(OrderedDict):
@@ -59,3 +61,206 @@ class LRUCache(OrderedDict):
         if len(self) > self.maxsize:
             old_key = next(iter(self))
             del self[old_key]
+
+
+class _PrefixTreeNode:
+    """Node of the prefix tree, which holds the entries that pass through it."""
+
+    __slots__ = ("children", "entries")
+
+    def __init__(self) -> None:
+        self.children: Dict[int, _PrefixTreeNode] = {}
+        self.entries: Dict[int, None] = {}
+
+
+class PrefixTreeCache:
+    """Implements a cache of past key/values indexed by a prefix tree of token identifiers.
+
+    Since the past key/values of a sequence hold the past key/values of all its prefixes,
+    a lookup returns the longest prefix of the input that is shared with any cached
+    sequence, regardless of its length. Past key/values are stored contiguously in a
+    pre-allocated ring buffer, which is bounded by a number of bytes and evicts the
+    oldest sequences when it is full.
+
+    """
+
+    def __init__(self, max_bytes: Optional[int] = 256 * 1024 * 1024) -> None:
+        """Overrides initialization method with custom arguments.
+
+        Args:
+            max_bytes: Maximum size (in bytes) of the cached past key/values.
+
+        """
+
+        self.max_bytes = max_bytes
+
+        self.root = _PrefixTreeNode()
+
+        # Ring buffer is allocated with the shape and type of the first inserted past key/values,
+        # where the first dimension indexes the tokens
+        self.buffer = None
+        self.head = 0
+
+        # Entries (in allocation order) are stored as `entry_id: (input_ids, start)`
+        self.entries: Dict[int, Tuple[Tuple[int, ...], int]] = {}
+        self.entries_order = deque()
+        self.n_entries = 0
+
+    def __len__(self) -> int:
+        """Provides the number of cached sequences.
+
+        Returns:
+            (int): Number of cached sequences.
+
+        """
+
+        return len(self.entries)
+
+    @property
+    def capacity(self) -> int:
+        """Number of tokens that fit in the ring buffer.
+
+        Returns:
+            (int): Number of tokens.
+
+        """
+
+        return 0 if self.buffer is None else self.buffer.shape[0]
+
+    def _remove(self, entry_id: int) -> None:
+        """Removes an entry from the cache.
+
+        Args:
+            entry_id: Entry identifier.
+
+        """
+
+        input_ids, _ = self.entries.pop(entry_id)
+
+        node = self.root
+        del node.entries[entry_id]
+
+        for token_id in input_ids:
+            child = node.children[token_id]
+            del child.entries[entry_id]
+
+            # Nodes without entries do not lead to any cached sequence
+            if not child.entries:
+                del node.children[token_id]
+                break
+
+            node = child
+
+    def _contains(self, input_ids: Tuple[int, ...]) -> bool:
+        """Checks whether a sequence (or a longer sequence that starts with it) is cached.
+
+        Args:
+            input_ids: Input tokens.
+
+        Returns:
+            (bool): Whether the sequence is cached.
+
+        """
+
+        node = self.root
+        for token_id in input_ids:
+            node = node.children.get(token_id, None)
+            if node is None:
+                return False
+
+        return True
+
+    def _allocate(self, length: int) -> int:
+        """Allocates a contiguous span of the ring buffer, evicting the entries that overlap it.
+
+        Args:
+            length: Number of tokens.
+
+        Returns:
+            (int): Start of the span.
+
+        """
+
+        if self.head + length > self.capacity:
+            # Entries after the head are the oldest and are evicted before wrapping around
+            while self.entries_order and self.entries[self.entries_order[0]][1] >= self.head:
+                self._remove(self.entries_order.popleft())
+            self.head = 0
+
+        start = self.head
+        while self.entries_order and start <= self.entries[self.entries_order[0]][1] < start + length:
+            self._remove(self.entries_order.popleft())
+
+        self.head = start + length
+
+        return start
+
+    def lookup(self, input_ids: Tuple[int, ...]) -> Tuple[Optional[List[np.ndarray]], int]:
+        """Retrieves the past key/values of the longest cached prefix of the input.
+
+        The prefix does not include the last token, so its outputs are always calculated.
+
+        Args:
+            input_ids: Input tokens.
+
+        Returns:
+            (Tuple[Optional[List[np.ndarray]], int]): Past key/values (per layer) and their length.
+
+        """
+
+        node = self.root
+        length = 0
+
+        for token_id in input_ids[:-1]:
+            child = node.children.get(token_id, None)
+            if child is None:
+                break
+
+            node = child
+            length += 1
+
+        if length == 0:
+            return None, 0
+
+        # Any sequence that passes through the node holds the past key/values of the prefix
+        _, start = self.entries[next(reversed(node.entries))]
+
+        past = np.moveaxis(self.buffer[start : start + length], 0, -2)
+
+        return [np.ascontiguousarray(layer_past) for layer_past in past], length
+
+    def insert(self, input_ids: Tuple[int, ...], past: List[np.ndarray]) -> None:
+        """Inserts the past key/values of a sequence in the cache.
+
+        Args:
+            input_ids: Input tokens.
+            past: Past key/values (per layer), where the second-to-last dimension indexes the tokens.
+
+        """
+
+        # Stacks layers and moves the tokens to the first dimension
+        past = np.moveaxis(np.stack(past), -2, 0)
+
+        if self.buffer is None:
+            capacity = self.max_bytes // (past[0].nbytes or 1)
+            self.buffer = np.empty((capacity,) + past.shape[1:], dtype=past.dtype)
+
+        length = len(input_ids)
+        if length == 0 or length > self.capacity or self._contains(input_ids):
+            return
+
+        start = self._allocate(length)
+        self.buffer[start : start + length] = past
+
+        entry_id = self.n_entries
+        self.n_entries += 1
+
+        self.entries[entry_id] = (tuple(input_ids), start)
+        self.entries_order.append(entry_id)
+
+        node = self.root
+        node.entries[entry_id] = None
+
+        for token_id in input_ids:
+            node = node.children.setdefault(token_id, _PrefixTreeNode())
+            node.entries[entry_id] = None
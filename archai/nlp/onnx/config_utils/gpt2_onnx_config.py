@@ -75,5 +75,6 @@ class GPT2FlexOnnxConfig(OnnxConfigWithPast):
                     for i in range(self.num_layers)
                 ]
             )
+            dummy_inputs.update(self.generate_dummy_padding_inputs(batch_size, seq_len, past_seq_len))
 
         return dummy_inputs
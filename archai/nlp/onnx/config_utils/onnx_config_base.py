@@ -188,6 +188,10 @@ class OnnxConfigWithPast(OnnxConfig):
                 # [past_key_values, batch_size, n_head, past_seq_len, d_head]
                 inputs[f"past_{i}"] = {1: "batch_size", 3: "past_seq_len"}
 
+            # Allows batching (left-padded) inputs with different past lengths
+            inputs["attention_mask"] = {0: "batch_size", 1: "total_seq_len"}
+            inputs["position_ids"] = {0: "batch_size", 1: "seq_len"}
+
         return inputs
 
     @property
@@ -245,5 +249,26 @@ class OnnxConfigWithPast(OnnxConfig):
                     for _ in range(self.num_layers)
                 ]
             )
+            dummy_inputs.update(self.generate_dummy_padding_inputs(batch_size, seq_len, past_seq_len))
 
         return dummy_inputs
+
+    def generate_dummy_padding_inputs(
+        self, batch_size: Optional[int] = 2, seq_len: Optional[int] = 8, past_seq_len: Optional[int] = 8
+    ) -> Mapping[str, torch.Tensor]:
+        """Generates the dummy attention mask and position identifiers for the ONNX exporter.
+
+        Args:
+            batch_size: Batch size.
+            seq_len: Sequence length.
+            past_seq_len: Past key/values sequence length.
+
+        Returns:
+            (Mapping[str, Any]): Keyword arguments for the model's forward.
+
+        """
+
+        return {
+            "attention_mask": torch.ones((batch_size, past_seq_len + seq_len), dtype=torch.long),
+            "position_ids": torch.arange(past_seq_len, past_seq_len + seq_len).repeat(batch_size, 1),
+        }
@@ -14,12 +14,19 @@ def gpt2_onnx_forward(
     self,
     input_ids: torch.LongTensor,
     past_key_values: Optional[Tuple[torch.FloatTensor, ...]] = None,
+    attention_mask: Optional[torch.LongTensor] = None,
+    position_ids: Optional[torch.LongTensor] = None,
 ) -> Dict[str, torch.FloatTensor]:
     """Overrides the GPT-2 forward by returning probabilities and past key/values.
 
+    The attention mask and position identifiers allow batching inputs (and past key/values)
+    of different lengths, which are left-padded so that their last tokens are aligned.
+
     Args:
         input_ids: Input tensor.
         past_key_values: Past pre-computed key/values tensor.
+        attention_mask: Attention mask over the past and input tokens.
+        position_ids: Position identifiers of the input tokens.
 
     Returns:
         (Dict[str, torch.FloatTensor]): Output probabilities and past key/values.
@@ -27,7 +34,9 @@ def gpt2_onnx_forward(
     """
 
     outputs_dict = {}
-    outputs = self.transformer(input_ids, past_key_values=past_key_values)
+    outputs = self.transformer(
+        input_ids, past_key_values=past_key_values, attention_mask=attention_mask, position_ids=position_ids
+    )
 
     last_hidden_state = outputs.last_hidden_state
     past_key_values = outputs.past_key_values
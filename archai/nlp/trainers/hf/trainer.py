@@ -3,19 +3,181 @@
 
 """Customizable trainers with huggingface/transformers."""
 
+import json
+import os
 import shutil
-from typing import Dict, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+from torch.utils.data import DataLoader
+from transformers.models.gpt2.modeling_gpt2 import GPT2Attention
 from transformers.trainer import Trainer
+from transformers.trainer_utils import PREFIX_CHECKPOINT_DIR, get_last_checkpoint
 
+from archai.nlp.datasets.hf.processors import get_packed_attention_mask
+from archai.nlp.datasets.hf.streaming import StreamingDataset
 from archai.nlp.trainers.hf.training_args import DistillerTrainingArguments
 
+# Name of the file (per process) that stores the position of a streaming training dataset
+STREAMING_STATE_NAME = "streaming_state_{}.json"
+
+
+@contextmanager
+def packed_attention(models: List[torch.nn.Module], segment_ids: torch.LongTensor) -> Generator[None, None, None]:
+    """Restricts the attention of models to the packed sequences of each row.
+
+    GPT-2-based models only accept 2D (padding) attention masks, so the block-diagonal
+    mask of the packed sequences is passed directly to their attention modules.
+
+    Args:
+        models: Models that are called within the context.
+        segment_ids: Segment identifiers of packed sequences (`0` for padding).
+
+    """
+
+    attn_modules = [module for model in models for module in model.modules() if isinstance(module, GPT2Attention)]
+    if not attn_modules:
+        raise ValueError("Packed sequences (`segment_ids`) are only supported by GPT-2-based models.")
+
+    # Padding tokens attend to themselves, so that none of the attention rows is fully masked
+    mask = get_packed_attention_mask(segment_ids)
+    mask |= torch.eye(mask.size(-1), dtype=torch.bool, device=mask.device)
+
+    dtype = next(models[0].parameters()).dtype
+    attention_mask = torch.zeros(mask.shape, dtype=dtype, device=mask.device)
+    attention_mask.masked_fill_(~mask, torch.finfo(dtype).min)
+
+    def _masked_forward(forward):
+        def _forward(*args, **kwargs):
+            kwargs["attention_mask"] = attention_mask
+            return forward(*args, **kwargs)
+
+        return _forward
+
+    for module in attn_modules:
+        module.forward = _masked_forward(module.forward)
+
+    try:
+        yield
+    finally:
+        for module in attn_modules:
+            del module.forward
+
 
 class HfTrainer(Trainer):
-    """A `Trainer` that supports customizations for running on AzureML."""
+    """A `Trainer` that supports customizations for running on AzureML.
+
+    Packed datasets (e.g., encoded with `archai.nlp.datasets.hf.processors.tokenize_packed_dataset`)
+    are supported through their `segment_ids` column, which restricts the attention to the
+    sequences of each row.
+
+    Streaming datasets (`archai.nlp.datasets.hf.streaming.StreamingDataset`) save the position
+    of the rows that have been trained on with each checkpoint, so resuming from a checkpoint
+    continues the iteration instead of skipping the already trained batches. Since they are
+    already sharded across ranks, every rank iterates over its own shard (batches are neither
+    sharded again nor dispatched from the first rank) and saves its own position.
+
+    """
+
+    def get_train_dataloader(self) -> DataLoader:
+        if not isinstance(self.train_dataset, StreamingDataset):
+            return super().get_train_dataloader()
+
+        # Bypasses `accelerator.prepare`, which would either dispatch the batches of the first rank
+        # (so only its shard is trained on) or shard the already sharded dataset again
+        return DataLoader(
+            self.train_dataset,
+            batch_size=self._train_batch_size,
+            collate_fn=self._get_collator_with_removed_columns(self.data_collator, description="training"),
+            num_workers=self.args.dataloader_num_workers,
+            pin_memory=self.args.dataloader_pin_memory,
+        )
+
+    def train(self, resume_from_checkpoint: Optional[Union[str, bool]] = None, **kwargs) -> Any:
+        if not isinstance(self.train_dataset, StreamingDataset):
+            return super().train(resume_from_checkpoint=resume_from_checkpoint, **kwargs)
+
+        checkpoint = resume_from_checkpoint
+        if isinstance(checkpoint, bool):
+            checkpoint = get_last_checkpoint(self.args.output_dir) if checkpoint else None
+
+        ignore_data_skip = self.args.ignore_data_skip
+        state_file = STREAMING_STATE_NAME.format(self.args.process_index)
+        if checkpoint is not None and os.path.isfile(os.path.join(checkpoint, state_file)):
+            state_file = os.path.join(checkpoint, state_file)
+            with open(state_file, "r") as f:
+                self.train_dataset.load_state_dict(json.load(f))
+
+            # The dataset resumes from its saved position, so trained batches should not be skipped again
+            self.args.ignore_data_skip = True
+
+        # Rows that have been trained on, which lag behind the rows prefetched by the data loader
+        self._n_streamed_rows = self.train_dataset.n_rows
+
+        try:
+            return super().train(resume_from_checkpoint=resume_from_checkpoint, **kwargs)
+        finally:
+            self.args.ignore_data_skip = ignore_data_skip
+
+    def _save_checkpoint(self, model: torch.nn.Module, trial: Any, metrics: Optional[Dict[str, float]] = None) -> None:
+        super()._save_checkpoint(model, trial, metrics=metrics)
+
+        if isinstance(self.train_dataset, StreamingDataset):
+            output_dir = os.path.join(
+                self._get_output_dir(trial=trial), f"{PREFIX_CHECKPOINT_DIR}-{self.state.global_step}"
+            )
+            os.makedirs(output_dir, exist_ok=True)
+
+            with open(os.path.join(output_dir, STREAMING_STATE_NAME.format(self.args.process_index)), "w") as f:
+                json.dump(self.train_dataset.state_dict(self._n_streamed_rows), f)
+
+    def _set_signature_columns_if_needed(self) -> None:
+        super()._set_signature_columns_if_needed()
+
+        # Keeps the segment identifiers of packed datasets, which are not model arguments
+        if "segment_ids" not in self._signature_columns:
+            self._signature_columns.append("segment_ids")
+
+    def _get_packed_models(self, model: torch.nn.Module) -> List[torch.nn.Module]:
+        """Get the models that should attend to the packed sequences of each row.
+
+        Args:
+            model: Model that is being trained or evaluated.
+
+        Returns:
+            Models.
+
+        """
+
+        return [model]
+
+    def training_step(self, model: torch.nn.Module, inputs: Dict[str, Union[torch.Tensor, Any]]) -> torch.Tensor:
+        if isinstance(self.train_dataset, StreamingDataset):
+            self._n_streamed_rows += len(next(iter(inputs.values())))
+
+        if "segment_ids" not in inputs:
+            return super().training_step(model, inputs)
+
+        inputs = dict(inputs)
+        with packed_attention(self._get_packed_models(model), inputs.pop("segment_ids").to(self.args.device)):
+            return super().training_step(model, inputs)
+
+    def prediction_step(
+        self,
+        model: torch.nn.Module,
+        inputs: Dict[str, Union[torch.Tensor, Any]],
+        prediction_loss_only: bool,
+        ignore_keys: Optional[List[str]] = None,
+    ) -> Tuple[Optional[torch.Tensor], Optional[torch.Tensor], Optional[torch.Tensor]]:
+        if "segment_ids" not in inputs:
+            return super().prediction_step(model, inputs, prediction_loss_only, ignore_keys=ignore_keys)
+
+        inputs = dict(inputs)
+        with packed_attention(self._get_packed_models(model), inputs.pop("segment_ids").to(self.args.device)):
+            return super().prediction_step(model, inputs, prediction_loss_only, ignore_keys=ignore_keys)
 
     def _rotate_checkpoints(self, use_mtime: Optional[bool] = False, output_dir: Optional[str] = None) -> None:
         """Rotate checkpoints and cache them to Azure Storage.
@@ -85,6 +247,9 @@ class HfDistillerTrainer(HfTrainer):
 
         super().__init__(**kwargs)
 
+    def _get_packed_models(self, model: torch.nn.Module) -> List[torch.nn.Module]:
+        return [model, self.teacher_model]
+
     def compute_loss(
         self,
         model: torch.nn.Module,
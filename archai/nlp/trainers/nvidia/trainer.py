@@ -7,17 +7,19 @@ import copy
 import itertools
 import math
 import os
-import shutil
 import sys
 import time
+from contextlib import nullcontext
 from typing import Any, Dict, Iterator, Optional, Tuple
 
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 from packaging import version
 from torch.nn.parallel import DistributedDataParallel
 
+from archai.common.async_checkpoint import AsyncCheckpointer, atomic_copy, atomic_save
 from archai.nlp import logging_utils
 from archai.nlp.datasets.nvidia import distributed_utils
 from archai.nlp.datasets.nvidia.corpus import load_corpus
@@ -41,6 +43,7 @@ def save_checkpoint(
     prefix: Optional[str] = None,
     save_all_checkpoints: Optional[bool] = False,
     is_best_model: Optional[bool] = False,
+    checkpointer: Optional[AsyncCheckpointer] = None,
 ) -> None:
     """Save a checkpoint that holds enough information to resume the training.
 
@@ -65,6 +68,9 @@ def save_checkpoint(
         prefix: Prefix which should be added to the checkpoint's file name.
         save_all_checkpoints: Whether all `eval_steps` steps should be saved.
         is_best_model: Whether best model should be saved.
+        checkpointer: Asynchronous checkpointer. If supplied, states are snapshotted
+            and the checkpoint is written in the background, so callers should wait for
+            the checkpointer (or use it as a context manager) before exiting.
 
     """
 
@@ -83,22 +89,22 @@ def save_checkpoint(
         checkpoint_path = os.path.join(output_dir, checkpoint_name)
 
         if rank == 0:
-            logger.info(f"Saving checkpoint: {checkpoint_path}")
-            torch.save(state, checkpoint_path)
-
+            copy_paths = []
             if is_best_model:
-                checkpoint_step_name = prefix + "checkpoint-best.pt"
-                checkpoint_step_path = os.path.join(output_dir, checkpoint_step_name)
-
-                logger.info(f"Saving checkpoint: {checkpoint_step_path}")
-                shutil.copy(checkpoint_path, checkpoint_step_path)
-
+                copy_paths.append(os.path.join(output_dir, prefix + "checkpoint-best.pt"))
             if save_all_checkpoints:
-                checkpoint_step_name = prefix + f"checkpoint-{trainer_state['step']}.pt"
-                checkpoint_step_path = os.path.join(output_dir, checkpoint_step_name)
+                copy_paths.append(os.path.join(output_dir, prefix + f"checkpoint-{trainer_state['step']}.pt"))
 
-                logger.info(f"Saving checkpoint: {checkpoint_step_path}")
-                shutil.copy(checkpoint_path, checkpoint_step_path)
+            logger.info(f"Saving checkpoint: {checkpoint_path}")
+            for copy_path in copy_paths:
+                logger.info(f"Saving checkpoint: {copy_path}")
+
+            if checkpointer is not None:
+                checkpointer.save(state, checkpoint_path, copy_paths=copy_paths)
+            else:
+                atomic_save(state, checkpoint_path)
+                for copy_path in copy_paths:
+                    atomic_copy(checkpoint_path, copy_path)
 
 
 class NvidiaTrainer:
@@ -137,6 +143,11 @@ class NvidiaTrainer:
 
         self.model.to(self.args.device)
 
+        self.checkpointer = AsyncCheckpointer() if self.args.save_async_checkpoints else None
+
+        # Half-width of the 95% confidence interval of the latest evaluation loss
+        self.eval_loss_ci = None
+
         self.trainer_state = {
             "iterator": 0,
             "epoch": 0,
@@ -298,9 +309,12 @@ class NvidiaTrainer:
 
     def training_step_chunk(
         self, input_ids: torch.LongTensor, labels: torch.LongTensor, autocast: torch.autocast
-    ) -> float:
+    ) -> torch.Tensor:
         """Perform the training step of a single chunk.
 
+        The loss is returned as a device tensor, so that the host does not wait for the
+        device and can keep enqueuing work.
+
         Args:
             input_ids: Input data chunk.
             labels: Input labels chunk.
@@ -308,7 +322,7 @@ class NvidiaTrainer:
                 fp16 or bf16 precision.
 
         Returns:
-            Training loss chunk.
+            Training loss chunk (detached scalar tensor).
 
         """
 
@@ -321,7 +335,7 @@ class NvidiaTrainer:
         else:
             loss.backward()
 
-        return loss.float().item()
+        return loss.detach().float()
 
     def training_step(
         self,
@@ -334,6 +348,9 @@ class NvidiaTrainer:
     ) -> None:
         """Perform the training over the supplied data loaders.
 
+        If checkpoints are saved in the background (`save_async_checkpoints`), callers other
+        than `train` should wait for `checkpointer` before exiting.
+
         Args:
             train_dataloader: Training data iterator.
             eval_dataloader: Validation data iterator.
@@ -346,14 +363,19 @@ class NvidiaTrainer:
 
         self.model.train()
 
-        train_loss, log_step, n_labels_tokens = 0.0, 0, 0
+        # Training loss is accumulated on the device and only retrieved when logging
+        train_loss = torch.zeros((), device=self.args.device)
+        log_step, n_labels_tokens = 0, 0
         best_eval_loss = self.trainer_state["best_eval_loss"]
 
         start_time = time.time()
 
         # `lm1b` uses a different style of data loader
         if self.args.dataset != "lm1b":
-            train_iterator = train_dataloader.get_fixlen_iter(start=iterator)
+            if self.args.iterator_varlen:
+                train_iterator = train_dataloader.get_varlen_iter(start=iterator)
+            else:
+                train_iterator = train_dataloader.get_fixlen_iter(start=iterator)
         else:
             train_iterator = train_dataloader
 
@@ -416,16 +438,21 @@ class NvidiaTrainer:
 
                 lr = self.optimizer.param_groups[0]["lr"]
 
-                loss = train_loss / log_step
-                loss = distributed_utils.all_reduce(loss, op="mean")
-
-                batch_time = elapsed_time / log_step
-                batch_time = distributed_utils.all_reduce(batch_time, op="max")
+                # Loss, throughput and batch time are reduced with a single collective (summed), where
+                # each rank writes its batch time to its own slot, so the slowest rank can be taken
+                # afterwards. Converting them is the only point where the host waits for the device
+                world_size = distributed_utils.get_world_size()
+                log_metrics = torch.zeros(2 + world_size, device=train_loss.device)
+                log_metrics[0] = train_loss / log_step
+                log_metrics[1] = n_labels_tokens / elapsed_time
+                log_metrics[2 + distributed_utils.get_rank()] = elapsed_time / log_step
+                log_metrics = distributed_utils.all_reduce_tensor(log_metrics, op="sum")
 
-                throughput = n_labels_tokens / elapsed_time
-                throughput = distributed_utils.all_reduce(throughput, op="sum")
+                loss, throughput, *batch_times = log_metrics.tolist()
+                loss, batch_time = loss / world_size, max(batch_times)
 
-                train_loss, log_step, n_labels_tokens = 0.0, 0, 0
+                train_loss.zero_()
+                log_step, n_labels_tokens = 0, 0
 
                 self.trainer_state["log_history"].append(
                     {
@@ -451,8 +478,10 @@ class NvidiaTrainer:
 
             # Evaluation and checkpoint
             if (do_periodic_eval or is_final_step) and self.args.do_eval:
-                eval_loss, eval_time = self.evaluation_step(eval_dataloader)
-                eval_loss = distributed_utils.all_reduce(eval_loss, op="mean")
+                eval_loss, eval_time = self.evaluation_step(
+                    eval_dataloader, max_batches=self.args.eval_max_batches, seed=self.args.seed + step
+                )
+                eval_loss_ci = self.eval_loss_ci
 
                 self.trainer_state["log_history"].append(
                     {
@@ -460,19 +489,22 @@ class NvidiaTrainer:
                         "eval_idx": (step // self.args.eval_steps) - 1,
                         "eval_runtime": eval_time,
                         "eval_loss": eval_loss,
+                        "eval_loss_ci": eval_loss_ci,
                         "eval_ppl": math.exp(eval_loss),
                         "step": step,
                     }
                 )
 
+                # Subclasses that override `evaluation_step` might not compute the confidence interval
+                eval_loss_ci_str = f" ± {eval_loss_ci:.3f}" if eval_loss_ci is not None else ""
                 logger.info(
                     f"Eval: {(step // self.args.eval_steps) - 1} | "
                     f"Step: {step} | Time: {eval_time:.2f}s | "
-                    f"Loss: {eval_loss:.3f} | PPL: {math.exp(eval_loss):.3f}"
+                    f"Loss: {eval_loss:.3f}{eval_loss_ci_str} | PPL: {math.exp(eval_loss):.3f}"
                 )
 
                 iterator = train_dataloader.last_iter
-                save_model = copy.deepcopy(self.model)
+                save_model = self.model
                 prefix = ""
 
                 self.trainer_state["iterator"] = iterator
@@ -480,9 +512,9 @@ class NvidiaTrainer:
                 self.trainer_state["batch"] = batch
                 self.trainer_state["step"] = step
 
-                # Model needs to be converted back to FP32 when using QAT
+                # Model needs to be converted back to FP32 (in a copy) when using QAT
                 if self.args.qat:
-                    save_model = qat_to_float_modules(save_model)
+                    save_model = qat_to_float_modules(copy.deepcopy(save_model))
                     prefix = "qat-"
 
                 # Save original FP32 model when using MixedQAT
@@ -507,6 +539,7 @@ class NvidiaTrainer:
                     prefix=prefix,
                     save_all_checkpoints=self.args.save_all_checkpoints,
                     is_best_model=is_best_model,
+                    checkpointer=self.checkpointer,
                 )
 
             if is_final_step:
@@ -548,31 +581,75 @@ class NvidiaTrainer:
         logger.debug(f"Training arguments: {self.args.to_dict()}")
 
         start_time = time.time()
-        try:
-            for epoch in itertools.count(start=start_epoch):
-                if self.args.iterator_roll:
-                    train_dataloader.roll(seed=self.args.seed + epoch)
 
-                step = self.training_step(train_dataloader, eval_dataloader, iterator, epoch, start_batch, step)
+        # Waits for checkpoints that are still being saved, even if the training fails
+        with self.checkpointer or nullcontext():
+            try:
+                for epoch in itertools.count(start=start_epoch):
+                    if self.args.iterator_roll:
+                        train_dataloader.roll(seed=self.args.seed + epoch)
+
+                    step = self.training_step(train_dataloader, eval_dataloader, iterator, epoch, start_batch, step)
 
-                iterator, start_batch = 0, 0
+                    iterator, start_batch = 0, 0
 
-                if step == self.args.max_steps:
-                    logger.info("End of training ...")
-                    break
+                    if step == self.args.max_steps:
+                        logger.info("End of training ...")
+                        break
+
+            except KeyboardInterrupt:
+                logger.info("Exiting from training ...")
 
-        except KeyboardInterrupt:
-            logger.info("Exiting from training ...")
         end_time = time.time()
 
         train_time = end_time - start_time
         logger.info(f"Training time: {train_time:.3f} seconds")
 
-    def evaluation_step(self, eval_dataloader: Iterator) -> Tuple[float, float]:
+    def _iter_eval_batches(self, eval_dataloader: Iterator, max_batches: Optional[int], seed: int) -> Iterator:
+        """Iterate over (a random subsample of) the evaluation batches.
+
+        Args:
+            eval_dataloader: Evaluation-related data loader.
+            max_batches: Maximum number of batches. If `None`, iterates over all batches.
+            seed: Random seed used to sample the batches, which should be the same across ranks.
+
+        Returns:
+            Iterator over the batches.
+
+        """
+
+        if max_batches is None:
+            return iter(eval_dataloader)
+
+        # Ordered iterators can gather any batch, so batches are uniformly sampled
+        # from the ones after the warmup (which are not evaluated)
+        if hasattr(eval_dataloader, "get_batch"):
+            warmup_elems = getattr(eval_dataloader, "warmup_elems", 0)
+            batch_starts = np.arange(warmup_elems, eval_dataloader.n_cols - 1, eval_dataloader.bptt)
+
+            if len(batch_starts) > max_batches:
+                rng = np.random.default_rng(seed)
+                batch_starts = np.sort(rng.choice(batch_starts, size=max_batches, replace=False))
+
+            return (eval_dataloader.get_batch(int(i)) for i in batch_starts)
+
+        return itertools.islice((batch for batch in eval_dataloader if batch[3]), max_batches)
+
+    def evaluation_step(
+        self, eval_dataloader: Iterator, max_batches: Optional[int] = None, seed: Optional[int] = 0
+    ) -> Tuple[float, float]:
         """Perform the evaluation over the supplied data loader.
 
+        Each rank evaluates its own shard of the data loader, and the token-weighted
+        losses are reduced across ranks with a single collective at the end. The half-width
+        of the loss' 95% confidence interval (based on the variance of the batches' losses)
+        is stored in `eval_loss_ci`. If no batch is evaluated, both are `nan`.
+
         Args:
             eval_dataloader: Evaluation-related data loader.
+            max_batches: Maximum number of (randomly sampled) batches to be evaluated.
+                If `None`, evaluates all batches.
+            seed: Random seed used to sample the batches.
 
         Returns:
             Evaluation loss and time.
@@ -581,16 +658,33 @@ class NvidiaTrainer:
 
         self.model.eval()
 
-        eval_loss, n_tokens = 0.0, 0
         start_time = time.time()
+
+        # Token-weighted loss, number of tokens, batches' losses (and squared losses) and number of batches
+        eval_stats = torch.zeros(5, dtype=torch.float64, device=self.args.device)
+
         with torch.no_grad():
-            for _, (input_ids, _, _, warm) in enumerate(eval_dataloader):
-                loss = self.model(input_ids, labels=input_ids)[0]
+            for input_ids, _, _, warm in self._iter_eval_batches(eval_dataloader, max_batches, seed):
+                if not warm:
+                    continue
+
+                loss = self.model(input_ids, labels=input_ids)[0].float().mean().double()
                 tokens = input_ids.numel()
-                if warm:
-                    eval_loss += tokens * loss.float().mean().item()
-                    n_tokens += tokens
-            eval_loss /= n_tokens
+
+                eval_stats += torch.stack((tokens * loss, loss.new_tensor(tokens), loss, loss**2, loss.new_tensor(1)))
+
+        eval_loss_sum, n_tokens, batch_loss_sum, batch_loss_sq_sum, n_batches = distributed_utils.all_reduce_tensor(
+            eval_stats, op="sum"
+        ).tolist()
+
+        if n_batches > 0:
+            eval_loss = eval_loss_sum / n_tokens
+
+            batch_loss_var = max(0.0, batch_loss_sq_sum / n_batches - (batch_loss_sum / n_batches) ** 2)
+            self.eval_loss_ci = 1.96 * math.sqrt(batch_loss_var / max(1.0, n_batches - 1))
+        else:
+            eval_loss = self.eval_loss_ci = math.nan
+
         end_time = time.time()
 
         self.model.train()
@@ -609,6 +703,10 @@ class NvidiaTrainer:
 
         """
 
+        # Checkpoints saved by steps outside of `train` are written before the evaluation
+        if self.checkpointer is not None:
+            self.checkpointer.wait()
+
         if not eval_dataloader:
             eval_dataloader = self.get_dataloader("test")
 
@@ -617,6 +715,7 @@ class NvidiaTrainer:
         eval_metrics = {
             "eval_time": eval_time,
             "eval_loss": eval_loss,
+            "eval_loss_ci": self.eval_loss_ci,
             "eval_ppl": math.exp(eval_loss),
             "eval_bpc": eval_loss / math.log(2),
         }
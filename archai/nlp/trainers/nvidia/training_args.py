@@ -5,7 +5,7 @@
 
 import os
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import numpy as np
 import torch
@@ -26,7 +26,9 @@ class NvidiaTrainingArguments:
         logging_steps: Number of steps between logs.
         do_eval: Whether to enable evaluation.
         eval_steps: Number of steps between evaluations.
+        eval_max_batches: Maximum number of (randomly sampled) batches used by evaluations during training.
         save_all_checkpoints: Whether to save all checkpoints from `eval_steps` steps.
+        save_async_checkpoints: Whether checkpoints should be saved in the background.
         dataset: Name of the dataset.
         dataset_dir: Dataset folder.
         dataset_cache_dir: Dataset cache folder.
@@ -34,6 +36,7 @@ class NvidiaTrainingArguments:
         vocab: Name of the tokenizer.
         vocab_size: Size of the vocabulary.
         iterator_roll: Whether iterator should be rolled.
+        iterator_varlen: Whether iterator should use variable-length sequences.
         global_batch_size: Global batch size.
         per_device_global_batch_size: Individual GPU batch size.
         seq_len: Sequence length.
@@ -76,10 +79,19 @@ class NvidiaTrainingArguments:
 
     eval_steps: int = field(default=100, metadata={"help": "Number of steps between evaluations."})
 
+    eval_max_batches: Optional[int] = field(
+        default=None,
+        metadata={"help": "Maximum number of (randomly sampled) batches used by evaluations during training."},
+    )
+
     save_all_checkpoints: bool = field(
         default=False, metadata={"help": "Whether to save all checkpoints from `eval_steps` steps."}
     )
 
+    save_async_checkpoints: bool = field(
+        default=False, metadata={"help": "Whether checkpoints should be saved in the background."}
+    )
+
     dataset: str = field(default="wt103", metadata={"help": "Name of the dataset."})
 
     dataset_dir: str = field(default="", metadata={"help": "Dataset folder."})
@@ -94,6 +106,10 @@ class NvidiaTrainingArguments:
 
     iterator_roll: bool = field(default=True, metadata={"help": "Whether iterator should be rolled."})
 
+    iterator_varlen: bool = field(
+        default=False, metadata={"help": "Whether iterator should use variable-length sequences."}
+    )
+
     global_batch_size: int = field(default=256, metadata={"help": "Global batch size."})
 
     per_device_global_batch_size: int = field(default=None, metadata={"help": "Individual GPU batch size."})
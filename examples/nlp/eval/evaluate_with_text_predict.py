@@ -109,6 +109,22 @@ def parse_args() -> argparse.Namespace:
         help="Expected match rate..",
     )
 
+    parser.add_argument(
+        "-bsz",
+        "--batch_size",
+        type=int,
+        default=1,
+        help="Number of positions that are predicted together.",
+    )
+
+    parser.add_argument(
+        "-bw",
+        "--beam_width",
+        type=int,
+        default=1,
+        help="Number of continuations kept per position (1 for greedy decoding).",
+    )
+
     return parser.parse_args()
 
 
@@ -141,4 +157,6 @@ if __name__ == "__main__":
         max_score=args.max_score,
         score_step=args.score_step,
         expected_match_rate=args.expected_match_rate,
+        batch_size=args.batch_size,
+        beam_width=args.beam_width,
     )
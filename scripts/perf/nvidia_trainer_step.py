@@ -0,0 +1,79 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""Benchmarks the step time of `NvidiaTrainer`-style training steps on a small model,
+comparing a host synchronization per gradient accumulation chunk (`loss.item()`)
+against accumulating the loss on the device and retrieving it once per logging interval.
+"""
+
+import argparse
+import time
+
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+
+
+def run(model: torch.nn.Module, input_ids: torch.LongTensor, args: argparse.Namespace, sync_every_chunk: bool) -> float:
+    optimizer = torch.optim.SGD(model.parameters(), lr=1e-3)
+    train_loss = torch.zeros((), device=input_ids.device) if not sync_every_chunk else 0.0
+
+    def _step() -> None:
+        nonlocal train_loss
+
+        for param in model.parameters():
+            param.grad = None
+
+        for input_ids_chunk in torch.chunk(input_ids, args.gradient_accumulation_steps, 0):
+            loss = model(input_ids_chunk, labels=input_ids_chunk)[0] / args.gradient_accumulation_steps
+            loss.backward()
+
+            train_loss += loss.float().item() if sync_every_chunk else loss.detach().float()
+
+        torch.nn.utils.clip_grad_norm_(model.parameters(), 0.25)
+        optimizer.step()
+
+    for _ in range(args.n_warmup_steps):
+        _step()
+
+    if input_ids.is_cuda:
+        torch.cuda.synchronize()
+    start_time = time.time()
+
+    for step in range(1, args.n_steps + 1):
+        _step()
+
+        if step % args.logging_steps == 0:
+            float(train_loss)
+
+    if input_ids.is_cuda:
+        torch.cuda.synchronize()
+
+    return (time.time() - start_time) / args.n_steps
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the step time with and without per-chunk synchronizations.")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--batch_size", type=int, default=16)
+    parser.add_argument("--seq_len", type=int, default=64)
+    parser.add_argument("--gradient_accumulation_steps", type=int, default=8)
+    parser.add_argument("--n_layer", type=int, default=2)
+    parser.add_argument("--n_embd", type=int, default=64)
+    parser.add_argument("--n_steps", type=int, default=50)
+    parser.add_argument("--n_warmup_steps", type=int, default=5)
+    parser.add_argument("--logging_steps", type=int, default=10)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=1000, n_positions=args.seq_len, n_embd=args.n_embd, n_layer=args.n_layer, n_head=2)
+    model = GPT2LMHeadModel(config).to(args.device)
+    input_ids = torch.randint(0, config.vocab_size, (args.batch_size, args.seq_len), device=args.device)
+
+    sync_time = run(model, input_ids, args, sync_every_chunk=True)
+    async_time = run(model, input_ids, args, sync_every_chunk=False)
+
+    print(f"Device: {args.device} | Gradient accumulation steps: {args.gradient_accumulation_steps}")
+    print(f"Synchronization per chunk: {sync_time * 1000:.2f} ms/step")
+    print(f"Synchronization per logging interval: {async_time * 1000:.2f} ms/step")
+    print(f"Speedup: {sync_time / async_time:.2f}x")
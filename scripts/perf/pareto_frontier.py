@@ -0,0 +1,125 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""Benchmarks the vectorized Pareto-frontier and non-dominated sorting engine
+against the previous pure-Python implementations."""
+
+import argparse
+from time import perf_counter
+from typing import Any, Callable, List, Tuple
+
+import numpy as np
+
+from archai.discrete_search.utils.multi_objective import (
+    _find_non_dominated_sorting,
+    _find_pareto_frontier_points,
+)
+
+
+def legacy_find_pareto_frontier_points(all_points: np.ndarray) -> List[int]:
+    pareto_inds = []
+    dim = all_points.shape[1]
+    _, unique_indices = np.unique(all_points, axis=0, return_index=True)
+
+    for i in unique_indices:
+        this_point = all_points[i, :]
+        is_pareto = True
+
+        for j in unique_indices:
+            if j == i:
+                continue
+
+            diff = this_point - all_points[j, :]
+            if sum(diff >= 0) == dim:
+                is_pareto = False
+                break
+
+        if is_pareto:
+            pareto_inds.append(i)
+
+    return pareto_inds
+
+
+def legacy_find_non_dominated_sorting(all_points: np.ndarray) -> List[np.ndarray]:
+    def dominates(x, y):
+        for i in range(len(x)):
+            if y[i] < x[i]:
+                return False
+        return True
+
+    def find_front_rank(points, idx, fronts):
+        num_found_fronts = len(fronts)
+        rank = 0
+        current = points[idx]
+
+        while True:
+            if num_found_fronts == 0:
+                return 0
+
+            solutions = points[fronts[rank][::-1]]
+            if not any(dominates(s, current) for s in solutions):
+                return rank
+
+            rank += 1
+            if rank >= num_found_fronts:
+                return num_found_fronts
+
+    lex_sorting = np.lexsort(all_points.T[::-1])
+    all_points = all_points.copy()[lex_sorting]
+    fronts = []
+
+    for idx in range(all_points.shape[0]):
+        front_rank = find_front_rank(all_points, idx, fronts)
+        if front_rank >= len(fronts):
+            fronts.append([])
+        fronts[front_rank].append(idx)
+
+    return [lex_sorting[front] for front in fronts]
+
+
+def timeit(fn: Callable, *args) -> Tuple[float, Any]:
+    start = perf_counter()
+    result = fn(*args)
+    return perf_counter() - start, result
+
+
+def _same_fronts(a: List[np.ndarray], b: List[np.ndarray]) -> bool:
+    return len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks Pareto-frontier and non-dominated sorting.')
+    parser.add_argument('--num_points', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--num_objectives', type=int, nargs='+', default=[2, 3])
+    parser.add_argument('--max_legacy_points', type=int, default=10000,
+                        help='Skips legacy implementations above this number of points.')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(args.seed)
+
+    print(f'{"task":>8} {"#points":>8} {"#objs":>6} {"legacy (s)":>12} {"vectorized (s)":>15} {"speedup":>8}')
+
+    for num_objectives in args.num_objectives:
+        for num_points in args.num_points:
+            # Rounds values to exercise duplicated points and ties
+            points = np.round(rng.rand(num_points, num_objectives), 3)
+            run_legacy = num_points <= args.max_legacy_points
+
+            for task, new_fn, legacy_fn, check_fn in [
+                ('pareto', _find_pareto_frontier_points, legacy_find_pareto_frontier_points,
+                 lambda a, b: list(a) == list(b)),
+                ('nds', _find_non_dominated_sorting, legacy_find_non_dominated_sorting, _same_fronts)
+            ]:
+                new_time, new_result = timeit(new_fn, points)
+                legacy_time, speedup = float('nan'), float('nan')
+
+                if run_legacy:
+                    legacy_time, legacy_result = timeit(legacy_fn, points)
+                    speedup = legacy_time / new_time
+                    assert check_fn(new_result, legacy_result), f'{task} results differ from legacy implementation.'
+
+                print(
+                    f'{task:>8} {num_points:>8} {num_objectives:>6} '
+                    f'{legacy_time:>12.4f} {new_time:>15.4f} {speedup:>8.1f}'
+                )
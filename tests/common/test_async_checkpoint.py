@@ -0,0 +1,58 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+
+import torch
+
+from archai.common.async_checkpoint import AsyncCheckpointer, atomic_save
+
+
+def test_atomic_save(tmp_path):
+    path = str(tmp_path / "checkpoint.pt")
+    atomic_save({"a": torch.ones(2)}, path)
+
+    assert torch.equal(torch.load(path)["a"], torch.ones(2))
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_async_checkpointer(tmp_path):
+    model = torch.nn.Linear(4, 2)
+    state = {"model_state": model.state_dict(), "trainer_state": {"step": 1, "log_history": [{"loss": 1.0}]}}
+    expected_weight = model.weight.detach().clone()
+
+    checkpointer = AsyncCheckpointer(max_in_flight=2)
+    path, copy_path = str(tmp_path / "checkpoint-last.pt"), str(tmp_path / "checkpoint-best.pt")
+    checkpointer.save(state, path, copy_paths=[copy_path])
+
+    # Assert that the checkpoint holds a snapshot of the state, unaffected by later updates
+    with torch.no_grad():
+        model.weight.add_(1.0)
+    state["trainer_state"]["log_history"].append({"loss": 0.5})
+
+    checkpointer.wait()
+
+    for checkpoint_path in [path, copy_path]:
+        checkpoint = torch.load(checkpoint_path)
+        assert torch.equal(checkpoint["model_state"]["weight"], expected_weight)
+        assert checkpoint["trainer_state"]["log_history"] == [{"loss": 1.0}]
+
+    # Assert that buffers are reused across saves of the same slot
+    buffers = dict(checkpointer._buffers[0])
+    checkpointer.save(state, path)
+    checkpointer.save(state, path)
+    checkpointer.wait()
+
+    assert all(checkpointer._buffers[0][k] is v for k, v in buffers.items())
+    assert torch.equal(torch.load(path)["model_state"]["weight"], model.weight.detach())
+
+
+def test_async_checkpointer_context(tmp_path):
+    path = str(tmp_path / "checkpoint-last.pt")
+
+    # Assert that in-flight checkpoints are written when the context is exited
+    with AsyncCheckpointer() as checkpointer:
+        future = checkpointer.save({"a": torch.ones(2)}, path)
+
+    assert future.done()
+    assert torch.equal(torch.load(path)["a"], torch.ones(2))
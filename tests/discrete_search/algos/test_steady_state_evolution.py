@@ -0,0 +1,108 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import random
+from typing import List, Optional, Tuple
+
+from overrides import overrides
+
+from archai.discrete_search import ArchaiModel, AsyncObjective, Objective
+from archai.discrete_search.algos.steady_state_evolution import SteadyStateEvolutionSearch
+from archai.discrete_search.api.search_space import EvolutionarySearchSpace
+
+
+class IntegerSearchSpace(EvolutionarySearchSpace):
+    def __init__(self, seed: int = 1):
+        self.rng = random.Random(seed)
+
+    @overrides
+    def random_sample(self) -> ArchaiModel:
+        return ArchaiModel(None, str(self.rng.randint(0, 10_000)))
+
+    @overrides
+    def save_arch(self, model, path):
+        with open(path, "w") as f:
+            f.write(model.archid)
+
+    @overrides
+    def load_arch(self, path):
+        with open(path) as f:
+            return ArchaiModel(None, f.read())
+
+    @overrides
+    def save_model_weights(self, model, path):
+        pass
+
+    @overrides
+    def load_model_weights(self, model, path):
+        pass
+
+    @overrides
+    def mutate(self, arch):
+        return ArchaiModel(None, str(max(0, int(arch.archid) + self.rng.randint(-50, 50))))
+
+    @overrides
+    def crossover(self, arch_list):
+        return ArchaiModel(None, str(sum(int(a.archid) for a in arch_list) // len(arch_list)))
+
+
+class DistanceObjective(Objective):
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        return abs(int(arch.archid) - 5_000) / 5_000
+
+
+class SlowAsyncObjective(AsyncObjective):
+    def __init__(self):
+        self.jobs = []
+        self.fetched = set()
+        self.max_pending = 0
+
+    @overrides
+    def send(self, arch, dataset, budget=None):
+        self.jobs.append(float(arch.archid))
+        self.max_pending = max(self.max_pending, len(self.jobs) - len(self.fetched))
+
+    @overrides
+    def fetch_all(self) -> List[Optional[float]]:
+        results = self.jobs
+        self.jobs, self.fetched = [], set()
+
+        return results
+
+    @overrides
+    def fetch_ready(self, timeout: Optional[float] = None) -> List[Tuple[int, Optional[float]]]:
+        # Finishes the oldest pending job
+        pending = [i for i in range(len(self.jobs)) if i not in self.fetched]
+
+        if not pending:
+            return []
+
+        self.fetched.add(pending[0])
+        ready = [(pending[0], self.jobs[pending[0]])]
+
+        if len(self.fetched) == len(self.jobs):
+            self.jobs, self.fetched = [], set()
+
+        return ready
+
+
+def test_steady_state_evolution_search(tmp_path):
+    async_obj = SlowAsyncObjective()
+    searcher = SteadyStateEvolutionSearch(
+        IntegerSearchSpace(), {"distance": DistanceObjective(), "size": async_obj}, None,
+        str(tmp_path), num_evals=40, max_in_flight=4, init_num_models=6, save_every=10
+    )
+    search_state = searcher.search()
+
+    # Assert that the evaluation budget is respected, architectures are not
+    # evaluated twice and the number of concurrent evaluations is bounded
+    assert search_state.num_models == 40
+    assert len(set(search_state.archids)) == 40
+    assert async_obj.max_pending <= 4
+
+    # Assert that finished evaluations are added to the Pareto archive in generations of `max_in_flight`
+    assert search_state.iteration_num == 10
+    assert len(search_state.pareto_archive) == search_state.iteration_num
+    assert len(search_state.get_pareto_frontier()["models"]) > 0
+    assert (tmp_path / "search_state_40.csv").exists()
@@ -0,0 +1,37 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pickle
+
+from archai.discrete_search import ArchaiModel
+
+
+def build_arch(model):
+    return {"layers": model.metadata["num_layers"]}
+
+
+def test_archai_model():
+    model = ArchaiModel(arch="arch", archid="0")
+    model.release()
+
+    # Assert that models that are not lazy cannot be released
+    assert not model.is_lazy
+    assert model.arch == "arch"
+
+
+def test_lazy_archai_model():
+    model = ArchaiModel(None, "1", metadata={"num_layers": 2}, build_fn=build_arch)
+    assert model.is_lazy and not model.is_materialized
+
+    # Assert that the model object is built on first access and cached
+    arch = model.arch
+    assert arch == {"layers": 2}
+    assert model.is_materialized and model.arch is arch
+
+    # Assert that released models are rebuilt
+    model.release()
+    assert not model.is_materialized
+    assert model.arch == {"layers": 2}
+
+    model = pickle.loads(pickle.dumps(model))
+    assert model.arch == {"layers": 2}
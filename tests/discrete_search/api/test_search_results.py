@@ -0,0 +1,101 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import numpy as np
+import pytest
+from overrides import overrides
+
+from archai.discrete_search import ArchaiModel, Objective, SearchResults
+from archai.discrete_search.utils.multi_objective import get_pareto_frontier
+
+
+class DummyObjective(Objective):
+    def __init__(self, higher_is_better: bool):
+        self.higher_is_better = higher_is_better
+
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        return 0.0
+
+
+@pytest.fixture
+def search_results():
+    objectives = {"a": DummyObjective(False), "b": DummyObjective(True), "c": DummyObjective(False)}
+    search_results = SearchResults(None, objectives)
+    rng = np.random.RandomState(0)
+
+    for it in range(6):
+        num_models = rng.randint(1, 30)
+        models = [ArchaiModel(None, f"{it}_{i}") for i in range(num_models)]
+        results = {obj_name: rng.randint(0, 6, size=num_models).astype(np.float32) for obj_name in objectives}
+
+        search_results.add_iteration_results(models, results)
+
+    return search_results
+
+
+@pytest.mark.parametrize("start_iteration,end_iteration", [(0, None), (0, 1), (0, 3), (2, 5), (1, None)])
+def test_search_results_get_pareto_frontier(search_results, start_iteration, end_iteration):
+    pareto_frontier = search_results.get_pareto_frontier(start_iteration, end_iteration)
+
+    # Recomputes the frontier from scratch
+    start = search_results.iteration_offsets[start_iteration]
+    end = search_results.iteration_offsets[end_iteration or search_results.iteration_num]
+    archids = search_results.archids[start:end]
+    results = {
+        obj_name: obj_results[start:end] for obj_name, obj_results in search_results.all_evaluation_results.items()
+    }
+    expected_frontier = get_pareto_frontier(archids, results, search_results.objectives)
+
+    # Assert that the incremental archive matches the full recomputation
+    assert pareto_frontier["indices"].tolist() == expected_frontier["indices"].tolist()
+    assert [m.archid for m in pareto_frontier["models"]] == expected_frontier["models"]
+    assert all(
+        m.archid.startswith(f"{it}_") for m, it in zip(pareto_frontier["models"], pareto_frontier["iteration_nums"])
+    )
+
+
+def test_search_results_columnar_storage(search_results):
+    num_models = search_results.num_models
+    all_evaluation_results = search_results.all_evaluation_results
+
+    # Assert that columns are read-only views over all stored models
+    assert all(len(obj_results) == num_models for obj_results in all_evaluation_results.values())
+    assert not all_evaluation_results["a"].flags.writeable
+    assert len(search_results.archids) == len(search_results.iteration_nums) == num_models
+
+    # Assert that only Pareto-frontier members are kept alive
+    pareto_indices = set(search_results.get_pareto_frontier()["indices"].tolist())
+    assert all(search_results.get_model(idx) is not None for idx in pareto_indices)
+    assert any(search_results.get_model(idx) is None for idx in range(num_models))
+
+    # Assert that columns added in later iterations are backfilled
+    search_results.add_iteration_results(
+        [ArchaiModel(None, "extra")], {"a": [0.0], "b": [0.0], "c": [0.0]}, extra_model_data={"budget": [1.0]}
+    )
+    state_df = search_results.get_search_state_df()
+    assert state_df["budget"].isna().sum() == num_models
+    assert state_df["budget"].iloc[-1] == 1.0
+
+
+class DummyTrainingObjective(DummyObjective):
+    requires_model_after_eval: bool = True
+
+
+@pytest.mark.parametrize(
+    "objective_cls, release_models, expected_release",
+    [
+        (DummyObjective, None, True),
+        (DummyTrainingObjective, None, False),
+        (DummyObjective, False, False),
+        (DummyTrainingObjective, True, True),
+    ],
+)
+def test_search_results_release_models(objective_cls, release_models, expected_release):
+    search_results = SearchResults(None, {"a": objective_cls(False)}, release_models=release_models)
+
+    models = [ArchaiModel(object(), str(i), build_fn=lambda m: object()) for i in range(3)]
+    search_results.add_iteration_results(models, {"a": np.zeros(3)})
+
+    # Assert that models used by the objectives after evaluation are not released
+    assert all(m.is_materialized != expected_release for m in models)
@@ -0,0 +1,47 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from overrides import overrides
+
+from archai.discrete_search import ArchaiModel
+from archai.discrete_search.api.search_space import EvolutionarySearchSpace
+
+
+class ListMutationSearchSpace(EvolutionarySearchSpace):
+    @overrides
+    def random_sample(self):
+        return ArchaiModel(None, "0")
+
+    @overrides
+    def save_arch(self, model, path):
+        pass
+
+    @overrides
+    def load_arch(self, path):
+        pass
+
+    @overrides
+    def save_model_weights(self, model, path):
+        pass
+
+    @overrides
+    def load_model_weights(self, model, path):
+        pass
+
+    @overrides
+    def mutate(self, arch):
+        # Returns a list of neighbors instead of a single model
+        return [ArchaiModel(None, str(int(arch.archid) + offset)) for offset in (-1, 1)]
+
+    @overrides
+    def crossover(self, arch_list):
+        return ArchaiModel(None, str(sum(int(a.archid) for a in arch_list)))
+
+
+def test_mutate_many_list_mutations():
+    search_space = ListMutationSearchSpace()
+    parents = [ArchaiModel(None, "0"), ArchaiModel(None, "2")]
+
+    # Assert that lists of mutations are flattened before rejecting duplicates
+    mutations = search_space.mutate_many(parents, exclude={"-1"})
+    assert [m.archid if m is not None else None for m in mutations] == [None, "1", None, "3"]
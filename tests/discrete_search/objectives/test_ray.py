@@ -0,0 +1,51 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import sys
+import time
+
+import pytest
+import ray
+from overrides import overrides
+
+from archai.discrete_search import ArchaiModel, Objective
+from archai.discrete_search.objectives.ray import RayParallelObjective
+from archai.discrete_search.utils.evaluation import StreamingEvaluator
+
+
+class SleepObjective(Objective):
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        time.sleep(float(arch.archid))
+        return float(arch.archid)
+
+
+@pytest.fixture(scope="module")
+def ray_cluster():
+    ray.init(num_cpus=2, include_dashboard=False)
+
+    # Test modules cannot be imported by the workers
+    ray.cloudpickle.register_pickle_by_value(sys.modules[__name__])
+
+    # Starts the workers, so their start up time is not counted in the timeouts
+    ray.get([ray.remote(lambda: None).remote() for _ in range(2)])
+    yield
+    ray.shutdown()
+
+
+def test_ray_parallel_objective_streaming_timeout(ray_cluster):
+    obj = RayParallelObjective(SleepObjective(), timeout=10.0, force_stop=True)
+    evaluator = StreamingEvaluator({"sleep": obj}, poll_interval=0.5)
+
+    models = [ArchaiModel(None, archid) for archid in ["0", "600"]]
+    evaluator.submit(models, None)
+
+    # Assert that jobs exceeding the objective timeout are canceled and returned as None
+    start = time.time()
+    evaluated, results, _ = evaluator.fetch()
+    assert time.time() - start < 60.0
+
+    assert [m.archid for m in evaluated] == ["0", "600"]
+    assert results["sleep"][0] == 0.0
+    assert results["sleep"][1] != results["sleep"][1]
+    assert obj.object_refs == []
@@ -0,0 +1,65 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from random import Random
+
+import numpy as np
+import pytest
+
+from archai.discrete_search.search_spaces.config import (
+    ArchParamTree, DiscreteChoice, repeat_config
+)
+
+
+@pytest.fixture
+def tree():
+    shared = DiscreteChoice([1, 2, 4])
+
+    return ArchParamTree({
+        "constant": 3,
+        "hidden": DiscreteChoice([8, 16, 32]),
+        "activation": DiscreteChoice(["relu", "gelu"]),
+        "blocks": repeat_config({"heads": DiscreteChoice([2, 4]), "shared": shared}, repeat_times=[1, 2]),
+        "head": {"shared": shared, "dropout": DiscreteChoice([0.1, 0.5])},
+    })
+
+
+def test_encode_many(tree):
+    rng = Random(1)
+    configs = [tree.sample_config(rng) for _ in range(20)]
+
+    for config in configs:
+        config.pick("hidden")
+
+    # Assert that numeric parameters are encoded as in `encode_config`
+    features = tree.encode_many(configs)
+    assert features.shape == (20, 9)
+    assert np.array_equal(features[:, 0], [c.pick("hidden") for c in configs])
+
+    # Assert that unused parameters are NaNs (or zeros if one-hot encoded)
+    assert np.isnan(features[:, 1:]).all()
+
+    one_hot = tree.encode_many(configs, one_hot=True)
+    assert one_hot.shape == (20, 3 + 2 + 2 + 2 * (2 + 3) + 3 + 2)
+    assert (one_hot.sum(axis=1) == 1).all()
+
+    # Assert that non-numeric parameters are encoded by their choice index
+    features = tree.encode_many(configs, track_unused_params=False)
+    assert np.array_equal(features[:, 1], [["relu", "gelu"].index(c.pick("activation")) for c in configs])
+
+    numeric_cols = [0] + list(range(2, 9))
+    expected = np.array([
+        [v for i, v in enumerate(tree.encode_config(c, track_unused_params=False)) if i in numeric_cols]
+        for c in configs
+    ], dtype=np.float64)
+    assert np.array_equal(features[:, numeric_cols], expected)
+
+@pytest.mark.parametrize("one_hot", [False, True])
+def test_decode_many(tree, one_hot):
+    rng = Random(2)
+    configs = [tree.sample_config(rng) for _ in range(20)]
+
+    features = tree.encode_many(configs, track_unused_params=False, one_hot=one_hot)
+    decoded = tree.decode_many(features, one_hot=one_hot)
+
+    assert [c.to_dict() for c in decoded] == [c.to_dict() for c in configs]
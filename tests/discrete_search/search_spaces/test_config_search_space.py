@@ -0,0 +1,161 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import numpy as np
+import pytest
+import torch
+
+from archai.discrete_search.search_spaces.config import (
+    ArchParamTree, ConfigSearchSpace, DiscreteChoice
+)
+
+
+class CountingModel(torch.nn.Module):
+    num_instances = 0
+
+    def __init__(self, config):
+        super().__init__()
+        CountingModel.num_instances += 1
+
+        # `extra` is only used when `use_extra` is set
+        self.linear = torch.nn.Linear(config.pick("hidden"), 1)
+
+        if config.pick("use_extra"):
+            self.extra = torch.nn.Linear(config.pick("extra"), 1)
+
+
+@pytest.fixture
+def arch_param_tree():
+    return ArchParamTree({
+        "hidden": DiscreteChoice([8, 16]),
+        "use_extra": DiscreteChoice([False, True]),
+        "extra": DiscreteChoice([4, 8, 16, 32]),
+    })
+
+
+@pytest.mark.parametrize("track_unused_params", [False, True])
+def test_mutate_many(arch_param_tree, track_unused_params):
+    search_space = ConfigSearchSpace(
+        CountingModel, arch_param_tree, mutation_prob=0.5, track_unused_params=track_unused_params
+    )
+
+    parent = search_space.random_sample()
+    evaluated = {parent.archid}
+
+    for _ in range(5):
+        mutations = search_space.mutate_many([parent] * 10, exclude=evaluated)
+        archids = [m.archid for m in mutations if m is not None]
+
+        # Assert that evaluated and duplicated architectures are rejected
+        assert len(mutations) == 10
+        assert len(set(archids)) == len(archids)
+        assert not (set(archids) & evaluated)
+
+        # Assert that archids match the ones from a regular model creation
+        for m in mutations:
+            if m is not None:
+                assert search_space.get_archid(m.metadata["config"]) == m.archid
+
+        evaluated.update(archids)
+
+    # Assert that at most one model is built for each of the 16 distinct configs
+    CountingModel.num_instances = 0
+    search_space.mutate_many([parent] * 50, exclude=evaluated)
+    assert CountingModel.num_instances <= 16
+
+
+def test_archid_index_size(arch_param_tree):
+    search_space = ConfigSearchSpace(CountingModel, arch_param_tree, max_archid_index_size=4)
+    models = [search_space.random_sample() for _ in range(20)]
+
+    # Assert that the index of built configs is bounded and keeps the most recent ones
+    assert len(search_space.archid_index) <= 4
+    assert search_space.get_config_archid(models[-1].metadata["config"]) == models[-1].archid
+
+
+def test_crossover_many(arch_param_tree):
+    search_space = ConfigSearchSpace(CountingModel, arch_param_tree, track_unused_params=False)
+    models = [search_space.random_sample() for _ in range(4)]
+
+    children = search_space.crossover_many([[models[0], models[1]], [models[2], models[3]]])
+    assert len(children) == 2
+
+    # Assert that excluded children are not built
+    CountingModel.num_instances = 0
+    assert search_space.crossover_many([[models[0], models[0]]], exclude={models[0].archid}) == [None]
+    assert CountingModel.num_instances == 0
+
+
+class FlakyModel(CountingModel):
+    num_failures = 0
+
+    def __init__(self, config):
+        if FlakyModel.num_failures > 0:
+            FlakyModel.num_failures -= 1
+            raise RuntimeError("Invalid architecture")
+
+        super().__init__(config)
+
+
+def test_mutate_many_model_creation_errors(arch_param_tree):
+    search_space = ConfigSearchSpace(
+        FlakyModel, arch_param_tree, track_unused_params=False, model_creation_attempts=3
+    )
+    parent = search_space.random_sample()
+
+    # Assert that model creation is retried with new candidates
+    FlakyModel.num_failures = 2
+    assert search_space.mutate_many([parent])[0] is not None
+
+    # Assert that errors are raised once attempts are exhausted
+    FlakyModel.num_failures = 3
+    with pytest.raises(RuntimeError):
+        search_space.mutate_many([parent])
+
+
+class ActivationModel(CountingModel):
+    def __init__(self, config):
+        super().__init__(config)
+        self.activation = config.pick("activation")
+
+
+@pytest.mark.parametrize("track_unused_params", [False, True])
+def test_encode_many(arch_param_tree, track_unused_params):
+    arch_param_tree = ArchParamTree({
+        **arch_param_tree.to_dict(),
+        "activation": DiscreteChoice(["relu", "gelu", "tanh"]),
+    })
+    search_space = ConfigSearchSpace(ActivationModel, arch_param_tree, track_unused_params=track_unused_params)
+    models = [search_space.random_sample() for _ in range(10)]
+
+    # Assert that batched and single encodings are the same, including non-numeric parameters
+    features = search_space.encode_many(models)
+    assert features.dtype == np.float64
+    for model, model_features in zip(models, features):
+        assert np.array_equal(model_features, search_space.encode(model), equal_nan=True)
+
+    assert np.array_equal(
+        features[:, -1], [["relu", "gelu", "tanh"].index(m.metadata["config"].pick("activation")) for m in models]
+    )
+
+
+@pytest.mark.parametrize("track_unused_params", [False, True])
+def test_lazy_models(arch_param_tree, track_unused_params):
+    search_space = ConfigSearchSpace(
+        CountingModel, arch_param_tree, track_unused_params=track_unused_params, lazy_models=True
+    )
+
+    CountingModel.num_instances = 0
+    model = search_space.random_sample()
+
+    # Assert that lazy models are only materialized on access, unless the model
+    # was built to compute its archid, in which case it is not built again
+    assert model.is_materialized == track_unused_params
+    assert CountingModel.num_instances == (1 if track_unused_params else 0)
+
+    assert isinstance(model.arch, CountingModel)
+    assert CountingModel.num_instances == 1
+    assert model.archid == search_space.get_archid(model.metadata["config"])
+
+    model.release()
+    assert not model.is_materialized
@@ -0,0 +1,83 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import List, Optional, Tuple
+
+from overrides import overrides
+
+from archai.discrete_search import ArchaiModel, AsyncObjective, Objective
+from archai.discrete_search.utils.evaluation import StreamingEvaluator
+
+
+class ArchidObjective(Objective):
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        return float(arch.archid)
+
+
+class LifoObjective(AsyncObjective):
+    def __init__(self):
+        self.jobs = []
+        self.fetched = set()
+
+    @overrides
+    def send(self, arch, dataset, budget=None):
+        self.jobs.append(float(arch.archid) * (budget or 1.0))
+
+    @overrides
+    def fetch_all(self) -> List[Optional[float]]:
+        results = self.jobs
+        self.jobs, self.fetched = [], set()
+
+        return results
+
+    @overrides
+    def fetch_ready(self, timeout: Optional[float] = None) -> List[Tuple[int, Optional[float]]]:
+        # Finishes one job per call, starting from the most recent one
+        pending = [i for i in range(len(self.jobs)) if i not in self.fetched]
+
+        if not pending:
+            return []
+
+        self.fetched.add(pending[-1])
+        ready = [(pending[-1], self.jobs[pending[-1]])]
+
+        if len(self.fetched) == len(self.jobs):
+            self.jobs, self.fetched = [], set()
+
+        return ready
+
+
+def test_as_completed():
+    obj = LifoObjective()
+
+    for i in range(3):
+        obj.send(ArchaiModel(None, str(i)), None)
+
+    # Assert that results are streamed as jobs finish and the job queue is reset
+    assert list(obj.as_completed()) == [(2, 2.0), (1, 1.0), (0, 0.0)]
+    assert obj.jobs == []
+
+
+def test_streaming_evaluator():
+    evaluator = StreamingEvaluator({"sync": ArchidObjective(), "async": LifoObjective()})
+    models = [ArchaiModel(None, str(i)) for i in range(4)]
+
+    tickets = evaluator.submit(models[:3], None, budgets={"async": 2.0})
+    assert tickets == [0, 1, 2]
+
+    # Assert that only the models that finished first are returned, in submission order
+    evaluated, results, budgets = evaluator.fetch(2)
+    assert [m.archid for m in evaluated] == ["1", "2"]
+    assert results["sync"].tolist() == [1.0, 2.0]
+    assert results["async"].tolist() == [2.0, 4.0]
+    assert budgets["async"] == [2.0, 2.0]
+    assert evaluator.num_pending == 1
+
+    # Assert that pending models are carried over to the next submission
+    evaluator.submit(models[3:], None)
+    evaluated, results, budgets = evaluator.fetch(1, tickets=[0])
+    assert [m.archid for m in evaluated] == ["0", "3"]
+    assert results["async"].tolist() == [0.0, 3.0]
+    assert budgets["async"] == [2.0, None]
+    assert evaluator.num_pending == 0
@@ -0,0 +1,66 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import numpy as np
+import pytest
+
+from archai.discrete_search.utils.multi_objective import (
+    _find_non_dominated_sorting,
+    _find_pareto_frontier_points,
+)
+
+
+def _brute_force_pareto(points):
+    _, unique_indices = np.unique(points, axis=0, return_index=True)
+
+    return [
+        i for i in unique_indices
+        if not any(j != i and np.all(points[j] <= points[i]) for j in unique_indices)
+    ]
+
+
+def _brute_force_ranks(points):
+    # Rank is 1 + the highest rank amongst (lexicographically) preceding weak dominators
+    lex_sorting = np.lexsort(points.T[::-1])
+    ranks = {}
+
+    for pos, i in enumerate(lex_sorting):
+        dominators = [j for j in lex_sorting[:pos] if np.all(points[j] <= points[i])]
+        ranks[i] = max((ranks[j] + 1 for j in dominators), default=0)
+
+    return ranks
+
+
+@pytest.mark.parametrize("num_objectives", [1, 2, 3, 4])
+def test_find_pareto_frontier_points(num_objectives):
+    rng = np.random.RandomState(num_objectives)
+    points = rng.randint(0, 10, size=(200, num_objectives)).astype(np.float32)
+
+    # Assert that the frontier matches brute-force, including the order of indices
+    assert _find_pareto_frontier_points(points) == _brute_force_pareto(points)
+
+    # Assert that small blocks do not change the frontier
+    if num_objectives > 2:
+        assert _find_pareto_frontier_points(points, block_size=7) == _brute_force_pareto(points)
+
+
+@pytest.mark.parametrize("num_objectives", [1, 2, 3, 4])
+def test_find_non_dominated_sorting(num_objectives):
+    rng = np.random.RandomState(num_objectives)
+    points = rng.randint(0, 10, size=(200, num_objectives)).astype(np.float32)
+
+    fronts = _find_non_dominated_sorting(points)
+    ranks = _brute_force_ranks(points)
+
+    # Assert that every point is assigned once and to the expected front
+    assert sorted(np.concatenate(fronts).tolist()) == list(range(len(points)))
+    for rank, front in enumerate(fronts):
+        assert all(ranks[i] == rank for i in front)
+
+    # Assert that the first front only contains Pareto-frontier points
+    assert set(_find_pareto_frontier_points(points)).issubset(set(fronts[0].tolist()))
+
+
+def test_find_non_dominated_sorting_empty():
+    assert _find_non_dominated_sorting(np.empty((0, 3))) == []
+    assert _find_pareto_frontier_points(np.empty((0, 3))) == []
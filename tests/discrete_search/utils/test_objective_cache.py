@@ -0,0 +1,180 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from overrides import overrides
+
+from archai.discrete_search import ArchaiModel, DatasetProvider, Objective
+from archai.discrete_search.api.search_objectives import SearchObjectives
+from archai.discrete_search.objectives.functional import EvaluationFunction
+from archai.discrete_search.utils.objective_cache import (
+    InMemoryObjectiveCache,
+    SQLiteObjectiveCache,
+    get_fingerprint,
+)
+
+
+class CountingObjective(Objective):
+    def __init__(self, scale: float = 1.0):
+        self.scale = scale
+        self.num_evaluations = 0
+
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        self.num_evaluations += 1
+        return float(len(arch.archid)) * self.scale
+
+
+class DummyDatasetProvider(DatasetProvider):
+    def __init__(self, dataroot: str):
+        self.dataroot = dataroot
+
+    @overrides
+    def get_train_val_datasets(self):
+        return None, None
+
+
+def test_get_fingerprint():
+    # Assert that fingerprints only depend on the objects configuration
+    assert get_fingerprint(CountingObjective(2.0)) == get_fingerprint(CountingObjective(2.0))
+    assert get_fingerprint(CountingObjective(2.0)) != get_fingerprint(CountingObjective(3.0))
+
+    objective = CountingObjective()
+    fingerprint = get_fingerprint(objective)
+    objective.num_evaluations += 1
+    assert get_fingerprint(objective) == fingerprint
+
+    assert get_fingerprint(DummyDatasetProvider("a")) != get_fingerprint(DummyDatasetProvider("b"))
+
+
+class Wrapper:
+    def __init__(self, value):
+        self.value = value
+
+
+def _nest(value, depth):
+    for _ in range(depth):
+        value = Wrapper(value)
+
+    return value
+
+
+def test_get_fingerprint_deep_config():
+    # Assert that configurations that only differ below the maximum depth have different fingerprints
+    assert get_fingerprint(CountingObjective(_nest(1.0, 6))) == get_fingerprint(CountingObjective(_nest(1.0, 6)))
+    assert get_fingerprint(CountingObjective(_nest(1.0, 6))) != get_fingerprint(CountingObjective(_nest(2.0, 6)))
+
+    # Assert that deep objects that cannot be hashed are rejected
+    with pytest.raises(ValueError):
+        get_fingerprint(CountingObjective(_nest(threading.Lock(), 6)))
+
+
+def test_in_memory_objective_cache():
+    cache = InMemoryObjectiveCache(max_entries=2)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+
+    # Assert that least recently used entries are evicted
+    assert cache.get("a") == 1.0
+    cache.set("c", 3.0)
+    assert cache.get_many(["a", "b", "c"]) == [1.0, None, 3.0]
+
+    # Assert that expired entries are not returned
+    cache = InMemoryObjectiveCache(ttl=0.05)
+    cache.set("a", 1.0)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_sqlite_objective_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "cache.db"
+
+        cache = SQLiteObjectiveCache(path, max_entries=2, eviction_interval=1)
+        cache.set_many([("a", 1.0), ("b", 2.0)])
+        assert cache.get("a") == 1.0
+
+        # Assert that entries persist across instances and LRU entries are evicted
+        time.sleep(0.01)
+        cache = SQLiteObjectiveCache(path, max_entries=2, eviction_interval=1)
+        cache.set("c", 3.0)
+        assert cache.get_many(["a", "b", "c"]) == [1.0, None, 3.0]
+        assert len(cache) == 2
+
+
+def test_search_objectives_persistent_cache():
+    models = [ArchaiModel(None, archid) for archid in ["a", "bb", "ccc"]]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "cache.db"
+
+        for expected_evaluations in [3, 0]:
+            # Each iteration simulates a restarted search with new objects
+            objective = CountingObjective()
+            search_objectives = SearchObjectives(cache=SQLiteObjectiveCache(path))
+            search_objectives.add_cheap_objective("length", objective, higher_is_better=False)
+
+            results, _ = search_objectives.eval_cheap_objs(models, DummyDatasetProvider("data"))
+
+            # Assert that cached evaluations are skipped
+            assert results["length"].tolist() == [1.0, 2.0, 3.0]
+            assert objective.num_evaluations == expected_evaluations
+
+
+class UnstableObjective(Objective):
+    def __init__(self, scale: float = 1.0):
+        self.factor = scale
+
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        return 1.0
+
+
+def test_get_fingerprint_unstable():
+    # Assert that objects without a stable description are only identified by `id()` when allowed
+    with pytest.raises(ValueError):
+        get_fingerprint(UnstableObjective())
+
+    objective = UnstableObjective()
+    assert get_fingerprint(objective, allow_ids=True) == get_fingerprint(objective, allow_ids=True)
+    assert get_fingerprint(objective, allow_ids=True) != get_fingerprint(UnstableObjective(), allow_ids=True)
+
+    # Assert that explicit fingerprints are used instead of the constructor arguments
+    UnstableObjective.cache_fingerprint = lambda self: {"factor": self.factor}
+    try:
+        assert get_fingerprint(UnstableObjective(2.0)) == get_fingerprint(UnstableObjective(2.0))
+        assert get_fingerprint(UnstableObjective(2.0)) != get_fingerprint(UnstableObjective(3.0))
+    finally:
+        del UnstableObjective.cache_fingerprint
+
+
+def test_search_objectives_cache_keys():
+    models = [ArchaiModel(None, archid) for archid in ["a", "bb"]]
+    dataset = DummyDatasetProvider("data")
+
+    # Assert that objectives with equal configurations are cached separately
+    search_objectives = SearchObjectives()
+    search_objectives.add_cheap_objective("a", EvaluationFunction(lambda m, d, b: 1.0, False), higher_is_better=False)
+    search_objectives.add_cheap_objective("b", EvaluationFunction(lambda m, d, b: 2.0, False), higher_is_better=False)
+
+    for _ in range(2):
+        results, _ = search_objectives.eval_cheap_objs(models, dataset)
+        assert results["a"].tolist() == [1.0, 1.0]
+        assert results["b"].tolist() == [2.0, 2.0]
+
+    # Assert that persistent caches do not store evaluations of objectives without a stable fingerprint
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SQLiteObjectiveCache(Path(tmp_dir) / "cache.db")
+        search_objectives = SearchObjectives(cache=cache)
+        search_objectives.add_cheap_objective("unstable", UnstableObjective(), higher_is_better=False)
+
+        with pytest.warns(UserWarning):
+            results, _ = search_objectives.eval_cheap_objs(models, dataset)
+
+        assert results["unstable"].tolist() == [1.0, 1.0]
+        assert len(cache) == 0
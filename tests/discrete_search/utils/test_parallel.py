@@ -0,0 +1,54 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import time
+
+import pytest
+from overrides import overrides
+
+from archai.discrete_search import ArchaiModel, Objective, evaluate_models
+from archai.discrete_search.utils.parallel import evaluate_objective
+
+
+class SleepObjective(Objective):
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        # Earlier models take longer, so they finish last
+        time.sleep(0.01 * (5 - int(arch.archid)))
+        return float(arch.archid)
+
+
+class AffinityObjective(Objective):
+    @overrides
+    def evaluate(self, arch, dataset, budget=None):
+        return float(len(os.sched_getaffinity(0)))
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+@pytest.mark.parametrize("chunk_size", [1, 2])
+def test_evaluate_objective(executor, chunk_size):
+    models = [ArchaiModel(None, str(i)) for i in range(5)]
+
+    # Assert that results respect the original order
+    results = evaluate_objective(
+        SleepObjective(), models, [None] * 5, [None] * 5,
+        num_workers=3, executor=executor, chunk_size=chunk_size, progress_bar=False
+    )
+    assert results == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="CPU pinning is only available on Linux")
+def test_evaluate_models_cpu_pinning():
+    models = [ArchaiModel(None, str(i)) for i in range(4)]
+    num_cpus = len(os.sched_getaffinity(0))
+
+    results = evaluate_models(
+        models, {"affinity": AffinityObjective(), "sleep": SleepObjective()}, None,
+        num_workers={"affinity": 2}, cpu_pinned_objectives=["affinity"]
+    )
+
+    # Assert that pinned workers use a subset of the CPUs and the main thread is unchanged
+    assert all(r == max(1, num_cpus // 2) for r in results["affinity"])
+    assert results["sleep"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert len(os.sched_getaffinity(0)) == num_cpus
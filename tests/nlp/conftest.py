@@ -0,0 +1,23 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pytest
+
+
+class CharTokenizer:
+    """Tokenizer that encodes each character by its code point."""
+
+    pad_token_id = 0
+
+    def __call__(self, texts, truncation=False, padding=False, return_attention_mask=True):
+        input_ids = [[ord(c) for c in text] for text in texts]
+        encoding = {"input_ids": input_ids}
+        if return_attention_mask:
+            encoding["attention_mask"] = [[1] * len(ids) for ids in input_ids]
+
+        return encoding
+
+
+@pytest.fixture
+def char_tokenizer():
+    return CharTokenizer()
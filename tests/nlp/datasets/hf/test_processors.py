@@ -0,0 +1,70 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import numpy as np
+import torch
+
+from archai.nlp.datasets.hf.processors import (
+    get_packed_attention_mask,
+    pack_sequences,
+    tokenize_contiguous_dataset,
+    tokenize_packed_dataset,
+)
+
+
+def test_tokenize_contiguous_dataset(char_tokenizer):
+    examples = {"text": ["abc", "defgh", "ij"]}
+
+    result = tokenize_contiguous_dataset(
+        examples, tokenizer=char_tokenizer, mapping_column_name=("text",), model_max_length=4
+    )
+    assert result["input_ids"].tolist() == [[97, 98, 99, 100], [101, 102, 103, 104]]
+    assert result["attention_mask"].tolist() == [[1] * 4] * 2
+
+
+def test_pack_sequences():
+    rows, cols = pack_sequences(np.array([3, 8, 5, 2, 6]), 8)
+
+    # Assert that sequences do not overlap and fit in the fewest rows
+    assert rows.max() + 1 == 3
+    for row in range(3):
+        spans = sorted((c, c + n) for r, c, n in zip(rows, cols, [3, 8, 5, 2, 6]) if r == row)
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(spans[:-1], spans[1:]))
+        assert spans[-1][1] <= 8
+
+
+def test_tokenize_packed_dataset(char_tokenizer):
+    texts = ["abc", "defghijklm", "no", "", "pqrstu"]
+    examples = {"text": texts}
+
+    result = tokenize_packed_dataset(
+        examples, tokenizer=char_tokenizer, mapping_column_name=("text",), model_max_length=8
+    )
+    input_ids = result["input_ids"]
+    assert input_ids.shape == (3, 8)
+
+    # Assert that every example (or piece of it) can be recovered from its segment
+    pieces = []
+    for row in range(input_ids.shape[0]):
+        for segment in range(1, result["segment_ids"][row].max() + 1):
+            is_segment = result["segment_ids"][row] == segment
+            pieces.append("".join(chr(c) for c in input_ids[row][is_segment]))
+
+            assert result["position_ids"][row][is_segment].tolist() == list(range(is_segment.sum()))
+            assert result["labels"][row][is_segment][0] == -100
+
+    assert sorted(pieces) == sorted(["abc", "defghijk", "lm", "no", "pqrstu"])
+    assert np.array_equal(result["attention_mask"], result["segment_ids"] > 0)
+    assert np.all(result["labels"][result["segment_ids"] == 0] == -100)
+
+
+def test_get_packed_attention_mask():
+    mask = get_packed_attention_mask(torch.LongTensor([[1, 1, 2, 0]]))
+
+    assert mask.shape == (1, 1, 4, 4)
+    assert mask[0, 0].tolist() == [
+        [True, False, False, False],
+        [True, True, False, False],
+        [False, False, True, False],
+        [False, False, False, False],
+    ]
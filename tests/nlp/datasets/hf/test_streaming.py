@@ -0,0 +1,81 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import torch
+from datasets import Dataset
+
+from archai.nlp.datasets.hf.processors import tokenize_contiguous_dataset
+from archai.nlp.datasets.hf.streaming import StreamingDataset
+
+
+def _get_streaming_dataset(tokenizer, **kwargs):
+    dataset = Dataset.from_dict({"text": [f"{i:03d}" for i in range(20)]}).to_iterable_dataset(num_shards=2)
+
+    return StreamingDataset(
+        dataset,
+        tokenize_contiguous_dataset,
+        mapping_fn_kwargs={"tokenizer": tokenizer, "mapping_column_name": ("text",), "model_max_length": 6},
+        batch_size=4,
+        **kwargs,
+    )
+
+
+def test_streaming_dataset(char_tokenizer):
+    dataset = _get_streaming_dataset(char_tokenizer)
+    rows = [row["input_ids"] for row in dataset]
+
+    # Assert that rows are encoded per batch of examples and a new epoch starts afterwards
+    assert len(rows) == 10
+    assert torch.equal(rows[0], torch.LongTensor([ord(c) for c in "000001"]))
+    assert dataset.state_dict() == {"epoch": 1, "n_examples": 0, "n_batch_rows": 0, "n_rows": 10}
+
+
+def test_streaming_dataset_resume(char_tokenizer):
+    dataset = _get_streaming_dataset(char_tokenizer)
+    dataset_iter = iter(dataset)
+    rows = [next(dataset_iter)["input_ids"] for _ in range(5)]
+
+    # Assert that a new dataset resumes from the saved position
+    resumed_dataset = _get_streaming_dataset(char_tokenizer)
+    resumed_dataset.load_state_dict(dataset.state_dict())
+
+    resumed_rows = [row["input_ids"] for row in resumed_dataset]
+    all_rows = [row["input_ids"] for row in _get_streaming_dataset(char_tokenizer)]
+
+    assert len(resumed_rows) == 5
+    assert all(torch.equal(a, b) for a, b in zip(rows + resumed_rows, all_rows))
+
+
+def test_streaming_dataset_resume_consumed_rows(char_tokenizer):
+    dataset = _get_streaming_dataset(char_tokenizer)
+    dataset_iter = iter(dataset)
+    rows = [next(dataset_iter)["input_ids"] for _ in range(8)]
+
+    # Assert that the position of consumed rows lags behind prefetched rows
+    resumed_dataset = _get_streaming_dataset(char_tokenizer)
+    resumed_dataset.load_state_dict(dataset.state_dict(n_rows=3))
+
+    resumed_rows = [row["input_ids"] for row in resumed_dataset]
+    assert len(resumed_rows) == 7
+    assert all(torch.equal(a, b) for a, b in zip(rows[3:], resumed_rows))
+    assert resumed_dataset.n_rows == 10
+
+
+def test_streaming_dataset_sharding(char_tokenizer):
+    rows = [
+        row["input_ids"].tolist()
+        for rank in range(2)
+        for row in _get_streaming_dataset(char_tokenizer, rank=rank, world_size=2)
+    ]
+
+    # Assert that ranks read disjoint shards
+    assert len(rows) == 10
+    assert len({tuple(row) for row in rows}) == 10
+
+
+def test_streaming_dataset_sharding_default_rank(char_tokenizer):
+    rows = [row["input_ids"].tolist() for row in _get_streaming_dataset(char_tokenizer, world_size=2)]
+    rank_rows = [row["input_ids"].tolist() for row in _get_streaming_dataset(char_tokenizer, rank=0, world_size=2)]
+
+    # Assert that the rank defaults to the first process when `world_size` is given
+    assert rows == rank_rows
@@ -0,0 +1,24 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from collections import Counter
+
+from archai.nlp.datasets.nvidia.tokenizer_utils.bbpe_vocab import BbpeVocab
+from archai.nlp.datasets.nvidia.tokenizer_utils.vocab_base import iter_sampled_lines
+
+
+def test_bbpe_vocab_count_token_freq_sample_lines(tmp_path):
+    file_path = tmp_path / "train.txt"
+    with open(file_path, "w", encoding="utf-8") as f:
+        for i in range(400):
+            f.write(" ".join(["the", "cat", "sat", "on", "a", "mat"][: i % 7]) + f" {i}\n")
+    file_path = str(file_path)
+
+    vocab = BbpeVocab(save_path=str(tmp_path / "vocab"), vocab_size=300, sample_stride=2, sample_lines=50)
+    vocab.train([file_path])
+
+    # Assert that frequencies are counted over the same sample of lines used for training
+    expected_counter = Counter(range(len(vocab._tokenizer)))
+    expected_counter.update(vocab.count_lines(iter_sampled_lines([file_path], stride=2, max_lines=50)))
+
+    assert vocab._count_token_freq([file_path]) == expected_counter
@@ -0,0 +1,132 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import numpy as np
+import pytest
+import torch
+
+from archai.nlp.datasets.nvidia import distributed_utils
+from archai.nlp.datasets.nvidia.corpus_utils import (
+    load_encoded_cache,
+    save_encoded_cache,
+)
+from archai.nlp.datasets.nvidia.lm_iterators import (
+    LMMultiFileIterator,
+    LMOrderedIterator,
+)
+from archai.nlp.datasets.nvidia.tokenizer_utils.word_vocab import WordVocab
+
+
+@pytest.fixture
+def input_ids():
+    return torch.randint(0, 1000, (1003,))
+
+
+def test_encoded_cache(tmp_path, input_ids):
+    cache_file_path = str(tmp_path / "train.npy")
+    save_encoded_cache(cache_file_path, input_ids)
+
+    # Assert that tokens are stored with a compact data type and memory-mapped
+    cache = load_encoded_cache(cache_file_path)
+    assert isinstance(cache, np.memmap)
+    assert cache.dtype == np.uint16
+    assert np.array_equal(cache, input_ids.numpy())
+
+
+def test_lm_ordered_iterator(input_ids):
+    iterator = LMOrderedIterator(input_ids.numpy().astype(np.uint16), 4, 32)
+    expected_ids = input_ids[:1000].view(4, -1)
+
+    batches = list(iterator.get_fixlen_iter())
+    assert len(batches) == iterator.n_batch == 8
+
+    # Assert that batches are contiguous slices of the input rows
+    for i, (batch_ids, labels, seq_len, _) in zip(range(0, 250, 32), batches):
+        assert batch_ids.dtype == torch.int64
+        assert torch.equal(batch_ids, expected_ids[:, i : i + seq_len])
+        assert torch.equal(labels, expected_ids[:, i + 1 : i + 1 + seq_len])
+
+
+@pytest.mark.parametrize("bsz, rank, world_size", [(2, 3, 4), (5, 3, 4)])
+def test_lm_ordered_iterator_empty_rank(monkeypatch, input_ids, bsz, rank, world_size):
+    monkeypatch.setattr(distributed_utils, "get_rank", lambda: rank)
+    monkeypatch.setattr(distributed_utils, "get_world_size", lambda: world_size)
+
+    # Assert that ranks without rows are rejected instead of yielding empty batches
+    with pytest.raises(ValueError):
+        LMOrderedIterator(input_ids, bsz, 32)
+
+
+def test_lm_ordered_iterator_warmup_roll(input_ids):
+    iterator = LMOrderedIterator(input_ids, 4, 32, mem_len=40)
+    iterator.roll(seed=1)
+    iterator.roll(seed=2)
+
+    # Builds the expected warmup and rolled inputs
+    expected_ids = input_ids[:1000].view(4, -1)
+    warmup_ids = expected_ids.roll((64, 1), (1, 0))[:, :64]
+    expected_ids = torch.cat((warmup_ids, expected_ids), dim=-1)
+
+    for seed in [1, 2]:
+        rng = torch.Generator()
+        rng.manual_seed(seed)
+
+        shifts = torch.randint(0, expected_ids.size(1), (4,), generator=rng)
+        expected_ids = torch.stack([row.roll(-int(shift)) for row, shift in zip(expected_ids, shifts)])
+
+    batch_ids, labels, seq_len, warmup = iterator.get_batch(64)
+    assert warmup
+    assert torch.equal(batch_ids, expected_ids[:, 64 : 64 + seq_len])
+    assert torch.equal(labels, expected_ids[:, 65 : 65 + seq_len])
+
+
+@pytest.mark.parametrize("num_workers", [0, 1])
+def test_lm_multi_file_iterator(tmp_path, num_workers):
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"train_{i}.txt"))
+        with open(paths[-1], "w", encoding="utf-8") as f:
+            f.write("\n".join(" ".join(str(j) for j in range(k % 7 + 1)) for k in range(40 * (i + 1))))
+
+    vocab = WordVocab(save_path=str(tmp_path / "vocab"), vocab_size=100, eos_token="<eos>")
+    vocab.train(paths)
+
+    iterator = LMMultiFileIterator(paths, vocab, 2, 8, n_chunks=1, num_workers=num_workers)
+    batches = list(iterator)
+
+    # Assert that each row holds `bptt` inputs from consecutive spans of `bptt + 1` tokens
+    expected = []
+    for path in paths:
+        input_ids = torch.from_numpy(vocab.encode_file(path).astype(np.int64))
+        n_batch = input_ids.size(0) // (2 * 9)
+        expected.extend(input_ids[: n_batch * 2 * 9].view(n_batch, 2, 9))
+
+    assert len(batches) == len(expected)
+    for (batch_ids, labels, seq_len, warm), spans in zip(batches, expected):
+        assert seq_len == 8 and warm
+        assert torch.equal(batch_ids, spans[:, :-1])
+        assert torch.equal(labels, spans[:, 1:])
+
+    # Assert that stopping the iteration early cancels the prefetched files
+    iterator = LMMultiFileIterator(paths, vocab, 2, 8, n_chunks=1, num_workers=num_workers, prefetch_files=3)
+    batches = iter(iterator)
+    next(batches)
+    batches.close()
+
+
+def test_lm_ordered_iterator_varlen(input_ids):
+    iterator = LMOrderedIterator(input_ids, 4, 32)
+    expected_ids = input_ids[:1000].view(4, -1)
+
+    np.random.seed(0)
+    batches = list(iterator.get_varlen_iter(start=10))
+
+    # Assert that variable-length batches cover the remaining columns contiguously
+    i = 10
+    for batch_ids, labels, seq_len, _ in batches:
+        assert 5 <= seq_len <= 47
+        assert torch.equal(batch_ids, expected_ids[:, i : i + seq_len])
+        assert torch.equal(labels, expected_ids[:, i + 1 : i + 1 + seq_len])
+        i += seq_len
+
+    assert i >= 248 and iterator.last_iter == i
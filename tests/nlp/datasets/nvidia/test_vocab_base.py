@@ -0,0 +1,126 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from functools import partial
+
+import numpy as np
+import pytest
+
+from archai.nlp.datasets.nvidia.tokenizer_utils import vocab_base
+from archai.nlp.datasets.nvidia.tokenizer_utils.vocab_base import (
+    get_file_chunks,
+    iter_sampled_lines,
+)
+from archai.nlp.datasets.nvidia.tokenizer_utils.word_vocab import WordVocab
+
+
+@pytest.fixture
+def text_file_path(tmp_path):
+    file_path = tmp_path / "train.txt"
+
+    with open(file_path, "w", encoding="utf-8", newline="") as f:
+        for i in range(1000):
+            f.write(" ".join(["the", "cat", "sat", "on", "the", "mat", "é"][: i % 8]) + ("\r\n" if i % 5 else "\n"))
+        f.write("last line")
+
+    return str(file_path)
+
+
+def test_get_file_chunks(text_file_path):
+    chunks = get_file_chunks(text_file_path, 1000)
+
+    # Assert that chunks are contiguous and end at line boundaries
+    with open(text_file_path, "rb") as f:
+        data = f.read()
+
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(chunks[:-1], chunks[1:]))
+    assert all(data[end - 1 : end] == b"\n" for _, end in chunks[:-1])
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_encode_file(tmp_path, text_file_path, num_workers):
+    vocab = WordVocab(save_path=str(tmp_path / "vocab"), vocab_size=100, eos_token="<eos>")
+    vocab.train([text_file_path])
+
+    with open(text_file_path, "r", encoding="utf-8") as f:
+        expected = [token for line in f for token in vocab.encode_text(line)]
+
+    # Assert that chunked (and parallel) encoding respects the original order
+    encoded = vocab.encode_file(text_file_path, num_workers=num_workers, chunk_size=1000)
+    assert encoded.dtype == np.uint16
+    assert encoded.tolist() == expected
+
+
+def test_encode_file_in_process(tmp_path, text_file_path, monkeypatch):
+    vocab = WordVocab(save_path=str(tmp_path / "vocab"), vocab_size=100, eos_token="<eos>")
+    vocab.train([text_file_path])
+
+    def _raise_pool(*args, **kwargs):
+        raise AssertionError("Pool of processes should not be started.")
+
+    messages = []
+    monkeypatch.setattr(vocab_base, "ProcessPoolExecutor", _raise_pool)
+    monkeypatch.setattr(vocab_base.logger, "debug", messages.append)
+
+    # Assert that files with few chunks are encoded in the current process, logging each chunk
+    n_chunks = len(get_file_chunks(text_file_path, 6000))
+    assert 1 < n_chunks < vocab_base.MIN_POOL_CHUNKS
+
+    encoded = vocab.encode_file(text_file_path, chunk_size=6000)
+    assert encoded.tolist() == vocab.encode_file(text_file_path, num_workers=1).tolist()
+    assert messages[:n_chunks] == [f"Completed chunk: {i + 1}/{n_chunks}" for i in range(n_chunks)]
+
+
+def test_iter_sampled_lines(text_file_path):
+    with open(text_file_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+
+    assert list(iter_sampled_lines([text_file_path], stride=3)) == lines[::3]
+
+    # Assert that reservoir sampling keeps the order of the files
+    sampled_lines = list(iter_sampled_lines([text_file_path], stride=2, max_lines=50))
+    assert len(sampled_lines) == 50
+    assert all(line in lines[::2] for line in sampled_lines)
+
+
+@pytest.mark.parametrize("num_workers,max_counter_size", [(1, None), (2, None), (1, 3)])
+def test_word_vocab_train(tmp_path, text_file_path, num_workers, max_counter_size):
+    expected_vocab = WordVocab(save_path=str(tmp_path / "expected"), vocab_size=6, eos_token="<eos>")
+    expected_vocab.train([text_file_path])
+
+    # Assert that parallel (and spilled) counts produce the same vocabulary
+    vocab = WordVocab(
+        save_path=str(tmp_path / "vocab"),
+        vocab_size=6,
+        eos_token="<eos>",
+        num_workers=num_workers,
+        max_counter_size=max_counter_size,
+    )
+    vocab.iter_file_counts = partial(vocab.iter_file_counts, chunk_size=1000)
+    vocab.train([text_file_path])
+
+    assert vocab.idx2sym == expected_vocab.idx2sym
+    assert vocab._spill_filepaths == []
+
+
+@pytest.mark.parametrize("vocab_size", [None, 5])
+def test_word_vocab_train_tied_counts(tmp_path, vocab_size):
+    file_path = tmp_path / "tied.txt"
+    with open(file_path, "w", encoding="utf-8") as f:
+        for i in range(200):
+            f.write(["zeta yak", "xi zeta", "yak xi", "omega"][i % 4] + "\n")
+
+    expected_vocab = WordVocab(save_path=str(tmp_path / "expected"), vocab_size=vocab_size, eos_token="<eos>")
+    expected_vocab.train([str(file_path)])
+
+    # Assert that tied counts are ordered by first appearance, whether counts are spilled or not
+    vocab = WordVocab(
+        save_path=str(tmp_path / "vocab"), vocab_size=vocab_size, eos_token="<eos>", max_counter_size=1
+    )
+    vocab.iter_file_counts = partial(vocab.iter_file_counts, chunk_size=100)
+    vocab.train([str(file_path)])
+
+    assert vocab.idx2sym == expected_vocab.idx2sym
+    tied_syms = [sym for sym in expected_vocab.idx2sym if sym in ("zeta", "yak", "xi")]
+    assert len(tied_syms) >= 2 and tied_syms == ["zeta", "yak", "xi"][: len(tied_syms)]
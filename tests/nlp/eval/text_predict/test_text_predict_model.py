@@ -0,0 +1,153 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import copy
+import inspect
+import os
+
+import numpy as np
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+
+from archai.nlp.eval.text_predict.text_predict_model import (
+    TextPredictONNXModel,
+    TextPredictTorchModel,
+)
+from archai.nlp.onnx.config_utils.gpt2_onnx_config import GPT2OnnxConfig
+from archai.nlp.onnx.export_utils import prepare_model_for_onnx
+
+
+class CountingSession:
+    def __init__(self, session):
+        self.session = session
+        self.batch_sizes = []
+
+    def get_inputs(self):
+        return self.session.get_inputs()
+
+    def run(self, output_names, input_feed):
+        self.batch_sizes.append(input_feed["input_ids"].shape[0])
+        return self.session.run(output_names, input_feed)
+
+
+def _export_onnx_model(model, onnx_model_path):
+    onnx_config = GPT2OnnxConfig(model.config, use_past=True)
+    model = prepare_model_for_onnx(copy.deepcopy(model), "gpt2")
+
+    # Uses the TorchScript-based exporter, which is the default of older PyTorch versions
+    kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    dynamic_axes = {name: axes for name, axes in list(onnx_config.inputs.items()) + list(onnx_config.outputs.items())}
+    torch.onnx.export(
+        model,
+        (onnx_config.generate_dummy_inputs(),),
+        f=onnx_model_path,
+        input_names=list(onnx_config.inputs.keys()),
+        output_names=list(onnx_config.outputs.keys()),
+        dynamic_axes=dynamic_axes,
+        opset_version=14,
+        **kwargs,
+    )
+    model.config.save_pretrained(os.path.dirname(onnx_model_path))
+
+
+def test_text_predict_torch_model_batch_next_token_probs():
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=50, n_positions=16, n_embd=16, n_layer=1, n_head=2)
+    model = GPT2LMHeadModel(config)
+
+    batch_input_ids = [(1, 2, 3), (4, 5, 6, 7, 8, 9, 10, 11, 12), (), (1, 2, 3)]
+
+    tp_model = TextPredictTorchModel(model, space_token_id=1, max_seq_length=8)
+    batch_probs = tp_model.get_batch_next_token_probs(batch_input_ids)
+    assert len(batch_probs) == len(batch_input_ids)
+    assert np.allclose(np.sum(batch_probs, axis=-1), 1.0, atol=1e-5)
+
+    # Batched probabilities should match the probabilities of each input
+    tp_model = TextPredictTorchModel(model, space_token_id=1, max_seq_length=8)
+    probs = [tp_model.get_next_token_probs(input_ids) for input_ids in batch_input_ids]
+    assert np.allclose(batch_probs, probs, atol=1e-6)
+
+    batch_top_probs = tp_model.get_batch_top_next_token_probs(batch_input_ids)
+    assert [idx for idx, _ in batch_top_probs] == [int(np.argmax(p)) for p in probs]
+
+
+def test_text_predict_torch_model_token_log_probs():
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=50, n_positions=16, n_embd=16, n_layer=1, n_head=2)
+    model = GPT2LMHeadModel(config)
+    model.eval()
+
+    tp_model = TextPredictTorchModel(model, space_token_id=1, max_seq_length=8)
+
+    # Inputs that fit in a window should be scored with their whole context
+    input_ids = (3, 4, 5, 6)
+    with torch.no_grad():
+        log_probs = torch.log_softmax(model(torch.tensor([(1,) + input_ids])).logits[0, :-1], dim=-1)
+        log_probs = log_probs.gather(-1, torch.tensor(input_ids).unsqueeze(-1)).squeeze(-1).numpy()
+    assert np.allclose(tp_model.get_token_log_probs(input_ids), log_probs, atol=1e-6)
+
+    # Longer inputs are scored with sliding windows, regardless of the number of windows per batch
+    input_ids = tuple(range(2, 25))
+    token_log_probs = tp_model.get_token_log_probs(input_ids, batch_size=2)
+    assert token_log_probs.shape == (len(input_ids),)
+    assert np.allclose(token_log_probs, tp_model.get_token_log_probs(input_ids, batch_size=32), atol=1e-6)
+    assert np.isclose(tp_model.get_loss(input_ids), -np.mean(token_log_probs))
+
+    assert tp_model.get_token_log_probs(()).shape == (0,)
+
+
+def test_text_predict_torch_model_batch_top_k_next_token_probs():
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=50, n_positions=16, n_embd=16, n_layer=1, n_head=2)
+    tp_model = TextPredictTorchModel(GPT2LMHeadModel(config), space_token_id=1, max_seq_length=8)
+
+    batch_input_ids = [(1, 2, 3), (4, 5)]
+    batch_top_k_probs = tp_model.get_batch_top_k_next_token_probs(batch_input_ids, k=3)
+
+    # Top-k tokens are sorted by probability and start with the top-1 token
+    for input_ids, top_k_probs in zip(batch_input_ids, batch_top_k_probs):
+        probs = tp_model.get_next_token_probs(input_ids)
+
+        assert [idx for idx, _ in top_k_probs] == np.argsort(probs)[::-1][:3].tolist()
+        assert np.allclose([prob for _, prob in top_k_probs], np.sort(probs)[::-1][:3])
+        assert top_k_probs[0] == tp_model.get_top_next_token_probs(input_ids)
+
+
+def test_text_predict_onnx_model_padded_batch_next_token_probs(tmp_path):
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=50, n_positions=32, n_embd=16, n_layer=2, n_head=2)
+    model = GPT2LMHeadModel(config).eval()
+
+    onnx_model_path = os.path.join(tmp_path, "model.onnx")
+    _export_onnx_model(model, onnx_model_path)
+
+    tp_model = TextPredictONNXModel(onnx_model_path, space_token_id=1, max_seq_length=8)
+    tp_model.session = CountingSession(tp_model.session)
+
+    # Caches prefixes of different lengths, so the inputs below have different past lengths
+    tp_model.get_batch_next_token_probs([(2, 3), (4, 5, 6, 7)])
+
+    batch_input_ids = [(2, 3, 9), (4, 5, 6, 7, 8, 9, 10), (11,), (), (2, 3, 9, 12, 13, 14, 15, 16, 17, 18)]
+    batch_probs = tp_model.get_batch_next_token_probs(batch_input_ids)
+
+    # Assert that inputs with different lengths and past lengths are forwarded together
+    assert tp_model.session.batch_sizes == [2, len(batch_input_ids)]
+
+    for input_ids, probs in zip(batch_input_ids, batch_probs):
+        input_ids = (input_ids or (1,))[-8:]
+        with torch.no_grad():
+            expected_probs = torch.softmax(model(torch.tensor([input_ids])).logits[0, -1], dim=-1)
+
+        assert np.allclose(probs, expected_probs.numpy(), atol=1e-5)
+
+    # Assert that the cached past key/values (without padding) give the same probabilities when reused
+    input_ids = (4, 5, 6, 7, 8, 9, 10, 11)
+    assert tp_model.past_cache.lookup(input_ids)[1] == 7
+
+    with torch.no_grad():
+        expected_probs = torch.softmax(model(torch.tensor([input_ids])).logits[0, -1], dim=-1)
+    assert np.allclose(tp_model.get_next_token_probs(input_ids), expected_probs.numpy(), atol=1e-5)
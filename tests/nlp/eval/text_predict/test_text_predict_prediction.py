@@ -0,0 +1,135 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pandas as pd
+import pytest
+
+from archai.nlp.eval.text_predict.text_predict_prediction import (
+    TextPredictionPosition,
+    TextPredictPrediction,
+    calculate_triggered_predictions,
+    positions_to_data_frame,
+    summarize_triggered_predictions,
+    sweep_triggered_predictions,
+)
+
+
+def _get_positions():
+    body = "the cat sat on the mat"
+    predictions = {
+        2: ("e cat", 0.9),
+        4: ("cat sat", 0.8),
+        5: ("at on", 0.3),
+        8: ("sat in the", 0.7),
+        15: ("the mat", 0.6),
+    }
+
+    positions = []
+    for char_id in range(len(body)):
+        prediction = predictions.get(char_id, None)
+        if prediction is not None:
+            prediction = TextPredictPrediction(*prediction)
+
+        positions.append(TextPredictionPosition(0, char_id, body[:char_id], body[char_id:], prediction=prediction))
+
+    return positions
+
+
+def test_calculate_triggered_predictions():
+    predictions_df = pd.DataFrame(
+        {
+            "Line": [0, 0, 0, 0, 0, 1, 1, 1],
+            "Char": [0, 1, 2, 3, 4, 0, 1, 2],
+            "Score": [2.0, 2.0, 0.5, 2.0, 2.0, 0.5, 2.0, 2.0],
+            "LastMatchChar": [2, 0, 0, 0, 0, 0, 5, 0],
+        }
+    )
+
+    # Predictions after the characters matched by the triggered prediction can be triggered
+    triggered_df = calculate_triggered_predictions(predictions_df, 1.0)
+    assert predictions_df["Trigger: 1.0"].tolist() == [1, 0, -1, 1, 1, -1, 1, 0]
+    assert triggered_df[["Line", "Char"]].values.tolist() == [[0, 0], [0, 3], [0, 4], [1, 1]]
+
+    triggered_df = calculate_triggered_predictions(predictions_df, 3.0)
+    assert len(triggered_df.index) == 0
+    assert predictions_df["Trigger: 3.0"].tolist() == [-1] * 8
+
+    with pytest.raises(ValueError):
+        calculate_triggered_predictions(predictions_df.iloc[::-1].reset_index(drop=True), 1.0)
+
+
+def test_positions_to_data_frame():
+    positions = _get_positions()
+    predictions_df = positions_to_data_frame(positions)
+
+    assert len(predictions_df.index) == len(positions)
+    assert predictions_df.columns.tolist() == [
+        "Line",
+        "Char",
+        "Text",
+        "BodyContinued",
+        "Probability",
+        "Length",
+        "Match",
+        "PAccept",
+        "Score",
+        "CharAccepted",
+        "WordCount",
+        "Type",
+        "LastMatchChar",
+        "NextTrigger",
+        "PAcceptGivenMatch",
+    ]
+
+    # Assert that positions without a prediction have empty meta-information
+    assert predictions_df.iloc[0].to_dict() == {
+        "Line": 0,
+        "Char": 0,
+        "Text": "",
+        "BodyContinued": True,
+        "Probability": 0.0,
+        "Length": 0,
+        "Match": None,
+        "PAccept": 0.0,
+        "Score": 0.0,
+        "CharAccepted": 0.0,
+        "WordCount": 0,
+        "Type": "",
+        "LastMatchChar": 0,
+        "NextTrigger": 1,
+        "PAcceptGivenMatch": 0.0,
+    }
+
+    # Assert that the meta-information of predictions matches their expected values
+    predictions_df = predictions_df.iloc[[2, 4, 5, 8, 15]]
+    assert predictions_df["Char"].tolist() == [2, 4, 5, 8, 15]
+    assert predictions_df["Text"].tolist() == ["e cat", "cat sat", "at on", "sat in the", "the mat"]
+    assert predictions_df["BodyContinued"].tolist() == ["e cat", "cat sat", "at sa", "sat on the", "the mat"]
+    assert predictions_df["Length"].tolist() == [5, 7, 5, 10, 7]
+    assert predictions_df["Match"].tolist() == [True, True, False, False, True]
+    assert predictions_df["WordCount"].tolist() == [2, 2, 2, 3, 2]
+    assert predictions_df["Type"].tolist() == ["0:XS", "1:S", "0:XS", "1:S", "1:S"]
+    assert predictions_df["LastMatchChar"].tolist() == [5, 7, 3, 4, 7]
+    assert predictions_df["NextTrigger"].tolist() == [8, 12, 9, 13, 23]
+    assert predictions_df["PAcceptGivenMatch"].tolist() == pytest.approx([0.0176, 0.10196, 0.0176, 0.2285, 0.10196])
+    assert predictions_df["PAccept"].tolist() == pytest.approx([0.01584, 0.081568, 0.00528, 0.15995, 0.061176])
+    assert predictions_df["Score"].tolist() == pytest.approx([0.0792, 0.570976, 0.0264, 1.5995, 0.428232])
+    assert predictions_df["CharAccepted"].tolist() == predictions_df["Score"].tolist()
+
+
+def test_sweep_triggered_predictions():
+    predictions_df = positions_to_data_frame(_get_positions())
+    min_scores = [1.0, 0.01, 0.2]
+
+    # Assert that all minimum scores are swept at once, as if they were calculated one by one
+    score_summary, triggered_df = sweep_triggered_predictions(predictions_df.copy(), min_scores, 22, 6, 1.0)
+
+    for min_score, summary in zip(sorted(min_scores), score_summary):
+        expected_triggered_df = calculate_triggered_predictions(predictions_df.copy(), min_score)
+        assert summary == summarize_triggered_predictions(expected_triggered_df, 22, 6, 1.0, min_score=min_score)
+
+    assert [summary["SuggestionsShown"] for summary in score_summary] == [3, 2, 1]
+
+    # Assert that the triggered predictions of the last minimum score have the triggers of every minimum score
+    assert triggered_df["Char"].tolist() == [8]
+    assert triggered_df[["Trigger: 0.01", "Trigger: 0.2", "Trigger: 1.0"]].values.tolist() == [[1, 0, 1]]
@@ -0,0 +1,104 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pytest
+import torch
+from tokenizers import ByteLevelBPETokenizer
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+from archai.nlp.eval.text_predict.text_predict_model import TextPredictTorchModel
+from archai.nlp.eval.text_predict.text_predict_predictor import Predictor
+from archai.nlp.eval.text_predict.text_predict_tokenizer import TextPredictTokenizer
+
+DOCUMENTS = ["the quick brown fox jumps over the lazy dog", "the dog was looking at the quick fox"]
+
+
+class TopKRecorderModel(TextPredictTorchModel):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.top_k_calls = []
+        self.n_forward_calls = 0
+
+    def _get_batch_next_token_probs(self, batch_input_ids):
+        self.n_forward_calls += 1
+        return super()._get_batch_next_token_probs(batch_input_ids)
+
+    def get_batch_top_k_next_token_probs(self, batch_input_ids, k=1):
+        self.top_k_calls.append((len(batch_input_ids), k))
+        return super().get_batch_top_k_next_token_probs(batch_input_ids, k=k)
+
+
+@pytest.fixture
+def tokenizer():
+    tokenizer = ByteLevelBPETokenizer()
+    tokenizer.train_from_iterator(DOCUMENTS, vocab_size=280, min_frequency=1, show_progress=False)
+
+    return TextPredictTokenizer(PreTrainedTokenizerFast(tokenizer_object=tokenizer._tokenizer))
+
+
+def _create_model(tokenizer):
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=len(tokenizer), n_positions=32, n_embd=16, n_layer=1, n_head=2)
+    model = GPT2LMHeadModel(config)
+
+    # Sharpens the next token's probabilities, so predictions are triggered
+    with torch.no_grad():
+        model.lm_head.weight.mul_(30)
+
+    return TopKRecorderModel(model, tokenizer.encode(" ")[0], max_seq_length=16)
+
+
+def _get_texts():
+    return [document[:i] for document in DOCUMENTS for i in range(4, len(document), 5)]
+
+
+def test_predictor_greedy_batch(tokenizer):
+    texts = _get_texts()
+
+    # Assert that a beam width of 1 (greedy decoding) predicts the same in batches or one text at a time
+    predictor = Predictor(_create_model(tokenizer), tokenizer, min_pred_length=1)
+    predictions = predictor._predict_batch(texts)
+    assert all(k == 1 for _, k in predictor.model.top_k_calls)
+
+    expected_predictions = [predictor._predict(text) for text in texts]
+    assert [p.to_dict() for p in predictions] == [p.to_dict() for p in expected_predictions]
+    assert any(len(prediction) > 0 for prediction in predictions)
+
+
+def test_predictor_beam_batch(tokenizer):
+    texts = _get_texts()
+
+    predictor = Predictor(_create_model(tokenizer), tokenizer, min_pred_length=1, beam_width=3)
+    predictions = predictor._predict_batch(texts)
+
+    # Assert that the continuations of every text are forwarded together, e.g., the first forward
+    # pass has one continuation per text and the following ones have up to `beam_width`
+    batch_sizes = [batch_size for batch_size, k in predictor.model.top_k_calls if k == 3]
+    assert len(batch_sizes) == len(predictor.model.top_k_calls)
+    assert max(batch_sizes[1:]) > batch_sizes[0]
+
+    for prediction in predictions:
+        if len(prediction) > 0:
+            assert predictor._check_valid_prediction(prediction)
+            assert prediction.probability > Predictor.MIN_PROB_CUTOFF
+
+    assert [p.to_dict() for p in predictions] == [predictor._predict(text).to_dict() for text in texts]
+
+    with pytest.raises(AssertionError):
+        Predictor(predictor.model, tokenizer, beam_width=0)
+
+
+def test_predictor_beam_batch_small_cache(tokenizer):
+    texts = _get_texts()
+
+    predictor = Predictor(_create_model(tokenizer), tokenizer, min_pred_length=1, beam_width=3)
+    expected_predictions = predictor._predict_batch(texts)
+
+    # Assert that a cache smaller than the batch's continuations does not add forward passes
+    small_cache_predictor = Predictor(_create_model(tokenizer), tokenizer, min_pred_length=1, beam_width=3)
+    small_cache_predictor.model.next_token_probs_cache.maxsize = 2
+    predictions = small_cache_predictor._predict_batch(texts)
+
+    assert small_cache_predictor.model.n_forward_calls == predictor.model.n_forward_calls
+    assert [p.to_dict() for p in predictions] == [p.to_dict() for p in expected_predictions]
@@ -0,0 +1,113 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import functools
+import os
+
+import pytest
+import torch
+from tokenizers import ByteLevelBPETokenizer
+from transformers import GPT2Config, GPT2LMHeadModel, PreTrainedTokenizerFast
+
+from archai.nlp.eval.text_predict.text_predict_model import TextPredictTorchModel
+from archai.nlp.eval.text_predict.text_predict_prediction import TextPredictionSequence
+from archai.nlp.eval.text_predict.text_predict_predictor import Predictor
+from archai.nlp.eval.text_predict.text_predict_sharded import (
+    predict_shards,
+    score_shards,
+)
+from archai.nlp.eval.text_predict.text_predict_tokenizer import TextPredictTokenizer
+
+DOCUMENTS = ["the quick brown fox jumps over the lazy dog", "the dog was looking at the quick fox"]
+
+
+def _create_model(vocab_size, space_token_id):
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=vocab_size, n_positions=32, n_embd=16, n_layer=1, n_head=2)
+    model = GPT2LMHeadModel(config)
+
+    # Sharpens the next token's probabilities, so predictions are triggered
+    with torch.no_grad():
+        model.lm_head.weight.mul_(30)
+
+    return TextPredictTorchModel(model, space_token_id, max_seq_length=16)
+
+
+@pytest.fixture
+def data_file_path(tmp_path):
+    data_file_path = os.path.join(tmp_path, "data.txt")
+    with open(data_file_path, "w") as f:
+        f.write("\n\n".join(DOCUMENTS))
+
+    return data_file_path
+
+
+@pytest.fixture
+def tokenizer():
+    tokenizer = ByteLevelBPETokenizer()
+    tokenizer.train_from_iterator(DOCUMENTS, vocab_size=280, min_frequency=1, show_progress=False)
+
+    return TextPredictTokenizer(PreTrainedTokenizerFast(tokenizer_object=tokenizer._tokenizer))
+
+
+@pytest.mark.parametrize("num_workers", [0, 1])
+def test_predict_and_score_shards(tmp_path, data_file_path, tokenizer, num_workers):
+    model_fn = functools.partial(_create_model, len(tokenizer), tokenizer.encode(" ")[0])
+    output_dir = os.path.join(tmp_path, "shards")
+
+    predictor_kwargs = {"min_pred_length": 1}
+    sequence_kwargs = {"min_score": 0.5, "min_pred_length": 1}
+    min_scores = [0.5, 1.0, 1.5]
+
+    def _predict_shards():
+        return predict_shards(
+            model_fn,
+            tokenizer,
+            data_file_path,
+            output_dir,
+            num_workers=num_workers,
+            shard_size=16,
+            batch_size=4,
+            predictor_kwargs=predictor_kwargs,
+            sequence_kwargs=sequence_kwargs,
+        )
+
+    # Sharded predictions should be scored as the predictions of the whole sequence
+    shard_file_paths = _predict_shards()
+    assert len(shard_file_paths) == (sum(len(document) for document in DOCUMENTS) + 15) // 16
+    score_summary = score_shards(shard_file_paths, min_scores)
+
+    sequence = TextPredictionSequence.from_file(data_file_path, **sequence_kwargs)
+    predictor = Predictor(model_fn(), tokenizer, **predictor_kwargs)
+    predictor.predict(sequence, batch_size=4)
+    predictor.score(sequence, min_scores)
+
+    assert score_summary == sequence.score_summary
+    assert score_summary[0]["SuggestionsShown"] > 0
+
+    # Complete shards are skipped by following runs, while a shard that misses
+    # its predictions file is predicted again
+    os.remove(shard_file_paths[0])
+    mtime = os.path.getmtime(shard_file_paths[1])
+
+    assert _predict_shards() == shard_file_paths
+    assert os.path.exists(shard_file_paths[0])
+    assert os.path.getmtime(shard_file_paths[1]) == mtime
+    assert score_shards(shard_file_paths, min_scores) == score_summary
+
+
+def test_predict_shards_worker_error(tmp_path, data_file_path, tokenizer):
+    model_fn = functools.partial(_create_model, len(tokenizer), tokenizer.encode(" ")[0])
+
+    # Assert that the error of a worker is raised by the main process
+    with pytest.raises(TypeError):
+        predict_shards(
+            model_fn,
+            tokenizer,
+            data_file_path,
+            os.path.join(tmp_path, "shards"),
+            num_workers=1,
+            shard_size=16,
+            sequence_kwargs={"invalid_kwarg": None},
+        )
@@ -0,0 +1,59 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+
+from archai.nlp.eval.text_predict.text_predict_tokenizer import TextPredictTokenizer
+
+
+class CountingTokenizerFast(PreTrainedTokenizerFast):
+    n_get_vocab = 0
+
+    def get_vocab(self):
+        self.n_get_vocab += 1
+        return super().get_vocab()
+
+
+def _get_tokenizer(vocab, tokenizer_cls=PreTrainedTokenizerFast):
+    tokenizer = Tokenizer(models.WordLevel(vocab=vocab, unk_token="a"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+
+    return TextPredictTokenizer(tokenizer_cls(tokenizer_object=tokenizer))
+
+
+def test_text_predict_tokenizer_filter_tokens():
+    vocab = ["a", "b", "Ġ", "Ġl", "Ġlo", "Ġloo", "Ġlook", "Ġlooking", "Ġlow", "Ġm", "lo", "look", "looking"]
+    vocab = {token: idx for idx, token in enumerate(vocab)}
+
+    tokenizer = _get_tokenizer(vocab)
+
+    def _filter_tokens(filter_prefix):
+        # Reference implementation based on a full scan of the vocabulary
+        if len(filter_prefix) > 0 and filter_prefix[0] == " ":
+            filter_prefix = "Ġ" + filter_prefix[1:]
+
+        return sorted(
+            idx
+            for token, idx in tokenizer.tokenizer.vocab.items()
+            if token[: len(filter_prefix)] == filter_prefix[: len(token)]
+        )
+
+    for filter_prefix in ["", " ", " l", " loo", " look", " looking", " lookingg", " lx", "lo", "looki", "z"]:
+        filtered_tokens = tokenizer.filter_tokens(filter_prefix)
+        assert sorted(filtered_tokens.tolist()) == _filter_tokens(filter_prefix)
+
+    expected_tokens = ["Ġ", "Ġl", "Ġlo", "Ġloo", "Ġlook", "Ġlooking"]
+    assert sorted(tokenizer.filter_tokens(" loo").tolist()) == [vocab[token] for token in expected_tokens]
+
+
+def test_text_predict_tokenizer_cached_vocab():
+    tokenizer = _get_tokenizer({"a": 0, "Ġl": 1, "Ġlo": 2}, tokenizer_cls=CountingTokenizerFast)
+    n_get_vocab = tokenizer.tokenizer.n_get_vocab
+
+    # Assert that the vocabulary is retrieved once, rather than on every filtered prefix
+    for filter_prefix in [" lo", " low", " lower", " l"]:
+        tokenizer.filter_tokens(filter_prefix)
+    assert len(tokenizer) == 3
+
+    assert tokenizer.tokenizer.n_get_vocab - n_get_vocab == 1
@@ -0,0 +1,49 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import numpy as np
+
+from archai.nlp.eval.text_predict.text_predict_utils import PrefixTreeCache
+
+
+def _get_past(input_ids, n_layer=2):
+    # Past key/values with shape (2, batch_size, n_head, seq_len, d_head), where
+    # the values of each token only depend on its prefix
+    token_values = np.cumsum(np.array(input_ids, dtype=np.float32))
+    past = np.broadcast_to(token_values[None, None, None, :, None], (2, 1, 2, len(input_ids), 3))
+
+    return [past + layer for layer in range(n_layer)]
+
+
+def test_prefix_tree_cache():
+    # Each token uses 2 * 2 * 1 * 2 * 3 * 4 = 96 bytes, so 10 tokens fit in the cache
+    cache = PrefixTreeCache(max_bytes=960)
+
+    assert cache.lookup((1, 2, 3)) == (None, 0)
+
+    cache.insert((1, 2, 3, 4), _get_past((1, 2, 3, 4)))
+    assert cache.capacity == 10
+
+    # Longest cached prefix does not include the last token
+    for input_ids, expected_length in [((1, 2, 3, 4), 3), ((1, 2, 5), 2), ((1, 2, 3, 4, 5, 6), 4), ((2, 1), 0)]:
+        past, length = cache.lookup(input_ids)
+        assert length == expected_length
+
+        if length > 0:
+            expected_past = _get_past(input_ids[:length])
+            assert all(np.array_equal(p, e) and p.flags.c_contiguous for p, e in zip(past, expected_past))
+
+    # Inserting a cached prefix does not allocate a new entry
+    cache.insert((1, 2), _get_past((1, 2)))
+    assert len(cache) == 1
+
+    # Oldest entries are evicted when the ring buffer wraps around
+    cache.insert((1, 7, 8, 9), _get_past((1, 7, 8, 9)))
+    cache.insert((5, 6, 7), _get_past((5, 6, 7)))
+    assert len(cache) == 2
+    assert cache.lookup((1, 2, 3))[1] == 1
+    assert cache.lookup((1, 7, 8, 9, 10))[1] == 4
+
+    past, length = cache.lookup((5, 6, 7, 8))
+    assert length == 3
+    assert all(np.array_equal(p, e) for p, e in zip(past, _get_past((5, 6, 7))))
@@ -1,15 +1,76 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import json
 import os
+import socket
 import tempfile
 
 import torch
-from transformers import TrainerState, TrainingArguments
+import torch.multiprocessing as mp
+from datasets import Dataset, DatasetDict
+from transformers import GPT2Config, GPT2LMHeadModel, TrainerState, TrainingArguments
 
+from archai.nlp.datasets.hf.loaders import encode_dataset
+from archai.nlp.datasets.hf.processors import (
+    tokenize_contiguous_dataset,
+    tokenize_packed_dataset,
+)
+from archai.nlp.datasets.hf.streaming import StreamingDataset
 from archai.nlp.trainers.hf.trainer import HfTrainer
 
 
+class RowRecorderModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.ones(1))
+        self.rows = []
+
+    def forward(self, input_ids, **kwargs):
+        self.rows.extend(input_ids.tolist())
+        return {"loss": (self.weight * input_ids.float().mean()).pow(2).sum()}
+
+
+def _get_streaming_dataset(tokenizer, **kwargs):
+    dataset = Dataset.from_dict({"text": [f"{i:03d}" for i in range(20)]}).to_iterable_dataset()
+
+    return StreamingDataset(
+        dataset,
+        tokenize_contiguous_dataset,
+        mapping_fn_kwargs={"tokenizer": tokenizer, "mapping_column_name": ("text",), "model_max_length": 6},
+        batch_size=4,
+        **kwargs,
+    )
+
+
+def _train_distributed_streaming(rank, world_size, port, output_dir, tokenizer):
+    os.environ.update(
+        {
+            "MASTER_ADDR": "127.0.0.1",
+            "MASTER_PORT": str(port),
+            "RANK": str(rank),
+            "LOCAL_RANK": str(rank),
+            "WORLD_SIZE": str(world_size),
+        }
+    )
+
+    args = TrainingArguments(
+        output_dir,
+        max_steps=2,
+        save_steps=2,
+        per_device_train_batch_size=2,
+        report_to=[],
+        no_cuda=True,
+    )
+    assert args.world_size == world_size
+
+    model = RowRecorderModel()
+    HfTrainer(model, args=args, train_dataset=_get_streaming_dataset(tokenizer)).train()
+
+    with open(os.path.join(output_dir, f"rows_{rank}.json"), "w") as f:
+        json.dump(model.rows, f)
+
+
 def test_hf_trainer_rotate_checkpoints():
     model = torch.nn.Linear(10, 5)
     args = TrainingArguments("tmp", save_total_limit=2, load_best_model_at_end=False)
@@ -53,3 +114,104 @@ def test_hf_trainer_rotate_checkpoints():
         assert not os.path.exists(checkpoint_1)
         assert os.path.exists(checkpoint_2)
         assert os.path.exists(checkpoint_3)
+
+
+def test_hf_trainer_packed_dataset(tmp_path, char_tokenizer):
+    torch.manual_seed(0)
+
+    config = GPT2Config(vocab_size=128, n_positions=16, n_embd=16, n_layer=2, n_head=2)
+    model = GPT2LMHeadModel(config).eval()
+
+    texts = ["abcdef", "ghij", "klmnopq", "rs"]
+    dataset = DatasetDict({"train": Dataset.from_dict({"text": texts})})
+    dataset = encode_dataset(
+        dataset,
+        char_tokenizer,
+        mapping_fn=tokenize_packed_dataset,
+        mapping_fn_kwargs={"model_max_length": 12},
+    )
+
+    args = TrainingArguments(str(tmp_path), per_device_eval_batch_size=8, report_to=[], no_cuda=True)
+    trainer = HfTrainer(model, args=args)
+
+    # Assert that the segment identifiers are kept by the trainer (the collator builds the tensors)
+    dataset.reset_format()
+    dataloader = trainer.get_eval_dataloader(dataset["train"])
+    inputs = next(iter(dataloader))
+    assert "segment_ids" in inputs
+
+    _, logits, _ = trainer.prediction_step(model, inputs, prediction_loss_only=False)
+
+    # Assert that no attention crosses examples, e.g., each sequence has the same
+    # logits as when it is evaluated alone
+    n_sequences = 0
+    for row in range(inputs["input_ids"].size(0)):
+        for segment in range(1, int(inputs["segment_ids"][row].max()) + 1):
+            is_segment = inputs["segment_ids"][row] == segment
+            input_ids = inputs["input_ids"][row][is_segment][None]
+
+            with torch.no_grad():
+                expected_logits = model(input_ids=input_ids).logits[0]
+
+            assert torch.allclose(logits[row][is_segment], expected_logits, atol=1e-5)
+            n_sequences += 1
+
+    assert n_sequences == len(texts)
+
+    # Assert that a training step runs on packed rows
+    model.train()
+    assert torch.isfinite(trainer.training_step(model, inputs))
+
+
+def test_hf_trainer_streaming_dataset_resume(tmp_path, char_tokenizer):
+    args = TrainingArguments(
+        str(tmp_path),
+        max_steps=4,
+        save_steps=2,
+        per_device_train_batch_size=2,
+        report_to=[],
+        no_cuda=True,
+    )
+
+    model = RowRecorderModel()
+    HfTrainer(model, args=args, train_dataset=_get_streaming_dataset(char_tokenizer)).train()
+
+    # Assert that the checkpoint saves the trained rows rather than the prefetched ones
+    with open(os.path.join(tmp_path, "checkpoint-2", "streaming_state_0.json"), "r") as f:
+        assert json.load(f)["n_rows"] == 4
+
+    # Assert that resuming continues from the rows after the checkpoint (the model does not use the RNG)
+    os.remove(os.path.join(tmp_path, "checkpoint-2", "rng_state.pth"))
+
+    resumed_model = RowRecorderModel()
+    HfTrainer(resumed_model, args=args, train_dataset=_get_streaming_dataset(char_tokenizer)).train(
+        resume_from_checkpoint=os.path.join(tmp_path, "checkpoint-2")
+    )
+    assert len(model.rows) == 8
+    assert resumed_model.rows == model.rows[4:]
+
+
+def test_hf_trainer_streaming_dataset_distributed(tmp_path, char_tokenizer):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    world_size = 2
+    mp.spawn(_train_distributed_streaming, args=(world_size, port, str(tmp_path), char_tokenizer), nprocs=world_size)
+
+    # Assert that every rank trains on (and saves the position of) its own shard, which is neither
+    # dispatched from the first rank nor sharded again
+    expected_rows = []
+    for rank in range(world_size):
+        with open(os.path.join(tmp_path, f"rows_{rank}.json"), "r") as f:
+            rows = json.load(f)
+
+        shard_dataset = _get_streaming_dataset(char_tokenizer, rank=rank, world_size=world_size)
+        shard_rows = [row["input_ids"].tolist() for row in shard_dataset]
+        assert rows == shard_rows[:4]
+        expected_rows.extend(rows)
+
+        with open(os.path.join(tmp_path, "checkpoint-2", f"streaming_state_{rank}.json"), "r") as f:
+            assert json.load(f)["n_rows"] == 4
+
+    assert len({tuple(row) for row in expected_rows}) == 8
@@ -0,0 +1,93 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import math
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from archai.nlp.datasets.nvidia.lm_iterators import LMOrderedIterator
+from archai.nlp.trainers.nvidia.trainer import NvidiaTrainer
+from archai.nlp.trainers.nvidia.training_args import NvidiaTrainingArguments
+
+
+class TokenLossModel(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.n_calls = 0
+
+    def forward(self, input_ids, labels=None):
+        # The loss of each token is its identifier, so losses are known beforehand
+        self.n_calls += 1
+        return (input_ids.float(),)
+
+
+@pytest.fixture
+def trainer(tmp_path):
+    dataset_dir = os.path.join(tmp_path, "textpred", "wikitext-103")
+    os.makedirs(dataset_dir)
+    for split in ["train", "valid", "test"]:
+        with open(os.path.join(dataset_dir, f"wiki.{split}.tokens"), "w") as f:
+            f.write("the cat sat on the mat\n" * 10)
+
+    args = NvidiaTrainingArguments(
+        "tmp",
+        no_cuda=True,
+        output_dir=str(tmp_path / "logdir"),
+        dataset_dir=str(tmp_path),
+        vocab="word",
+        vocab_size=None,
+    )
+
+    return NvidiaTrainer(TokenLossModel(), args=args)
+
+
+def _get_batch_losses(eval_dataloader):
+    return [
+        (input_ids.float().mean().item(), input_ids.numel())
+        for input_ids, _, _, warm in eval_dataloader.get_fixlen_iter()
+        if warm
+    ]
+
+
+def test_nvidia_trainer_evaluation_step(trainer):
+    input_ids = torch.arange(1, 401) % 97
+    eval_dataloader = LMOrderedIterator(input_ids, bsz=4, bptt=5, mem_len=10)
+    batch_losses = _get_batch_losses(eval_dataloader)
+
+    # Assert that all warm batches are evaluated and weighted by their number of tokens
+    eval_loss, _ = trainer.evaluation_step(eval_dataloader)
+
+    losses = np.array([loss for loss, _ in batch_losses])
+    expected_loss = sum(loss * n_tokens for loss, n_tokens in batch_losses) / sum(n for _, n in batch_losses)
+    expected_loss_ci = 1.96 * math.sqrt(losses.var() / (len(losses) - 1))
+
+    assert trainer.model.n_calls == len(batch_losses)
+    assert eval_loss == pytest.approx(expected_loss)
+    assert trainer.eval_loss_ci == pytest.approx(expected_loss_ci)
+
+
+def test_nvidia_trainer_evaluation_step_max_batches(trainer):
+    input_ids = torch.arange(1, 401) % 97
+    eval_dataloader = LMOrderedIterator(input_ids, bsz=4, bptt=5, mem_len=10)
+    batch_starts = range(eval_dataloader.warmup_elems, eval_dataloader.n_cols - 1, eval_dataloader.bptt)
+    batch_losses = dict(zip(batch_starts, _get_batch_losses(eval_dataloader)))
+
+    # Assert that exactly `max_batches` warm batches are sampled, whatever the seed
+    for seed in range(5):
+        trainer.model.n_calls = 0
+        eval_loss, _ = trainer.evaluation_step(eval_dataloader, max_batches=4, seed=seed)
+
+        sampled_starts = np.random.default_rng(seed).choice(list(batch_starts), size=4, replace=False)
+        losses = np.array([batch_losses[i][0] for i in sampled_starts])
+        n_tokens = np.array([batch_losses[i][1] for i in sampled_starts])
+
+        assert trainer.model.n_calls == 4
+        assert eval_loss == pytest.approx((losses * n_tokens).sum() / n_tokens.sum())
+        assert trainer.eval_loss_ci == pytest.approx(1.96 * math.sqrt(losses.var() / 3))
+
+    # Assert that evaluating no batches does not divide by zero
+    eval_loss, _ = trainer.evaluation_step(eval_dataloader, max_batches=0)
+    assert math.isnan(eval_loss) and math.isnan(trainer.eval_loss_ci)